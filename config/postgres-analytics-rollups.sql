@@ -0,0 +1,209 @@
+-- Conversation Analytics Rollups
+-- Incrementally maintained aggregates read by ConversationStorage analytics
+-- (essence/chat/storage/conversation.py), so dashboards don't scan messages.
+-- Run this after postgres-init.sql; it backfills from existing messages.
+--
+-- Response time = assistant message time minus the latest preceding user
+-- message in the same conversation. Rollups assume messages arrive in
+-- created_at order and are not reduced when messages are deleted (deleting
+-- a conversation removes its conversation_stats row).
+
+-- ============================================================================
+-- TABLES
+-- ============================================================================
+
+-- Per-conversation counters
+CREATE TABLE IF NOT EXISTS conversation_stats (
+    conversation_id UUID PRIMARY KEY REFERENCES conversations(id) ON DELETE CASCADE,
+    message_count BIGINT NOT NULL DEFAULT 0,
+    user_message_count BIGINT NOT NULL DEFAULT 0,
+    assistant_message_count BIGINT NOT NULL DEFAULT 0,
+    response_time_sum DOUBLE PRECISION NOT NULL DEFAULT 0, -- Seconds
+    response_count BIGINT NOT NULL DEFAULT 0,
+    first_message_at TIMESTAMP WITH TIME ZONE,
+    last_message_at TIMESTAMP WITH TIME ZONE,
+    last_user_message_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Message counters per hour (bucket = date_trunc('hour', created_at))
+CREATE TABLE IF NOT EXISTS message_stats_hourly (
+    bucket TIMESTAMP WITH TIME ZONE PRIMARY KEY,
+    message_count BIGINT NOT NULL DEFAULT 0,
+    user_message_count BIGINT NOT NULL DEFAULT 0,
+    assistant_message_count BIGINT NOT NULL DEFAULT 0,
+    response_time_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    response_count BIGINT NOT NULL DEFAULT 0
+);
+
+-- Message counters per day
+CREATE TABLE IF NOT EXISTS message_stats_daily (
+    day DATE PRIMARY KEY,
+    message_count BIGINT NOT NULL DEFAULT 0,
+    user_message_count BIGINT NOT NULL DEFAULT 0,
+    assistant_message_count BIGINT NOT NULL DEFAULT 0,
+    response_time_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    response_count BIGINT NOT NULL DEFAULT 0
+);
+
+-- Users with at least one message per day (for active user counts)
+CREATE TABLE IF NOT EXISTS user_activity_daily (
+    day DATE NOT NULL,
+    user_id VARCHAR(255) NOT NULL,
+    PRIMARY KEY (day, user_id)
+);
+
+-- ============================================================================
+-- TRIGGER
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION rollup_message_insert() RETURNS TRIGGER AS $$
+DECLARE
+    ts TIMESTAMP WITH TIME ZONE := COALESCE(NEW.created_at, NOW());
+    is_user INTEGER := CASE WHEN NEW.role = 'user' THEN 1 ELSE 0 END;
+    is_assistant INTEGER := CASE WHEN NEW.role = 'assistant' THEN 1 ELSE 0 END;
+    last_user TIMESTAMP WITH TIME ZONE;
+    response DOUBLE PRECISION := 0;
+    responded INTEGER := 0;
+    conv_user VARCHAR(255);
+BEGIN
+    IF NEW.conversation_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT last_user_message_at INTO last_user
+    FROM conversation_stats
+    WHERE conversation_id = NEW.conversation_id
+    FOR UPDATE;
+
+    IF is_assistant = 1 AND last_user IS NOT NULL AND ts > last_user THEN
+        response := EXTRACT(EPOCH FROM (ts - last_user));
+        responded := 1;
+    END IF;
+
+    INSERT INTO conversation_stats AS s (
+        conversation_id, message_count, user_message_count,
+        assistant_message_count, response_time_sum, response_count,
+        first_message_at, last_message_at, last_user_message_at
+    )
+    VALUES (
+        NEW.conversation_id, 1, is_user, is_assistant, response, responded,
+        ts, ts, CASE WHEN is_user = 1 THEN ts END
+    )
+    ON CONFLICT (conversation_id) DO UPDATE SET
+        message_count = s.message_count + 1,
+        user_message_count = s.user_message_count + is_user,
+        assistant_message_count = s.assistant_message_count + is_assistant,
+        response_time_sum = s.response_time_sum + response,
+        response_count = s.response_count + responded,
+        first_message_at = LEAST(s.first_message_at, ts),
+        last_message_at = GREATEST(s.last_message_at, ts),
+        last_user_message_at = CASE
+            WHEN is_user = 1 THEN GREATEST(s.last_user_message_at, ts)
+            ELSE s.last_user_message_at
+        END;
+
+    INSERT INTO message_stats_hourly AS h (
+        bucket, message_count, user_message_count, assistant_message_count,
+        response_time_sum, response_count
+    )
+    VALUES (date_trunc('hour', ts), 1, is_user, is_assistant, response, responded)
+    ON CONFLICT (bucket) DO UPDATE SET
+        message_count = h.message_count + 1,
+        user_message_count = h.user_message_count + is_user,
+        assistant_message_count = h.assistant_message_count + is_assistant,
+        response_time_sum = h.response_time_sum + response,
+        response_count = h.response_count + responded;
+
+    INSERT INTO message_stats_daily AS d (
+        day, message_count, user_message_count, assistant_message_count,
+        response_time_sum, response_count
+    )
+    VALUES (ts::date, 1, is_user, is_assistant, response, responded)
+    ON CONFLICT (day) DO UPDATE SET
+        message_count = d.message_count + 1,
+        user_message_count = d.user_message_count + is_user,
+        assistant_message_count = d.assistant_message_count + is_assistant,
+        response_time_sum = d.response_time_sum + response,
+        response_count = d.response_count + responded;
+
+    SELECT user_id INTO conv_user FROM conversations WHERE id = NEW.conversation_id;
+    IF conv_user IS NOT NULL THEN
+        INSERT INTO user_activity_daily (day, user_id)
+        VALUES (ts::date, conv_user)
+        ON CONFLICT DO NOTHING;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rollup_message_insert ON messages;
+CREATE TRIGGER trg_rollup_message_insert
+    AFTER INSERT ON messages
+    FOR EACH ROW EXECUTE FUNCTION rollup_message_insert();
+
+-- ============================================================================
+-- BACKFILL
+-- ============================================================================
+
+-- Recompute all rollups from the messages table (one full scan). Run once
+-- after installing the trigger, or to repair drift after bulk deletes.
+CREATE OR REPLACE FUNCTION rebuild_message_rollups() RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE messages IN SHARE MODE;
+    TRUNCATE conversation_stats, message_stats_hourly, message_stats_daily,
+        user_activity_daily;
+
+    DROP TABLE IF EXISTS rollup_messages;
+    CREATE TEMP TABLE rollup_messages ON COMMIT DROP AS
+    SELECT
+        m.conversation_id,
+        c.user_id,
+        m.created_at,
+        CASE WHEN m.role = 'user' THEN 1 ELSE 0 END AS is_user,
+        CASE WHEN m.role = 'assistant' THEN 1 ELSE 0 END AS is_assistant,
+        MAX(CASE WHEN m.role = 'user' THEN m.created_at END) OVER (
+            PARTITION BY m.conversation_id ORDER BY m.created_at
+            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+        ) AS last_user
+    FROM messages m
+    JOIN conversations c ON c.id = m.conversation_id;
+
+    ALTER TABLE rollup_messages
+        ADD COLUMN response DOUBLE PRECISION,
+        ADD COLUMN responded INTEGER;
+    UPDATE rollup_messages SET
+        responded = CASE
+            WHEN is_assistant = 1 AND created_at > last_user THEN 1 ELSE 0
+        END,
+        response = CASE
+            WHEN is_assistant = 1 AND created_at > last_user
+            THEN EXTRACT(EPOCH FROM (created_at - last_user)) ELSE 0
+        END;
+
+    INSERT INTO conversation_stats
+    SELECT conversation_id, COUNT(*), SUM(is_user), SUM(is_assistant),
+        SUM(response), SUM(responded), MIN(created_at), MAX(created_at),
+        MAX(CASE WHEN is_user = 1 THEN created_at END)
+    FROM rollup_messages
+    GROUP BY conversation_id;
+
+    INSERT INTO message_stats_hourly
+    SELECT date_trunc('hour', created_at), COUNT(*), SUM(is_user),
+        SUM(is_assistant), SUM(response), SUM(responded)
+    FROM rollup_messages
+    GROUP BY 1;
+
+    INSERT INTO message_stats_daily
+    SELECT created_at::date, COUNT(*), SUM(is_user), SUM(is_assistant),
+        SUM(response), SUM(responded)
+    FROM rollup_messages
+    GROUP BY 1;
+
+    INSERT INTO user_activity_daily
+    SELECT DISTINCT created_at::date, user_id
+    FROM rollup_messages;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_message_rollups();
@@ -83,6 +83,8 @@ class MessageAPIClient:
         message_type: Optional[str] = None,
         limit: Optional[int] = 50,
         offset: Optional[int] = 0,
+        after_seq: Optional[int] = None,
+        before_seq: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         List message history with optional filters.
@@ -94,9 +96,13 @@ class MessageAPIClient:
             message_type: Filter by message type
             limit: Maximum number of results (default: 50)
             offset: Offset for pagination (default: 0)
+            after_seq: Only messages after this seq, oldest first (pass the
+                previous response's "next_after_seq" to poll for new messages)
+            before_seq: Only messages before this seq, newest first (pass the
+                previous response's "next_before_seq" to page back)
 
         Returns:
-            Dictionary with "messages" list and "total" count
+            Dictionary with "messages" list, "total" count and pagination cursors
         """
         params = {}
         if platform:
@@ -111,6 +117,10 @@ class MessageAPIClient:
             params["limit"] = limit
         if offset:
             params["offset"] = offset
+        if after_seq is not None:
+            params["after_seq"] = after_seq
+        if before_seq is not None:
+            params["before_seq"] = before_seq
 
         return self._request("GET", "/messages", params=params)
 
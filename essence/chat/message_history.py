@@ -4,14 +4,29 @@ Message history storage for debugging Telegram and Discord rendering issues.
 Provides in-memory storage for all sent messages, allowing inspection of what
 was actually rendered and sent to users.
 """
+import json
 import logging
-from collections import defaultdict
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from essence.chat.message_log import MessageLog
 
 logger = logging.getLogger(__name__)
 
+# Count keys: (platform, user_id, chat_id, message_type), None = any value
+CountKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+# Every subset of the four filter fields
+_FILTER_MASKS = range(16)
+# Drop evicted seqs from the front of an index once there are at least this many
+_INDEX_COMPACT_MIN = 64
+
 
 @dataclass
 class MessageHistoryEntry:
@@ -29,6 +44,41 @@ class MessageHistoryEntry:
     rendering_metadata: Dict[str, Any] = field(
         default_factory=dict
     )  # Truncation, formatting applied, etc.
+    seq: Optional[int] = None  # Sequence number assigned by MessageHistory
+
+
+class _SeqIndex:
+    """
+    Sequence numbers of one user's or chat's entries, oldest first.
+
+    A list with a head offset: eviction advances ``head`` instead of popping
+    from the front, so positional access (and bisect) stays O(1) per probe.
+    The evicted prefix is dropped once it is at least half of the list, which
+    keeps eviction amortized O(1).
+    """
+
+    __slots__ = ("seqs", "head")
+
+    def __init__(self) -> None:
+        self.seqs: List[int] = []
+        self.head = 0  # Position of the oldest live seq in ``seqs``
+
+    def __len__(self) -> int:
+        return len(self.seqs) - self.head
+
+    def __iter__(self) -> Iterator[int]:
+        return islice(self.seqs, self.head, None)
+
+    def append(self, seq: int) -> None:
+        self.seqs.append(seq)
+
+    def popleft(self) -> int:
+        seq = self.seqs[self.head]
+        self.head += 1
+        if self.head >= _INDEX_COMPACT_MIN and self.head * 2 >= len(self.seqs):
+            del self.seqs[: self.head]
+            self.head = 0
+        return seq
 
 
 class MessageHistory:
@@ -38,6 +88,15 @@ class MessageHistory:
     Stores all sent messages for debugging rendering issues. Uses in-memory
     storage consistent with MVP architecture, but designed to allow future
     migration to persistent storage if needed.
+
+    Entries live in a fixed-capacity ring addressed by a monotonically
+    increasing sequence number (``seq``). The per-user, per-chat and
+    per-message-ID indexes are sorted lists of sequence numbers (see
+    ``_SeqIndex``) with the oldest entry at their head: adding, evicting and
+    looking up an entry (by ``seq``, or by ``message_id`` among the few entries
+    sharing it) are O(1), and cursor bounds are found by bisection. Match
+    counts for every combination of the platform/user/chat/type filters are
+    maintained on add and evict.
     """
 
     def __init__(self, max_entries: int = 10000):
@@ -47,14 +106,39 @@ class MessageHistory:
         Args:
             max_entries: Maximum number of entries to store (FIFO eviction)
         """
-        self._messages: List[MessageHistoryEntry] = []
-        self._max_entries = max_entries
-        self._by_user: Dict[str, List[int]] = defaultdict(
-            list
-        )  # user_id -> list of indices
-        self._by_chat: Dict[str, List[int]] = defaultdict(
-            list
-        )  # chat_id -> list of indices
+        self._max_entries = max(1, max_entries)
+        self._ring: List[Optional[MessageHistoryEntry]] = [None] * self._max_entries
+        self._next_seq = 0  # Sequence number of the next entry
+        self._oldest_seq = 0  # Sequence number of the oldest stored entry
+        self._by_user: Dict[str, _SeqIndex] = {}  # user_id -> seqs, oldest first
+        self._by_chat: Dict[str, _SeqIndex] = {}  # chat_id -> seqs, oldest first
+        # message_id -> seqs, oldest first (IDs repeat across chats and platforms)
+        self._by_message_id: Dict[str, _SeqIndex] = {}
+        self._counts: Counter = Counter()  # CountKey -> number of entries
+
+    def __len__(self) -> int:
+        return self._next_seq - self._oldest_seq
+
+    @property
+    def _messages(self) -> List[MessageHistoryEntry]:
+        """Stored entries, oldest first (O(n); for debugging and tests)."""
+        return [self._ring[seq % self._max_entries] for seq in self._seq_range()]
+
+    @property
+    def last_seq(self) -> Optional[int]:
+        """Sequence number of the newest entry, or None if empty."""
+        return self._next_seq - 1 if len(self) else None
+
+    def _seq_range(self) -> range:
+        return range(self._oldest_seq, self._next_seq)
+
+    @staticmethod
+    def _count_keys(entry: MessageHistoryEntry) -> Iterator[CountKey]:
+        values = (entry.platform, entry.user_id, entry.chat_id, entry.message_type)
+        for mask in _FILTER_MASKS:
+            yield tuple(
+                value if mask >> i & 1 else None for i, value in enumerate(values)
+            )
 
     def add_message(
         self,
@@ -67,7 +151,7 @@ class MessageHistory:
         raw_text: Optional[str] = None,
         formatted_text: Optional[str] = None,
         rendering_metadata: Optional[Dict[str, Any]] = None,
-    ) -> None:
+    ) -> MessageHistoryEntry:
         """
         Add a message to history.
 
@@ -81,7 +165,11 @@ class MessageHistory:
             raw_text: Raw text before formatting (optional)
             formatted_text: Formatted text with HTML/markdown (optional)
             rendering_metadata: Additional metadata about rendering (optional)
+
+        Returns:
+            The stored entry (with its sequence number set)
         """
+        seq = self._next_seq
         entry = MessageHistoryEntry(
             timestamp=datetime.now(),
             platform=platform,
@@ -93,65 +181,133 @@ class MessageHistory:
             raw_text=raw_text,
             formatted_text=formatted_text,
             rendering_metadata=rendering_metadata or {},
+            seq=seq,
         )
 
-        # Add to main list
-        index = len(self._messages)
-        self._messages.append(entry)
-
-        # Update indices
-        self._by_user[entry.user_id].append(index)
-        self._by_chat[entry.chat_id].append(index)
-
-        # Evict oldest entries if over limit
-        if len(self._messages) > self._max_entries:
-            self._evict_oldest()
+        self._store(entry)
 
         logger.debug(
             f"Added message to history: platform={platform}, user_id={user_id}, "
             f"chat_id={chat_id}, type={message_type}, content_length={len(message_content)}"
         )
+        return entry
+
+    def _store(self, entry: MessageHistoryEntry) -> None:
+        """Store an entry whose seq is the next sequence number."""
+        seq = entry.seq
+        # Evict the oldest entry if the ring is full
+        if len(self) >= self._max_entries:
+            self._evict_oldest()
+
+        self._ring[seq % self._max_entries] = entry
+        self._next_seq = seq + 1
+
+        # Update indices
+        self._by_user.setdefault(entry.user_id, _SeqIndex()).append(seq)
+        self._by_chat.setdefault(entry.chat_id, _SeqIndex()).append(seq)
+        if entry.message_id is not None:
+            self._by_message_id.setdefault(str(entry.message_id), _SeqIndex()).append(
+                seq
+            )
+        for key in self._count_keys(entry):
+            self._counts[key] += 1
 
     def _evict_oldest(self) -> None:
-        """Evict oldest entries when over limit."""
-        num_to_evict = len(self._messages) - self._max_entries
+        """Evict the oldest entry."""
+        seq = self._oldest_seq
+        slot = seq % self._max_entries
+        entry = self._ring[slot]
+        self._ring[slot] = None
+        self._oldest_seq += 1
+        if entry is None:
+            return
+
+        # The evicted entry is the oldest one in each of its indices
+        indices = [(self._by_user, entry.user_id), (self._by_chat, entry.chat_id)]
+        if entry.message_id is not None:
+            indices.append((self._by_message_id, str(entry.message_id)))
+        for index, key in indices:
+            seqs = index.get(key)
+            if seqs:
+                seqs.popleft()
+                if not seqs:
+                    del index[key]
+
+        for key in self._count_keys(entry):
+            self._counts[key] -= 1
+            if self._counts[key] <= 0:
+                del self._counts[key]
+
+    def get_entry(self, seq: int) -> Optional[MessageHistoryEntry]:
+        """
+        Get an entry by sequence number.
 
-        # Remove oldest entries
-        for _ in range(num_to_evict):
-            if not self._messages:
-                break
+        Args:
+            seq: Sequence number assigned when the entry was added
+
+        Returns:
+            The entry, or None if it was evicted or never existed
+        """
+        if not self._oldest_seq <= seq < self._next_seq:
+            return None
+        return self._ring[seq % self._max_entries]
+
+    def get_by_message_id(
+        self,
+        message_id: str,
+        platform: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Optional[MessageHistoryEntry]:
+        """
+        Get the most recent entry with a platform message ID.
+
+        Args:
+            message_id: Platform-specific message ID
+            platform: Only match entries from this platform (optional)
+            user_id: Only match entries from this user (optional)
+
+        Returns:
+            The entry, or None if no stored entry matches
+        """
+        index = self._by_message_id.get(str(message_id))
+        if not index:
+            return None
+        # Newest first; an ID is shared by only a few chats, so this stays short
+        for position in range(len(index.seqs) - 1, index.head - 1, -1):
+            entry = self._ring[index.seqs[position] % self._max_entries]
+            if platform and entry.platform != platform:
+                continue
+            if user_id and entry.user_id != str(user_id):
+                continue
+            return entry
+        return None
+
+    def count_messages(
+        self,
+        user_id: Optional[str] = None,
+        chat_id: Optional[str] = None,
+        platform: Optional[str] = None,
+        message_type: Optional[str] = None,
+    ) -> int:
+        """
+        Count messages matching criteria in O(1).
+
+        Args:
+            user_id: Filter by user ID (optional)
+            chat_id: Filter by chat/channel ID (optional)
+            platform: Filter by platform (optional)
+            message_type: Filter by message type (optional)
 
-            entry = self._messages.pop(0)
-
-            # Remove from indices
-            if entry.user_id in self._by_user:
-                indices = self._by_user[entry.user_id]
-                if indices:
-                    indices.pop(0)
-                if not indices:
-                    del self._by_user[entry.user_id]
-
-            if entry.chat_id in self._by_chat:
-                indices = self._by_chat[entry.chat_id]
-                if indices:
-                    indices.pop(0)
-                if not indices:
-                    del self._by_chat[entry.chat_id]
-
-        # Rebuild indices (shift all indices down by num_to_evict)
-        for user_id in self._by_user:
-            self._by_user[user_id] = [
-                idx - num_to_evict
-                for idx in self._by_user[user_id]
-                if idx >= num_to_evict
-            ]
-
-        for chat_id in self._by_chat:
-            self._by_chat[chat_id] = [
-                idx - num_to_evict
-                for idx in self._by_chat[chat_id]
-                if idx >= num_to_evict
-            ]
+        Returns:
+            Number of stored entries matching all given filters
+        """
+        key = (
+            platform or None,
+            str(user_id) if user_id else None,
+            str(chat_id) if chat_id else None,
+            message_type or None,
+        )
+        return self._counts.get(key, 0)
 
     def get_messages(
         self,
@@ -160,37 +316,60 @@ class MessageHistory:
         platform: Optional[str] = None,
         message_type: Optional[str] = None,
         limit: Optional[int] = None,
+        after_seq: Optional[int] = None,
+        before_seq: Optional[int] = None,
     ) -> List[MessageHistoryEntry]:
         """
         Retrieve messages matching criteria.
 
+        ``after_seq``/``before_seq`` are keyset cursors: pass the ``seq`` of
+        the last entry of a page to get the next one. Only the entries on the
+        page are visited, however large the history is.
+
         Args:
             user_id: Filter by user ID (optional)
             chat_id: Filter by chat/channel ID (optional)
             platform: Filter by platform ("telegram" or "discord") (optional)
             message_type: Filter by message type (optional)
             limit: Maximum number of results to return (optional)
+            after_seq: Only entries with seq > after_seq, oldest first (optional)
+            before_seq: Only entries with seq < before_seq (optional)
 
         Returns:
-            List of matching MessageHistoryEntry objects, ordered by timestamp (newest first)
+            List of matching MessageHistoryEntry objects, ordered by timestamp
+            (newest first, or oldest first when after_seq is given)
         """
         # Use indices for efficient filtering
-        if user_id:
-            indices = self._by_user.get(str(user_id), [])
-        elif chat_id:
-            indices = self._by_chat.get(str(chat_id), [])
+        seqs: Sequence[int] = self._seq_range()
+        start = 0  # Position of the oldest live seq in seqs
+        if user_id or chat_id:
+            if user_id:
+                index = self._by_user.get(str(user_id))
+            else:
+                index = self._by_chat.get(str(chat_id))
+            seqs, start = (index.seqs, index.head) if index else ((), 0)
+
+        # Positions of the cursor bounds (indexes and ranges are sorted by seq)
+        lo = bisect_right(seqs, after_seq, start) if after_seq is not None else start
+        hi = (
+            bisect_left(seqs, before_seq, start)
+            if before_seq is not None
+            else len(seqs)
+        )
+        if after_seq is not None:
+            positions = range(lo, hi)
         else:
-            indices = list(range(len(self._messages)))
+            positions = range(hi - 1, lo - 1, -1)  # Newest first
 
         # Get entries and filter
         results = []
-        for idx in reversed(indices):  # Newest first
-            if idx >= len(self._messages):
-                continue
-
-            entry = self._messages[idx]
+        for position in positions:
+            seq = seqs[position]
+            entry = self._ring[seq % self._max_entries]
 
             # Apply filters
+            if user_id and chat_id and entry.chat_id != str(chat_id):
+                continue
             if platform and entry.platform != platform:
                 continue
             if message_type and entry.message_type != message_type:
@@ -204,10 +383,17 @@ class MessageHistory:
         return results
 
     def clear(self) -> None:
-        """Clear all message history."""
-        self._messages.clear()
+        """Clear all message history.
+
+        Sequence numbers keep increasing so ids handed out before the clear
+        are never reused.
+        """
+        self._ring = [None] * self._max_entries
+        self._oldest_seq = self._next_seq
         self._by_user.clear()
         self._by_chat.clear()
+        self._by_message_id.clear()
+        self._counts.clear()
         logger.info("Message history cleared")
 
     def get_stats(self) -> Dict[str, Any]:
@@ -218,14 +404,14 @@ class MessageHistory:
             Dictionary with statistics
         """
         return {
-            "total_messages": len(self._messages),
+            "total_messages": len(self),
             "max_entries": self._max_entries,
             "by_platform": {
-                platform: sum(1 for m in self._messages if m.platform == platform)
+                platform: self.count_messages(platform=platform)
                 for platform in ["telegram", "discord"]
             },
             "by_type": {
-                msg_type: sum(1 for m in self._messages if m.message_type == msg_type)
+                msg_type: self.count_messages(message_type=msg_type)
                 for msg_type in ["text", "voice", "error", "status"]
             },
             "unique_users": len(self._by_user),
@@ -233,6 +419,201 @@ class MessageHistory:
         }
 
 
+class PersistentMessageHistory(MessageHistory):
+    """
+    Message history backed by an on-disk append-only log.
+
+    Every entry is written through to a MessageLog as JSON, so history survives
+    restarts. The newest ``max_entries`` entries are kept in the in-memory ring
+    (replayed from the log on startup) and serve all queries; older entries
+    stay on disk and are reachable with ``scan()`` and ``get_entry()`` until
+    they fall out of the retention window. Retention is applied on open and,
+    on a background thread, whenever a log segment is sealed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_entries: int = 10000,
+        retention_seconds: Optional[float] = None,
+        fsync_batch: int = 256,
+        fsync_interval: float = 1.0,
+        segment_records: int = 65536,
+    ):
+        """
+        Open (or create) persistent message history.
+
+        Args:
+            directory: Directory holding the log segments
+            max_entries: Number of newest entries kept in memory
+            retention_seconds: Drop entries older than this from disk when
+                segments are compacted (None keeps everything)
+            fsync_batch: fsync after this many unsynced entries
+            fsync_interval: fsync when the oldest unsynced entry is this old
+            segment_records: Entries per log segment
+        """
+        super().__init__(max_entries=max_entries)
+        self.retention_seconds = retention_seconds
+        self._log = MessageLog(
+            directory,
+            segment_records=segment_records,
+            fsync_batch=fsync_batch,
+            fsync_interval=fsync_interval,
+        )
+        self._compaction: Optional[threading.Thread] = None
+        self._compaction_requested = False
+        self._compaction_lock = threading.Lock()
+        self.compact()
+
+        # Replay the newest entries; seqs continue where the log ended
+        first = max(self._log.first_seq or 0, self._log.next_seq - self._max_entries)
+        self._oldest_seq = self._next_seq = first
+        for record in self._log.scan(after_seq=first - 1):
+            self._store(self._decode(record))
+        if not len(self):
+            # Nothing to replay (e.g. cleared): keep seqs monotonic
+            self._oldest_seq = self._next_seq = self._log.next_seq
+        logger.info(
+            f"Loaded {len(self)} of {len(self._log)} message history entries "
+            f"from {directory}"
+        )
+
+    @staticmethod
+    def _encode(entry: MessageHistoryEntry) -> bytes:
+        data = dict(vars(entry))  # Shallow: json walks the nested values
+        data["timestamp"] = entry.timestamp.isoformat()
+        return json.dumps(data, default=str).encode("utf-8")
+
+    @staticmethod
+    def _decode(record: Tuple[int, float, bytes]) -> MessageHistoryEntry:
+        seq, _, payload = record
+        data = json.loads(payload)
+        data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+        data["seq"] = seq
+        return MessageHistoryEntry(**data)
+
+    def add_message(self, *args, **kwargs) -> MessageHistoryEntry:
+        """Add a message to history and append it to the log.
+
+        Takes the same arguments as MessageHistory.add_message.
+        """
+        entry = super().add_message(*args, **kwargs)
+        if self._log.append(
+            entry.seq, entry.timestamp.timestamp(), self._encode(entry)
+        ):
+            # A segment was sealed: a good time to apply retention
+            self._compact_in_background()
+        return entry
+
+    def _compact_in_background(self) -> None:
+        """Run compact() on a worker thread (again, if one is running)."""
+        with self._compaction_lock:
+            self._compaction_requested = True
+            if self._compaction is not None:
+                return
+            self._compaction = threading.Thread(
+                target=self._run_compaction,
+                name="message-log-compaction",
+                daemon=True,
+            )
+            self._compaction.start()
+
+    def _run_compaction(self) -> None:
+        while True:
+            with self._compaction_lock:
+                if not self._compaction_requested:
+                    self._compaction = None
+                    return
+                self._compaction_requested = False
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Message log compaction failed: {e}", exc_info=True)
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        """Wait for background compaction to finish."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join(timeout)
+
+    def get_entry(self, seq: int) -> Optional[MessageHistoryEntry]:
+        """
+        Get an entry by sequence number, reading evicted entries from disk.
+
+        Args:
+            seq: Sequence number assigned when the entry was added
+
+        Returns:
+            The entry, or None if it is not in memory or on disk
+        """
+        entry = super().get_entry(seq)
+        if entry is None and 0 <= seq < self._oldest_seq:
+            record = self._log.get(seq)
+            entry = self._decode(record) if record is not None else None
+        return entry
+
+    def scan(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after_seq: Optional[int] = None,
+        reverse: bool = False,
+    ) -> Iterator[MessageHistoryEntry]:
+        """
+        Iterate over all entries on disk in a time range without loading
+        them into memory.
+
+        Args:
+            start: Only entries at or after this time (optional)
+            end: Only entries before this time (optional)
+            after_seq: Only entries with seq > after_seq (optional)
+            reverse: Newest first
+
+        Yields:
+            MessageHistoryEntry objects, oldest first (or newest first)
+        """
+        records = self._log.scan(
+            start_time=start.timestamp() if start else None,
+            end_time=end.timestamp() if end else None,
+            after_seq=after_seq,
+            reverse=reverse,
+        )
+        for record in records:
+            yield self._decode(record)
+
+    def compact(self) -> int:
+        """
+        Apply the retention window to the log and merge small segments.
+
+        Returns:
+            Number of entries removed from disk
+        """
+        before_time = None
+        if self.retention_seconds is not None:
+            before_time = time.time() - self.retention_seconds
+        return self._log.compact(before_time=before_time)
+
+    def sync(self) -> None:
+        """fsync entries not yet on disk."""
+        self._log.sync()
+
+    def clear(self) -> None:
+        """Clear all message history, in memory and on disk."""
+        super().clear()
+        self._log.truncate()
+
+    def close(self) -> None:
+        """Flush and close the log."""
+        self.wait_for_compaction()
+        self._log.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["stored_messages"] = len(self._log)
+        stats["log_segments"] = self._log.segment_count
+        return stats
+
+
 # Global singleton instance
 _message_history: Optional[MessageHistory] = None
 
@@ -241,16 +622,32 @@ def get_message_history() -> MessageHistory:
     """
     Get the global message history instance.
 
+    With MESSAGE_HISTORY_DIR set, history is persisted there; the directory is
+    locked by the process that opens it, so each process needs its own.
+
     Returns:
         MessageHistory instance
     """
     global _message_history
     if _message_history is None:
-        _message_history = MessageHistory()
+        directory = os.getenv("MESSAGE_HISTORY_DIR")
+        if directory:
+            retention_days = os.getenv("MESSAGE_HISTORY_RETENTION_DAYS")
+            _message_history = PersistentMessageHistory(
+                directory,
+                retention_seconds=float(retention_days) * 86400
+                if retention_days
+                else None,
+                fsync_batch=int(os.getenv("MESSAGE_HISTORY_FSYNC_BATCH", "256")),
+            )
+        else:
+            _message_history = MessageHistory()
     return _message_history
 
 
 def reset_message_history() -> None:
     """Reset the global message history (useful for testing)."""
     global _message_history
+    if isinstance(_message_history, PersistentMessageHistory):
+        _message_history.close()
     _message_history = None
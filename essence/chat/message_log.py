@@ -0,0 +1,665 @@
+"""
+Append-only, segmented on-disk log for message history.
+
+Records are appended to ``segment-<base_seq>.log`` files. Each segment has a
+fixed-size ``.idx`` file that is memory-mapped and holds one
+``(seq, offset, time)`` entry per record, so a record is found by binary
+search over the mapped index and read with a single ``pread``. Nothing is
+loaded into RAM beyond the index pages the OS keeps cached.
+
+Durability: appends go through the page cache and are fsync'ed in batches
+(every ``fsync_batch`` records, at most ``fsync_interval`` seconds after the
+first unsynced record even if appends stop, and on close), so a power failure
+can lose at most one batch. On open, the active segment is re-validated
+against its log: torn records at the tail are truncated and records missing
+from the index are re-indexed.
+
+Concurrency: one process owns a log directory (an exclusive ``flock`` on its
+``LOCK`` file). Within the process the log is thread-safe; ``compact()`` builds
+replacement segments without blocking appends or reads and swaps them in
+under the lock, and scans that cross a swap resume by seq.
+
+Index times are kept non-decreasing within the log (a clock step backwards
+records the previous time) so time-range scans can binary search; the
+record's own timestamp is stored unchanged in the payload.
+"""
+import fcntl
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Record header: payload length, crc32(seq + time + payload), seq, time
+_RECORD_HEADER = struct.Struct("<IIQd")
+_CRC_FIELDS = struct.Struct("<Qd")
+# Index file header: magic, version, record count
+_INDEX_HEADER = struct.Struct("<4sIQ")
+_INDEX_ENTRY = struct.Struct("<QQd")  # seq, log offset, time
+_INDEX_MAGIC = b"MHIX"
+_INDEX_VERSION = 1
+
+_SEGMENT_NAME = re.compile(r"^segment-(\d{20})\.log$")
+
+# A stored record: (seq, time, payload)
+Record = Tuple[int, float, bytes]
+
+
+class CorruptRecordError(Exception):
+    """Raised when a record does not match its index entry or checksum."""
+
+
+class LogLockedError(Exception):
+    """Raised when another process already has the log directory open."""
+
+
+class _IndexTimes:
+    """Sequence view of a segment's index times (for bisect)."""
+
+    def __init__(self, segment: "_Segment"):
+        self._segment = segment
+
+    def __len__(self) -> int:
+        return self._segment.count
+
+    def __getitem__(self, i: int) -> float:
+        return self._segment.index_entry(i)[2]
+
+
+class _IndexSeqs(_IndexTimes):
+    """Sequence view of a segment's index seqs (for bisect)."""
+
+    def __getitem__(self, i: int) -> int:
+        return self._segment.index_entry(i)[0]
+
+
+class _Segment:
+    """One log file and its memory-mapped index."""
+
+    def __init__(self, directory: Path, base_seq: int, capacity: int):
+        self.base_seq = base_seq
+        self.capacity = capacity
+        self.log_path = directory / f"segment-{base_seq:020d}.log"
+        self.index_path = self.log_path.with_suffix(".idx")
+
+        index_size = _INDEX_HEADER.size + capacity * _INDEX_ENTRY.size
+        new_index = not self.index_path.exists()
+        self._index_file = open(self.index_path, "w+b" if new_index else "r+b")
+        if os.fstat(self._index_file.fileno()).st_size < index_size:
+            self._index_file.truncate(index_size)  # Sparse until written
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        magic, version, count = _INDEX_HEADER.unpack_from(self._index, 0)
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION:
+            count = 0
+            _INDEX_HEADER.pack_into(self._index, 0, _INDEX_MAGIC, _INDEX_VERSION, 0)
+        self.capacity = (len(self._index) - _INDEX_HEADER.size) // _INDEX_ENTRY.size
+        self.count = min(count, self.capacity)
+
+        # Unbuffered: one write() per record, visible to pread() immediately
+        self._log = open(self.log_path, "a+b", buffering=0)
+        self.log_size = os.fstat(self._log.fileno()).st_size
+        self.times = _IndexTimes(self)
+        self.seqs = _IndexSeqs(self)
+        self.closed = False
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    @property
+    def first_seq(self) -> Optional[int]:
+        return self.index_entry(0)[0] if self.count else None
+
+    @property
+    def last_seq(self) -> Optional[int]:
+        return self.index_entry(self.count - 1)[0] if self.count else None
+
+    @property
+    def last_time(self) -> Optional[float]:
+        return self.index_entry(self.count - 1)[2] if self.count else None
+
+    def index_entry(self, i: int) -> Tuple[int, int, float]:
+        return _INDEX_ENTRY.unpack_from(
+            self._index, _INDEX_HEADER.size + i * _INDEX_ENTRY.size
+        )
+
+    def _set_count(self, count: int) -> None:
+        self.count = count
+        _INDEX_HEADER.pack_into(self._index, 0, _INDEX_MAGIC, _INDEX_VERSION, count)
+
+    def append(self, seq: int, timestamp: float, payload: bytes) -> None:
+        crc = zlib.crc32(_CRC_FIELDS.pack(seq, timestamp) + payload)
+        offset = self.log_size
+        self._log.write(
+            _RECORD_HEADER.pack(len(payload), crc, seq, timestamp) + payload
+        )
+        self.log_size += _RECORD_HEADER.size + len(payload)
+        _INDEX_ENTRY.pack_into(
+            self._index,
+            _INDEX_HEADER.size + self.count * _INDEX_ENTRY.size,
+            seq,
+            offset,
+            timestamp,
+        )
+        self._set_count(self.count + 1)
+
+    def _read_at(self, offset: int) -> Tuple[Record, int]:
+        """Read the record at a log offset; returns it and the next offset."""
+        header = os.pread(self._log.fileno(), _RECORD_HEADER.size, offset)
+        if len(header) < _RECORD_HEADER.size:
+            raise CorruptRecordError(f"Truncated record header at {offset}")
+        length, crc, seq, timestamp = _RECORD_HEADER.unpack(header)
+        payload = os.pread(self._log.fileno(), length, offset + _RECORD_HEADER.size)
+        if (
+            len(payload) < length
+            or zlib.crc32(_CRC_FIELDS.pack(seq, timestamp) + payload) != crc
+        ):
+            raise CorruptRecordError(f"Bad record at {offset}")
+        return (seq, timestamp, payload), offset + _RECORD_HEADER.size + length
+
+    def read(self, i: int) -> Record:
+        seq, offset, _ = self.index_entry(i)
+        record, _ = self._read_at(offset)
+        if record[0] != seq:
+            raise CorruptRecordError(f"Index/log mismatch for seq {seq}")
+        return record
+
+    def find(self, seq: int) -> Optional[int]:
+        """Index position of ``seq`` in this segment, or None."""
+        i = bisect_left(self.seqs, seq)
+        if i < self.count and self.index_entry(i)[0] == seq:
+            return i
+        return None
+
+    def _last_record_end(self) -> Optional[int]:
+        """Log offset after the last indexed record, or None if it is invalid."""
+        seq, offset, _ = self.index_entry(self.count - 1)
+        try:
+            record, end = self._read_at(offset)
+        except CorruptRecordError:
+            return None
+        return end if record[0] == seq and end <= self.log_size else None
+
+    def recover(self, active: bool) -> None:
+        """Make the index agree with the log after an unclean shutdown.
+
+        A sealed segment's index must end exactly at the end of its log,
+        otherwise (e.g. after an interrupted compaction) it is rebuilt from
+        the log. The active segment drops index entries without a valid
+        record, indexes records written after the last indexed one and
+        truncates a torn tail.
+
+        Args:
+            active: Whether this is the segment appends go to
+        """
+        end = self._last_record_end() if self.count else 0
+        if not active:
+            if end == self.log_size:
+                return
+            logger.warning(f"Rebuilding index {self.index_path.name}")
+            self._set_count(0)
+            end = 0
+        else:
+            while end is None:
+                self._set_count(self.count - 1)
+                end = self._last_record_end() if self.count else 0
+
+        offset = end
+        last_time = self.last_time or 0.0
+        while offset < self.log_size and not self.full:
+            try:
+                (seq, timestamp, _), next_offset = self._read_at(offset)
+            except CorruptRecordError:
+                break
+            last_time = max(last_time, timestamp)
+            _INDEX_ENTRY.pack_into(
+                self._index,
+                _INDEX_HEADER.size + self.count * _INDEX_ENTRY.size,
+                seq,
+                offset,
+                last_time,
+            )
+            self._set_count(self.count + 1)
+            offset = next_offset
+        if offset < self.log_size:
+            logger.warning(
+                f"{self.log_path.name}: truncating {self.log_size - offset} "
+                "bytes of torn records"
+            )
+            self._log.truncate(offset)
+            self.log_size = offset
+
+    def sync(self) -> None:
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._index.flush()
+
+    def close(self) -> None:
+        self.closed = True
+        self._log.close()
+        self._index.close()
+        self._index_file.close()
+
+    def delete(self) -> None:
+        self.close()
+        self.log_path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+
+
+class MessageLog:
+    """Segmented append-only record log with memory-mapped indexes."""
+
+    def __init__(
+        self,
+        directory: str,
+        segment_records: int = 65536,
+        fsync_batch: int = 256,
+        fsync_interval: float = 1.0,
+    ):
+        """
+        Open (or create) a log.
+
+        Args:
+            directory: Directory holding the segment files
+            segment_records: Records per segment before rolling to a new one
+            fsync_batch: fsync after this many unsynced records
+            fsync_interval: fsync when the oldest unsynced record is this old
+                (seconds)
+
+        Raises:
+            LogLockedError: If another process has the directory open
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self.directory / "LOCK", "a+b")
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise LogLockedError(f"Message log {directory} is already open")
+
+        self.segment_records = segment_records
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[threading.Timer] = None
+        # Guards the segment list and segment I/O
+        self._lock = threading.RLock()
+        # Serializes compact(), truncate() and close()
+        self._compact_lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._open_segments()
+
+    def _open_segments(self) -> None:
+        bases = sorted(
+            int(match.group(1))
+            for match in map(_SEGMENT_NAME.match, os.listdir(self.directory))
+            if match
+        )
+        for n, base in enumerate(bases):
+            segment = _Segment(self.directory, base, self.segment_records)
+            segment.recover(active=n == len(bases) - 1)
+            previous = self._segments[-1] if self._segments else None
+            if segment.count == 0 and n < len(bases) - 1:
+                segment.delete()
+                continue
+            if (
+                previous is not None
+                and segment.count
+                and previous.count
+                and segment.first_seq <= previous.last_seq
+            ):
+                # Left over from an interrupted merge: already in `previous`
+                logger.warning(f"Removing merged segment {segment.log_path.name}")
+                segment.delete()
+                continue
+            self._segments.append(segment)
+
+    @property
+    def next_seq(self) -> int:
+        """One past the highest seq in the log (0 when empty)."""
+        with self._lock:
+            if not self._segments:
+                return 0
+            active = self._segments[-1]
+            if not active.count:
+                return active.base_seq  # Nothing appended since truncate()
+            return active.last_seq + 1
+
+    @property
+    def first_seq(self) -> Optional[int]:
+        with self._lock:
+            for segment in self._segments:
+                if segment.count:
+                    return segment.first_seq
+            return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(segment.count for segment in self._segments)
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments)
+
+    def append(self, seq: int, timestamp: float, payload: bytes) -> bool:
+        """
+        Append a record.
+
+        Args:
+            seq: Record sequence number (must be greater than any stored seq)
+            timestamp: Record time (UNIX seconds)
+            payload: Serialized record
+
+        Returns:
+            True if the active segment was full and has been sealed (a good
+            time to compact)
+        """
+        with self._lock:
+            active = self._segments[-1] if self._segments else None
+            if active is not None and active.count and seq <= active.last_seq:
+                raise ValueError(f"seq {seq} is not after {active.last_seq}")
+            sealed = active is not None and active.full
+            if active is None or active.full:
+                if active is not None:
+                    active.sync()
+                active = _Segment(self.directory, seq, self.segment_records)
+                self._segments.append(active)
+
+            # Keep index times monotonic so time scans can binary search
+            last_time = self._last_time()
+            active.append(seq, max(timestamp, last_time or timestamp), payload)
+
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.fsync_batch
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self.sync()
+            elif self._sync_timer is None:
+                # Sync the batch even if no further appends arrive
+                self._sync_timer = threading.Timer(
+                    self.fsync_interval, self._timed_sync
+                )
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+        return sealed
+
+    def _timed_sync(self) -> None:
+        with self._lock:
+            self._sync_timer = None
+            if self._segments:
+                self.sync()
+
+    def _last_time(self) -> Optional[float]:
+        for segment in reversed(self._segments):
+            if segment.count:
+                return segment.last_time
+        return None
+
+    def sync(self) -> None:
+        """fsync unsynced records."""
+        with self._lock:
+            if self._segments and self._unsynced:
+                self._segments[-1].sync()
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def get(self, seq: int) -> Optional[Record]:
+        """
+        Read one record by seq.
+
+        Returns:
+            The record, or None if it is not in the log
+        """
+        with self._lock:
+            bases = [segment.base_seq for segment in self._segments]
+            n = bisect_right(bases, seq) - 1
+            if n < 0:
+                return None
+            segment = self._segments[n]
+            i = segment.find(seq)
+            return segment.read(i) if i is not None else None
+
+    def scan(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        after_seq: Optional[int] = None,
+        reverse: bool = False,
+    ) -> Iterator[Record]:
+        """
+        Iterate over records lazily, oldest first (or newest first).
+
+        Args:
+            start_time: Only records at or after this time (UNIX seconds)
+            end_time: Only records before this time
+            after_seq: Only records with a greater seq
+            reverse: Newest first
+
+        Yields:
+            (seq, time, payload) records
+        """
+        before_seq: Optional[int] = None
+        while True:
+            with self._lock:
+                segments = self._segments[::-1] if reverse else list(self._segments)
+            replaced = False
+            for segment in segments:
+                with self._lock:
+                    if segment.closed:
+                        replaced = True
+                        break
+                    positions = self._scan_positions(
+                        segment, start_time, end_time, after_seq, before_seq, reverse
+                    )
+                for i in positions:
+                    with self._lock:
+                        if segment.closed:
+                            replaced = True
+                            break
+                        record = segment.read(i)
+                    # Cursor to resume from if a compaction replaces segments
+                    if reverse:
+                        before_seq = record[0]
+                    else:
+                        after_seq = record[0]
+                    yield record
+                if replaced:
+                    break
+            if not replaced:
+                return
+
+    @staticmethod
+    def _scan_positions(
+        segment: _Segment,
+        start_time: Optional[float],
+        end_time: Optional[float],
+        after_seq: Optional[int],
+        before_seq: Optional[int],
+        reverse: bool,
+    ) -> range:
+        """Index positions of a segment that a scan visits, in scan order."""
+        if not segment.count:
+            return range(0)
+        if start_time is not None and segment.last_time < start_time:
+            return range(0)
+        if end_time is not None and segment.index_entry(0)[2] >= end_time:
+            return range(0)
+        if after_seq is not None and segment.last_seq <= after_seq:
+            return range(0)
+        if before_seq is not None and segment.first_seq >= before_seq:
+            return range(0)
+
+        lo = 0 if start_time is None else bisect_left(segment.times, start_time)
+        hi = segment.count if end_time is None else bisect_left(segment.times, end_time)
+        if after_seq is not None:
+            lo = max(lo, bisect_right(segment.seqs, after_seq))
+        if before_seq is not None:
+            hi = min(hi, bisect_left(segment.seqs, before_seq))
+        return range(hi - 1, lo - 1, -1) if reverse else range(lo, hi)
+
+    def compact(
+        self,
+        before_time: Optional[float] = None,
+        keep: Optional[Callable[[Record], bool]] = None,
+    ) -> int:
+        """
+        Drop old records and merge small sealed segments.
+
+        Sealed segments entirely before ``before_time`` are deleted. The
+        others lose records before ``before_time`` or rejected by ``keep``,
+        and runs of adjacent small segments are merged while they fit in one
+        segment. The active segment is never rewritten. Only segments that
+        lose records or are merged are read; without ``keep`` the others are
+        left untouched.
+
+        Appends and reads proceed while replacement segments are written;
+        only the swap takes the log lock.
+
+        Args:
+            before_time: Drop records older than this (UNIX seconds)
+            keep: Optional predicate; records for which it returns False are
+                dropped
+
+        Returns:
+            Number of records removed
+        """
+        with self._compact_lock:
+            self.sync()
+            with self._lock:
+                sealed = self._segments[:-1]
+            removed = 0
+            # Adjacent segments merged into one: (segment, first kept position,
+            # kept records or None for all records from that position)
+            group: List[Tuple[_Segment, int, Optional[List[Record]]]] = []
+            group_count = 0
+
+            def write_group() -> None:
+                segments = [segment for segment, _, _ in group]
+                if len(group) == 1 and group_count == segments[0].count:
+                    pass  # Nothing to merge or drop
+                elif group_count:
+                    records = (
+                        record
+                        for segment, lo, kept in group
+                        for record in (
+                            kept
+                            if kept is not None
+                            else (segment.read(i) for i in range(lo, segment.count))
+                        )
+                    )
+                    self._rewrite(segments, records)
+                else:
+                    self._delete(segments)
+                group.clear()
+
+            for segment in sealed:
+                if before_time is not None and segment.last_time < before_time:
+                    removed += segment.count
+                    self._delete([segment])
+                    continue
+                lo = (
+                    0
+                    if before_time is None
+                    else bisect_left(segment.times, before_time)
+                )
+                kept = None
+                count = segment.count - lo
+                if keep is not None:
+                    kept = [
+                        record
+                        for record in (
+                            segment.read(i) for i in range(lo, segment.count)
+                        )
+                        if keep(record)
+                    ]
+                    count = len(kept)
+                removed += segment.count - count
+
+                if group and group_count + count > self.segment_records:
+                    write_group()
+                    group_count = 0
+                group.append((segment, lo, kept))
+                group_count += count
+            if group:
+                write_group()
+
+        if removed:
+            logger.info(f"Compacted message log: removed {removed} records")
+        return removed
+
+    def _replace(self, old: List[_Segment], new: List[_Segment]) -> None:
+        """Swap a run of segments in the segment list (called with the lock held)."""
+        i = next(n for n, segment in enumerate(self._segments) if segment is old[0])
+        self._segments[i : i + len(old)] = new
+
+    def _delete(self, segments: List[_Segment]) -> None:
+        """Remove a run of segments from the log and delete their files."""
+        with self._lock:
+            self._replace(segments, [])
+            for segment in segments:
+                segment.delete()
+
+    def _rewrite(self, group: List[_Segment], records: Iterable[Record]) -> None:
+        """Replace a run of segments with one segment holding ``records``."""
+        base_seq = group[0].base_seq
+        tmp = self.directory / "compact.tmp"
+        tmp.mkdir(exist_ok=True)
+        for path in tmp.iterdir():
+            path.unlink()
+        # Sealed segments don't change, so the copy runs without the lock
+        segment = _Segment(tmp, base_seq, self.segment_records)
+        for seq, timestamp, payload in records:
+            segment.append(seq, timestamp, payload)
+        segment.sync()
+        segment.close()
+
+        with self._lock:
+            for old in group:
+                old.close()
+            # Log first: if we crash before the index is replaced, the stale
+            # index does not end at the end of the log and is rebuilt on open.
+            # Leftover merged segments overlap the new one and are dropped on
+            # open.
+            os.replace(segment.log_path, group[0].log_path)
+            os.replace(segment.index_path, group[0].index_path)
+            tmp.rmdir()
+            for old in group[1:]:
+                old.log_path.unlink(missing_ok=True)
+                old.index_path.unlink(missing_ok=True)
+            self._replace(
+                group, [_Segment(self.directory, base_seq, self.segment_records)]
+            )
+
+    def truncate(self) -> None:
+        """Delete every record; seqs stay monotonic across the truncation."""
+        with self._compact_lock, self._lock:
+            next_seq = self.next_seq
+            for segment in self._segments:
+                segment.delete()
+            self._segments = [_Segment(self.directory, next_seq, self.segment_records)]
+            self._unsynced = 0
+
+    def close(self) -> None:
+        """fsync and close all segments and release the directory."""
+        with self._compact_lock, self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            self.sync()
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+            if not self._lock_file.closed:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                self._lock_file.close()
@@ -0,0 +1,111 @@
+"""
+Process-local read-through cache for conversation storage.
+
+TTLCache is a thread-safe LRU map whose entries also expire after ``ttl``
+seconds, so values written by other processes become visible within that
+bound. Hits, misses and evictions are exported as Prometheus metrics (see
+essence.services.shared_metrics).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+from essence.services.shared_metrics import (
+    STORAGE_CACHE_ENTRIES,
+    STORAGE_CACHE_EVICTIONS_TOTAL,
+    STORAGE_CACHE_REQUESTS_TOTAL,
+)
+
+# Returned by TTLCache.get() on a miss (None is a valid cached value)
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry expiry."""
+
+    def __init__(self, name: str, max_entries: int = 10000, ttl: float = 300.0):
+        """
+        Initialize cache.
+
+        Args:
+            name: Cache name (metrics label)
+            max_entries: Maximum entries; least recently used are evicted
+            ttl: Seconds an entry stays valid (0 disables caching)
+        """
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Look up a key.
+
+        Returns:
+            Cached value, or MISSING if absent or expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                result, value = "hit", entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                result, value = "miss", MISSING
+        STORAGE_CACHE_REQUESTS_TOTAL.labels(cache=self.name, result=result).inc()
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.ttl <= 0:
+            return
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            size = len(self._entries)
+        if evicted:
+            STORAGE_CACHE_EVICTIONS_TOTAL.labels(cache=self.name).inc(evicted)
+        STORAGE_CACHE_ENTRIES.labels(cache=self.name).set(size)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single key."""
+        with self._lock:
+            self._entries.pop(key, None)
+            size = len(self._entries)
+        STORAGE_CACHE_ENTRIES.labels(cache=self.name).set(size)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Drop every key matching a predicate.
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            size = len(self._entries)
+        STORAGE_CACHE_ENTRIES.labels(cache=self.name).set(size)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+        STORAGE_CACHE_ENTRIES.labels(cache=self.name).set(0)
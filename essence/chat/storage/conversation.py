@@ -10,29 +10,26 @@ import io
 import json
 import logging
 import os
+import threading
+import uuid
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import psycopg2
 from psycopg2 import IntegrityError
 from psycopg2.extras import RealDictCursor
 
+from essence.chat.storage.cache import MISSING, TTLCache
+from essence.chat.storage.pool import ConnectionPool, PooledConnection
+
 logger = logging.getLogger(__name__)
 
 # Default language preference
 DEFAULT_LANGUAGE = "en"
 
 
-def get_db_connection() -> psycopg2.extensions.connection:
-    """
-    Get PostgreSQL database connection.
-
-    Returns:
-        PostgreSQL connection object
-
-    Raises:
-        psycopg2.OperationalError: If connection to database fails
-    """
+def _db_conn_string() -> str:
+    """Build the libpq connection string from DB_* environment variables."""
     db_host = os.getenv("DB_HOST", "localhost")
     db_port = os.getenv("DB_PORT", "5432")
     db_name = os.getenv("DB_NAME", "conversations")
@@ -42,13 +39,263 @@ def get_db_connection() -> psycopg2.extensions.connection:
     conn_string = f"host={db_host} port={db_port} dbname={db_name} user={db_user}"
     if db_password:
         conn_string += f" password={db_password}"
+    return conn_string
+
+
+def _pool_settings() -> Dict[str, Any]:
+    """Pool sizing and recycling settings from DB_POOL_* environment variables."""
+    return {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+        "health_check_interval": float(
+            os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30")
+        ),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+
+
+_db_pool: Optional[ConnectionPool] = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool() -> ConnectionPool:
+    """
+    Get the shared PostgreSQL connection pool (created on first use).
+
+    Returns:
+        ConnectionPool of psycopg2 connections
+    """
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                conn_string = _db_conn_string()
+                _db_pool = ConnectionPool(
+                    lambda: psycopg2.connect(conn_string),
+                    name="conversations",
+                    **_pool_settings(),
+                )
+    return _db_pool
+
+
+def close_db_pool() -> None:
+    """Close the shared pool (called on service shutdown)."""
+    global _db_pool
+    with _db_pool_lock:
+        pool, _db_pool = _db_pool, None
+    if pool is not None:
+        pool.close()
+
+
+def get_db_connection() -> PooledConnection:
+    """
+    Get a PostgreSQL database connection from the shared pool.
+
+    The connection behaves like a psycopg2 connection; close() returns it to
+    the pool instead of closing it.
 
-    return psycopg2.connect(conn_string)
+    Returns:
+        Pooled PostgreSQL connection
+
+    Raises:
+        psycopg2.OperationalError: If connection to database fails
+        PoolTimeout: If the pool is exhausted for longer than DB_POOL_TIMEOUT
+    """
+    return get_db_pool().getconn()
+
+
+# Read-through caches in front of per-message lookups. Entries expire after
+# CONVERSATION_CACHE_TTL seconds so writes from other processes show up.
+_cache_ttl = float(os.getenv("CONVERSATION_CACHE_TTL", "300"))
+_cache_max_entries = int(os.getenv("CONVERSATION_CACHE_MAX_ENTRIES", "10000"))
+# (user_id, chat_id) -> conversations.metadata dict
+_metadata_cache = TTLCache("conversation_metadata", _cache_max_entries, _cache_ttl)
+# ("id", template_id) / ("user", user_id, name) /
+# ("conversation", user_id, chat_id, name) -> template dict or None
+_template_cache = TTLCache("prompt_templates", _cache_max_entries, _cache_ttl)
+# Cached for conversations without their own template
+_USE_USER_TEMPLATE = object()
+
+
+def _parse_metadata(metadata: Any) -> Dict[str, Any]:
+    """Normalize a metadata column value (dict, JSON string or NULL) to a dict."""
+    if isinstance(metadata, str):
+        metadata = json.loads(metadata)
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def _where(conditions: List[str]) -> str:
+    """Join SQL conditions into a WHERE clause ("" if there are none)."""
+    return "WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+def _copy(template: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Copy a cached template so callers can't mutate the cached entry."""
+    return dict(template) if template is not None else None
+
+
+# Streaming export: rows are fetched from a server-side cursor
+# CONVERSATION_EXPORT_BATCH_SIZE at a time and encoded one batch per chunk.
+EXPORT_STREAM_FORMATS = ("jsonl", "csv")
+EXPORT_MEDIA_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_CSV_FIELDS = [
+    "conversation_id",
+    "user_id",
+    "chat_id",
+    "role",
+    "content",
+    "created_at",
+    "metadata",
+]
+_export_batch_size = int(os.getenv("CONVERSATION_EXPORT_BATCH_SIZE", "1000"))
+
+
+def _export_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a joined message/conversation row to an export record."""
+    return {
+        "conversation_id": str(row["conversation_id"]),
+        "user_id": row["user_id"],
+        "chat_id": row["session_id"],
+        "role": row["role"],
+        "content": row["content"],
+        "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+        "metadata": _parse_metadata(row["metadata"]),
+    }
+
+
+def _encode_jsonl(records: Iterable[Dict[str, Any]]) -> bytes:
+    """Encode export records as JSON Lines."""
+    return "".join(
+        json.dumps(record, ensure_ascii=False) + "\n" for record in records
+    ).encode("utf-8")
+
+
+def _encode_csv(records: Iterable[Dict[str, Any]], header: bool = False) -> bytes:
+    """Encode export records as CSV rows (metadata as a JSON string)."""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=EXPORT_CSV_FIELDS)
+    if header:
+        writer.writeheader()
+    for record in records:
+        metadata = record["metadata"]
+        writer.writerow(
+            {
+                **record,
+                "metadata": json.dumps(metadata, ensure_ascii=False)
+                if metadata
+                else "",
+            }
+        )
+    return output.getvalue().encode("utf-8")
+
+
+def _iter_export(
+    query: str, params: List[Any], format: str, batch_size: int
+) -> Iterator[bytes]:
+    """
+    Run an export query on a named (server-side) cursor and yield encoded chunks.
+
+    Only one batch of rows is held in memory at a time. The connection goes
+    back to the pool when the generator is exhausted or closed early.
+    """
+    conn = get_db_connection()
+    cursor = None
+    try:
+        cursor = conn.cursor(
+            name=f"conversation_export_{uuid.uuid4().hex}",
+            cursor_factory=RealDictCursor,
+        )
+        cursor.itersize = batch_size
+        cursor.execute(query, params)
+        if format == "csv":
+            yield _encode_csv([], header=True)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            records = [_export_record(row) for row in rows]
+            if format == "jsonl":
+                yield _encode_jsonl(records)
+            else:
+                yield _encode_csv(records)
+    except Exception as e:
+        logger.error(f"Error streaming conversation export: {e}", exc_info=True)
+        raise
+    finally:
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass  # The pool rolls back the transaction, which drops the cursor
+        conn.close()
 
 
 class ConversationStorage:
     """Storage class for conversation data and metadata."""
 
+    @staticmethod
+    def invalidate_cache(
+        user_id: Optional[str] = None, chat_id: Optional[str] = None
+    ) -> None:
+        """
+        Drop cached preferences and prompt templates.
+
+        Args:
+            user_id: Only drop entries for this user (default: everything)
+            chat_id: Only drop entries for this chat (requires user_id)
+        """
+        if user_id is None:
+            _metadata_cache.clear()
+            _template_cache.clear()
+            return
+        user_id = str(user_id)
+        if chat_id is not None:
+            _metadata_cache.invalidate((user_id, str(chat_id)))
+        else:
+            _metadata_cache.invalidate_where(lambda key: key[0] == user_id)
+        _template_cache.invalidate_where(
+            lambda key: key[0] != "id" and key[1] == user_id
+        )
+
+    @staticmethod
+    def _get_conversation_metadata(user_id: str, chat_id: str) -> Dict[str, Any]:
+        """
+        Get the metadata of the latest conversation for a user/chat (cached).
+
+        Returns:
+            Metadata dict ({} if the conversation doesn't exist); do not mutate
+
+        Raises:
+            Exception: If the database query fails
+        """
+        key = (str(user_id), str(chat_id))
+        metadata = _metadata_cache.get(key)
+        if metadata is not MISSING:
+            return metadata
+
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            # Query conversation by user_id and session_id (chat_id)
+            cursor.execute(
+                """
+                SELECT metadata
+                FROM conversations
+                WHERE user_id = %s AND session_id = %s
+                ORDER BY created_at DESC
+                LIMIT 1
+                """,
+                key,
+            )
+            result = cursor.fetchone()
+        finally:
+            conn.close()
+
+        metadata = _parse_metadata(result["metadata"]) if result else {}
+        _metadata_cache.set(key, metadata)
+        return metadata
+
     @staticmethod
     def get_language_preference(user_id: str, chat_id: str) -> str:
         """
@@ -62,45 +309,19 @@ class ConversationStorage:
             Language code (ISO 639-1), defaults to "en" if not set
         """
         try:
-            conn = get_db_connection()
-            try:
-                cursor = conn.cursor(cursor_factory=RealDictCursor)
-                # Query conversation by user_id and session_id (chat_id)
-                cursor.execute(
-                    """
-                    SELECT metadata
-                    FROM conversations
-                    WHERE user_id = %s AND session_id = %s
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                    """,
-                    (str(user_id), str(chat_id)),
-                )
-                result = cursor.fetchone()
-
-                if result and result["metadata"]:
-                    metadata = result["metadata"]
-                    # Handle both dict and JSON string
-                    if isinstance(metadata, str):
-                        metadata = json.loads(metadata)
-                    elif not isinstance(metadata, dict):
-                        metadata = {}
-
-                    language_preference = metadata.get("language_preference")
-                    if language_preference:
-                        logger.debug(
-                            f"Language preference for {user_id}/{chat_id}: {language_preference}"
-                        )
-                        return language_preference
-
-                # Default to "en" if not found
+            metadata = ConversationStorage._get_conversation_metadata(user_id, chat_id)
+            language_preference = metadata.get("language_preference")
+            if language_preference:
                 logger.debug(
-                    f"No language preference found for {user_id}/{chat_id}, defaulting to {DEFAULT_LANGUAGE}"
+                    f"Language preference for {user_id}/{chat_id}: {language_preference}"
                 )
-                return DEFAULT_LANGUAGE
+                return language_preference
 
-            finally:
-                conn.close()
+            # Default to "en" if not found
+            logger.debug(
+                f"No language preference found for {user_id}/{chat_id}, defaulting to {DEFAULT_LANGUAGE}"
+            )
+            return DEFAULT_LANGUAGE
         except Exception as e:
             logger.error(
                 f"Error getting language preference for {user_id}/{chat_id}: {e}",
@@ -172,24 +393,23 @@ class ConversationStorage:
                         (json.dumps(metadata), conversation_id),
                     )
                     conn.commit()
+                    _metadata_cache.set((str(user_id), str(chat_id)), metadata)
                     logger.info(
                         f"Updated language preference for {user_id}/{chat_id}: {language_code}"
                     )
                     return True
                 else:
                     # Conversation doesn't exist - create it with metadata
+                    metadata = {"language_preference": language_code}
                     cursor.execute(
                         """
                         INSERT INTO conversations (user_id, session_id, metadata)
                         VALUES (%s, %s, %s)
                         """,
-                        (
-                            str(user_id),
-                            str(chat_id),
-                            json.dumps({"language_preference": language_code}),
-                        ),
+                        (str(user_id), str(chat_id), json.dumps(metadata)),
                     )
                     conn.commit()
+                    _metadata_cache.set((str(user_id), str(chat_id)), metadata)
                     logger.info(
                         f"Created conversation with language preference for {user_id}/{chat_id}: {language_code}"
                     )
@@ -220,52 +440,20 @@ class ConversationStorage:
             Dictionary with user preferences (name, favorite_color, etc.), empty dict if not set
         """
         try:
-            conn = get_db_connection()
-            try:
-                cursor = conn.cursor(cursor_factory=RealDictCursor)
-                # Query conversation by user_id and session_id (chat_id)
-                cursor.execute(
-                    """
-                    SELECT metadata
-                    FROM conversations
-                    WHERE user_id = %s AND session_id = %s
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                    """,
-                    (str(user_id), str(chat_id)),
-                )
-                result = cursor.fetchone()
-
-                if result and result["metadata"]:
-                    metadata = result["metadata"]
-                    # Handle both dict and JSON string
-                    if isinstance(metadata, str):
-                        metadata = json.loads(metadata)
-                    elif not isinstance(metadata, dict):
-                        metadata = {}
-
-                    # Extract user preferences from metadata
-                    preferences = {
-                        "name": metadata.get("user_name"),
-                        "favorite_color": metadata.get("favorite_color"),
-                    }
-                    # Remove None values
-                    preferences = {
-                        k: v for k, v in preferences.items() if v is not None
-                    }
-
-                    if preferences:
-                        logger.debug(
-                            f"User preferences for {user_id}/{chat_id}: {preferences}"
-                        )
-                    return preferences
+            metadata = ConversationStorage._get_conversation_metadata(user_id, chat_id)
+            # Extract user preferences from metadata
+            preferences = {
+                "name": metadata.get("user_name"),
+                "favorite_color": metadata.get("favorite_color"),
+            }
+            # Remove None values
+            preferences = {k: v for k, v in preferences.items() if v is not None}
 
-                # Return empty dict if not found
+            if preferences:
+                logger.debug(f"User preferences for {user_id}/{chat_id}: {preferences}")
+            else:
                 logger.debug(f"No user preferences found for {user_id}/{chat_id}")
-                return {}
-
-            finally:
-                conn.close()
+            return preferences
         except Exception as e:
             logger.error(
                 f"Error getting user preferences for {user_id}/{chat_id}: {e}",
@@ -344,6 +532,7 @@ class ConversationStorage:
                         (json.dumps(metadata), conversation_id),
                     )
                     conn.commit()
+                    _metadata_cache.set((str(user_id), str(chat_id)), metadata)
                     logger.info(
                         f"Updated user preferences for {user_id}/{chat_id}: name={name}, favorite_color={favorite_color}"
                     )
@@ -366,6 +555,7 @@ class ConversationStorage:
                         (str(user_id), str(chat_id), json.dumps(metadata)),
                     )
                     conn.commit()
+                    _metadata_cache.set((str(user_id), str(chat_id)), metadata)
                     logger.info(
                         f"Created conversation with user preferences for {user_id}/{chat_id}: name={name}, favorite_color={favorite_color}"
                     )
@@ -393,6 +583,9 @@ class ConversationStorage:
         - Average response time (time between user messages and assistant responses)
         - User engagement score (based on message frequency and response patterns)
 
+        Reads the conversation_stats rollup instead of the conversation's
+        messages (see config/postgres-analytics-rollups.sql).
+
         Args:
             user_id: Telegram user ID
             chat_id: Telegram chat ID (maps to session_id in database)
@@ -432,19 +625,21 @@ class ConversationStorage:
 
                 conversation_id = result["id"]
 
-                # Get all messages for this conversation, ordered by time
+                # Counters are maintained on insert by the rollup trigger
+                # (config/postgres-analytics-rollups.sql)
                 cursor.execute(
                     """
-                    SELECT role, content, created_at
-                    FROM messages
+                    SELECT message_count, user_message_count,
+                           assistant_message_count, response_time_sum,
+                           response_count, first_message_at, last_message_at
+                    FROM conversation_stats
                     WHERE conversation_id = %s
-                    ORDER BY created_at ASC
                     """,
                     (conversation_id,),
                 )
-                messages = cursor.fetchall()
+                stats = cursor.fetchone()
 
-                if not messages:
+                if not stats or not stats["message_count"]:
                     return {
                         "conversation_id": str(conversation_id),
                         "message_count": 0,
@@ -456,41 +651,19 @@ class ConversationStorage:
                         "last_message_at": None,
                     }
 
-                # Calculate metrics
-                message_count = len(messages)
-                user_message_count = sum(1 for m in messages if m["role"] == "user")
-                assistant_message_count = sum(
-                    1 for m in messages if m["role"] == "assistant"
-                )
-
-                # Calculate response times
-                response_times = []
-                last_user_message_time = None
-
-                for msg in messages:
-                    msg_time = msg["created_at"]
-                    if isinstance(msg_time, str):
-                        msg_time = datetime.fromisoformat(
-                            msg_time.replace("Z", "+00:00")
-                        )
-
-                    if msg["role"] == "user":
-                        last_user_message_time = msg_time
-                    elif msg["role"] == "assistant" and last_user_message_time:
-                        response_time = (
-                            msg_time - last_user_message_time
-                        ).total_seconds()
-                        if response_time > 0:  # Only count positive response times
-                            response_times.append(response_time)
-
+                message_count = stats["message_count"]
+                user_message_count = stats["user_message_count"]
+                assistant_message_count = stats["assistant_message_count"]
                 avg_response_time = (
-                    sum(response_times) / len(response_times) if response_times else 0.0
+                    stats["response_time_sum"] / stats["response_count"]
+                    if stats["response_count"]
+                    else 0.0
                 )
 
                 # Calculate engagement score (0-100)
                 # Based on: message frequency, response patterns, conversation length
-                first_message_time = messages[0]["created_at"]
-                last_message_time = messages[-1]["created_at"]
+                first_message_time = stats["first_message_at"]
+                last_message_time = stats["last_message_at"]
 
                 if isinstance(first_message_time, str):
                     first_message_time = datetime.fromisoformat(
@@ -531,12 +704,8 @@ class ConversationStorage:
                     "assistant_message_count": assistant_message_count,
                     "average_response_time_seconds": round(avg_response_time, 2),
                     "engagement_score": round(engagement_score, 2),
-                    "first_message_at": messages[0]["created_at"].isoformat()
-                    if messages
-                    else None,
-                    "last_message_at": messages[-1]["created_at"].isoformat()
-                    if messages
-                    else None,
+                    "first_message_at": first_message_time.isoformat(),
+                    "last_message_at": last_message_time.isoformat(),
                 }
 
             finally:
@@ -575,84 +744,82 @@ class ConversationStorage:
             try:
                 cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-                # Build date filter
-                date_filter = ""
-                params = []
-                if start_date or end_date:
-                    conditions = []
-                    if start_date:
-                        conditions.append("m.created_at >= %s")
-                        params.append(start_date)
-                    if end_date:
-                        conditions.append("m.created_at <= %s")
-                        params.append(end_date)
-                    if conditions:
-                        date_filter = "WHERE " + " AND ".join(conditions)
+                # Read the rollup tables maintained on insert
+                # (config/postgres-analytics-rollups.sql), so the cost depends
+                # on the length of the range, not the size of messages.
+                # Date filters are applied at hour granularity (day
+                # granularity for active users).
+                conv_conditions = []
+                conv_params: List[Any] = []
+                bucket_conditions = []
+                bucket_params: List[Any] = []
+                day_conditions = []
+                day_params: List[Any] = []
+                if start_date:
+                    conv_conditions.append("created_at >= %s")
+                    conv_params.append(start_date)
+                    bucket_conditions.append("bucket >= date_trunc('hour', %s)")
+                    bucket_params.append(start_date)
+                    day_conditions.append("day >= %s::date")
+                    day_params.append(start_date)
+                if end_date:
+                    conv_conditions.append("created_at <= %s")
+                    conv_params.append(end_date)
+                    bucket_conditions.append("bucket <= %s")
+                    bucket_params.append(end_date)
+                    day_conditions.append("day <= %s::date")
+                    day_params.append(end_date)
 
                 # Get total conversations
                 cursor.execute(
                     f"""
-                    SELECT COUNT(DISTINCT c.id) as total_conversations
-                    FROM conversations c
-                    {date_filter.replace('m.', 'c.') if date_filter else ''}
+                    SELECT COUNT(*) as total_conversations
+                    FROM conversations
+                    {_where(conv_conditions)}
                     """,
-                    params,
+                    conv_params,
                 )
                 total_conversations = cursor.fetchone()["total_conversations"]
 
-                # Get total messages
+                # Get message counts and response times (daily rollup is
+                # enough when the range is unbounded)
+                if bucket_conditions:
+                    rollup_table = "message_stats_hourly"
+                    rollup_filter = _where(bucket_conditions)
+                else:
+                    rollup_table, rollup_filter = "message_stats_daily", ""
                 cursor.execute(
                     f"""
-                    SELECT COUNT(*) as total_messages,
-                           COUNT(*) FILTER (WHERE role = 'user') as user_messages,
-                           COUNT(*) FILTER (WHERE role = 'assistant') as assistant_messages
-                    FROM messages m
-                    JOIN conversations c ON m.conversation_id = c.id
-                    {date_filter}
+                    SELECT SUM(message_count) as total_messages,
+                           SUM(user_message_count) as user_messages,
+                           SUM(assistant_message_count) as assistant_messages,
+                           SUM(response_time_sum) as response_time_sum,
+                           SUM(response_count) as response_count
+                    FROM {rollup_table}
+                    {rollup_filter}
                     """,
-                    params,
+                    bucket_params,
                 )
                 msg_result = cursor.fetchone()
-                total_messages = msg_result["total_messages"] or 0
-                user_messages = msg_result["user_messages"] or 0
-                assistant_messages = msg_result["assistant_messages"] or 0
-
-                # Get average response time across all conversations
-                cursor.execute(
-                    f"""
-                    WITH user_messages AS (
-                        SELECT conversation_id, created_at as user_time,
-                               ROW_NUMBER() OVER (PARTITION BY conversation_id ORDER BY created_at) as rn
-                        FROM messages
-                        WHERE role = 'user'
-                    ),
-                    assistant_messages AS (
-                        SELECT conversation_id, created_at as assistant_time,
-                               ROW_NUMBER() OVER (PARTITION BY conversation_id ORDER BY created_at) as rn
-                        FROM messages
-                        WHERE role = 'assistant'
-                    )
-                    SELECT AVG(EXTRACT(EPOCH FROM (am.assistant_time - um.user_time))) as avg_response_time
-                    FROM user_messages um
-                    JOIN assistant_messages am ON um.conversation_id = am.conversation_id AND um.rn = am.rn
-                    JOIN conversations c ON um.conversation_id = c.id
-                    {date_filter.replace('m.', 'um.') if date_filter else ''}
-                    WHERE am.assistant_time > um.user_time
-                    """,
-                    params,
+                total_messages = int(msg_result["total_messages"] or 0)
+                user_messages = int(msg_result["user_messages"] or 0)
+                assistant_messages = int(msg_result["assistant_messages"] or 0)
+                # SUM(bigint) comes back as Decimal and SUM(double) as float
+                response_count = int(msg_result["response_count"] or 0)
+                avg_response_time = (
+                    float(msg_result["response_time_sum"] or 0) / response_count
+                    if response_count
+                    else 0.0
                 )
-                avg_response_result = cursor.fetchone()
-                avg_response_time = avg_response_result["avg_response_time"] or 0.0
 
                 # Get active users (users with messages in date range)
                 cursor.execute(
                     f"""
-                    SELECT COUNT(DISTINCT c.user_id) as active_users
-                    FROM conversations c
-                    JOIN messages m ON m.conversation_id = c.id
-                    {date_filter.replace('m.', 'm.') if date_filter else ''}
+                    SELECT COUNT(DISTINCT user_id) as active_users
+                    FROM user_activity_daily
+                    {_where(day_conditions)}
                     """,
-                    params,
+                    day_params,
                 )
                 active_users = cursor.fetchone()["active_users"] or 0
 
@@ -853,6 +1020,8 @@ class ConversationStorage:
 
                 template_id = cursor.fetchone()[0]
                 conn.commit()
+                # A new template can shadow cached lookups (including misses)
+                _template_cache.clear()
                 logger.info(
                     f"Created prompt template: {template_id} (name={name}, user_id={user_id}, conversation_id={conversation_id})"
                 )
@@ -882,6 +1051,11 @@ class ConversationStorage:
         Returns:
             Template dictionary or None if not found
         """
+        key = ("id", str(template_id))
+        cached = _template_cache.get(key)
+        if cached is not MISSING:
+            return _copy(cached)
+
         try:
             conn = get_db_connection()
             try:
@@ -895,10 +1069,9 @@ class ConversationStorage:
                     (template_id,),
                 )
                 result = cursor.fetchone()
-
-                if result:
-                    return dict(result)
-                return None
+                template = dict(result) if result else None
+                _template_cache.set(key, template)
+                return _copy(template)
 
             finally:
                 conn.close()
@@ -920,6 +1093,11 @@ class ConversationStorage:
         Returns:
             Template dictionary or None if not found
         """
+        key = ("user", str(user_id), name)
+        cached = _template_cache.get(key)
+        if cached is not MISSING:
+            return _copy(cached)
+
         try:
             conn = get_db_connection()
             try:
@@ -949,9 +1127,9 @@ class ConversationStorage:
                     )
 
                 result = cursor.fetchone()
-                if result:
-                    return dict(result)
-                return None
+                template = dict(result) if result else None
+                _template_cache.set(key, template)
+                return _copy(template)
 
             finally:
                 conn.close()
@@ -974,6 +1152,13 @@ class ConversationStorage:
         Returns:
             Template dictionary or None if not found
         """
+        key = ("conversation", str(user_id), str(chat_id), name)
+        cached = _template_cache.get(key)
+        if cached is _USE_USER_TEMPLATE:
+            return ConversationStorage.get_prompt_template_for_user(user_id, name)
+        if cached is not MISSING:
+            return _copy(cached)
+
         try:
             conn = get_db_connection()
             try:
@@ -1021,12 +1206,12 @@ class ConversationStorage:
 
                     result = cursor.fetchone()
                     if result:
-                        return dict(result)
-
-                # Fallback to user template
-                return ConversationStorage.get_prompt_template_for_user(user_id, name)
+                        template = dict(result)
+                        _template_cache.set(key, template)
+                        return _copy(template)
 
             finally:
+                # Returned before the fallback below checks out its own
                 conn.close()
         except Exception as e:
             logger.error(
@@ -1035,6 +1220,11 @@ class ConversationStorage:
             # Fallback to user template on error
             return ConversationStorage.get_prompt_template_for_user(user_id, name)
 
+        # Fallback to user template (cached under its own key, so a change to
+        # the user template is picked up here as well)
+        _template_cache.set(key, _USE_USER_TEMPLATE)
+        return ConversationStorage.get_prompt_template_for_user(user_id, name)
+
     @staticmethod
     def list_prompt_templates(
         user_id: Optional[str] = None,
@@ -1154,6 +1344,7 @@ class ConversationStorage:
 
                 cursor.execute(query, params)
                 conn.commit()
+                _template_cache.clear()
 
                 if cursor.rowcount > 0:
                     logger.info(f"Updated prompt template: {template_id}")
@@ -1190,6 +1381,7 @@ class ConversationStorage:
                     "DELETE FROM prompt_templates WHERE id = %s", (template_id,)
                 )
                 conn.commit()
+                _template_cache.clear()
 
                 if cursor.rowcount > 0:
                     logger.info(f"Deleted prompt template: {template_id}")
@@ -1503,6 +1695,87 @@ class ConversationStorage:
             )
             raise
 
+    @staticmethod
+    def stream_conversation_export(
+        user_id: str,
+        chat_id: Optional[str] = None,
+        format: str = "jsonl",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """
+        Stream messages as JSON Lines or CSV in constant memory.
+
+        Unlike export_conversation(), messages are read through a server-side
+        cursor in batches and yielded as encoded chunks, so very large
+        conversations (or all of a user's conversations) can be written to a
+        file or HTTP response without building the export in memory.
+
+        Args:
+            user_id: Telegram user ID
+            chat_id: Telegram chat ID; None exports all of the user's conversations
+            format: Export format - "jsonl" or "csv"
+            start_date: Optional start date filter for messages
+            end_date: Optional end date filter for messages
+            batch_size: Rows fetched per round trip (default:
+                CONVERSATION_EXPORT_BATCH_SIZE)
+
+        Returns:
+            Iterator of bytes chunks (one per batch; CSV starts with a header)
+
+        Raises:
+            ValueError: If the format is unsupported or the conversation is
+                not found (raised before the first chunk is produced)
+        """
+        format = format.lower()
+        if format not in EXPORT_STREAM_FORMATS:
+            raise ValueError(
+                f"Unsupported streaming export format: {format}. "
+                f"Supported formats: {', '.join(EXPORT_STREAM_FORMATS)}"
+            )
+
+        conditions = ["c.user_id = %s"]
+        params: List[Any] = [str(user_id)]
+        if chat_id is not None:
+            conn = get_db_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id FROM conversations
+                    WHERE user_id = %s AND session_id = %s
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                    """,
+                    (str(user_id), str(chat_id)),
+                )
+                row = cursor.fetchone()
+            finally:
+                conn.close()
+            if not row:
+                raise ValueError(
+                    f"Conversation not found for user_id={user_id}, chat_id={chat_id}"
+                )
+            conditions.append("m.conversation_id = %s")
+            params.append(row[0])
+        if start_date:
+            conditions.append("m.created_at >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append("m.created_at <= %s")
+            params.append(end_date)
+
+        query = f"""
+            SELECT m.conversation_id, c.user_id, c.session_id,
+                   m.role, m.content, m.created_at, m.metadata
+            FROM messages m
+            JOIN conversations c ON c.id = m.conversation_id
+            {_where(conditions)}
+            ORDER BY m.conversation_id, m.created_at
+        """
+        return _iter_export(query, params, format, batch_size or _export_batch_size)
+
     # ==================== A/B Testing Methods ====================
 
     @staticmethod
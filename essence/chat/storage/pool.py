@@ -0,0 +1,347 @@
+"""
+Database connection pool for conversation storage.
+
+Opening a PostgreSQL connection costs a TCP handshake and authentication, so
+storage methods check connections out of a shared pool instead of connecting
+on every call. The pool:
+
+- reuses the most recently returned connection first, so idle extras age out;
+- pings connections that have been idle for ``health_check_interval`` seconds
+  before handing them out, and drops broken ones;
+- closes connections older than ``max_lifetime`` seconds (recycling them
+  across server restarts, failovers and credential rotation);
+- rolls back transactions left open by the caller when a connection returns;
+- exports Prometheus metrics (see essence.services.shared_metrics).
+
+ConnectionPool holds DB-API connections (psycopg2) and is safe to share
+between threads.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+from essence.services.shared_metrics import (
+    DB_POOL_ACQUIRE_DURATION_SECONDS,
+    DB_POOL_ACQUIRE_TIMEOUTS_TOTAL,
+    DB_POOL_CONNECTIONS,
+    DB_POOL_CONNECTIONS_CLOSED_TOTAL,
+    DB_POOL_CONNECTIONS_OPENED_TOTAL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became available within the timeout."""
+
+
+class PoolClosed(Exception):
+    """Raised when checking a connection out of a closed pool."""
+
+
+@dataclass
+class _Slot:
+    """A pooled connection and its bookkeeping."""
+
+    conn: Any
+    created_at: float = field(default_factory=time.monotonic)
+    returned_at: float = field(default_factory=time.monotonic)
+
+
+class PooledConnection:
+    """
+    Connection checked out of a ConnectionPool.
+
+    Behaves like the underlying connection, except that close() returns it to
+    the pool, so code written for one-connection-per-call works unchanged.
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn: Any):
+        self._pool = pool
+        self._conn = conn
+
+    @property
+    def raw(self) -> Any:
+        """The underlying connection."""
+        if self._conn is None:
+            raise PoolClosed("Connection was returned to the pool")
+        return self._conn
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+    def __enter__(self) -> "PooledConnection":
+        self.raw.__enter__()
+        return self
+
+    def __exit__(self, *exc_info) -> Any:
+        return self.raw.__exit__(*exc_info)
+
+    def close(self) -> None:
+        """Return the connection to the pool (idempotent)."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.putconn(conn)
+
+    def discard(self) -> None:
+        """Close the underlying connection instead of returning it."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.putconn(conn, discard=True)
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections."""
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        name: str = "default",
+        min_size: int = 1,
+        max_size: int = 10,
+        max_lifetime: float = 1800.0,
+        health_check_interval: float = 30.0,
+        timeout: float = 10.0,
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            connect: Zero-argument callable opening a new connection
+            name: Pool name (metrics label)
+            min_size: Connections opened up front and kept when idle
+            max_size: Maximum open connections
+            max_lifetime: Close connections older than this (seconds, 0 = never)
+            health_check_interval: Ping connections idle for longer than this
+                before handing them out (seconds)
+            timeout: Seconds to wait for a connection when the pool is exhausted
+        """
+        self.name = name
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._idle: Deque[_Slot] = deque()  # Most recently returned last
+        self._in_use: Dict[int, _Slot] = {}  # id(conn) -> slot
+        self._opening = 0  # Connections being opened
+        self._closed = False
+        self.opened = 0
+        self.closed_by_reason: Dict[str, int] = {}
+        self._connect = connect
+        self._cond = threading.Condition()
+        for _ in range(self.min_size):
+            try:
+                self._idle.append(self._open())
+            except Exception as e:
+                logger.warning(f"Could not pre-open connection for {name!r}: {e}")
+                break
+        self._update_gauges()
+
+    @property
+    def size(self) -> int:
+        """Open connections (idle + in use + being opened)."""
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool statistics (also exported as Prometheus metrics)."""
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+            "max_size": self.max_size,
+            "opened": self.opened,
+            "closed": dict(self.closed_by_reason),
+        }
+
+    def _update_gauges(self) -> None:
+        DB_POOL_CONNECTIONS.labels(pool=self.name, state="idle").set(len(self._idle))
+        DB_POOL_CONNECTIONS.labels(pool=self.name, state="in_use").set(
+            len(self._in_use)
+        )
+
+    def _record_opened(self) -> None:
+        self.opened += 1
+        DB_POOL_CONNECTIONS_OPENED_TOTAL.labels(pool=self.name).inc()
+
+    def _record_closed(self, reason: str) -> None:
+        self.closed_by_reason[reason] = self.closed_by_reason.get(reason, 0) + 1
+        DB_POOL_CONNECTIONS_CLOSED_TOTAL.labels(pool=self.name, reason=reason).inc()
+
+    def _expired(self, slot: _Slot, now: float) -> bool:
+        return self.max_lifetime > 0 and now - slot.created_at >= self.max_lifetime
+
+    def _needs_check(self, slot: _Slot, now: float) -> bool:
+        return now - slot.returned_at >= self.health_check_interval
+
+    def _record_timeout(self) -> PoolTimeout:
+        DB_POOL_ACQUIRE_TIMEOUTS_TOTAL.labels(pool=self.name).inc()
+        return PoolTimeout(
+            f"No connection available in pool {self.name!r} within "
+            f"{self.timeout}s ({self.max_size} in use)"
+        )
+
+    def _open(self) -> _Slot:
+        slot = _Slot(self._connect())
+        self._record_opened()
+        return slot
+
+    def _discard(self, slot: _Slot, reason: str) -> None:
+        try:
+            slot.conn.close()
+        except Exception:
+            pass
+        self._record_closed(reason)
+
+    @staticmethod
+    def _is_broken(conn: Any) -> bool:
+        # psycopg2: conn.closed is non-zero once the connection is closed/broken
+        return bool(getattr(conn, "closed", False))
+
+    @staticmethod
+    def _ping(conn: Any) -> None:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+        conn.rollback()
+
+    def getconn(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Check a connection out of the pool.
+
+        Args:
+            timeout: Seconds to wait when the pool is exhausted (default: the
+                pool timeout)
+
+        Returns:
+            PooledConnection; call close() to return it
+
+        Raises:
+            PoolTimeout: If no connection became available in time
+            PoolClosed: If the pool was closed
+        """
+        start = time.monotonic()
+        deadline = start + (self.timeout if timeout is None else timeout)
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolClosed(f"Pool {self.name!r} is closed")
+                    if self._idle:
+                        slot = self._idle.pop()
+                        self._in_use[id(slot.conn)] = slot
+                        break
+                    if self.size < self.max_size:
+                        self._opening += 1
+                        slot = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._record_timeout()
+                    self._cond.wait(remaining)
+
+            if slot is None:
+                # Open outside the lock: connecting takes a network round trip
+                try:
+                    slot = self._open()
+                finally:
+                    with self._cond:
+                        self._opening -= 1
+                        if slot is not None:
+                            self._in_use[id(slot.conn)] = slot
+                        self._cond.notify()
+            elif not self._validate(slot):
+                continue
+
+            self._update_gauges()
+            DB_POOL_ACQUIRE_DURATION_SECONDS.labels(pool=self.name).observe(
+                time.monotonic() - start
+            )
+            return PooledConnection(self, slot.conn)
+
+    def _validate(self, slot: _Slot) -> bool:
+        """Check an idle connection before handing it out."""
+        now = time.monotonic()
+        reason = None
+        if self._expired(slot, now):
+            reason = "max_lifetime"
+        elif self._is_broken(slot.conn):
+            reason = "broken"
+        elif self._needs_check(slot, now):
+            try:
+                self._ping(slot.conn)
+            except Exception as e:
+                logger.warning(f"Dropping unhealthy connection from {self.name!r}: {e}")
+                reason = "unhealthy"
+        if reason is None:
+            return True
+        with self._cond:
+            self._in_use.pop(id(slot.conn), None)
+            self._cond.notify()
+        self._discard(slot, reason)
+        return False
+
+    def putconn(self, conn: Any, discard: bool = False) -> None:
+        """
+        Return a connection to the pool.
+
+        Args:
+            conn: Connection obtained from getconn() (raw or PooledConnection)
+            discard: Close the connection instead of keeping it
+        """
+        if isinstance(conn, PooledConnection):
+            conn.close() if not discard else conn.discard()
+            return
+        with self._cond:
+            slot = self._in_use.pop(id(conn), None)
+        if slot is None:
+            logger.warning(f"Connection returned to {self.name!r} was not checked out")
+            return
+
+        reason = "discarded" if discard else None
+        if reason is None and self._is_broken(conn):
+            reason = "broken"
+        if reason is None:
+            try:
+                conn.rollback()  # Don't leak an open transaction to the next user
+            except Exception:
+                reason = "broken"
+        if reason is None and self._expired(slot, time.monotonic()):
+            reason = "max_lifetime"
+
+        with self._cond:
+            if reason is None and self._closed:
+                reason = "pool_closed"
+            if reason is None:
+                slot.returned_at = time.monotonic()
+                self._idle.append(slot)
+            self._cond.notify()
+        if reason is not None:
+            self._discard(slot, reason)
+        self._update_gauges()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager yielding a pooled connection."""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        """Close idle connections; in-use ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._cond.notify_all()
+        for slot in idle:
+            self._discard(slot, "pool_closed")
+        self._update_gauges()
@@ -0,0 +1,470 @@
+"""
+Indexed queue store for user messages.
+
+Messages between owner/whitelisted users and the looping agent are kept in a
+SQLite database in WAL mode (readers never block the writer, and the services
+and the agent can share the file). Rows are indexed by status and by user, so
+appending a message, changing its status and fetching NEW messages after a
+cursor cost O(log n) however long the history gets. USER_MESSAGES.md is only a
+rendered export of the store.
+"""
+import logging
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pattern of Markdown entry headers: ## [YYYY-MM-DD HH:MM:SS] MessageType
+_ENTRY_HEADER = re.compile(
+    r"^## \[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (.+)$", re.MULTILINE
+)
+
+_COLUMNS = (
+    "id, timestamp, message_type, user_id, chat_id, platform, content, "
+    "message_id, username, status"
+)
+
+
+@dataclass
+class UserMessage:
+    """Represents a message from USER_MESSAGES.md"""
+
+    timestamp: str
+    message_type: str
+    user_id: str
+    chat_id: str
+    platform: str
+    content: str
+    message_id: Optional[str] = None
+    username: Optional[str] = None
+    status: str = "NEW"
+    raw_entry: str = ""  # Full markdown entry for status updates
+    id: Optional[int] = None  # Row ID in the queue store (fetch cursor)
+
+
+def render_user_message_markdown(message: UserMessage) -> str:
+    """
+    Render a message as a USER_MESSAGES.md entry.
+
+    Args:
+        message: Message to render
+
+    Returns:
+        Markdown entry (with surrounding blank lines)
+    """
+    username_str = f"@{message.username} " if message.username else ""
+    message_id_str = (
+        f"\n- **Message ID:** {message.message_id}" if message.message_id else ""
+    )
+    chat_id_str = f"\n- **Chat ID:** {message.chat_id}" if message.chat_id else ""
+    return f"""
+## [{message.timestamp}] {message.message_type}
+- **User:** {username_str}(user_id: {message.user_id})
+- **Platform:** {message.platform.capitalize()}
+- **Type:** {message.message_type}
+- **Content:** {message.content}
+{message_id_str}{chat_id_str}
+- **Status:** {message.status}
+
+"""
+
+
+def parse_user_messages_markdown(content: str) -> List[UserMessage]:
+    """
+    Parse USER_MESSAGES.md content into messages.
+
+    Args:
+        content: Markdown content
+
+    Returns:
+        List of UserMessage objects, in file order
+    """
+    messages = []
+    # entries[0] = text before first match, then (timestamp, type, text) triples
+    entries = _ENTRY_HEADER.split(content)
+    i = 1  # Start after initial text
+    while i < len(entries) - 2:
+        timestamp = entries[i].strip()
+        message_type = entries[i + 1].strip()
+        entry_text = entries[i + 2]
+        i += 3
+
+        # Username is optional (format: "- **User:** @username (user_id: 123)"
+        # or "- **User:** (user_id: 123)")
+        user_match = re.search(
+            r"- \*\*User:\*\* (?:@?(\S+)\s+)?\(user_id: (\d+)\)", entry_text
+        )
+        content_match = re.search(
+            r"- \*\*Content:\*\* (.+?)(?:\n- \*\*|$)", entry_text, re.DOTALL
+        )
+        if not user_match or not content_match:
+            continue
+
+        def field(name: str) -> Optional[str]:
+            match = re.search(rf"- \*\*{name}:\*\* (.+)", entry_text)
+            return match.group(1).strip() if match else None
+
+        messages.append(
+            UserMessage(
+                timestamp=timestamp,
+                message_type=message_type,
+                user_id=user_match.group(2).strip(),
+                chat_id=field("Chat ID") or "",
+                platform=field("Platform") or "",
+                content=content_match.group(1).strip(),
+                message_id=field("Message ID"),
+                username=user_match.group(1).strip().replace("@", "")
+                if user_match.group(1)
+                else None,
+                status=field("Status") or "NEW",
+                raw_entry=entry_text,
+            )
+        )
+    return messages
+
+
+class UserMessageStore:
+    """SQLite (WAL) queue of user messages with a status index."""
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the store.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_path, timeout=5.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._init_database()
+
+    def _init_database(self) -> None:
+        """Initialize the schema and WAL mode."""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL: durable across process crashes, commits don't fsync
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS user_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    message_type TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    chat_id TEXT NOT NULL DEFAULT '',
+                    platform TEXT NOT NULL DEFAULT '',
+                    content TEXT NOT NULL,
+                    message_id TEXT,
+                    username TEXT,
+                    status TEXT NOT NULL DEFAULT 'NEW'
+                )
+            """
+            )
+            # "NEW since cursor" and status counts
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_user_messages_status
+                ON user_messages(status, id)
+            """
+            )
+            # Status updates by user + message ID / timestamp
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_user_messages_user
+                ON user_messages(user_id, message_id, timestamp)
+            """
+            )
+
+    @staticmethod
+    def _to_message(row: sqlite3.Row) -> UserMessage:
+        return UserMessage(
+            id=row["id"],
+            timestamp=row["timestamp"],
+            message_type=row["message_type"],
+            user_id=row["user_id"],
+            chat_id=row["chat_id"],
+            platform=row["platform"],
+            content=row["content"],
+            message_id=row["message_id"],
+            username=row["username"],
+            status=row["status"],
+        )
+
+    def append(
+        self,
+        user_id: str,
+        chat_id: str,
+        platform: str,
+        message_type: str,
+        content: str,
+        message_id: Optional[str] = None,
+        status: str = "NEW",
+        username: Optional[str] = None,
+        timestamp: Optional[str] = None,
+    ) -> UserMessage:
+        """
+        Append a message.
+
+        Args:
+            user_id: User ID
+            chat_id: Chat/channel ID
+            platform: Platform ("telegram" or "discord")
+            message_type: Type of message ("Request", "Response", etc.)
+            content: Message content
+            message_id: Optional platform message ID
+            status: Message status ("NEW", "PROCESSING", "RESPONDED", etc.)
+            username: Optional username (without "@")
+            timestamp: "YYYY-MM-DD HH:MM:SS" (defaults to now)
+
+        Returns:
+            The stored message (with its ID set)
+        """
+        message = UserMessage(
+            timestamp=timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            message_type=message_type,
+            user_id=str(user_id),
+            chat_id=str(chat_id) if chat_id else "",
+            platform=platform,
+            content=content,
+            message_id=str(message_id) if message_id else None,
+            username=username,
+            status=status,
+        )
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO user_messages (
+                    timestamp, message_type, user_id, chat_id, platform,
+                    content, message_id, username, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    message.timestamp,
+                    message.message_type,
+                    message.user_id,
+                    message.chat_id,
+                    message.platform,
+                    message.content,
+                    message.message_id,
+                    message.username,
+                    message.status,
+                ),
+            )
+        message.id = cursor.lastrowid
+        return message
+
+    def import_messages(
+        self, messages: List[UserMessage], only_if_empty: bool = False
+    ) -> int:
+        """
+        Bulk insert messages (e.g. parsed from an existing USER_MESSAGES.md).
+
+        Args:
+            messages: Messages to insert, oldest first
+            only_if_empty: Skip the import if the store already has messages
+                (checked in the same transaction, so concurrent processes
+                import once)
+
+        Returns:
+            Number of messages imported
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if (
+                    only_if_empty
+                    and self._conn.execute(
+                        "SELECT 1 FROM user_messages LIMIT 1"
+                    ).fetchone()
+                ):
+                    self._conn.execute("ROLLBACK")
+                    return 0
+                self._conn.executemany(
+                    """
+                    INSERT INTO user_messages (
+                        timestamp, message_type, user_id, chat_id, platform,
+                        content, message_id, username, status
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                    [
+                        (
+                            m.timestamp,
+                            m.message_type,
+                            m.user_id,
+                            m.chat_id,
+                            m.platform,
+                            m.content,
+                            m.message_id,
+                            m.username,
+                            m.status,
+                        )
+                        for m in messages
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(messages)
+
+    def set_status(
+        self, row_id: int, new_status: str, expected_status: Optional[str] = None
+    ) -> bool:
+        """
+        Change the status of a message by ID.
+
+        Args:
+            row_id: Message row ID
+            new_status: New status
+            expected_status: Only change it if the current status is this
+                (lets concurrent workers claim a NEW message exactly once)
+
+        Returns:
+            True if the status was changed
+        """
+        query = "UPDATE user_messages SET status = ? WHERE id = ?"
+        params: tuple = (new_status, row_id)
+        if expected_status is not None:
+            query += " AND status = ?"
+            params += (expected_status,)
+        with self._lock:
+            return self._conn.execute(query, params).rowcount > 0
+
+    def update_status(
+        self,
+        user_id: str,
+        message_id: Optional[str] = None,
+        timestamp: Optional[str] = None,
+        new_status: str = "PROCESSING",
+    ) -> bool:
+        """
+        Change the status of the oldest message matching user/message ID/time.
+
+        Returns:
+            True if a message was updated
+        """
+        query = "SELECT id FROM user_messages WHERE user_id = ?"
+        params: tuple = (str(user_id),)
+        if message_id:
+            query += " AND message_id = ?"
+            params += (str(message_id),)
+        if timestamp:
+            query += " AND timestamp = ?"
+            params += (timestamp,)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    query + " ORDER BY id LIMIT 1", params
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE user_messages SET status = ? WHERE id = ?",
+                        (new_status, row["id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row is not None
+
+    def get(self, row_id: int) -> Optional[UserMessage]:
+        """Get a message by row ID."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM user_messages WHERE id = ?", (row_id,)
+            ).fetchone()
+        return self._to_message(row) if row is not None else None
+
+    def fetch_by_status(
+        self, status: str = "NEW", after_id: int = 0, limit: Optional[int] = None
+    ) -> List[UserMessage]:
+        """
+        Fetch messages with a status, oldest first.
+
+        Args:
+            status: Status to fetch
+            after_id: Cursor; only messages with a greater ID (pass the ID of
+                the last message of the previous fetch)
+            limit: Maximum number of messages
+
+        Returns:
+            Matching messages
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {_COLUMNS} FROM user_messages
+                WHERE status = ? AND id > ? ORDER BY id LIMIT ?
+            """,
+                (status, after_id, -1 if limit is None else limit),
+            ).fetchall()
+        return [self._to_message(row) for row in rows]
+
+    def count_by_status(self, status: str) -> int:
+        """Number of messages with a status."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM user_messages WHERE status = ?", (status,)
+            ).fetchone()[0]
+
+    def iter_messages(self, batch_size: int = 500) -> Iterator[UserMessage]:
+        """Iterate over all messages, oldest first, in batches."""
+        after_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT {_COLUMNS} FROM user_messages
+                    WHERE id > ? ORDER BY id LIMIT ?
+                """,
+                    (after_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._to_message(row)
+            after_id = rows[-1]["id"]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM user_messages").fetchone()[
+                0
+            ]
+
+    def export_markdown(self, path: Path, header: str = "") -> int:
+        """
+        Render all messages (with their current status) to a Markdown file.
+
+        The file is written to a temporary file and renamed, so readers never
+        see a partial export.
+
+        Args:
+            path: Output path
+            header: Text written before the entries
+
+        Returns:
+            Number of messages exported
+        """
+        tmp_path = path.with_name(path.name + ".tmp")
+        count = 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(header)
+            for message in self.iter_messages():
+                f.write(render_user_message_markdown(message))
+                count += 1
+        tmp_path.replace(path)
+        return count
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
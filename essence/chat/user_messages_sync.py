@@ -1,16 +1,29 @@
 """
 User Messages Synchronization
 
-Handles syncing all messages between owner/whitelisted users and the looping agent to USER_MESSAGES.md.
-Uses file locking (open/write/close) to minimize concurrent read/write issues.
+Handles syncing all messages between owner/whitelisted users and the looping agent.
+Messages live in an indexed SQLite queue store (user_messages.db next to
+USER_MESSAGES.md); USER_MESSAGES.md is a rendered Markdown export that new
+messages are appended to (set USER_MESSAGES_MARKDOWN_EXPORT=false to disable it).
+Status changes update the store and schedule a re-render of the file, so bursts
+of changes are coalesced into one rewrite (USER_MESSAGES_EXPORT_DELAY seconds
+after the first). Appends and re-renders hold an exclusive fcntl lock on the
+file, so an append is never lost to a concurrent re-render.
 """
 import logging
 import os
 import fcntl
-from datetime import datetime
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from essence.chat.user_messages_store import (
+    UserMessageStore,
+    parse_user_messages_markdown,
+    render_user_message_markdown,
+)
+
 logger = logging.getLogger(__name__)
 
 # Path to USER_MESSAGES.md (in /var/data/ directory)
@@ -58,6 +71,108 @@ except (PermissionError, OSError) as e:
     logger.warning(f"Could not create {DATA_DIR} directory: {e}. This is OK for services that don't use USER_MESSAGES.md")
 USER_MESSAGES_FILE = DATA_DIR / "USER_MESSAGES.md"
 
+_USER_MESSAGES_TEMPLATE = """# User Messages and Agent Communication Log
+
+This file tracks all direct communication between owner/whitelisted users and the looping agent.
+
+## Format
+
+Each entry follows this structure:
+
+```markdown
+## [TIMESTAMP] Message Type
+- **User:** @username (user_id: 123456789)
+- **Platform:** Telegram | Discord
+- **Type:** Request | Response | Clarification | Help Request | Progress Update
+- **Content:** [message content]
+- **Message ID:** [platform message ID]
+- **Chat ID:** [platform chat/channel ID]
+- **Status:** NEW | PROCESSING | RESPONDED | ERROR
+```
+
+## Status Values
+
+- **NEW**: Message just received, not yet processed by agent
+- **PROCESSING**: Agent is currently processing this message
+- **RESPONDED**: Agent has responded to this message
+- **ERROR**: Error occurred while processing
+
+## Communication Log
+
+"""
+
+_store: Optional[UserMessageStore] = None
+
+# Pending re-render of USER_MESSAGES.md after status changes
+_export_timer: Optional[threading.Timer] = None
+_export_timer_lock = threading.Lock()
+
+
+def markdown_export_enabled() -> bool:
+    """Whether new messages are also appended to USER_MESSAGES.md."""
+    return os.getenv("USER_MESSAGES_MARKDOWN_EXPORT", "true").lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+
+
+def _export_delay_seconds() -> float:
+    """Delay before status changes are re-rendered into USER_MESSAGES.md."""
+    return float(os.getenv("USER_MESSAGES_EXPORT_DELAY", "1.0"))
+
+
+@contextmanager
+def _locked_user_messages_file():
+    """
+    Open USER_MESSAGES.md for appending under an exclusive lock.
+
+    Re-renders replace the file by renaming a new one over it, so once the
+    lock is held the handle is checked against the current path and reopened
+    if the file was replaced while waiting.
+    """
+    while True:
+        with open(USER_MESSAGES_FILE, "a", encoding="utf-8") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # Exclusive lock
+            try:
+                try:
+                    current = (
+                        os.fstat(f.fileno()).st_ino
+                        == os.stat(USER_MESSAGES_FILE).st_ino
+                    )
+                except FileNotFoundError:
+                    current = False
+                if current:
+                    yield f
+                    return
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)  # Release lock
+
+
+def get_user_message_store() -> UserMessageStore:
+    """
+    Get the queue store next to USER_MESSAGES.md.
+
+    On first use, messages from an existing USER_MESSAGES.md are imported.
+
+    Returns:
+        UserMessageStore instance
+    """
+    global _store
+    db_path = str(USER_MESSAGES_FILE.with_name("user_messages.db"))
+    if _store is None or _store.db_path != db_path:
+        if _store is not None:
+            _store.close()
+        _store = UserMessageStore(db_path)
+        if USER_MESSAGES_FILE.exists():
+            imported = _store.import_messages(
+                parse_user_messages_markdown(read_user_messages()),
+                only_if_empty=True,
+            )
+            if imported:
+                logger.info(f"Imported {imported} messages from {USER_MESSAGES_FILE}")
+    return _store
+
 
 def get_owner_users(platform: str) -> List[str]:
     """
@@ -140,9 +255,11 @@ def append_message_to_user_messages(
     username: Optional[str] = None,
 ) -> bool:
     """
-    Append a message to USER_MESSAGES.md with file locking.
+    Append a message to the queue store and the USER_MESSAGES.md export.
 
-    Uses open/write/close pattern with fcntl locking to minimize concurrent access issues.
+    With the export enabled, the message is stored and appended while holding
+    the file lock, so a concurrent re-render either includes it or runs
+    before it is written.
 
     Args:
         user_id: User ID
@@ -158,36 +275,29 @@ def append_message_to_user_messages(
         True if appended successfully, False otherwise
     """
     try:
-        # Ensure file exists
-        if not USER_MESSAGES_FILE.exists():
-            _initialize_user_messages_file()
-
-        # Format new entry
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        username_str = f"@{username} " if username else ""
-        message_id_str = f"\n- **Message ID:** {message_id}" if message_id else ""
-        chat_id_str = f"\n- **Chat ID:** {chat_id}" if chat_id else ""
-
-        entry = f"""
-## [{timestamp}] {message_type}
-- **User:** {username_str}(user_id: {user_id})
-- **Platform:** {platform.capitalize()}
-- **Type:** {message_type}
-- **Content:** {content}
-{message_id_str}{chat_id_str}
-- **Status:** {status}
+        store = get_user_message_store()
+        fields = dict(
+            user_id=user_id,
+            chat_id=chat_id,
+            platform=platform,
+            message_type=message_type,
+            content=content,
+            message_id=message_id,
+            status=status,
+            username=username,
+        )
 
-"""
+        if markdown_export_enabled():
+            # Ensure file exists
+            if not USER_MESSAGES_FILE.exists():
+                _initialize_user_messages_file()
 
-        # Open file with exclusive lock, append, and close
-        # This minimizes concurrent read/write issues
-        with open(USER_MESSAGES_FILE, "a", encoding="utf-8") as f:
-            fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # Exclusive lock
-            try:
-                f.write(entry)
+            with _locked_user_messages_file() as f:
+                message = store.append(**fields)
+                f.write(render_user_message_markdown(message))
                 f.flush()  # Ensure data is written
-            finally:
-                fcntl.flock(f.fileno(), fcntl.LOCK_UN)  # Release lock
+        else:
+            store.append(**fields)
 
         logger.debug(
             f"Appended {message_type} message to USER_MESSAGES.md for user {user_id} (status: {status})"
@@ -232,7 +342,11 @@ def update_message_status(
     new_status: str = "PROCESSING",
 ) -> bool:
     """
-    Update the status of a message in USER_MESSAGES.md with file locking.
+    Update the status of a message in the queue store.
+
+    The indexed store is updated right away (O(log n)); USER_MESSAGES.md is
+    re-rendered with the new status shortly after (see
+    schedule_user_messages_export()).
 
     Args:
         user_id: User ID
@@ -244,97 +358,74 @@ def update_message_status(
         True if updated successfully, False otherwise
     """
     try:
-        if not USER_MESSAGES_FILE.exists():
-            logger.warning("USER_MESSAGES.md does not exist, cannot update status")
-            return False
-
-        # Read current content with lock
-        content = read_user_messages()
-        if not content:
-            return False
-
-        # Find and update the matching entry
-        lines = content.split("\n")
-        updated = False
-
-        for i, line in enumerate(lines):
-            # Look for status line
-            if line.strip().startswith("- **Status:**"):
-                # Check if this entry matches our criteria
-                # Look backwards for user_id and optionally message_id/timestamp
-                entry_start = max(0, i - 10)  # Look back up to 10 lines
-                entry_lines = lines[entry_start : i + 1]
-                entry_text = "\n".join(entry_lines)
-
-                # Check if this entry matches
-                matches = True
-                if user_id not in entry_text:
-                    matches = False
-                if message_id and message_id not in entry_text:
-                    matches = False
-                if timestamp and timestamp not in entry_text:
-                    matches = False
-
-                if matches:
-                    # Update status
-                    lines[i] = f"- **Status:** {new_status}"
-                    updated = True
-                    break
-
-        if updated:
-            # Write back with exclusive lock
-            with open(USER_MESSAGES_FILE, "w", encoding="utf-8") as f:
-                fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # Exclusive lock
-                try:
-                    f.write("\n".join(lines))
-                    f.flush()
-                finally:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)  # Release lock
-
+        if get_user_message_store().update_status(
+            user_id, message_id=message_id, timestamp=timestamp, new_status=new_status
+        ):
             logger.debug(f"Updated message status to {new_status} for user {user_id}")
+            if markdown_export_enabled():
+                schedule_user_messages_export()
             return True
-        else:
-            logger.warning(
-                f"Could not find matching message to update status for user {user_id}"
-            )
-            return False
+        logger.warning(
+            f"Could not find matching message to update status for user {user_id}"
+        )
+        return False
 
     except Exception as e:
-        logger.error(f"Failed to update message status in USER_MESSAGES.md: {e}", exc_info=True)
+        logger.error(f"Failed to update message status: {e}", exc_info=True)
         return False
 
 
-def _initialize_user_messages_file() -> None:
-    """Initialize USER_MESSAGES.md with template if it doesn't exist."""
-    template = """# User Messages and Agent Communication Log
-
-This file tracks all direct communication between owner/whitelisted users and the looping agent.
-
-## Format
+def export_user_messages_markdown() -> int:
+    """
+    Re-render USER_MESSAGES.md from the queue store with current statuses.
 
-Each entry follows this structure:
+    Returns:
+        Number of messages exported
+    """
+    store = get_user_message_store()
+    with _locked_user_messages_file():
+        count = store.export_markdown(
+            USER_MESSAGES_FILE, header=_USER_MESSAGES_TEMPLATE
+        )
+    logger.debug(f"Exported {count} messages to {USER_MESSAGES_FILE}")
+    return count
 
-```markdown
-## [TIMESTAMP] Message Type
-- **User:** @username (user_id: 123456789)
-- **Platform:** Telegram | Discord
-- **Type:** Request | Response | Clarification | Help Request | Progress Update
-- **Content:** [message content]
-- **Message ID:** [platform message ID]
-- **Chat ID:** [platform chat/channel ID]
-- **Status:** NEW | PROCESSING | RESPONDED | ERROR
-```
 
-## Status Values
+def schedule_user_messages_export() -> None:
+    """
+    Re-render USER_MESSAGES.md after USER_MESSAGES_EXPORT_DELAY seconds.
 
-- **NEW**: Message just received, not yet processed by agent
-- **PROCESSING**: Agent is currently processing this message
-- **RESPONDED**: Agent has responded to this message
-- **ERROR**: Error occurred while processing
+    Changes made while a re-render is pending are covered by it, so a burst of
+    status changes costs one rewrite. The timer thread is not a daemon, so a
+    pending re-render still runs when the process exits. With a delay of 0 the
+    file is re-rendered immediately.
+    """
+    global _export_timer
+    delay = _export_delay_seconds()
+    if delay <= 0:
+        _run_scheduled_export()
+        return
+    with _export_timer_lock:
+        if _export_timer is not None:
+            return
+        _export_timer = threading.Timer(delay, _run_scheduled_export)
+        _export_timer.start()
+
+
+def _run_scheduled_export() -> None:
+    global _export_timer
+    with _export_timer_lock:
+        # Cleared first so changes made during the export schedule another one
+        _export_timer = None
+    try:
+        export_user_messages_markdown()
+    except Exception as e:
+        logger.error(f"Failed to re-render USER_MESSAGES.md: {e}", exc_info=True)
 
-## Communication Log
 
-"""
+def _initialize_user_messages_file() -> None:
+    """Initialize USER_MESSAGES.md with template if it doesn't exist."""
+    template = _USER_MESSAGES_TEMPLATE
     try:
         with open(USER_MESSAGES_FILE, "w", encoding="utf-8") as f:
             fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # Exclusive lock
@@ -11,7 +11,11 @@ Commands are discovered via reflection - they must be:
 """
 
 # Import command modules so they're available for reflection
+from . import benchmark_db_pool  # noqa: F401
+from . import benchmark_llm_batching  # noqa: F401
+from . import benchmark_message_history  # noqa: F401
 from . import benchmark_qwen3  # noqa: F401
+from . import benchmark_tts  # noqa: F401
 from . import check_environment  # noqa: F401
 from . import check_service_status  # noqa: F401
 from . import coding_agent  # noqa: F401
@@ -52,6 +56,10 @@ __all__ = [
     "verify_qwen3",
     "download_models",
     "benchmark_qwen3",
+    "benchmark_llm_batching",
+    "benchmark_tts",
+    "benchmark_message_history",
+    "benchmark_db_pool",
     "run_benchmarks",
     "generate_alice_dataset",
     "integration_test_service",
@@ -0,0 +1,205 @@
+"""
+Benchmark database pool command - per-call latency with and without pooling.
+
+Usage:
+    poetry run python -m essence benchmark-db-pool [--count 1000] [--concurrency 4]
+
+Runs --count small queries (the shape of a language-preference lookup) against
+the PostgreSQL configured by DB_HOST/DB_PORT/DB_NAME/DB_USER/DB_PASSWORD, once
+opening a fresh connection per call and once checking connections out of
+ConnectionPool. Start a local container with e.g.
+``docker run --rm -e POSTGRES_HOST_AUTH_METHOD=trust -p 5432:5432 postgres:16``.
+"""
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, List
+
+from essence.command import Command
+
+logger = logging.getLogger(__name__)
+
+QUERY = "SELECT %s::text AS session_id, '{}'::jsonb AS metadata"
+
+
+@dataclass
+class DbPoolBenchmarkResult:
+    """Latency of one connection strategy."""
+
+    strategy: str
+    calls: int
+    concurrency: int
+    wall_time_seconds: float
+    calls_per_second: float
+    p50_ms: float
+    p99_ms: float
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def _run_strategy(
+    strategy: str,
+    get_conn: Callable[[], Any],
+    count: int,
+    concurrency: int,
+) -> DbPoolBenchmarkResult:
+    def call(i: int) -> float:
+        start = time.perf_counter()
+        conn = get_conn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(QUERY, (str(i),))
+            cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(call, range(count)))
+    elapsed = time.perf_counter() - start
+    return DbPoolBenchmarkResult(
+        strategy=strategy,
+        calls=count,
+        concurrency=concurrency,
+        wall_time_seconds=elapsed,
+        calls_per_second=count / elapsed if elapsed > 0 else 0.0,
+        p50_ms=_percentile(latencies, 0.5) * 1000,
+        p99_ms=_percentile(latencies, 0.99) * 1000,
+    )
+
+
+def run_db_pool_benchmark(count: int, concurrency: int) -> List[DbPoolBenchmarkResult]:
+    """Measure per-call latency with a fresh connection and with the pool.
+
+    Args:
+        count: Number of queries per strategy
+        concurrency: Number of threads issuing queries
+
+    Returns:
+        One result per strategy
+    """
+    import psycopg2
+
+    from essence.chat.storage.conversation import _db_conn_string
+    from essence.chat.storage.pool import ConnectionPool
+
+    conn_string = _db_conn_string()
+    results = [
+        _run_strategy(
+            "connect", lambda: psycopg2.connect(conn_string), count, concurrency
+        )
+    ]
+    pool = ConnectionPool(
+        lambda: psycopg2.connect(conn_string),
+        name="benchmark",
+        min_size=concurrency,
+        max_size=concurrency,
+    )
+    try:
+        results.append(_run_strategy("pool", pool.getconn, count, concurrency))
+    finally:
+        pool.close()
+    return results
+
+
+def format_db_pool_results_table(results: List[DbPoolBenchmarkResult]) -> str:
+    """Render results as a plain-text table."""
+    lines = [
+        f"{'strategy':>8} {'calls':>7} {'threads':>7} {'wall s':>8} "
+        f"{'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8}",
+    ]
+    for r in results:
+        lines.append(
+            f"{r.strategy:>8} {r.calls:>7} {r.concurrency:>7} "
+            f"{r.wall_time_seconds:>8.3f} {r.calls_per_second:>9.0f} "
+            f"{r.p50_ms:>8.2f} {r.p99_ms:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+class BenchmarkDbPoolCommand(Command):
+    """
+    Command for measuring the benefit of the storage connection pool.
+
+    Compares connect-per-call with pooled connections against a live
+    PostgreSQL and prints a table.
+    """
+
+    @classmethod
+    def get_name(cls) -> str:
+        """
+        Get the command name.
+
+        Returns:
+            Command name: "benchmark-db-pool"
+        """
+        return "benchmark-db-pool"
+
+    @classmethod
+    def get_description(cls) -> str:
+        """
+        Get the command description.
+
+        Returns:
+            Description of what this command does
+        """
+        return "Benchmark PostgreSQL per-call latency (connect vs. pool)"
+
+    @classmethod
+    def add_args(cls, parser: argparse.ArgumentParser) -> None:
+        """
+        Add command-line arguments to the argument parser.
+
+        Args:
+            parser: Argument parser to add arguments to
+        """
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=1000,
+            help="Number of queries per strategy (default: 1000)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Number of threads issuing queries (default: 4)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="Optional path to write results as JSON",
+        )
+
+    def init(self) -> None:
+        """
+        Initialize the benchmark command.
+        """
+
+    def run(self) -> None:
+        """
+        Run the benchmark and print a results table.
+        """
+        results = run_db_pool_benchmark(self.args.count, self.args.concurrency)
+        print(format_db_pool_results_table(results))
+
+        if self.args.output:
+            output_path = Path(self.args.output)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(json.dumps([asdict(r) for r in results], indent=2))
+            logger.info(f"Results written to {output_path}")
+
+    def cleanup(self) -> None:
+        """
+        Clean up the benchmark command.
+        """
@@ -0,0 +1,300 @@
+"""
+Benchmark LLM batching command - Aggregate throughput vs. concurrent clients.
+
+Usage:
+    poetry run python -m essence benchmark-llm-batching [--model MODEL] [--clients 1,2,4,8]
+
+Compares two serving modes for the same loaded model:
+- sequential: each client calls Qwen3LlmStrategy.infer() (one model.generate per request)
+- batched: requests go through inference_core's ContinuousBatchScheduler
+
+Runs on CPU with a tiny HuggingFace model by default so it can be used without a GPU.
+"""
+import argparse
+import concurrent.futures
+import json
+import logging
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+try:
+    from inference_core.llm.batch_scheduler import ContinuousBatchScheduler
+    from inference_core.llm.qwen3_strategy import Qwen3LlmStrategy
+    from inference_core.strategies import InferenceRequest
+
+    INFERENCE_CORE_AVAILABLE = True
+except ImportError:
+    INFERENCE_CORE_AVAILABLE = False
+    ContinuousBatchScheduler = None
+    Qwen3LlmStrategy = None
+    InferenceRequest = None
+
+from essence.command import Command
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPT = "Write a short story about a robot learning to paint."
+
+
+@dataclass
+class ConcurrencyResult:
+    """Aggregate throughput for one serving mode at one client count."""
+
+    mode: str  # 'sequential' or 'batched'
+    clients: int
+    requests: int
+    failed_requests: int
+    output_tokens: int
+    wall_time_seconds: float
+    tokens_per_second: float
+    average_latency_seconds: float
+    p95_latency_seconds: float
+
+
+def run_concurrency_level(
+    mode: str,
+    generate: Callable[[], int],
+    clients: int,
+    requests_per_client: int,
+) -> ConcurrencyResult:
+    """Run `clients` concurrent clients, each issuing `requests_per_client` requests.
+
+    Args:
+        mode: Label for the serving mode
+        generate: Callable that performs one request and returns output token count
+        clients: Number of concurrent clients
+        requests_per_client: Sequential requests per client
+
+    Returns:
+        Aggregate throughput for this concurrency level
+    """
+
+    def client() -> Tuple[List[float], int, int]:
+        latencies = []
+        tokens = 0
+        failed = 0
+        for _ in range(requests_per_client):
+            start = time.time()
+            try:
+                tokens += generate()
+                latencies.append(time.time() - start)
+            except Exception as e:
+                logger.error(f"Request failed: {e}")
+                failed += 1
+        return latencies, tokens, failed
+
+    start_time = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(lambda _: client(), range(clients)))
+    wall_time = time.time() - start_time
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    output_tokens = sum(result[1] for result in results)
+    failed = sum(result[2] for result in results)
+
+    return ConcurrencyResult(
+        mode=mode,
+        clients=clients,
+        requests=clients * requests_per_client,
+        failed_requests=failed,
+        output_tokens=output_tokens,
+        wall_time_seconds=wall_time,
+        tokens_per_second=output_tokens / wall_time if wall_time > 0 else 0.0,
+        average_latency_seconds=statistics.mean(latencies) if latencies else 0.0,
+        p95_latency_seconds=latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+    )
+
+
+def format_results_table(results: List[ConcurrencyResult]) -> str:
+    """Render results as a plain-text table."""
+    lines = [
+        f"{'mode':<11} {'clients':>7} {'requests':>8} {'tokens':>7} "
+        f"{'wall s':>8} {'tok/s':>9} {'avg lat s':>9} {'p95 lat s':>9}",
+    ]
+    for r in results:
+        lines.append(
+            f"{r.mode:<11} {r.clients:>7} {r.requests:>8} {r.output_tokens:>7} "
+            f"{r.wall_time_seconds:>8.2f} {r.tokens_per_second:>9.1f} "
+            f"{r.average_latency_seconds:>9.3f} {r.p95_latency_seconds:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+class BenchmarkLlmBatchingCommand(Command):
+    """
+    Command for measuring LLM throughput against the number of concurrent clients.
+
+    Loads a model once through Qwen3LlmStrategy, then sweeps client counts for the
+    sequential (one generate per request) and continuous batching serving modes,
+    reporting aggregate tokens/s for each.
+    """
+
+    @classmethod
+    def get_name(cls) -> str:
+        """
+        Get the command name.
+
+        Returns:
+            Command name: "benchmark-llm-batching"
+        """
+        return "benchmark-llm-batching"
+
+    @classmethod
+    def get_description(cls) -> str:
+        """
+        Get the command description.
+
+        Returns:
+            Description of what this command does
+        """
+        return "Benchmark LLM tokens/s vs. concurrent clients with and without continuous batching"
+
+    @classmethod
+    def add_args(cls, parser: argparse.ArgumentParser) -> None:
+        """
+        Add command-line arguments to the argument parser.
+
+        Args:
+            parser: Argument parser to add arguments to
+        """
+        parser.add_argument(
+            "--model",
+            type=str,
+            default="sshleifer/tiny-gpt2",
+            help="HuggingFace model to load (default: sshleifer/tiny-gpt2)",
+        )
+        parser.add_argument(
+            "--device", type=str, default="cpu", help="Device (default: cpu)"
+        )
+        parser.add_argument(
+            "--clients",
+            type=str,
+            default="1,2,4,8",
+            help="Comma-separated concurrent client counts (default: 1,2,4,8)",
+        )
+        parser.add_argument(
+            "--requests-per-client",
+            type=int,
+            default=4,
+            help="Requests issued by each client (default: 4)",
+        )
+        parser.add_argument(
+            "--max-tokens",
+            type=int,
+            default=64,
+            help="max_tokens per request (default: 64)",
+        )
+        parser.add_argument(
+            "--max-batch-size",
+            type=int,
+            default=8,
+            help="Scheduler max batch size (default: 8)",
+        )
+        parser.add_argument(
+            "--modes",
+            type=str,
+            default="sequential,batched",
+            help="Comma-separated modes to run (default: sequential,batched)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="Optional path to write results as JSON",
+        )
+
+    def init(self) -> None:
+        """
+        Initialize the benchmark command.
+
+        Raises:
+            RuntimeError: If the inference_core package is not available
+        """
+        if not INFERENCE_CORE_AVAILABLE:
+            error_msg = "inference_core package not available"
+            logger.error(error_msg)
+            raise RuntimeError(
+                f"{error_msg}\nInstall with: pip install 'inference-core[llm]'"
+            )
+        self.client_counts = [int(c) for c in self.args.clients.split(",") if c]
+        self.modes = [m.strip() for m in self.args.modes.split(",") if m.strip()]
+
+    def run(self) -> None:
+        """
+        Run the client-count sweep for each serving mode and print a results table.
+        """
+        logger.info(f"Loading {self.args.model} on {self.args.device}...")
+        strategy = Qwen3LlmStrategy(
+            model_name=self.args.model,
+            device=self.args.device,
+            use_quantization=False,
+            enable_batching=False,
+        )
+        strategy.warmup()
+        # Measure generation, not the result cache
+        strategy._cache.enable_cache = False
+
+        params = {"max_tokens": self.args.max_tokens, "temperature": 0.7}
+
+        def sequential_generate() -> int:
+            response = strategy.infer(
+                InferenceRequest(
+                    payload={"prompt": DEFAULT_PROMPT, "params": params}, metadata={}
+                )
+            )
+            return int(response.payload.get("tokens") or 0)
+
+        scheduler = ContinuousBatchScheduler(
+            strategy._model,
+            strategy._tokenizer,
+            device=strategy.device,
+            max_batch_size=self.args.max_batch_size,
+        )
+
+        def batched_generate() -> int:
+            generation = scheduler.submit(DEFAULT_PROMPT, params)
+            generation.text()
+            return generation.output_tokens
+
+        generators = {"sequential": sequential_generate, "batched": batched_generate}
+
+        results: List[ConcurrencyResult] = []
+        scheduler.start()
+        try:
+            for mode in self.modes:
+                if mode not in generators:
+                    logger.warning(f"Unknown mode '{mode}', skipping")
+                    continue
+                for clients in self.client_counts:
+                    result = run_concurrency_level(
+                        mode,
+                        generators[mode],
+                        clients,
+                        self.args.requests_per_client,
+                    )
+                    logger.info(
+                        f"{mode}: {clients} clients -> {result.tokens_per_second:.1f} tokens/s"
+                    )
+                    results.append(result)
+        finally:
+            scheduler.stop()
+
+        print(format_results_table(results))
+        logger.info(f"Scheduler stats: {scheduler.get_stats()}")
+
+        if self.args.output:
+            output_path = Path(self.args.output)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(json.dumps([asdict(r) for r in results], indent=2))
+            logger.info(f"Results written to {output_path}")
+
+    def cleanup(self) -> None:
+        """
+        Clean up the benchmark command.
+
+        The scheduler is stopped at the end of run(); nothing else is held.
+        """
+        pass
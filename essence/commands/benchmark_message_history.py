@@ -0,0 +1,239 @@
+"""
+Benchmark message history command - add and scan throughput per backend.
+
+Usage:
+    poetry run python -m essence benchmark-message-history [--count 100000] [--dir /tmp/history]
+
+Adds --count synthetic messages to the in-memory MessageHistory and to the
+persistent log-backed history, then measures a full scan and a time-range scan
+of the log. Without --dir, the log is written to a temporary directory that is
+removed afterwards.
+"""
+import argparse
+import json
+import logging
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from essence.chat.message_history import MessageHistory, PersistentMessageHistory
+from essence.command import Command
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MessageHistoryBenchmarkResult:
+    """Throughput of one operation on one backend."""
+
+    backend: str
+    operation: str
+    messages: int
+    wall_time_seconds: float
+    messages_per_second: float
+
+
+def _result(
+    backend: str, operation: str, messages: int, start: float
+) -> MessageHistoryBenchmarkResult:
+    elapsed = time.perf_counter() - start
+    return MessageHistoryBenchmarkResult(
+        backend=backend,
+        operation=operation,
+        messages=messages,
+        wall_time_seconds=elapsed,
+        messages_per_second=messages / elapsed if elapsed > 0 else 0.0,
+    )
+
+
+def add_messages(history: MessageHistory, count: int, content: str) -> None:
+    """Add `count` synthetic messages spread over 100 users."""
+    for i in range(count):
+        history.add_message(
+            platform="telegram" if i % 2 else "discord",
+            user_id=str(i % 100),
+            chat_id=str(i % 100),
+            message_content=content,
+            message_type="text",
+            message_id=str(i),
+        )
+
+
+def run_message_history_benchmark(
+    directory: str, count: int, content: str, fsync_batch: int
+) -> List[MessageHistoryBenchmarkResult]:
+    """Measure add throughput for both backends and scan throughput of the log.
+
+    Args:
+        directory: Empty directory for the log
+        count: Number of messages to add
+        content: Message text
+        fsync_batch: fsync batch size of the log
+
+    Returns:
+        One result per backend and operation
+    """
+    results = []
+
+    memory = MessageHistory(max_entries=count)
+    start = time.perf_counter()
+    add_messages(memory, count, content)
+    results.append(_result("memory", "add", count, start))
+
+    persistent = PersistentMessageHistory(
+        directory, max_entries=min(count, 10000), fsync_batch=fsync_batch
+    )
+    start_time = datetime.now()
+    start = time.perf_counter()
+    add_messages(persistent, count, content)
+    persistent.sync()
+    results.append(_result("log", "add", count, start))
+    middle_time = start_time + (datetime.now() - start_time) / 2
+
+    start = time.perf_counter()
+    scanned = sum(1 for _ in persistent.scan())
+    results.append(_result("log", "scan", scanned, start))
+
+    # Second half of the run by time: binary search, then a sequential read
+    start = time.perf_counter()
+    scanned = sum(1 for _ in persistent.scan(start=middle_time))
+    results.append(_result("log", "time-range scan", scanned, start))
+    persistent.close()
+
+    # Reopening replays the newest entries into memory
+    start = time.perf_counter()
+    reopened = PersistentMessageHistory(directory, max_entries=min(count, 10000))
+    results.append(_result("log", "reopen", len(reopened), start))
+    reopened.close()
+    return results
+
+
+def format_message_history_results_table(
+    results: List[MessageHistoryBenchmarkResult],
+) -> str:
+    """Render results as a plain-text table."""
+    lines = [
+        f"{'backend':>8} {'operation':>16} {'messages':>9} {'wall s':>8} {'msg/s':>10}",
+    ]
+    for r in results:
+        lines.append(
+            f"{r.backend:>8} {r.operation:>16} {r.messages:>9} "
+            f"{r.wall_time_seconds:>8.3f} {r.messages_per_second:>10.0f}"
+        )
+    return "\n".join(lines)
+
+
+class BenchmarkMessageHistoryCommand(Command):
+    """
+    Command for measuring message history add and scan throughput.
+
+    Compares the in-memory ring with the persistent append-only log and
+    prints a table.
+    """
+
+    @classmethod
+    def get_name(cls) -> str:
+        """
+        Get the command name.
+
+        Returns:
+            Command name: "benchmark-message-history"
+        """
+        return "benchmark-message-history"
+
+    @classmethod
+    def get_description(cls) -> str:
+        """
+        Get the command description.
+
+        Returns:
+            Description of what this command does
+        """
+        return "Benchmark message history add/scan throughput (memory vs. log)"
+
+    @classmethod
+    def add_args(cls, parser: argparse.ArgumentParser) -> None:
+        """
+        Add command-line arguments to the argument parser.
+
+        Args:
+            parser: Argument parser to add arguments to
+        """
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=100000,
+            help="Number of messages to add (default: 100000)",
+        )
+        parser.add_argument(
+            "--dir",
+            type=str,
+            default=None,
+            help="Empty directory for the log (default: a temporary directory)",
+        )
+        parser.add_argument(
+            "--message-size",
+            type=int,
+            default=200,
+            help="Message length in characters (default: 200)",
+        )
+        parser.add_argument(
+            "--fsync-batch",
+            type=int,
+            default=256,
+            help="Records per fsync (default: 256)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="Optional path to write results as JSON",
+        )
+
+    def init(self) -> None:
+        """
+        Initialize the benchmark command.
+
+        Raises:
+            ValueError: If --dir exists and is not empty
+        """
+        self._temp_dir: Optional[str] = None
+        if self.args.dir:
+            directory = Path(self.args.dir)
+            if directory.exists() and any(directory.iterdir()):
+                raise ValueError(f"--dir must be empty: {directory}")
+            self.directory = str(directory)
+        else:
+            self._temp_dir = tempfile.mkdtemp(prefix="message-history-")
+            self.directory = self._temp_dir
+
+    def run(self) -> None:
+        """
+        Run the benchmark and print a results table.
+        """
+        results = run_message_history_benchmark(
+            self.directory,
+            self.args.count,
+            "x" * self.args.message_size,
+            self.args.fsync_batch,
+        )
+        print(format_message_history_results_table(results))
+
+        if self.args.output:
+            output_path = Path(self.args.output)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(json.dumps([asdict(r) for r in results], indent=2))
+            logger.info(f"Results written to {output_path}")
+
+    def cleanup(self) -> None:
+        """
+        Clean up the benchmark command.
+
+        Removes the temporary log directory if one was created.
+        """
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
@@ -0,0 +1,272 @@
+"""
+Benchmark TTS command - Synthesis requests/s vs. concurrent clients.
+
+Usage:
+    poetry run python -m essence benchmark-tts [--address tts:50053] [--concurrency 1,2,4,8]
+
+Sends Synthesize requests to the TTS gRPC service from N concurrent clients and
+reports requests/s and latency per concurrency level. Without --address, an
+in-process TTS server backed by EspeakTtsStrategy is started on a free port so
+the synthesis engine itself can be measured without deploying the service.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import grpc
+
+try:
+    from june_grpc_api.shim.tts import TextToSpeechClient
+
+    GRPC_API_AVAILABLE = True
+except ImportError:
+    GRPC_API_AVAILABLE = False
+    TextToSpeechClient = None
+
+from essence.command import Command
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEXT = "Hello, this is a short sentence used to benchmark speech synthesis."
+
+
+@dataclass
+class TtsConcurrencyResult:
+    """Synthesis throughput at one concurrency level."""
+
+    concurrency: int
+    requests: int
+    failed_requests: int
+    wall_time_seconds: float
+    requests_per_second: float
+    average_latency_seconds: float
+    p95_latency_seconds: float
+    audio_bytes: int
+
+
+async def run_tts_concurrency_level(
+    client: "TextToSpeechClient",
+    text: str,
+    concurrency: int,
+    requests_per_client: int,
+) -> TtsConcurrencyResult:
+    """Run `concurrency` clients, each issuing `requests_per_client` Synthesize calls.
+
+    Args:
+        client: TTS client bound to the service channel
+        text: Text to synthesize
+        concurrency: Number of concurrent clients
+        requests_per_client: Sequential requests per client
+
+    Returns:
+        Throughput and latency for this concurrency level
+    """
+    latencies: List[float] = []
+    audio_bytes = 0
+    failed = 0
+
+    async def worker() -> None:
+        nonlocal audio_bytes, failed
+        for _ in range(requests_per_client):
+            start = time.time()
+            try:
+                audio = await client.synthesize(text)
+                latencies.append(time.time() - start)
+                audio_bytes += len(audio)
+            except Exception as e:
+                logger.error(f"Request failed: {e}")
+                failed += 1
+
+    start_time = time.time()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    wall_time = time.time() - start_time
+
+    latencies.sort()
+    return TtsConcurrencyResult(
+        concurrency=concurrency,
+        requests=concurrency * requests_per_client,
+        failed_requests=failed,
+        wall_time_seconds=wall_time,
+        requests_per_second=len(latencies) / wall_time if wall_time > 0 else 0.0,
+        average_latency_seconds=statistics.mean(latencies) if latencies else 0.0,
+        p95_latency_seconds=latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+        audio_bytes=audio_bytes,
+    )
+
+
+def format_tts_results_table(results: List[TtsConcurrencyResult]) -> str:
+    """Render results as a plain-text table."""
+    lines = [
+        f"{'concurrency':>11} {'requests':>8} {'failed':>6} {'wall s':>8} "
+        f"{'req/s':>8} {'avg lat s':>9} {'p95 lat s':>9}",
+    ]
+    for r in results:
+        lines.append(
+            f"{r.concurrency:>11} {r.requests:>8} {r.failed_requests:>6} "
+            f"{r.wall_time_seconds:>8.2f} {r.requests_per_second:>8.1f} "
+            f"{r.average_latency_seconds:>9.3f} {r.p95_latency_seconds:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+class BenchmarkTtsCommand(Command):
+    """
+    Command for measuring TTS synthesis requests/s against concurrency.
+
+    Targets a running TTS service (--address) or an in-process server using the
+    espeak engine, sweeps the configured concurrency levels and prints a table.
+    """
+
+    @classmethod
+    def get_name(cls) -> str:
+        """
+        Get the command name.
+
+        Returns:
+            Command name: "benchmark-tts"
+        """
+        return "benchmark-tts"
+
+    @classmethod
+    def get_description(cls) -> str:
+        """
+        Get the command description.
+
+        Returns:
+            Description of what this command does
+        """
+        return "Benchmark TTS synthesis requests/s vs. concurrent clients"
+
+    @classmethod
+    def add_args(cls, parser: argparse.ArgumentParser) -> None:
+        """
+        Add command-line arguments to the argument parser.
+
+        Args:
+            parser: Argument parser to add arguments to
+        """
+        parser.add_argument(
+            "--address",
+            type=str,
+            default=None,
+            help="TTS gRPC address (default: start an in-process espeak server)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=str,
+            default="1,2,4,8",
+            help="Comma-separated concurrency levels (default: 1,2,4,8)",
+        )
+        parser.add_argument(
+            "--requests-per-client",
+            type=int,
+            default=10,
+            help="Requests issued by each client (default: 10)",
+        )
+        parser.add_argument(
+            "--text",
+            type=str,
+            default=DEFAULT_TEXT,
+            help="Text to synthesize",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=None,
+            help="Synthesis worker pool size for the in-process server "
+            "(default: TTS_MAX_WORKERS)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="Optional path to write results as JSON",
+        )
+
+    def init(self) -> None:
+        """
+        Initialize the benchmark command.
+
+        Raises:
+            RuntimeError: If the june_grpc_api package is not available
+        """
+        if not GRPC_API_AVAILABLE:
+            error_msg = "june_grpc_api package not available"
+            logger.error(error_msg)
+            raise RuntimeError(
+                f"{error_msg}\nInstall with: pip install -e packages/june-grpc-api"
+            )
+        self.concurrency_levels = [
+            int(c) for c in self.args.concurrency.split(",") if c
+        ]
+
+    async def _start_local_server(self) -> "tuple[grpc.aio.Server, str]":
+        from inference_core.servers.tts_server import _TtsServicer
+        from inference_core.tts.espeak_strategy import EspeakTtsStrategy
+        from june_grpc_api.generated import tts_pb2_grpc
+
+        strategy = EspeakTtsStrategy()
+        strategy.warmup()
+        server = grpc.aio.server()
+        tts_pb2_grpc.add_TextToSpeechServicer_to_server(
+            _TtsServicer(strategy, max_workers=self.args.max_workers), server
+        )
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        return server, f"127.0.0.1:{port}"
+
+    async def _run_async(self) -> List[TtsConcurrencyResult]:
+        server: Optional[grpc.aio.Server] = None
+        address = self.args.address
+        if address is None:
+            server, address = await self._start_local_server()
+            logger.info(f"Started in-process espeak TTS server on {address}")
+
+        results: List[TtsConcurrencyResult] = []
+        try:
+            async with grpc.aio.insecure_channel(address) as channel:
+                client = TextToSpeechClient(channel)
+                # Warm the connection and the engine before measuring
+                await client.synthesize(self.args.text)
+                for concurrency in self.concurrency_levels:
+                    result = await run_tts_concurrency_level(
+                        client,
+                        self.args.text,
+                        concurrency,
+                        self.args.requests_per_client,
+                    )
+                    logger.info(
+                        f"{concurrency} clients -> {result.requests_per_second:.1f} req/s"
+                    )
+                    results.append(result)
+        finally:
+            if server is not None:
+                await server.stop(grace=None)
+        return results
+
+    def run(self) -> None:
+        """
+        Run the concurrency sweep and print a results table.
+        """
+        results = asyncio.run(self._run_async())
+        print(format_tts_results_table(results))
+
+        if self.args.output:
+            output_path = Path(self.args.output)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(json.dumps([asdict(r) for r in results], indent=2))
+            logger.info(f"Results written to {output_path}")
+
+    def cleanup(self) -> None:
+        """
+        Clean up the benchmark command.
+
+        The in-process server and channel are closed at the end of run().
+        """
+        pass
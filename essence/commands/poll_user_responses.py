@@ -3,13 +3,22 @@ Command to poll for user responses to agent messages.
 
 This command checks USER_REQUESTS.md for pending requests that are waiting
 for user responses, and can be used by the looping agent for periodic polling.
+
+USER_REQUESTS.md only grows at its end, so polls are incremental: a tail
+reader remembers the byte offset (and inode) it parsed up to and only parses
+what was appended since, keeping an index of agent messages still waiting for
+a response. Rotation, truncation and edits before the offset are detected and
+trigger a full re-parse.
 """
 import argparse
 import logging
+import os
+import re
 import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from essence.chat.user_requests_sync import update_message_status
 from essence.command import Command
@@ -23,6 +32,229 @@ USER_REQUESTS_FILE = Path(__file__).parent.parent.parent / "USER_REQUESTS.md"
 # Default timeout for waiting for user responses (in hours)
 DEFAULT_RESPONSE_TIMEOUT_HOURS = 24
 
+# Agent message types that wait for user responses
+AGENT_WAITING_TYPES = ["Clarification", "Help Request", "Feedback Request"]
+
+# Pattern to match all entries (requests and responses)
+_ENTRY_PATTERN = re.compile(r"## \[([^\]]+)\] (.+?)(?=\n## |\Z)", re.DOTALL)
+# Bytes before the parse offset that must be unchanged for a tail parse
+_FINGERPRINT_BYTES = 64
+
+# Entries are ordered by timestamp, then by position in the file
+EntryOrder = Tuple[str, int]
+
+
+@dataclass
+class _Entry:
+    """Entry of USER_REQUESTS.md and its byte offset in the file."""
+
+    offset: int
+    request: UserRequest
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.request.user_id, self.request.chat_id)
+
+    @property
+    def order(self) -> EntryOrder:
+        return (self.request.timestamp, self.offset)
+
+
+def _parse_entry(timestamp: str, entry_text: str) -> Optional[UserRequest]:
+    """Parse the fields of one entry; None if it has no user or content."""
+    message_type = entry_text.split("\n")[0].strip()
+
+    # Extract fields
+    user_id = None
+    chat_id = None
+    platform = None
+    content_text = None
+    message_id = None
+    status = "Pending"
+
+    for line in entry_text.split("\n"):
+        line = line.strip()
+        if line.startswith("- **User:**"):
+            user_match = re.search(r"\(user_id: (\d+)\)", line)
+            if user_match:
+                user_id = user_match.group(1)
+        elif line.startswith("- **Platform:**"):
+            platform = line.split(":**", 1)[1].strip()
+        elif line.startswith("- **Type:**"):
+            message_type = line.split(":**", 1)[1].strip()
+        elif line.startswith("- **Content:**"):
+            content_text = line.split(":**", 1)[1].strip()
+        elif line.startswith("- **Message ID:**"):
+            message_id = line.split(":**", 1)[1].strip()
+        elif line.startswith("- **Chat ID:**"):
+            chat_id = line.split(":**", 1)[1].strip()
+        elif line.startswith("- **Status:**"):
+            status = line.split(":**", 1)[1].strip()
+
+    if not (user_id and content_text):
+        return None
+    return UserRequest(
+        timestamp=timestamp,
+        user_id=str(user_id),
+        chat_id=str(chat_id) if chat_id else "",
+        platform=platform or "unknown",
+        message_type=message_type,
+        content=content_text,
+        message_id=message_id,
+        status=status,
+    )
+
+
+class UserRequestsTailReader:
+    """
+    Incremental parser of USER_REQUESTS.md.
+
+    The parse offset is the start of the last entry seen: that entry may
+    still be incomplete, so it is parsed again on the next poll together with
+    whatever was appended after it. Entries are identified by their byte
+    offset, so re-parsing one replaces its previous version in the index.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize reader.
+
+        Args:
+            path: Path to USER_REQUESTS.md
+        """
+        self.path = Path(path)
+        self.full_parses = 0
+        self.bytes_parsed = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._fingerprint = b""
+        self._last_entry: Optional[_Entry] = None
+        # (user_id, chat_id) -> {offset: agent message waiting for a response}
+        self.waiting: Dict[Tuple[str, str], Dict[int, _Entry]] = {}
+        # (user_id, chat_id) -> order of the latest pending user request
+        self._latest_request: Dict[Tuple[str, str], EntryOrder] = {}
+
+    def _read_fingerprint(self, f, offset: int) -> bytes:
+        start = max(0, offset - _FINGERPRINT_BYTES)
+        f.seek(start)
+        return f.read(offset - start)
+
+    def poll(self) -> None:
+        """Parse entries appended since the last poll."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return
+
+        with open(self.path, "rb") as f:
+            if (
+                stat.st_ino != self._inode
+                or stat.st_size < self._offset
+                or self._read_fingerprint(f, self._offset) != self._fingerprint
+            ):
+                if self._inode is not None:
+                    logger.info(f"{self.path} was rotated or rewritten, re-parsing")
+                self._reset()
+                self._inode = stat.st_ino
+                self.full_parses += 1
+            f.seek(self._offset)
+            data = f.read()
+
+        self.bytes_parsed += len(data)
+        # surrogateescape round-trips invalid bytes, keeping offsets exact
+        text = data.decode("utf-8", errors="surrogateescape")
+        if self._last_entry is not None:
+            self._remove(self._last_entry)  # Parsed again below
+            self._last_entry = None
+
+        # Byte offset of the current match (text offsets are characters)
+        position, offset = 0, self._offset
+        for match in _ENTRY_PATTERN.finditer(text):
+            offset += len(
+                text[position : match.start()].encode("utf-8", errors="surrogateescape")
+            )
+            position = match.start()
+            request = _parse_entry(match.group(1), match.group(2))
+            entry = _Entry(offset, request) if request is not None else None
+            if entry is not None:
+                self._add(entry)
+            self._last_entry = entry
+
+        self._offset = offset
+        with open(self.path, "rb") as f:
+            self._fingerprint = self._read_fingerprint(f, self._offset)
+
+    def _add(self, entry: _Entry) -> None:
+        request = entry.request
+        if request.status != "Pending":
+            return
+        if request.message_type in AGENT_WAITING_TYPES:
+            self.waiting.setdefault(entry.key, {})[entry.offset] = entry
+        elif request.message_type == "Request":
+            latest = self._latest_request.get(entry.key)
+            if latest is None or entry.order > latest:
+                self._latest_request[entry.key] = entry.order
+
+    def _remove(self, entry: _Entry) -> None:
+        waiting = self.waiting.get(entry.key)
+        if waiting is not None:
+            waiting.pop(entry.offset, None)
+            if not waiting:
+                del self.waiting[entry.key]
+
+    def has_response(self, entry: _Entry) -> bool:
+        """Whether a pending user request follows an agent message."""
+        latest = self._latest_request.get(entry.key)
+        return latest is not None and latest > entry.order
+
+    def set_status(self, entry: _Entry, new_status: str) -> bool:
+        """
+        Update an entry's status in the file and in the index.
+
+        update_message_status rewrites the status line in place, which moves
+        the parse offset by the change in length; the offset is adjusted so
+        the next poll stays incremental.
+
+        Returns:
+            True if the file was updated
+        """
+        if not update_message_status(
+            user_id=entry.request.user_id,
+            message_id=entry.request.message_id,
+            timestamp=entry.request.timestamp,
+            new_status=new_status,
+        ):
+            return False
+        self._remove(entry)
+        if entry.offset < self._offset:
+            self._offset += len(new_status.encode("utf-8")) - len(
+                entry.request.status.encode("utf-8")
+            )
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                if f.read(4) == b"## [":
+                    self._fingerprint = self._read_fingerprint(f, self._offset)
+                # Otherwise a different entry was updated: the fingerprint no
+                # longer matches and the next poll re-parses the file
+        if self._last_entry is entry:
+            self._last_entry = None
+        return True
+
+
+# Tail reader kept between polls (per USER_REQUESTS.md path)
+_reader: Optional[UserRequestsTailReader] = None
+
+
+def _get_reader(path: Path) -> UserRequestsTailReader:
+    global _reader
+    if _reader is None or _reader.path != Path(path):
+        _reader = UserRequestsTailReader(path)
+    return _reader
+
 
 def check_for_user_responses(
     timeout_hours: float = DEFAULT_RESPONSE_TIMEOUT_HOURS,
@@ -33,6 +265,7 @@ def check_for_user_responses(
     This function looks for agent messages (clarification, help_request, etc.)
     that are waiting for user responses. It checks if there are newer user
     requests after the agent message, indicating the user has responded.
+    Only entries appended since the previous call are parsed.
 
     Args:
         timeout_hours: Hours to wait before marking a request as timed out
@@ -45,160 +278,43 @@ def check_for_user_responses(
     if not USER_REQUESTS_FILE.exists():
         return [], []
 
-    # Parse all entries from USER_REQUESTS.md
-    # We need to parse ALL entries (not just requests) to find agent messages
-    import re
-
     from essence.chat.user_requests_sync import USER_REQUESTS_FILE as SYNC_FILE
 
-    content = SYNC_FILE.read_text(encoding="utf-8")
-    all_entries = []
-
-    # Pattern to match all entries (requests and responses)
-    pattern = r"## \[([^\]]+)\] (.+?)(?=\n## |\Z)"
-    matches = re.finditer(pattern, content, re.DOTALL)
-
-    for match in matches:
-        timestamp = match.group(1)
-        entry_text = match.group(2)
-        message_type = entry_text.split("\n")[0].strip()
-
-        # Extract fields
-        user_id = None
-        chat_id = None
-        platform = None
-        content_text = None
-        message_id = None
-        status = "Pending"
-
-        for line in entry_text.split("\n"):
-            line = line.strip()
-            if line.startswith("- **User:**"):
-                user_match = re.search(r"\(user_id: (\d+)\)", line)
-                if user_match:
-                    user_id = user_match.group(1)
-            elif line.startswith("- **Platform:**"):
-                platform = line.split(":", 1)[1].strip()
-            elif line.startswith("- **Type:**"):
-                message_type = line.split(":", 1)[1].strip()
-            elif line.startswith("- **Content:**"):
-                content_text = line.split(":", 1)[1].strip()
-            elif line.startswith("- **Message ID:**"):
-                message_id = line.split(":", 1)[1].strip()
-            elif line.startswith("- **Chat ID:**"):
-                chat_id = line.split(":", 1)[1].strip()
-            elif line.startswith("- **Status:**"):
-                status = line.split(":", 1)[1].strip()
-
-        if user_id and content_text:
-            all_entries.append(
-                {
-                    "timestamp": timestamp,
-                    "user_id": str(user_id),
-                    "chat_id": str(chat_id) if chat_id else "",
-                    "platform": platform or "unknown",
-                    "message_type": message_type,
-                    "content": content_text,
-                    "message_id": message_id,
-                    "status": status,
-                }
-            )
-
-    # Group entries by user_id and chat_id
-    user_entries: dict[tuple[str, str], List[dict]] = {}
-    for entry in all_entries:
-        key = (str(entry["user_id"]), str(entry["chat_id"]))
-        if key not in user_entries:
-            user_entries[key] = []
-        user_entries[key].append(entry)
+    reader = _get_reader(SYNC_FILE)
+    reader.poll()
 
     new_responses = []
     timed_out_requests = []
     timeout_threshold = datetime.now() - timedelta(hours=timeout_hours)
 
-    # Agent message types that wait for user responses
-    agent_waiting_types = ["Clarification", "Help Request", "Feedback Request"]
-
-    # Check each user's entries for responses
-    for (user_id, chat_id), entries in user_entries.items():
-        # Sort by timestamp
-        entries.sort(key=lambda e: e["timestamp"])
-
-        # Find agent messages waiting for responses
-        for i, entry in enumerate(entries):
-            if (
-                entry["status"] == "Pending"
-                and entry["message_type"] in agent_waiting_types
-            ):
-                # This is an agent message waiting for user response
-                # Check if there's a new user request after this agent message
-                has_response = False
-                for later_entry in entries[i + 1 :]:
-                    if (
-                        later_entry["user_id"] == user_id
-                        and later_entry["chat_id"] == chat_id
-                        and later_entry["message_type"] == "Request"
-                        and later_entry["status"] == "Pending"
-                    ):
-                        # Found a new user request (user responded to agent)
-                        has_response = True
-                        # Convert to UserRequest for return
-                        user_req = UserRequest(
-                            timestamp=entry["timestamp"],
-                            user_id=entry["user_id"],
-                            chat_id=entry["chat_id"],
-                            platform=entry["platform"],
-                            message_type=entry["message_type"],
-                            content=entry["content"],
-                            message_id=entry["message_id"],
-                            status=entry["status"],
-                        )
-                        new_responses.append(user_req)
-                        # Update status
-                        try:
-                            update_message_status(
-                                user_id=entry["user_id"],
-                                message_id=entry["message_id"],
-                                timestamp=entry["timestamp"],
-                                new_status="Responded",
-                            )
-                        except Exception as e:
-                            logger.warning(f"Failed to update message status: {e}")
-                        break
-
-                # Check for timeout if no response found
-                if not has_response:
-                    try:
-                        request_time = datetime.strptime(
-                            entry["timestamp"], "%Y-%m-%d %H:%M:%S"
-                        )
-                        if request_time < timeout_threshold:
-                            # Convert to UserRequest for return
-                            user_req = UserRequest(
-                                timestamp=entry["timestamp"],
-                                user_id=entry["user_id"],
-                                chat_id=entry["chat_id"],
-                                platform=entry["platform"],
-                                message_type=entry["message_type"],
-                                content=entry["content"],
-                                message_id=entry["message_id"],
-                                status=entry["status"],
-                            )
-                            timed_out_requests.append(user_req)
-                            # Update status
-                            try:
-                                update_message_status(
-                                    user_id=entry["user_id"],
-                                    message_id=entry["message_id"],
-                                    timestamp=entry["timestamp"],
-                                    new_status="Timeout",
-                                )
-                            except Exception as e:
-                                logger.warning(f"Failed to update timeout status: {e}")
-                    except ValueError:
-                        logger.warning(
-                            f"Invalid timestamp format: {entry['timestamp']}"
-                        )
+    waiting = sorted(
+        (entry for entries in reader.waiting.values() for entry in entries.values()),
+        key=lambda entry: entry.order,
+    )
+    for entry in waiting:
+        if reader.has_response(entry):
+            # Found a new user request (user responded to agent)
+            new_responses.append(entry.request)
+            try:
+                reader.set_status(entry, "Responded")
+            except Exception as e:
+                logger.warning(f"Failed to update message status: {e}")
+            continue
+
+        # Check for timeout if no response found
+        try:
+            request_time = datetime.strptime(
+                entry.request.timestamp, "%Y-%m-%d %H:%M:%S"
+            )
+        except ValueError:
+            logger.warning(f"Invalid timestamp format: {entry.request.timestamp}")
+            continue
+        if request_time < timeout_threshold:
+            timed_out_requests.append(entry.request)
+            try:
+                reader.set_status(entry, "Timeout")
+            except Exception as e:
+                logger.warning(f"Failed to update timeout status: {e}")
 
     return new_responses, timed_out_requests
 
@@ -225,8 +341,27 @@ class PollUserResponsesCommand(Command):
             self.args, "timeout_hours", DEFAULT_RESPONSE_TIMEOUT_HOURS
         )
 
-        new_responses, timed_out = check_for_user_responses(timeout_hours=timeout_hours)
+        # With an interval, keep polling in-process so each poll only parses
+        # what was appended since the previous one
+        interval = getattr(self.args, "interval", 0) or 0
 
+        while True:
+            new_responses, timed_out = check_for_user_responses(
+                timeout_hours=timeout_hours
+            )
+            if new_responses or timed_out or interval <= 0:
+                self._report(new_responses, timed_out, timeout_hours)
+            if interval <= 0:
+                return
+            time.sleep(interval)
+
+    def _report(
+        self,
+        new_responses: List[UserRequest],
+        timed_out: List[UserRequest],
+        timeout_hours: float,
+    ) -> None:
+        """Print responses and timeouts found by a poll."""
         if not new_responses and not timed_out:
             print("No new responses or timeouts found.")
             return
@@ -266,3 +401,9 @@ class PollUserResponsesCommand(Command):
             default=DEFAULT_RESPONSE_TIMEOUT_HOURS,
             help=f"Hours to wait before marking a request as timed out (default: {DEFAULT_RESPONSE_TIMEOUT_HOURS})",
         )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep polling every N seconds (default: 0, poll once)",
+        )
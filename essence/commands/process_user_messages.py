@@ -6,15 +6,13 @@ processes them, generates responses, sends via Message API, and marks tasks as c
 """
 import logging
 import os
-import re
-from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
 from essence.command import Command
+from essence.chat.user_messages_store import UserMessage, parse_user_messages_markdown
 from essence.chat.user_messages_sync import (
-    read_user_messages,
+    get_user_message_store,
     update_message_status,
 )
 
@@ -30,134 +28,62 @@ except ImportError:
     LLMClient = None
 
 
-@dataclass
-class UserMessage:
-    """Represents a message from USER_MESSAGES.md"""
-
-    timestamp: str
-    message_type: str
-    user_id: str
-    chat_id: str
-    platform: str
-    content: str
-    message_id: Optional[str] = None
-    username: Optional[str] = None
-    status: str = "NEW"
-    raw_entry: str = ""  # Full markdown entry for status updates
-
-
 def parse_user_messages_file(file_path: Path) -> List[UserMessage]:
     """
     Parse USER_MESSAGES.md and extract all messages.
 
+    USER_MESSAGES.md is an export of the queue store, so for the default file
+    the messages (with their current status) are read from the store instead.
+
     Args:
         file_path: Path to USER_MESSAGES.md
 
     Returns:
         List of UserMessage objects
     """
-    messages = []
+    from essence.chat.user_messages_sync import USER_MESSAGES_FILE
+
+    if Path(file_path) == USER_MESSAGES_FILE:
+        return list(get_user_message_store().iter_messages())
 
     if not file_path.exists():
         logger.warning(f"USER_MESSAGES.md not found at {file_path}")
-        return messages
-
-    content = read_user_messages()
-    if not content:
-        return messages
-
-    # Split by message headers (## [TIMESTAMP] Message Type)
-    # Pattern: ## [YYYY-MM-DD HH:MM:SS] MessageType
-    message_pattern = r"^## \[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (.+)$"
-
-    entries = re.split(message_pattern, content, flags=re.MULTILINE)
-
-    # Process entries (pattern returns groups + text between)
-    # entries[0] = text before first match
-    # entries[1] = timestamp, entries[2] = message_type, entries[3] = text until next match
-    # entries[4] = next timestamp, etc.
-    i = 1  # Start after initial text
-    while i < len(entries) - 2:
-        timestamp = entries[i].strip()
-        message_type = entries[i + 1].strip()
-        entry_text = entries[i + 2] if i + 2 < len(entries) else ""
-
-        # Parse entry fields
-        user_id = None
-        chat_id = None
-        platform = None
-        content = None
-        message_id = None
-        username = None
-        status = "NEW"
-
-        # Extract fields from entry text
-        # Username is optional (format: "- **User:** @username (user_id: 123)" or "- **User:** (user_id: 123)")
-        user_match = re.search(r"- \*\*User:\*\* (?:@?(\S+)\s+)?\(user_id: (\d+)\)", entry_text)
-        if user_match:
-            username = user_match.group(1).strip().replace("@", "") if user_match.group(1) else None
-            user_id = user_match.group(2).strip()
-
-        platform_match = re.search(r"- \*\*Platform:\*\* (.+)", entry_text)
-        if platform_match:
-            platform = platform_match.group(1).strip()
-
-        content_match = re.search(r"- \*\*Content:\*\* (.+?)(?:\n- \*\*|$)", entry_text, re.DOTALL)
-        if content_match:
-            content = content_match.group(1).strip()
-
-        message_id_match = re.search(r"- \*\*Message ID:\*\* (.+)", entry_text)
-        if message_id_match:
-            message_id = message_id_match.group(1).strip()
-
-        chat_id_match = re.search(r"- \*\*Chat ID:\*\* (.+)", entry_text)
-        if chat_id_match:
-            chat_id = chat_id_match.group(1).strip()
-
-        status_match = re.search(r"- \*\*Status:\*\* (.+)", entry_text)
-        if status_match:
-            status = status_match.group(1).strip()
-
-        if user_id and content:
-            messages.append(
-                UserMessage(
-                    timestamp=timestamp,
-                    message_type=message_type,
-                    user_id=user_id,
-                    chat_id=chat_id or "",
-                    platform=platform or "",
-                    content=content,
-                    message_id=message_id,
-                    username=username,
-                    status=status,
-                    raw_entry=entry_text,
-                )
-            )
-
-        i += 3  # Move to next entry
+        return []
 
-    return messages
+    return parse_user_messages_markdown(file_path.read_text(encoding="utf-8"))
 
 
-def get_new_messages(file_path: Optional[Path] = None) -> List[UserMessage]:
+def get_new_messages(
+    file_path: Optional[Path] = None, after_id: int = 0, limit: Optional[int] = None
+) -> List[UserMessage]:
     """
-    Get all NEW messages from USER_MESSAGES.md.
+    Get NEW messages from the queue store.
+
+    Uses the store's status index, so the cost does not grow with the number
+    of messages already processed.
 
     Args:
-        file_path: Optional path to USER_MESSAGES.md (defaults to /var/data/USER_MESSAGES.md)
+        file_path: Optional path to a USER_MESSAGES.md export to parse instead
+            of the store
+        after_id: Cursor; only messages with a greater ID (the ID of the last
+            message returned by the previous call)
+        limit: Maximum number of messages
 
     Returns:
-        List of UserMessage objects with status "NEW"
+        List of UserMessage objects with status "NEW", oldest first
     """
     from essence.chat.user_messages_sync import USER_MESSAGES_FILE
 
-    if file_path is None:
-        file_path = USER_MESSAGES_FILE
-
-    all_messages = parse_user_messages_file(file_path)
-    new_messages = [msg for msg in all_messages if msg.status == "NEW"]
+    if file_path is not None and Path(file_path) != USER_MESSAGES_FILE:
+        new_messages = [
+            msg for msg in parse_user_messages_file(file_path) if msg.status == "NEW"
+        ]
+        return new_messages[:limit] if limit else new_messages
 
-    logger.info(f"Found {len(new_messages)} NEW messages out of {len(all_messages)} total")
+    new_messages = get_user_message_store().fetch_by_status(
+        "NEW", after_id=after_id, limit=limit
+    )
+    logger.info(f"Found {len(new_messages)} NEW messages")
     return new_messages
 
 
@@ -10,6 +10,7 @@ Endpoints:
 - POST /messages - Send a new message
 - PUT /messages/{message_id} - Edit/update a message
 - PATCH /messages/{message_id} - Partial update (append/edit)
+- GET /conversations/export - Stream a conversation export (JSON Lines/CSV)
 """
 import logging
 import os
@@ -19,7 +20,8 @@ from typing import Any, Dict, List, Optional
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from essence.chat.agent_communication import (
@@ -27,7 +29,7 @@ from essence.chat.agent_communication import (
     edit_message_to_user,
     send_message_to_user,
 )
-from essence.chat.message_history import get_message_history
+from essence.chat.message_history import MessageHistoryEntry, get_message_history
 
 # Setup logging
 logging.basicConfig(
@@ -94,6 +96,7 @@ class MessageHistoryItem(BaseModel):
     raw_text: Optional[str] = None
     formatted_text: Optional[str] = None
     rendering_metadata: Optional[Dict[str, Any]] = None
+    seq: Optional[int] = None
 
 
 class MessageHistoryResponse(BaseModel):
@@ -103,6 +106,53 @@ class MessageHistoryResponse(BaseModel):
     total: int
     limit: Optional[int] = None
     offset: Optional[int] = None
+    next_after_seq: Optional[int] = None  # Cursor for the next page (after_seq)
+    next_before_seq: Optional[int] = None  # Cursor for the next page (before_seq)
+    last_seq: Optional[int] = None  # Newest seq in the history
+
+
+def _to_history_item(msg: MessageHistoryEntry) -> MessageHistoryItem:
+    """Convert a history entry to its response model."""
+    return MessageHistoryItem(
+        platform=msg.platform,
+        user_id=msg.user_id,
+        chat_id=msg.chat_id,
+        message_content=msg.message_content,
+        message_type=msg.message_type,
+        message_id=str(msg.message_id) if msg.message_id is not None else None,
+        timestamp=msg.timestamp.isoformat() if msg.timestamp else None,
+        raw_text=msg.raw_text,
+        formatted_text=msg.formatted_text,
+        rendering_metadata=msg.rendering_metadata,
+        seq=msg.seq,
+    )
+
+
+def _find_message(
+    message_id: str, platform: Optional[str] = None, user_id: Optional[str] = None
+) -> MessageHistoryEntry:
+    """Look up a message by platform message ID via the history index.
+
+    Raises:
+        HTTPException: 404 if no stored message matches
+    """
+    msg = get_message_history().get_by_message_id(
+        message_id, platform=platform, user_id=user_id
+    )
+    if msg is None:
+        raise HTTPException(status_code=404, detail=f"Message {message_id} not found")
+    return msg
+
+
+@app.on_event("shutdown")
+def close_database_pool():
+    """Close pooled connections to the conversations database."""
+    try:
+        from essence.chat.storage.conversation import close_db_pool
+    except ImportError:
+        # psycopg2 is not installed, so the pool was never opened
+        return
+    close_db_pool()
 
 
 @app.get("/health")
@@ -125,12 +175,21 @@ async def list_messages(
     message_type: Optional[str] = Query(None, description="Filter by message type"),
     limit: Optional[int] = Query(50, ge=1, le=1000, description="Maximum number of results"),
     offset: Optional[int] = Query(0, ge=0, description="Offset for pagination"),
+    after_seq: Optional[int] = Query(
+        None, ge=-1, description="Only messages after this seq, oldest first"
+    ),
+    before_seq: Optional[int] = Query(
+        None, ge=0, description="Only messages before this seq, newest first"
+    ),
 ):
     """
     List message history with optional filters.
 
     Supports filtering by platform, user_id, chat_id, and message_type.
-    Results are paginated using limit and offset.
+    Results are paginated with keyset cursors: pass next_after_seq back as
+    after_seq to poll for new messages (oldest first), or next_before_seq as
+    before_seq to page back through older ones (newest first). limit/offset
+    paging is still accepted.
     """
     try:
         history = get_message_history()
@@ -142,6 +201,8 @@ async def list_messages(
             chat_id=chat_id,
             message_type=message_type,
             limit=limit + offset if limit else None,  # Get more to handle offset
+            after_seq=after_seq,
+            before_seq=before_seq,
         )
 
         # Apply offset
@@ -153,38 +214,32 @@ async def list_messages(
             messages = messages[:limit]
 
         # Convert to response format (messages are MessageHistoryEntry objects, not dicts)
-        history_items = []
-        for msg in messages:
-            history_items.append(
-                MessageHistoryItem(
-                    platform=msg.platform,
-                    user_id=msg.user_id,
-                    chat_id=msg.chat_id,
-                    message_content=msg.message_content,
-                    message_type=msg.message_type,
-                    message_id=str(msg.message_id) if msg.message_id is not None else None,
-                    timestamp=msg.timestamp.isoformat() if msg.timestamp else None,
-                    raw_text=msg.raw_text,
-                    formatted_text=msg.formatted_text,
-                    rendering_metadata=msg.rendering_metadata,
-                )
-            )
+        history_items = [_to_history_item(msg) for msg in messages]
 
-        # Get total count (approximate, may be limited by history size)
-        total_messages = history.get_messages(
+        # Maintained per-filter count, no second pass over the history
+        total = history.count_messages(
             platform=platform,
             user_id=user_id,
             chat_id=chat_id,
             message_type=message_type,
-            limit=None,  # Get all for count
         )
-        total = len(total_messages)
+
+        next_after_seq = None
+        next_before_seq = None
+        if after_seq is not None:
+            # Keep the cursor when there is nothing new
+            next_after_seq = messages[-1].seq if messages else after_seq
+        elif limit and len(messages) == limit:
+            next_before_seq = messages[-1].seq
 
         return MessageHistoryResponse(
             messages=history_items,
             total=total,
             limit=limit,
             offset=offset,
+            next_after_seq=next_after_seq,
+            next_before_seq=next_before_seq,
+            last_seq=history.last_seq,
         )
 
     except Exception as e:
@@ -204,41 +259,8 @@ async def get_message(
     Requires message_id. Optionally filter by platform and user_id to narrow search.
     """
     try:
-        history = get_message_history()
-
-        # Get messages with filters (get_messages doesn't support message_id directly)
-        messages = history.get_messages(
-            platform=platform,
-            user_id=user_id,
-            limit=None,  # Get all matching, then filter by message_id
-        )
-
-        # Find message with matching ID
-        msg = None
-        for entry in messages:
-            # Handle both string and None message_id
-            entry_id = str(entry.message_id) if entry.message_id is not None else None
-            if entry_id == str(message_id):
-                msg = entry
-                break
-
-        if not msg:
-            raise HTTPException(
-                status_code=404, detail=f"Message {message_id} not found"
-            )
-
-        return MessageHistoryItem(
-            platform=msg.platform,
-            user_id=msg.user_id,
-            chat_id=msg.chat_id,
-            message_content=msg.message_content,
-            message_type=msg.message_type,
-            message_id=str(msg.message_id) if msg.message_id is not None else None,
-            timestamp=msg.timestamp.isoformat() if msg.timestamp else None,
-            raw_text=msg.raw_text,
-            formatted_text=msg.formatted_text,
-            rendering_metadata=msg.rendering_metadata,
-        )
+        msg = _find_message(message_id, platform=platform, user_id=user_id)
+        return _to_history_item(msg)
 
     except HTTPException:
         raise
@@ -309,25 +331,7 @@ async def edit_message(
     """
     try:
         # We need user_id and chat_id to edit - get from message history
-        history = get_message_history()
-
-        # Get messages with filters (get_messages doesn't support message_id directly)
-        messages = history.get_messages(
-            platform=platform,
-            limit=None,  # Get all matching, then filter by message_id
-        )
-
-        # Find message with matching ID
-        msg = None
-        for entry in messages:
-            if str(entry.message_id) == str(message_id):
-                msg = entry
-                break
-
-        if not msg:
-            raise HTTPException(
-                status_code=404, detail=f"Message {message_id} not found"
-            )
+        msg = _find_message(message_id, platform=platform)
 
         user_id = msg.user_id
         chat_id = msg.chat_id
@@ -391,25 +395,7 @@ async def append_to_message(
     """
     try:
         # Get existing message
-        history = get_message_history()
-
-        # Get messages with filters (get_messages doesn't support message_id directly)
-        messages = history.get_messages(
-            platform=platform,
-            limit=None,  # Get all matching, then filter by message_id
-        )
-
-        # Find message with matching ID
-        msg = None
-        for entry in messages:
-            if str(entry.message_id) == str(message_id):
-                msg = entry
-                break
-
-        if not msg:
-            raise HTTPException(
-                status_code=404, detail=f"Message {message_id} not found"
-            )
+        msg = _find_message(message_id, platform=platform)
 
         existing_content = msg.message_content
         user_id = msg.user_id
@@ -473,6 +459,56 @@ async def append_to_message(
         )
 
 
+@app.get("/conversations/export")
+async def export_conversation(
+    user_id: str = Query(..., description="User ID"),
+    chat_id: Optional[str] = Query(
+        None, description="Chat ID (omit to export all of the user's conversations)"
+    ),
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$", description="jsonl or csv"),
+    start_date: Optional[datetime] = Query(
+        None, description="Only messages from this time"
+    ),
+    end_date: Optional[datetime] = Query(
+        None, description="Only messages up to this time"
+    ),
+):
+    """
+    Stream a conversation export from the conversations database.
+
+    Messages are read in batches through a server-side cursor and sent as
+    they are encoded, so large exports don't have to fit in memory.
+    """
+    from essence.chat.storage.conversation import (
+        EXPORT_MEDIA_TYPES,
+        ConversationStorage,
+    )
+
+    try:
+        chunks = await run_in_threadpool(
+            ConversationStorage.stream_conversation_export,
+            user_id=user_id,
+            chat_id=chat_id,
+            format=format,
+            start_date=start_date,
+            end_date=end_date,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error exporting conversation: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Error exporting conversation: {str(e)}"
+        )
+
+    filename = f"conversation_{user_id}_{chat_id or 'all'}.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 def main():
     """Run the message API service."""
     port = int(os.getenv("MESSAGE_API_PORT", "8082"))
@@ -87,3 +87,83 @@ SERVICE_HEALTH = Gauge(
     ["service"],
     registry=REGISTRY,
 )
+
+# Database Connection Pool Metrics
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Open database connections by state (in_use, idle)",
+    ["pool", "state"],
+    registry=REGISTRY,
+)
+
+DB_POOL_CONNECTIONS_OPENED_TOTAL = Counter(
+    "db_pool_connections_opened_total",
+    "Total database connections opened by the pool",
+    ["pool"],
+    registry=REGISTRY,
+)
+
+DB_POOL_CONNECTIONS_CLOSED_TOTAL = Counter(
+    "db_pool_connections_closed_total",
+    "Total database connections closed by the pool",
+    ["pool", "reason"],
+    registry=REGISTRY,
+)
+
+DB_POOL_ACQUIRE_DURATION_SECONDS = Histogram(
+    "db_pool_acquire_duration_seconds",
+    "Time to check a connection out of the pool in seconds",
+    ["pool"],
+    registry=REGISTRY,
+)
+
+DB_POOL_ACQUIRE_TIMEOUTS_TOTAL = Counter(
+    "db_pool_acquire_timeouts_total",
+    "Total pool checkouts that timed out waiting for a connection",
+    ["pool"],
+    registry=REGISTRY,
+)
+
+# Storage Cache Metrics
+STORAGE_CACHE_REQUESTS_TOTAL = Counter(
+    "storage_cache_requests_total",
+    "Storage cache lookups by result (hit, miss)",
+    ["cache", "result"],
+    registry=REGISTRY,
+)
+
+STORAGE_CACHE_EVICTIONS_TOTAL = Counter(
+    "storage_cache_evictions_total",
+    "Storage cache entries evicted to stay within the size limit",
+    ["cache"],
+    registry=REGISTRY,
+)
+
+STORAGE_CACHE_ENTRIES = Gauge(
+    "storage_cache_entries",
+    "Entries currently held in the storage cache",
+    ["cache"],
+    registry=REGISTRY,
+)
+
+# In-Memory Rate Limit Metrics
+RATE_LIMIT_TRACKED_KEYS = Gauge(
+    "rate_limit_tracked_keys",
+    "Keys (users) held by an in-memory rate limiter",
+    ["limiter"],
+    registry=REGISTRY,
+)
+
+RATE_LIMIT_STATE_BYTES = Gauge(
+    "rate_limit_state_bytes",
+    "Approximate memory held by an in-memory rate limiter",
+    ["limiter"],
+    registry=REGISTRY,
+)
+
+RATE_LIMIT_EVICTIONS_TOTAL = Counter(
+    "rate_limit_evictions_total",
+    "Keys dropped by an in-memory rate limiter (expired, capacity)",
+    ["limiter", "reason"],
+    registry=REGISTRY,
+)
@@ -1,7 +1,9 @@
 """
 Conversation storage for managing conversation data and metadata.
 
-Uses in-memory storage for MVP (PostgreSQL removed).
+Uses in-memory storage for MVP (PostgreSQL removed). Set
+CONVERSATION_DB_PATH to persist preferences, prompt templates and analytics in
+an embedded SQLite database instead (see embedded_storage).
 Provides methods to store and retrieve conversation information including
 language preferences and prompt templates.
 """
@@ -10,6 +12,7 @@ import io
 import json
 import logging
 import os
+import threading
 from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
@@ -27,6 +30,8 @@ except ImportError:
     RealDictCursor = None
     PSYCOPG2_AVAILABLE = False
 
+from essence.services.telegram.embedded_storage import EmbeddedConversationStore
+
 logger = logging.getLogger(__name__)
 
 # Default language preference
@@ -40,6 +45,45 @@ _in_memory_prompt_templates: Dict[
     tuple, Dict[str, Any]
 ] = {}  # (user_id, template_name) -> template dict
 
+# Embedded store, opened on first use when CONVERSATION_DB_PATH is set
+_store: Optional[EmbeddedConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> Optional[EmbeddedConversationStore]:
+    """
+    Get the embedded conversation store, if configured.
+
+    Returns:
+        EmbeddedConversationStore at CONVERSATION_DB_PATH, or None to use
+        in-memory storage
+    """
+    global _store
+    if _store is None:
+        db_path = os.getenv("CONVERSATION_DB_PATH")
+        if not db_path:
+            return None
+        with _store_lock:
+            if _store is None:
+                _store = EmbeddedConversationStore(
+                    db_path,
+                    batch_size=int(os.getenv("CONVERSATION_DB_BATCH_SIZE", "100")),
+                    flush_interval=float(
+                        os.getenv("CONVERSATION_DB_FLUSH_INTERVAL", "1.0")
+                    ),
+                )
+                logger.info(f"Using embedded conversation store at {db_path}")
+    return _store
+
+
+def close_conversation_store() -> None:
+    """Flush and close the embedded conversation store, if open."""
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
+
 
 def get_db_connection() -> None:
     """
@@ -74,8 +118,18 @@ class ConversationStorage:
         Returns:
             Language code (ISO 639-1), defaults to "en" if not set
         """
-        key = (str(user_id), str(chat_id))
-        metadata = _in_memory_storage.get(key, {})
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                metadata = store.get_metadata(user_id, chat_id)
+            except Exception as e:
+                logger.error(
+                    f"Error getting language preference for {user_id}/{chat_id}: {e}",
+                    exc_info=True,
+                )
+                return DEFAULT_LANGUAGE
+        else:
+            metadata = _in_memory_storage.get((str(user_id), str(chat_id)), {})
         language_preference = metadata.get("language_preference")
 
         if language_preference:
@@ -108,8 +162,21 @@ class ConversationStorage:
         # Normalize language code (lowercase)
         language_code = language_code.lower() if language_code else DEFAULT_LANGUAGE
 
-        key = (str(user_id), str(chat_id))
-        _in_memory_storage[key]["language_preference"] = language_code
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                store.update_metadata(
+                    user_id, chat_id, {"language_preference": language_code}
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error setting language preference for {user_id}/{chat_id}: {e}",
+                    exc_info=True,
+                )
+                return False
+        else:
+            key = (str(user_id), str(chat_id))
+            _in_memory_storage[key]["language_preference"] = language_code
 
         logger.info(f"Set language preference for {user_id}/{chat_id}: {language_code}")
         return True
@@ -128,8 +195,18 @@ class ConversationStorage:
         Returns:
             Dictionary with user preferences (name, favorite_color, etc.), empty dict if not set
         """
-        key = (str(user_id), str(chat_id))
-        metadata = _in_memory_storage.get(key, {})
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                metadata = store.get_metadata(user_id, chat_id)
+            except Exception as e:
+                logger.error(
+                    f"Error getting user preferences for {user_id}/{chat_id}: {e}",
+                    exc_info=True,
+                )
+                return {}
+        else:
+            metadata = _in_memory_storage.get((str(user_id), str(chat_id)), {})
 
         # Extract user preferences from metadata
         preferences = {
@@ -167,16 +244,28 @@ class ConversationStorage:
         Returns:
             True if preferences were set successfully, False otherwise
         """
-        key = (str(user_id), str(chat_id))
-
         # Update user preferences (only set provided values)
+        updates = {}
         if name is not None:
-            _in_memory_storage[key]["user_name"] = name.strip() if name else None
+            updates["user_name"] = name.strip() if name else None
         if favorite_color is not None:
-            _in_memory_storage[key]["favorite_color"] = (
+            updates["favorite_color"] = (
                 favorite_color.strip() if favorite_color else None
             )
 
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                store.update_metadata(user_id, chat_id, updates)
+            except Exception as e:
+                logger.error(
+                    f"Error setting user preferences for {user_id}/{chat_id}: {e}",
+                    exc_info=True,
+                )
+                return False
+        else:
+            _in_memory_storage[(str(user_id), str(chat_id))].update(updates)
+
         logger.info(
             f"Set user preferences for {user_id}/{chat_id}: name={name}, favorite_color={favorite_color}"
         )
@@ -187,16 +276,26 @@ class ConversationStorage:
         """
         Get analytics metrics for a specific conversation.
 
-        Uses in-memory storage (PostgreSQL removed for MVP).
-        For MVP, returns empty analytics.
+        Computed from recorded messages (see record_message) when the embedded
+        store is configured; empty with in-memory storage.
 
         Args:
             user_id: Telegram user ID
             chat_id: Telegram chat ID (maps to session_id in database)
 
         Returns:
-            Dictionary with analytics metrics (empty for MVP)
+            Dictionary with analytics metrics
         """
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                return store.get_conversation_analytics(user_id, chat_id)
+            except Exception as e:
+                logger.error(
+                    f"Error getting conversation analytics for {user_id}/{chat_id}: {e}",
+                    exc_info=True,
+                )
+
         # PostgreSQL not available for MVP - return empty analytics
         logger.debug(
             f"PostgreSQL not available - returning empty analytics for {user_id}/{chat_id}"
@@ -219,16 +318,23 @@ class ConversationStorage:
         """
         Get aggregated analytics across all conversations (dashboard view).
 
-        Uses in-memory storage (PostgreSQL removed for MVP).
-        For MVP, returns empty analytics.
+        Computed from recorded messages (see record_message) when the embedded
+        store is configured; empty with in-memory storage.
 
         Args:
             start_date: Optional start date filter
             end_date: Optional end date filter
 
         Returns:
-            Dictionary with aggregated metrics (empty for MVP)
+            Dictionary with aggregated metrics
         """
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                return store.get_dashboard_analytics(start_date, end_date)
+            except Exception as e:
+                logger.error(f"Error getting dashboard analytics: {e}", exc_info=True)
+
         # PostgreSQL not available for MVP - return empty analytics
         logger.debug(f"PostgreSQL not available - returning empty dashboard analytics")
         return {
@@ -240,6 +346,40 @@ class ConversationStorage:
             "active_users": 0,
         }
 
+    @staticmethod
+    def record_message(
+        user_id: str,
+        chat_id: str,
+        role: str,
+        content: str,
+        created_at: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Record a conversation message for analytics.
+
+        Messages are written in batches by the embedded store; with in-memory
+        storage they are not kept.
+
+        Args:
+            user_id: Telegram user ID
+            chat_id: Telegram chat ID
+            role: "user" or "assistant"
+            content: Message text
+            created_at: Message time (default: now)
+
+        Returns:
+            True if the message was recorded, False otherwise
+        """
+        store = get_conversation_store()
+        if store is None:
+            return False
+        try:
+            store.record_message(user_id, chat_id, role, content, created_at)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to record message for {user_id}/{chat_id}: {e}")
+            return False
+
     @staticmethod
     def generate_analytics_report(
         format: str = "json",
@@ -399,6 +539,21 @@ class ConversationStorage:
             logger.error("conversation_id requires user_id to be set")
             return None
 
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                template_id = store.create_template(
+                    name, template_text, user_id, conversation_id, description
+                )
+            except Exception as e:
+                logger.error(f"Error creating prompt template: {e}", exc_info=True)
+                return None
+            if template_id:
+                logger.info(
+                    f"Created prompt template: {template_id} (name={name}, user_id={user_id}, conversation_id={conversation_id})"
+                )
+            return template_id
+
         try:
             conn = get_db_connection()
             try:
@@ -453,6 +608,14 @@ class ConversationStorage:
         Returns:
             Template dictionary or None if not found
         """
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                return store.get_template(template_id)
+            except Exception as e:
+                logger.error(f"Error getting prompt template: {e}", exc_info=True)
+                return None
+
         try:
             conn = get_db_connection()
             try:
@@ -488,8 +651,7 @@ class ConversationStorage:
         """
         Get a user-specific prompt template.
 
-        Uses in-memory storage (PostgreSQL removed for MVP).
-        For MVP, returns None (no custom templates stored).
+        Returns None with in-memory storage (no custom templates stored).
 
         Args:
             user_id: User ID
@@ -498,6 +660,14 @@ class ConversationStorage:
         Returns:
             Template dictionary or None if not found
         """
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                return store.get_template_for_user(user_id, name)
+            except Exception as e:
+                logger.error(f"Error getting user prompt template: {e}", exc_info=True)
+                return None
+
         # For MVP, prompt templates are not stored in-memory
         # Return None to use default prompts
         logger.debug(
@@ -512,8 +682,7 @@ class ConversationStorage:
         """
         Get a conversation-specific prompt template, with fallback to user template.
 
-        Uses in-memory storage (PostgreSQL removed for MVP).
-        For MVP, returns None (no custom templates stored).
+        Returns None with in-memory storage (no custom templates stored).
 
         Args:
             user_id: User ID
@@ -523,6 +692,16 @@ class ConversationStorage:
         Returns:
             Template dictionary or None if not found
         """
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                return store.get_template_for_conversation(user_id, chat_id, name)
+            except Exception as e:
+                logger.error(
+                    f"Error getting conversation prompt template: {e}", exc_info=True
+                )
+                return None
+
         # For MVP, prompt templates are not stored in-memory
         # Return None to use default prompts
         logger.debug(
@@ -547,6 +726,14 @@ class ConversationStorage:
         Returns:
             List of template dictionaries
         """
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                return store.list_templates(user_id, conversation_id, is_active)
+            except Exception as e:
+                logger.error(f"Error listing prompt templates: {e}", exc_info=True)
+                return []
+
         try:
             conn = get_db_connection()
             try:
@@ -617,6 +804,24 @@ class ConversationStorage:
                 logger.error(f"Invalid template syntax: {error_msg}")
                 return False
 
+        store = get_conversation_store()
+        if store is not None:
+            if template_text is None and description is None and is_active is None:
+                logger.warning("No fields to update")
+                return False
+            try:
+                updated = store.update_template(
+                    template_id, template_text, description, is_active
+                )
+            except Exception as e:
+                logger.error(f"Error updating prompt template: {e}", exc_info=True)
+                return False
+            if updated:
+                logger.info(f"Updated prompt template: {template_id}")
+            else:
+                logger.warning(f"Template not found: {template_id}")
+            return updated
+
         try:
             conn = get_db_connection()
             try:
@@ -689,6 +894,19 @@ class ConversationStorage:
         Returns:
             True if successful, False otherwise
         """
+        store = get_conversation_store()
+        if store is not None:
+            try:
+                deleted = store.delete_template(template_id)
+            except Exception as e:
+                logger.error(f"Error deleting prompt template: {e}", exc_info=True)
+                return False
+            if deleted:
+                logger.info(f"Deleted prompt template: {template_id}")
+            else:
+                logger.warning(f"Template not found: {template_id}")
+            return deleted
+
         try:
             conn = get_db_connection()
             try:
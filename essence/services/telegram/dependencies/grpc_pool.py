@@ -1,22 +1,85 @@
-"""gRPC connection pooling for production use."""
+"""gRPC connection pooling for production use.
+
+Each service may run several replicas. Addresses are given as a list or as a
+comma-separated string (e.g. ``STT_URL=grpc://stt-1:50052,stt-2:50052``);
+calls are spread across replicas round-robin or to the replica with the
+fewest outstanding calls. A replica that keeps failing (connection timeouts,
+UNAVAILABLE) is ejected for a while and probed back with the service's
+HealthCheck RPC before it receives traffic again.
+"""
 import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Union
 
 import grpc.aio
 
 logger = logging.getLogger(__name__)
 
+LOAD_BALANCING_POLICIES = ("round_robin", "least_outstanding")
+
+# Full method name of each service's HealthCheck RPC
+_HEALTH_CHECK_METHODS = {
+    "stt": "/june.asr.SpeechToText/HealthCheck",
+    "tts": "/june.tts.TextToSpeech/HealthCheck",
+    "llm": "/june.llm.LLMInference/HealthCheck",
+}
+# Status codes that point at the replica rather than the request
+_ENDPOINT_FAILURE_CODES = (grpc.StatusCode.UNAVAILABLE,)
+
+
+def _rpc_status(error: BaseException) -> Optional[grpc.StatusCode]:
+    """Status code of the gRPC error behind an exception, if there is one.
+
+    Client shims wrap gRPC errors in their own exceptions (e.g.
+    ``STTConnectionError`` raised ``from`` an UNAVAILABLE ``AioRpcError``), so
+    the cause/context chain is followed down to the RPC error.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, grpc.RpcError) and callable(getattr(error, "code", None)):
+            return error.code()
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def parse_addresses(addresses: Union[str, Sequence[str]]) -> List[str]:
+    """Split a comma-separated address string (or list) into replica addresses."""
+    if isinstance(addresses, str):
+        addresses = addresses.split(",")
+    parsed = [address.strip() for address in addresses if address and address.strip()]
+    if not parsed:
+        raise ValueError("At least one service address is required")
+    return parsed
+
+
+class _Endpoint:
+    """One replica of a service: its pooled channels and health state."""
+
+    def __init__(self, address: str):
+        self.address = address
+        self.channels: list = []
+        self.outstanding = 0
+        self.failures = 0  # Consecutive failed calls
+        self.ejections = 0  # Consecutive ejections, for backoff
+        self.ejected_until: Optional[float] = None
+        self.probing = False
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until is not None
+
 
 class GrpcConnectionPool:
     """Manages pooled gRPC connections for STT, TTS, and LLM services."""
 
     def __init__(
         self,
-        stt_address: str,
-        tts_address: str,
-        llm_address: str,
+        stt_address: Union[str, Sequence[str]],
+        tts_address: Union[str, Sequence[str]],
+        llm_address: Union[str, Sequence[str]],
         max_connections_per_service: int = 10,
         keepalive_time_ms: int = 30000,
         keepalive_timeout_ms: int = 5000,
@@ -24,13 +87,19 @@ class GrpcConnectionPool:
         http2_max_pings_without_data: int = 2,  # Limit pings to prevent "too_many_pings" error
         http2_min_time_between_pings_ms: int = 10000,
         http2_min_ping_interval_without_data_ms: int = 300000,
+        load_balancing: str = "round_robin",
+        eject_after_failures: int = 3,
+        ejection_time_s: float = 10.0,
+        max_ejection_time_s: float = 300.0,
+        health_check_timeout_s: float = 2.0,
+        connect_timeout_s: float = 5.0,
     ):
         """Initialize connection pool.
 
         Args:
-            stt_address: STT service address (host:port)
-            tts_address: TTS service address (host:port)
-            llm_address: LLM service address (host:port)
+            stt_address: STT service address(es) (host:port, list or comma-separated)
+            tts_address: TTS service address(es) (host:port, list or comma-separated)
+            llm_address: LLM service address(es) (host:port, list or comma-separated)
             max_connections_per_service: Maximum connections per service
             keepalive_time_ms: Keepalive time in milliseconds
             keepalive_timeout_ms: Keepalive timeout in milliseconds
@@ -38,16 +107,40 @@ class GrpcConnectionPool:
             http2_max_pings_without_data: Max pings without data
             http2_min_time_between_pings_ms: Min time between pings
             http2_min_ping_interval_without_data_ms: Min ping interval without data
+            load_balancing: "round_robin" or "least_outstanding"
+            eject_after_failures: Consecutive failures before a replica is ejected
+            ejection_time_s: First ejection period; doubles on each re-ejection
+            max_ejection_time_s: Upper bound on the ejection period
+            health_check_timeout_s: Timeout of the HealthCheck probe
+            connect_timeout_s: Time to wait for a new channel to become ready
         """
+        if load_balancing not in LOAD_BALANCING_POLICIES:
+            raise ValueError(
+                f"Unknown load balancing policy: {load_balancing}. "
+                f"Supported: {', '.join(LOAD_BALANCING_POLICIES)}"
+            )
+
         self.stt_address = stt_address
         self.tts_address = tts_address
         self.llm_address = llm_address
         self.max_connections = max_connections_per_service
+        self.load_balancing = load_balancing
+        self.eject_after_failures = eject_after_failures
+        self.ejection_time_s = ejection_time_s
+        self.max_ejection_time_s = max_ejection_time_s
+        self.health_check_timeout_s = health_check_timeout_s
+        self.connect_timeout_s = connect_timeout_s
+
+        # Replicas per service, each with its own list of pooled channels
+        self._endpoints: Dict[str, List[_Endpoint]] = {
+            "stt": [_Endpoint(a) for a in parse_addresses(stt_address)],
+            "tts": [_Endpoint(a) for a in parse_addresses(tts_address)],
+            "llm": [_Endpoint(a) for a in parse_addresses(llm_address)],
+        }
+        self._next_endpoint: Dict[str, int] = {"stt": 0, "tts": 0, "llm": 0}
+        # Running HealthCheck probes (kept referenced until they finish)
+        self._probes: set = set()
 
-        # Connection pools: service_name -> list of channels
-        # Store event loop ID with each channel to prevent cross-loop reuse
-        self._pools: Dict[str, list] = {"stt": [], "tts": [], "llm": []}
-        
         # Don't create semaphores here - they're event loop bound
         # Create them lazily in _get_semaphore() method
         self._max_connections = max_connections_per_service
@@ -104,34 +197,168 @@ class GrpcConnectionPool:
         
         return self._semaphores[service_name]
 
+    def endpoint_status(self, service_name: str) -> List[dict]:
+        """Load balancing state of each replica of a service."""
+        return [
+            {
+                "address": endpoint.address,
+                "outstanding": endpoint.outstanding,
+                "failures": endpoint.failures,
+                "ejected": endpoint.ejected,
+            }
+            for endpoint in self._endpoints[service_name]
+        ]
+
     @asynccontextmanager
     async def get_stt_channel(self):
         """Get STT service channel from pool."""
-        async with self._get_channel("stt", self.stt_address) as channel:
+        async with self._get_channel("stt") as channel:
             yield channel
 
     @asynccontextmanager
     async def get_tts_channel(self):
         """Get TTS service channel from pool."""
-        async with self._get_channel("tts", self.tts_address) as channel:
+        async with self._get_channel("tts") as channel:
             yield channel
 
     @asynccontextmanager
     async def get_llm_channel(self):
         """Get LLM service channel from pool."""
-        async with self._get_channel("llm", self.llm_address) as channel:
+        async with self._get_channel("llm") as channel:
             yield channel
 
     @asynccontextmanager
-    async def _get_channel(self, service_name: str, address: str):
-        """Get channel from pool or create new one.
+    async def _get_channel(self, service_name: str):
+        """Get a channel to one replica of a service.
 
-        Uses semaphore to limit concurrent connections and reuses channels when possible.
-        Ensures channels are created in the current event loop to avoid cross-loop issues.
+        Picks a replica with the configured policy and records whether the
+        call failed because of the replica (so it can be ejected).
         """
         if self._shutdown:
             raise RuntimeError("Connection pool is shut down")
 
+        endpoint = self._pick_endpoint(service_name)
+        endpoint.outstanding += 1
+        try:
+            async with self._get_endpoint_channel(service_name, endpoint) as channel:
+                yield channel
+        except asyncio.TimeoutError:
+            # Replica did not become ready in time
+            self._record_failure(service_name, endpoint)
+            raise
+        except Exception as e:
+            code = _rpc_status(e)
+            if code in _ENDPOINT_FAILURE_CODES:
+                self._record_failure(service_name, endpoint)
+            elif code is not None:
+                # The replica answered; the error is about the request
+                self._record_success(service_name, endpoint)
+            raise
+        else:
+            self._record_success(service_name, endpoint)
+        finally:
+            endpoint.outstanding -= 1
+
+    def _pick_endpoint(self, service_name: str) -> _Endpoint:
+        """Choose the replica for the next call."""
+        endpoints = self._endpoints[service_name]
+        now = time.monotonic()
+        for endpoint in endpoints:
+            if (
+                endpoint.ejected
+                and endpoint.ejected_until <= now
+                and not endpoint.probing
+            ):
+                self._start_probe(service_name, endpoint)
+
+        # With every replica ejected, keep trying them rather than failing all calls
+        available = [e for e in endpoints if not e.ejected] or endpoints
+        start = self._next_endpoint[service_name] % len(available)
+        self._next_endpoint[service_name] += 1
+        # Rotate so least_outstanding breaks ties round-robin
+        ordered = available[start:] + available[:start]
+        if self.load_balancing == "least_outstanding":
+            return min(ordered, key=lambda endpoint: endpoint.outstanding)
+        return ordered[0]
+
+    def _record_failure(self, service_name: str, endpoint: _Endpoint) -> None:
+        endpoint.failures += 1
+        if endpoint.failures >= self.eject_after_failures and not endpoint.ejected:
+            self._eject(service_name, endpoint)
+
+    def _record_success(self, service_name: str, endpoint: _Endpoint) -> None:
+        endpoint.failures = 0
+        if endpoint.ejected and not endpoint.probing:
+            # Served a call while every replica was ejected
+            self._restore(service_name, endpoint)
+
+    def _eject(self, service_name: str, endpoint: _Endpoint) -> None:
+        """Stop routing to a replica; the period doubles on each re-ejection."""
+        endpoint.ejections += 1
+        duration = min(
+            self.ejection_time_s * 2 ** (endpoint.ejections - 1),
+            self.max_ejection_time_s,
+        )
+        endpoint.ejected_until = time.monotonic() + duration
+        logger.warning(
+            f"Ejecting {service_name} replica {endpoint.address} for {duration:.0f}s "
+            f"after {endpoint.failures} consecutive failures"
+        )
+
+    def _restore(self, service_name: str, endpoint: _Endpoint) -> None:
+        endpoint.ejected_until = None
+        endpoint.ejections = 0
+        endpoint.failures = 0
+        logger.info(f"Restored {service_name} replica {endpoint.address}")
+
+    def _start_probe(self, service_name: str, endpoint: _Endpoint) -> None:
+        endpoint.probing = True
+        task = asyncio.ensure_future(self._probe(service_name, endpoint))
+        self._probes.add(task)
+        task.add_done_callback(self._probes.discard)
+
+    async def _probe(self, service_name: str, endpoint: _Endpoint) -> None:
+        """Check an ejected replica and restore or re-eject it."""
+        try:
+            healthy = await self._health_check(service_name, endpoint.address)
+        except Exception as e:
+            logger.debug(
+                f"HealthCheck of {service_name} replica {endpoint.address} failed: {e}"
+            )
+            healthy = False
+        finally:
+            endpoint.probing = False
+
+        if healthy:
+            self._restore(service_name, endpoint)
+        else:
+            self._eject(service_name, endpoint)
+
+    async def _health_check(self, service_name: str, address: str) -> bool:
+        """Call the service's HealthCheck RPC on one replica."""
+        from june_grpc_api.generated import asr_pb2, llm_pb2, tts_pb2
+
+        pb2 = {"stt": asr_pb2, "tts": tts_pb2, "llm": llm_pb2}[service_name]
+        async with grpc.aio.insecure_channel(
+            address, options=self._channel_options
+        ) as channel:
+            health_check = channel.unary_unary(
+                _HEALTH_CHECK_METHODS[service_name],
+                request_serializer=pb2.HealthRequest.SerializeToString,
+                response_deserializer=pb2.HealthResponse.FromString,
+            )
+            response = await health_check(
+                pb2.HealthRequest(), timeout=self.health_check_timeout_s
+            )
+        return response.healthy
+
+    @asynccontextmanager
+    async def _get_endpoint_channel(self, service_name: str, endpoint: _Endpoint):
+        """Get channel to a replica from its pool or create new one.
+
+        Uses semaphore to limit concurrent connections and reuses channels when possible.
+        Ensures channels are created in the current event loop to avoid cross-loop issues.
+        """
         # Get semaphore for current event loop
         semaphore = self._get_semaphore(service_name)
         
@@ -140,8 +367,8 @@ class GrpcConnectionPool:
             # Try to reuse existing channel from pool
             # Filter out channels that might be from different event loops
             valid_channels = []
-            while self._pools[service_name]:
-                channel = self._pools[service_name].pop()
+            while endpoint.channels:
+                channel = endpoint.channels.pop()
                 # Check if channel is still ready
                 try:
                     state = channel.get_state()
@@ -161,103 +388,68 @@ class GrpcConnectionPool:
                         pass
             
             # Put valid channels back in pool
-            self._pools[service_name] = valid_channels
+            endpoint.channels = valid_channels
             
-            # Try to reuse a valid channel
             if valid_channels:
                 channel = valid_channels.pop()
+            else:
+                # Create new channel in current event loop
+                channel = grpc.aio.insecure_channel(
+                    endpoint.address, options=self._channel_options
+                )
                 try:
-                    yield channel
-                    # Return channel to pool if still ready
-                    if channel.get_state() == grpc.ChannelConnectivity.READY:
-                        if len(self._pools[service_name]) < self.max_connections:
-                            self._pools[service_name].append(channel)
-                        else:
-                            # Pool is full, close the channel
-                            await channel.close()
-                    else:
-                        # Channel is not ready, close it
-                        await channel.close()
-                except RuntimeError as e:
-                    # Catch "attached to a different loop" error
-                    if "different loop" in str(e) or "attached to a different" in str(e):
-                        logger.warning(
-                            f"Channel {service_name} from different event loop, creating new one: {e}"
-                        )
-                        try:
-                            await channel.close()
-                        except Exception:
-                            pass
-                        # Fall through to create new channel
-                    else:
-                        logger.warning(
-                            f"Error using pooled {service_name} channel: {e}"
-                        )
-                        try:
-                            await channel.close()
-                        except Exception:
-                            pass
-                        raise
-                except Exception as e:
-                    logger.warning(
-                        f"Error using pooled {service_name} channel: {e}"
+                    # Wait for channel to be ready (with timeout)
+                    await asyncio.wait_for(
+                        channel.channel_ready(), timeout=self.connect_timeout_s
                     )
-                    try:
-                        await channel.close()
-                    except Exception:
-                        pass
-                    # Don't raise - try creating new channel instead
-                else:
-                    # Successfully used channel, return early
-                    return
-
-            # Create new channel in current event loop
-            channel = grpc.aio.insecure_channel(address, options=self._channel_options)
-            try:
-                # Wait for channel to be ready (with timeout)
-                try:
-                    await asyncio.wait_for(channel.channel_ready(), timeout=5.0)
                 except asyncio.TimeoutError:
-                    logger.warning(f"Channel {service_name} connection timeout")
+                    logger.warning(
+                        f"Channel {service_name} ({endpoint.address}) connection timeout"
+                    )
                     await channel.close()
                     raise
 
+            try:
                 yield channel
-
-                # Return channel to pool if still ready
-                if (
-                    not self._shutdown
-                    and channel.get_state() == grpc.ChannelConnectivity.READY
-                ):
-                    if len(self._pools[service_name]) < self.max_connections:
-                        self._pools[service_name].append(channel)
-                    else:
-                        # Pool is full, close the channel
-                        await channel.close()
-                else:
-                    await channel.close()
             except Exception as e:
-                logger.error(f"Error with {service_name} channel: {e}", exc_info=True)
+                # A failed call may have left the channel unusable; don't pool it
+                logger.warning(
+                    f"Error using {service_name} channel ({endpoint.address}): {e}"
+                )
                 try:
                     await channel.close()
                 except Exception:
                     pass
                 raise
 
+            # Return channel to pool if still ready
+            if (
+                not self._shutdown
+                and channel.get_state() == grpc.ChannelConnectivity.READY
+                and len(endpoint.channels) < self.max_connections
+            ):
+                endpoint.channels.append(channel)
+            else:
+                await channel.close()
+
     async def shutdown(self):
         """Shutdown connection pool and close all channels."""
         self._shutdown = True
         logger.info("Shutting down gRPC connection pool...")
 
-        for service_name in ["stt", "tts", "llm"]:
-            channels = self._pools[service_name]
-            self._pools[service_name] = []
+        for task in list(self._probes):
+            task.cancel()
 
-            for channel in channels:
-                try:
-                    await channel.close()
-                except Exception as e:
-                    logger.warning(f"Error closing {service_name} channel: {e}")
+        for service_name, endpoints in self._endpoints.items():
+            for endpoint in endpoints:
+                channels = endpoint.channels
+                endpoint.channels = []
+
+                for channel in channels:
+                    try:
+                        await channel.close()
+                    except Exception as e:
+                        logger.warning(f"Error closing {service_name} channel: {e}")
 
         logger.info("gRPC connection pool shut down")
 
@@ -267,7 +459,11 @@ _pool: Optional[GrpcConnectionPool] = None
 
 
 def get_grpc_pool() -> GrpcConnectionPool:
-    """Get global gRPC connection pool instance."""
+    """Get global gRPC connection pool instance.
+
+    Replica lists come from STT_URLS, TTS_URLS and LLM_URLS (comma-separated)
+    and default to the single STT_URL, TTS_URL and LLM_URL addresses.
+    """
     global _pool
     if _pool is None:
         import os
@@ -281,14 +477,23 @@ def get_grpc_pool() -> GrpcConnectionPool:
         max_connections = int(os.getenv("GRPC_MAX_CONNECTIONS_PER_SERVICE", "10"))
         keepalive_time_ms = int(os.getenv("GRPC_KEEPALIVE_TIME_MS", "30000"))
         keepalive_timeout_ms = int(os.getenv("GRPC_KEEPALIVE_TIMEOUT_MS", "5000"))
+        load_balancing = os.getenv("GRPC_LB_POLICY", "round_robin")
+        eject_after_failures = int(os.getenv("GRPC_EJECT_AFTER_FAILURES", "3"))
+        ejection_time_s = float(os.getenv("GRPC_EJECTION_TIME_S", "10"))
 
         _pool = GrpcConnectionPool(
-            stt_address=get_stt_address(),
-            tts_address=get_tts_address(),
-            llm_address=get_llm_address(),
+            stt_address=os.getenv("STT_URLS", "").replace("grpc://", "")
+            or get_stt_address(),
+            tts_address=os.getenv("TTS_URLS", "").replace("grpc://", "")
+            or get_tts_address(),
+            llm_address=os.getenv("LLM_URLS", "").replace("grpc://", "")
+            or get_llm_address(),
             max_connections_per_service=max_connections,
             keepalive_time_ms=keepalive_time_ms,
             keepalive_timeout_ms=keepalive_timeout_ms,
+            load_balancing=load_balancing,
+            eject_after_failures=eject_after_failures,
+            ejection_time_s=ejection_time_s,
         )
     return _pool
 
@@ -1,88 +1,181 @@
 """Rate limiting per user to prevent abuse.
 
-Uses in-memory rate limiting (Redis removed for MVP).
+Uses in-memory rate limiting (Redis removed for MVP). Each user keeps two
+counters per window (sliding window counter), so memory and time per check
+are constant no matter how many requests a user makes. Users are forgotten
+once their day window has fully elapsed, and at most max_users are tracked.
 """
-import asyncio
 import logging
+import math
 import os
+import sys
+import threading
 import time
-from collections import defaultdict
-from typing import Dict, Optional, Tuple
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from essence.services.shared_metrics import (
+    RATE_LIMIT_EVICTIONS_TOTAL,
+    RATE_LIMIT_STATE_BYTES,
+    RATE_LIMIT_TRACKED_KEYS,
+)
 
 logger = logging.getLogger(__name__)
 
+# (period and unit used in error messages, window length in seconds)
+_WINDOWS = (
+    ("minute", "minute", 60),
+    ("hour", "hour", 3600),
+    ("24 hours", "day", 86400),
+)
+
+
+# Bytes per tracked user besides the user ID (counters, list, dict entry)
+_USER_STATE_BYTES = 400
+
+
+class _WindowCounter:
+    """Request counts for the current and previous fixed window."""
+
+    __slots__ = ("start", "current", "previous")
+
+    def __init__(self):
+        self.start = 0.0
+        self.current = 0
+        self.previous = 0
+
+    def estimate(self, window: int, now: float) -> float:
+        """Approximate requests in the sliding window ending at now."""
+        start = now - now % window
+        if start != self.start:
+            self.previous = self.current if self.start == start - window else 0
+            self.current = 0
+            self.start = start
+        weight = 1.0 - (now - start) / window
+        return self.previous * weight + self.current
+
 
 # Redis removed - using in-memory rate limiting only
 class InMemoryRateLimiter:
-    """In-memory rate limiter with sliding window per user."""
+    """In-memory rate limiter with sliding window counters per user."""
 
     def __init__(
         self,
         max_requests_per_minute: int = 10,
         max_requests_per_hour: int = 100,
         max_requests_per_day: int = 500,
+        shards: int = 16,
+        max_users: Optional[int] = 100000,
     ):
         self.max_per_minute = max_requests_per_minute
         self.max_per_hour = max_requests_per_hour
         self.max_per_day = max_requests_per_day
-        self._user_requests: Dict[str, list] = defaultdict(list)
-        self._lock = asyncio.Lock()
+        # Users are spread over shards, each with its own lock. Each shard is
+        # in least recently used order, which is also expiry order.
+        self._locks = [threading.Lock() for _ in range(max(1, shards))]
+        self._user_counters: List["OrderedDict[str, List[_WindowCounter]]"] = [
+            OrderedDict() for _ in self._locks
+        ]
+        self._nbytes = [0] * len(self._locks)
+        self._max_users_per_shard = (
+            math.ceil(max_users / len(self._locks)) if max_users else None
+        )
+
+        RATE_LIMIT_TRACKED_KEYS.labels(limiter="telegram").set_function(
+            self.tracked_users
+        )
+        RATE_LIMIT_STATE_BYTES.labels(limiter="telegram").set_function(
+            lambda: sum(self._nbytes)
+        )
+
+    def _shard(self, user_id: str) -> int:
+        return zlib.crc32(str(user_id).encode("utf-8")) % len(self._locks)
+
+    @staticmethod
+    def _state_bytes(user_id: str) -> int:
+        return sys.getsizeof(user_id) + _USER_STATE_BYTES
+
+    def _evict(self, shard: int, now: float) -> None:
+        """Drop expired and over-capacity users (called with the shard lock held)."""
+        users = self._user_counters[shard]
+        evicted = {"expired": 0, "capacity": 0}
+        day_window = _WINDOWS[-1][2]
+        while users:
+            user_id, counters = next(iter(users.items()))
+            # Both day counts are gone once the following day window ends
+            if counters[-1].start + 2 * day_window > now:
+                break
+            del users[user_id]
+            self._nbytes[shard] -= self._state_bytes(user_id)
+            evicted["expired"] += 1
+        if self._max_users_per_shard:
+            while len(users) > self._max_users_per_shard:
+                user_id, _ = users.popitem(last=False)
+                self._nbytes[shard] -= self._state_bytes(user_id)
+                evicted["capacity"] += 1
+        for reason, count in evicted.items():
+            if count:
+                RATE_LIMIT_EVICTIONS_TOTAL.labels(
+                    limiter="telegram", reason=reason
+                ).inc(count)
+
+    def tracked_users(self) -> int:
+        """Number of users currently holding rate limit state."""
+        return sum(len(users) for users in self._user_counters)
 
     async def check_rate_limit(self, user_id: str) -> Tuple[bool, Optional[str]]:
-        async with self._lock:
+        shard = self._shard(user_id)
+        with self._locks[shard]:
             now = time.time()
-            user_requests = self._user_requests[user_id]
-
-            cutoff_24h = now - 86400
-            user_requests = [ts for ts in user_requests if ts > cutoff_24h]
-            self._user_requests[user_id] = user_requests
-
-            cutoff_1m = now - 60
-            requests_1m = [ts for ts in user_requests if ts > cutoff_1m]
-            if len(requests_1m) >= self.max_per_minute:
-                return False, (
-                    f"Rate limit exceeded: {len(requests_1m)} requests in the last minute. "
-                    f"Maximum allowed: {self.max_per_minute} requests/minute."
-                )
-
-            cutoff_1h = now - 3600
-            requests_1h = [ts for ts in user_requests if ts > cutoff_1h]
-            if len(requests_1h) >= self.max_per_hour:
-                return False, (
-                    f"Rate limit exceeded: {len(requests_1h)} requests in the last hour. "
-                    f"Maximum allowed: {self.max_per_hour} requests/hour."
-                )
-
-            if len(user_requests) >= self.max_per_day:
-                return False, (
-                    f"Rate limit exceeded: {len(user_requests)} requests in the last 24 hours. "
-                    f"Maximum allowed: {self.max_per_day} requests/day."
-                )
-
-            user_requests.append(now)
-            self._user_requests[user_id] = user_requests
+            users = self._user_counters[shard]
+            counters = users.get(user_id)
+            if counters is None:
+                counters = [_WindowCounter() for _ in _WINDOWS]
+                users[user_id] = counters
+                self._nbytes[shard] += self._state_bytes(user_id)
+            else:
+                users.move_to_end(user_id)
+
+            limits = (self.max_per_minute, self.max_per_hour, self.max_per_day)
+            for counter, (period, unit, window), limit in zip(
+                counters, _WINDOWS, limits
+            ):
+                used = round(counter.estimate(window, now))
+                if used >= limit:
+                    return False, (
+                        f"Rate limit exceeded: {used} requests in the last {period}. "
+                        f"Maximum allowed: {limit} requests/{unit}."
+                    )
+
+            for counter in counters:
+                counter.current += 1
+            self._evict(shard, now)
             return True, None
 
     async def get_user_stats(self, user_id: str) -> Dict[str, int]:
-        async with self._lock:
+        shard = self._shard(user_id)
+        with self._locks[shard]:
             now = time.time()
-            user_requests = self._user_requests.get(user_id, [])
-            cutoff_24h = now - 86400
-            user_requests = [ts for ts in user_requests if ts > cutoff_24h]
-            cutoff_1m = now - 60
-            cutoff_1h = now - 3600
+            counters = self._user_counters[shard].get(user_id, [])
+            used = [
+                round(counter.estimate(window, now))
+                for counter, (_, _, window) in zip(counters, _WINDOWS)
+            ] or [0] * len(_WINDOWS)
             return {
-                "requests_1m": len([ts for ts in user_requests if ts > cutoff_1m]),
-                "requests_1h": len([ts for ts in user_requests if ts > cutoff_1h]),
-                "requests_24h": len(user_requests),
+                "requests_1m": used[0],
+                "requests_1h": used[1],
+                "requests_24h": used[2],
                 "max_per_minute": self.max_per_minute,
                 "max_per_hour": self.max_per_hour,
                 "max_per_day": self.max_per_day,
             }
 
     def clear_user(self, user_id: str):
-        if user_id in self._user_requests:
-            del self._user_requests[user_id]
+        shard = self._shard(user_id)
+        with self._locks[shard]:
+            if self._user_counters[shard].pop(user_id, None) is not None:
+                self._nbytes[shard] -= self._state_bytes(user_id)
 
 
 class RateLimiter:
@@ -93,12 +186,14 @@ class RateLimiter:
         max_requests_per_minute: int = 10,
         max_requests_per_hour: int = 100,
         max_requests_per_day: int = 500,
+        max_users: Optional[int] = 100000,
     ):
         """Initialize in-memory rate limiter."""
         self._limiter = InMemoryRateLimiter(
             max_requests_per_minute=max_requests_per_minute,
             max_requests_per_hour=max_requests_per_hour,
             max_requests_per_day=max_requests_per_day,
+            max_users=max_users,
         )
 
     async def check_rate_limit(self, user_id: str) -> Tuple[bool, Optional[str]]:
@@ -125,10 +220,12 @@ def get_rate_limiter() -> RateLimiter:
         max_per_minute = int(os.getenv("TELEGRAM_RATE_LIMIT_PER_MINUTE", "10"))
         max_per_hour = int(os.getenv("TELEGRAM_RATE_LIMIT_PER_HOUR", "100"))
         max_per_day = int(os.getenv("TELEGRAM_RATE_LIMIT_PER_DAY", "500"))
+        max_users = int(os.getenv("TELEGRAM_RATE_LIMIT_MAX_USERS", "100000"))
 
         _rate_limiter = RateLimiter(
             max_requests_per_minute=max_per_minute,
             max_requests_per_hour=max_per_hour,
             max_requests_per_day=max_per_day,
+            max_users=max_users,
         )
     return _rate_limiter
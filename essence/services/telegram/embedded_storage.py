@@ -0,0 +1,665 @@
+"""
+Embedded SQLite backend for the Telegram ConversationStorage.
+
+Gives single-node deployments persistent preferences, prompt templates and
+conversation analytics without a database server. The database runs in WAL
+mode (readers never block the writer), statements are constant SQL strings so
+sqlite3 reuses its prepared-statement cache, and messages recorded for
+analytics are buffered and written in batches by a background flusher.
+
+Analytics read rollup tables (per-conversation counters, hourly buckets and
+daily active users) that triggers maintain on insert, mirroring
+config/postgres-analytics-rollups.sql, so they don't scan messages.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (user_id, chat_id)
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id INTEGER NOT NULL REFERENCES conversations(id),
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation
+    ON messages(conversation_id, created_at);
+
+CREATE TABLE IF NOT EXISTS prompt_templates (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    template_text TEXT NOT NULL,
+    user_id TEXT,
+    conversation_id TEXT,
+    description TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+-- One template per user/conversation/name (NULL scopes compare equal)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_prompt_templates_scope_name
+    ON prompt_templates(COALESCE(user_id, ''), COALESCE(conversation_id, ''), name);
+CREATE INDEX IF NOT EXISTS idx_prompt_templates_user
+    ON prompt_templates(user_id, conversation_id, is_active, created_at);
+
+CREATE TABLE IF NOT EXISTS conversation_stats (
+    conversation_id INTEGER PRIMARY KEY,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    user_message_count INTEGER NOT NULL DEFAULT 0,
+    assistant_message_count INTEGER NOT NULL DEFAULT 0,
+    response_time_sum REAL NOT NULL DEFAULT 0,
+    response_count INTEGER NOT NULL DEFAULT 0,
+    first_message_at REAL,
+    last_message_at REAL,
+    last_user_message_at REAL
+);
+
+-- bucket = start of the hour (unix seconds, UTC)
+CREATE TABLE IF NOT EXISTS message_stats_hourly (
+    bucket INTEGER PRIMARY KEY,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    user_message_count INTEGER NOT NULL DEFAULT 0,
+    assistant_message_count INTEGER NOT NULL DEFAULT 0,
+    response_time_sum REAL NOT NULL DEFAULT 0,
+    response_count INTEGER NOT NULL DEFAULT 0
+);
+
+-- day = unix day number (UTC)
+CREATE TABLE IF NOT EXISTS user_activity_daily (
+    day INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (day, user_id)
+) WITHOUT ROWID;
+
+-- Response time = assistant message time minus the latest preceding user
+-- message of the conversation (read before conversation_stats is updated).
+CREATE TRIGGER IF NOT EXISTS trg_messages_rollup AFTER INSERT ON messages
+BEGIN
+    INSERT INTO conversation_stats (conversation_id) VALUES (NEW.conversation_id)
+    ON CONFLICT (conversation_id) DO NOTHING;
+
+    INSERT INTO message_stats_hourly (
+        bucket, message_count, user_message_count, assistant_message_count,
+        response_time_sum, response_count
+    )
+    SELECT
+        CAST(NEW.created_at / 3600 AS INTEGER) * 3600,
+        1,
+        NEW.role = 'user',
+        NEW.role = 'assistant',
+        CASE WHEN NEW.role = 'assistant' AND NEW.created_at > s.last_user_message_at
+             THEN NEW.created_at - s.last_user_message_at ELSE 0 END,
+        CASE WHEN NEW.role = 'assistant' AND NEW.created_at > s.last_user_message_at
+             THEN 1 ELSE 0 END
+    FROM conversation_stats s
+    WHERE s.conversation_id = NEW.conversation_id
+    ON CONFLICT (bucket) DO UPDATE SET
+        message_count = message_count + excluded.message_count,
+        user_message_count = user_message_count + excluded.user_message_count,
+        assistant_message_count =
+            assistant_message_count + excluded.assistant_message_count,
+        response_time_sum = response_time_sum + excluded.response_time_sum,
+        response_count = response_count + excluded.response_count;
+
+    UPDATE conversation_stats SET
+        message_count = message_count + 1,
+        user_message_count = user_message_count + (NEW.role = 'user'),
+        assistant_message_count = assistant_message_count + (NEW.role = 'assistant'),
+        response_time_sum = response_time_sum + CASE
+            WHEN NEW.role = 'assistant' AND NEW.created_at > last_user_message_at
+            THEN NEW.created_at - last_user_message_at ELSE 0 END,
+        response_count = response_count + CASE
+            WHEN NEW.role = 'assistant' AND NEW.created_at > last_user_message_at
+            THEN 1 ELSE 0 END,
+        first_message_at = COALESCE(MIN(first_message_at, NEW.created_at), NEW.created_at),
+        last_message_at = COALESCE(MAX(last_message_at, NEW.created_at), NEW.created_at),
+        last_user_message_at = CASE WHEN NEW.role = 'user'
+            THEN COALESCE(MAX(last_user_message_at, NEW.created_at), NEW.created_at)
+            ELSE last_user_message_at END
+    WHERE conversation_id = NEW.conversation_id;
+
+    INSERT INTO user_activity_daily (day, user_id)
+    SELECT CAST(NEW.created_at / 86400 AS INTEGER), user_id
+    FROM conversations WHERE id = NEW.conversation_id
+    ON CONFLICT DO NOTHING;
+END;
+"""
+
+_TEMPLATE_COLUMNS = (
+    "id, name, template_text, user_id, conversation_id, description, "
+    "is_active, created_at, updated_at"
+)
+
+
+def _to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    """Datetime to unix seconds (naive datetimes are local time)."""
+    return value.timestamp() if value is not None else None
+
+
+def _to_iso(value: Optional[float]) -> Optional[str]:
+    return (
+        datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+        if value is not None
+        else None
+    )
+
+
+def engagement_score(
+    message_count: int,
+    user_message_count: int,
+    assistant_message_count: int,
+    duration_seconds: float,
+) -> float:
+    """
+    Engagement score (0-100) from message frequency, response ratio and length.
+
+    Same formula as the PostgreSQL ConversationStorage.
+    """
+    if duration_seconds <= 0:
+        return 0.0
+    message_frequency = message_count / (duration_seconds / 3600)  # per hour
+    response_ratio = (
+        assistant_message_count / user_message_count if user_message_count > 0 else 0
+    )
+    return min(
+        100,
+        message_frequency * 10 + response_ratio * 30 + min(message_count / 10, 1) * 60,
+    )
+
+
+class EmbeddedConversationStore:
+    """SQLite (WAL) store for conversation metadata, templates and analytics."""
+
+    def __init__(
+        self, db_path: str, batch_size: int = 100, flush_interval: float = 1.0
+    ):
+        """
+        Open (or create) the store.
+
+        Args:
+            db_path: Path to the SQLite database file
+            batch_size: Flush buffered messages once this many are pending
+            flush_interval: Seconds between background flushes (0 = only on
+                batch_size, reads and close)
+        """
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_path,
+            timeout=5.0,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: durable across process crashes, commits don't fsync
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        # (user_id, chat_id, role, content, created_at) waiting to be written
+        self._pending: List[Tuple[str, str, str, str, float]] = []
+        self._conversation_ids: Dict[Tuple[str, str], int] = {}
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_loop,
+                args=(flush_interval,),
+                name="conversation-store-flush",
+                daemon=True,
+            )
+            self._flusher.start()
+
+    # ------------------------------------------------------------------
+    # Conversations and metadata
+    # ------------------------------------------------------------------
+
+    def _conversation_id(self, user_id: str, chat_id: str) -> int:
+        """Get or create the conversation row (call with the lock held)."""
+        key = (user_id, chat_id)
+        conversation_id = self._conversation_ids.get(key)
+        if conversation_id is None:
+            now = time.time()
+            self._conn.execute(
+                """
+                INSERT INTO conversations (user_id, chat_id, created_at, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id, chat_id) DO NOTHING
+                """,
+                (user_id, chat_id, now, now),
+            )
+            conversation_id = self._conn.execute(
+                "SELECT id FROM conversations WHERE user_id = ? AND chat_id = ?",
+                key,
+            ).fetchone()["id"]
+            self._conversation_ids[key] = conversation_id
+        return conversation_id
+
+    def get_metadata(self, user_id: str, chat_id: str) -> Dict[str, Any]:
+        """
+        Get conversation metadata.
+
+        Returns:
+            Metadata dict ({} if the conversation doesn't exist)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata FROM conversations WHERE user_id = ? AND chat_id = ?",
+                (str(user_id), str(chat_id)),
+            ).fetchone()
+        return json.loads(row["metadata"]) if row is not None else {}
+
+    def update_metadata(
+        self, user_id: str, chat_id: str, updates: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Merge keys into conversation metadata, creating the conversation.
+
+        Keys set to None are removed.
+
+        Returns:
+            The updated metadata
+        """
+        key = (str(user_id), str(chat_id))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                conversation_id = self._conversation_id(*key)
+                row = self._conn.execute(
+                    "SELECT metadata FROM conversations WHERE id = ?",
+                    (conversation_id,),
+                ).fetchone()
+                metadata = json.loads(row["metadata"])
+                for name, value in updates.items():
+                    if value is None:
+                        metadata.pop(name, None)
+                    else:
+                        metadata[name] = value
+                self._conn.execute(
+                    "UPDATE conversations SET metadata = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(metadata), time.time(), conversation_id),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._conversation_ids.pop(key, None)
+                raise
+        return metadata
+
+    # ------------------------------------------------------------------
+    # Messages (batched)
+    # ------------------------------------------------------------------
+
+    def record_message(
+        self,
+        user_id: str,
+        chat_id: str,
+        role: str,
+        content: str,
+        created_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Record a conversation message for analytics.
+
+        The message is buffered and written with the next batch.
+
+        Args:
+            user_id: User ID
+            chat_id: Chat ID
+            role: "user" or "assistant"
+            content: Message text
+            created_at: Message time (default: now)
+        """
+        timestamp = _to_timestamp(created_at) or time.time()
+        with self._lock:
+            self._pending.append(
+                (str(user_id), str(chat_id), role, content or "", timestamp)
+            )
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write buffered messages in one transaction.
+
+        Returns:
+            Number of messages written
+        """
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, []
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = [
+                (self._conversation_id(user_id, chat_id), role, content, created_at)
+                for user_id, chat_id, role, content, created_at in pending
+            ]
+            self._conn.executemany(
+                """
+                INSERT INTO messages (conversation_id, role, content, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            self._conversation_ids.clear()
+            self._pending[:0] = pending  # Retry with the next flush
+            raise
+        return len(rows)
+
+    def _flush_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Failed to flush conversation messages: {e}")
+
+    # ------------------------------------------------------------------
+    # Analytics
+    # ------------------------------------------------------------------
+
+    def get_conversation_analytics(self, user_id: str, chat_id: str) -> Dict[str, Any]:
+        """Analytics for one conversation (same keys as ConversationStorage)."""
+        with self._lock:
+            self._flush_locked()
+            row = self._conn.execute(
+                """
+                SELECT c.id, s.message_count, s.user_message_count,
+                       s.assistant_message_count, s.response_time_sum,
+                       s.response_count, s.first_message_at, s.last_message_at
+                FROM conversations c
+                LEFT JOIN conversation_stats s ON s.conversation_id = c.id
+                WHERE c.user_id = ? AND c.chat_id = ?
+                """,
+                (str(user_id), str(chat_id)),
+            ).fetchone()
+
+        if row is None or not row["message_count"]:
+            return {
+                "conversation_id": str(row["id"]) if row is not None else None,
+                "message_count": 0,
+                "user_message_count": 0,
+                "assistant_message_count": 0,
+                "average_response_time_seconds": 0.0,
+                "engagement_score": 0.0,
+                "first_message_at": None,
+                "last_message_at": None,
+            }
+
+        average = (
+            row["response_time_sum"] / row["response_count"]
+            if row["response_count"]
+            else 0.0
+        )
+        score = engagement_score(
+            row["message_count"],
+            row["user_message_count"],
+            row["assistant_message_count"],
+            row["last_message_at"] - row["first_message_at"],
+        )
+        return {
+            "conversation_id": str(row["id"]),
+            "message_count": row["message_count"],
+            "user_message_count": row["user_message_count"],
+            "assistant_message_count": row["assistant_message_count"],
+            "average_response_time_seconds": round(average, 2),
+            "engagement_score": round(score, 2),
+            "first_message_at": _to_iso(row["first_message_at"]),
+            "last_message_at": _to_iso(row["last_message_at"]),
+        }
+
+    def get_dashboard_analytics(
+        self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Analytics across all conversations (same keys as ConversationStorage).
+
+        Date filters apply at hour granularity (day granularity for active
+        users).
+        """
+        start = _to_timestamp(start_date)
+        end = _to_timestamp(end_date)
+        lower = float("-inf") if start is None else start
+        upper = float("inf") if end is None else end
+        with self._lock:
+            self._flush_locked()
+            total_conversations = self._conn.execute(
+                """
+                SELECT COUNT(*) FROM conversations
+                WHERE created_at >= ? AND created_at <= ?
+                """,
+                (lower, upper),
+            ).fetchone()[0]
+            stats = self._conn.execute(
+                """
+                SELECT SUM(message_count), SUM(user_message_count),
+                       SUM(assistant_message_count), SUM(response_time_sum),
+                       SUM(response_count)
+                FROM message_stats_hourly
+                WHERE bucket >= ? AND bucket <= ?
+                """,
+                (lower if start is None else start // 3600 * 3600, upper),
+            ).fetchone()
+            active_users = self._conn.execute(
+                """
+                SELECT COUNT(DISTINCT user_id) FROM user_activity_daily
+                WHERE day >= ? AND day <= ?
+                """,
+                (lower if start is None else start // 86400, upper / 86400),
+            ).fetchone()[0]
+
+        response_count = stats[4] or 0
+        return {
+            "total_conversations": total_conversations,
+            "total_messages": stats[0] or 0,
+            "user_messages": stats[1] or 0,
+            "assistant_messages": stats[2] or 0,
+            "average_response_time_seconds": round(
+                stats[3] / response_count if response_count else 0.0, 2
+            ),
+            "active_users": active_users,
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Prompt templates
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _to_template(row: sqlite3.Row) -> Dict[str, Any]:
+        template = dict(row)
+        template["is_active"] = bool(template["is_active"])
+        template["created_at"] = _to_iso(template["created_at"])
+        template["updated_at"] = _to_iso(template["updated_at"])
+        return template
+
+    def create_template(
+        self,
+        name: str,
+        template_text: str,
+        user_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Create a prompt template.
+
+        Returns:
+            Template ID, or None if a template with the same name exists
+        """
+        template_id = str(uuid.uuid4())
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    """
+                    INSERT INTO prompt_templates (
+                        id, name, template_text, user_id, conversation_id,
+                        description, is_active, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+                    """,
+                    (
+                        template_id,
+                        name,
+                        template_text,
+                        user_id,
+                        conversation_id,
+                        description,
+                        now,
+                        now,
+                    ),
+                )
+        except sqlite3.IntegrityError as e:
+            logger.error(f"Template already exists or constraint violation: {e}")
+            return None
+        return template_id
+
+    def get_template(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """Get a prompt template by ID."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_TEMPLATE_COLUMNS} FROM prompt_templates WHERE id = ?",
+                (str(template_id),),
+            ).fetchone()
+        return self._to_template(row) if row is not None else None
+
+    def get_template_for_user(
+        self, user_id: str, name: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Latest active user-wide template (optionally by name)."""
+        with self._lock:
+            row = self._conn.execute(
+                f"""
+                SELECT {_TEMPLATE_COLUMNS} FROM prompt_templates
+                WHERE user_id = ? AND conversation_id IS NULL AND is_active = 1
+                  AND (? IS NULL OR name = ?)
+                ORDER BY created_at DESC LIMIT 1
+                """,
+                (str(user_id), name, name),
+            ).fetchone()
+        return self._to_template(row) if row is not None else None
+
+    def get_template_for_conversation(
+        self, user_id: str, chat_id: str, name: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Latest active conversation template, falling back to the user's."""
+        with self._lock:
+            row = self._conn.execute(
+                f"""
+                SELECT {_TEMPLATE_COLUMNS} FROM prompt_templates
+                WHERE user_id = ? AND is_active = 1 AND (? IS NULL OR name = ?)
+                  AND conversation_id = (
+                      SELECT CAST(id AS TEXT) FROM conversations
+                      WHERE user_id = ? AND chat_id = ?
+                  )
+                ORDER BY created_at DESC LIMIT 1
+                """,
+                (str(user_id), name, name, str(user_id), str(chat_id)),
+            ).fetchone()
+        if row is not None:
+            return self._to_template(row)
+        return self.get_template_for_user(user_id, name)
+
+    def list_templates(
+        self,
+        user_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        is_active: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        """List prompt templates with optional filters, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {_TEMPLATE_COLUMNS} FROM prompt_templates
+                WHERE (? IS NULL OR user_id = ?)
+                  AND (? IS NULL OR conversation_id = ?)
+                  AND (? IS NULL OR is_active = ?)
+                ORDER BY created_at DESC
+                """,
+                (
+                    user_id,
+                    user_id,
+                    conversation_id,
+                    conversation_id,
+                    is_active,
+                    is_active,
+                ),
+            ).fetchall()
+        return [self._to_template(row) for row in rows]
+
+    def update_template(
+        self,
+        template_id: str,
+        template_text: Optional[str] = None,
+        description: Optional[str] = None,
+        is_active: Optional[bool] = None,
+    ) -> bool:
+        """
+        Update the given fields of a prompt template.
+
+        Returns:
+            True if the template exists
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE prompt_templates SET
+                    template_text = COALESCE(?, template_text),
+                    description = COALESCE(?, description),
+                    is_active = COALESCE(?, is_active),
+                    updated_at = ?
+                WHERE id = ?
+                """,
+                (template_text, description, is_active, time.time(), str(template_id)),
+            )
+        return cursor.rowcount > 0
+
+    def delete_template(self, template_id: str) -> bool:
+        """
+        Delete a prompt template.
+
+        Returns:
+            True if the template existed
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM prompt_templates WHERE id = ?", (str(template_id),)
+            )
+        return cursor.rowcount > 0
+
+    def close(self) -> None:
+        """Flush buffered messages and close the database."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
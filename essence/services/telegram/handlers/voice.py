@@ -63,6 +63,7 @@ from essence.services.telegram.language_preferences import (
     get_supported_languages,
     is_language_supported,
 )
+from essence.services.telegram.tts_pipeline import PipelinedTTS
 
 PLATFORM = "telegram"
 SERVICE_NAME = "telegram"
@@ -440,6 +441,58 @@ async def send_voice_with_error_handling(
         return False
 
 
+def create_tts_pipeline(
+    language: str, user_id: int, chat_id: int
+) -> Optional[PipelinedTTS]:
+    """
+    Create a sentence-pipelined TTS stage for a streaming LLM response.
+
+    Each segment is synthesized through the TTS connection pool with the same
+    retry policy as a whole-response TTS call.
+
+    Args:
+        language: Language code for TTS
+        user_id: Telegram user ID (for tracing)
+        chat_id: Telegram chat ID (for tracing)
+
+    Returns:
+        PipelinedTTS instance, or None if TELEGRAM_TTS_PIPELINE_ENABLED is false
+    """
+    if os.getenv("TELEGRAM_TTS_PIPELINE_ENABLED", "true").lower() != "true":
+        return None
+
+    from june_grpc_api.shim.tts import TextToSpeechClient
+
+    from essence.services.telegram.dependencies.grpc_pool import get_grpc_pool
+    from essence.services.telegram.dependencies.retry import (
+        retry_with_exponential_backoff,
+    )
+
+    async def synthesize_segment(text: str) -> bytes:
+        async def call_tts():
+            with tracer.start_as_current_span("tts.synthesize_segment") as span:
+                span.set_attribute("tts.text_length", len(text))
+                span.set_attribute("tts.language", language)
+                span.set_attribute("tts.user_id", str(user_id))
+                span.set_attribute("tts.chat_id", str(chat_id))
+                async with get_grpc_pool().get_tts_channel() as channel:
+                    tts_client = TextToSpeechClient(channel)
+                    audio_bytes = await tts_client.synthesize(
+                        text, voice_id="default", language=language
+                    )
+                    span.set_attribute("tts.audio_size_bytes", len(audio_bytes))
+                    return audio_bytes
+
+        return await retry_with_exponential_backoff(
+            call_tts, max_retries=3, initial_delay=1.0
+        )
+
+    return PipelinedTTS(
+        synthesize_segment,
+        max_concurrency=int(os.getenv("TELEGRAM_TTS_PIPELINE_CONCURRENCY", "2")),
+    )
+
+
 def handle_voice_language_command(
     transcript: str, user_id: str, chat_id: str
 ) -> tuple[bool, str]:
@@ -1251,7 +1304,9 @@ async def handle_voice_message(
             return
 
         # Step 4: Send transcript to LLM service
+        transcript_at = datetime.now()
         await status_msg.edit_text("?? Processing with LLM...")
+        tts_pipeline = None
         try:
             from june_grpc_api.shim.llm import LLMClient
 
@@ -1358,6 +1413,13 @@ async def handle_voice_message(
                     grpc_pool = get_grpc_pool()
                     async with grpc_pool.get_llm_channel() as channel:
                         llm_client = LLMClient(channel)
+                        tts_pipeline = create_tts_pipeline(
+                            detected_language, user_id, chat_id
+                        )
+                        llm_stream = llm_client.chat_stream(chat_messages)
+                        if tts_pipeline is not None:
+                            # Synthesize finished sentences while the LLM keeps generating
+                            llm_stream = tts_pipeline.tee(llm_stream)
                         try:
                             # Stream LLM response to Telegram
                             (
@@ -1365,7 +1427,7 @@ async def handle_voice_message(
                                 stream_success,
                             ) = await stream_llm_response_to_telegram(
                                 message=status_msg,
-                                llm_stream=llm_client.chat_stream(chat_messages),
+                                llm_stream=llm_stream,
                                 prefix="💬 **Response:**\n\n",
                                 update_interval=0.1,
                             )
@@ -1374,8 +1436,10 @@ async def handle_voice_message(
                                 len(llm_response) if llm_response else 0,
                             )
                             span.set_attribute("llm.stream_success", stream_success)
-                            return llm_response, stream_success
+                            return llm_response, stream_success, tts_pipeline
                         except Exception as e:
+                            if tts_pipeline is not None:
+                                tts_pipeline.cancel()
                             span.record_exception(e)
                             span.set_status(
                                 trace.Status(trace.StatusCode.ERROR, str(e))
@@ -1383,7 +1447,11 @@ async def handle_voice_message(
                             raise
 
             try:
-                llm_response, stream_success = await retry_with_exponential_backoff(
+                (
+                    llm_response,
+                    stream_success,
+                    tts_pipeline,
+                ) = await retry_with_exponential_backoff(
                     call_llm, max_retries=3, initial_delay=1.0
                 )
             except Exception as e:
@@ -1428,15 +1496,23 @@ async def handle_voice_message(
                     f"💬 **Transcription:**\n\n{transcript}\n\n"
                     "❌ LLM returned an empty response. Please try again."
                 )
+                if tts_pipeline is not None:
+                    tts_pipeline.cancel()
                 return
 
-            # Conversation history storage removed (gateway removed for MVP)
-            # Language preference is stored via in-memory ConversationStorage
-            logger.debug(f"Conversation history not saved (gateway removed for MVP)")
+            # Record the turn for analytics (kept only by the embedded store)
+            ConversationStorage.record_message(
+                user_id, chat_id, "user", transcript, created_at=transcript_at
+            )
+            ConversationStorage.record_message(
+                user_id, chat_id, "assistant", llm_response
+            )
 
             logger.info(f"LLM response: {llm_response}")
         except Exception as e:
             logger.error(f"LLM error: {e}", exc_info=True)
+            if tts_pipeline is not None:
+                tts_pipeline.cancel()
             await status_msg.edit_text(
                 f"?? **Transcription:**\n\n{transcript}\n\n"
                 f"? LLM processing failed: {str(e)}\n\n"
@@ -1491,9 +1567,13 @@ async def handle_voice_message(
                             raise
 
             try:
-                tts_audio_bytes = await retry_with_exponential_backoff(
-                    call_tts, max_retries=3, initial_delay=1.0
-                )
+                if tts_pipeline is not None:
+                    # Segments were synthesized while the LLM was streaming
+                    tts_audio_bytes = await tts_pipeline.finish()
+                else:
+                    tts_audio_bytes = await retry_with_exponential_backoff(
+                        call_tts, max_retries=3, initial_delay=1.0
+                    )
             except Exception as e:
                 tts_status = "error"
                 raise
@@ -2155,7 +2235,9 @@ async def handle_voice_message_from_queue(
             return
 
         # Step 3: Send transcript to LLM service (same as original handler)
+        transcript_at = datetime.now()
         await status_msg.edit_text("?? Processing with LLM...")
+        tts_pipeline = None
         try:
             from june_grpc_api.shim.llm import LLMClient
 
@@ -2246,6 +2328,13 @@ async def handle_voice_message_from_queue(
                     grpc_pool = get_grpc_pool()
                     async with grpc_pool.get_llm_channel() as channel:
                         llm_client = LLMClient(channel)
+                        tts_pipeline = create_tts_pipeline(
+                            detected_language, user_id, chat_id
+                        )
+                        llm_stream = llm_client.chat_stream(chat_messages)
+                        if tts_pipeline is not None:
+                            # Synthesize finished sentences while the LLM keeps generating
+                            llm_stream = tts_pipeline.tee(llm_stream)
                         try:
                             # Stream LLM response to Telegram
                             (
@@ -2253,7 +2342,7 @@ async def handle_voice_message_from_queue(
                                 stream_success,
                             ) = await stream_llm_response_to_telegram(
                                 message=status_msg,
-                                llm_stream=llm_client.chat_stream(chat_messages),
+                                llm_stream=llm_stream,
                                 prefix="💬 **Response:**\n\n",
                                 update_interval=0.1,
                             )
@@ -2262,15 +2351,21 @@ async def handle_voice_message_from_queue(
                                 len(llm_response) if llm_response else 0,
                             )
                             span.set_attribute("llm.stream_success", stream_success)
-                            return llm_response, stream_success
+                            return llm_response, stream_success, tts_pipeline
                         except Exception as e:
+                            if tts_pipeline is not None:
+                                tts_pipeline.cancel()
                             span.record_exception(e)
                             span.set_status(
                                 trace.Status(trace.StatusCode.ERROR, str(e))
                             )
                             raise
 
-            llm_response, stream_success = await retry_with_exponential_backoff(
+            (
+                llm_response,
+                stream_success,
+                tts_pipeline,
+            ) = await retry_with_exponential_backoff(
                 call_llm, max_retries=3, initial_delay=1.0
             )
 
@@ -2304,15 +2399,23 @@ async def handle_voice_message_from_queue(
                     f"💬 **Transcription:**\n\n{transcript}\n\n"
                     "❌ LLM returned an empty response. Please try again."
                 )
+                if tts_pipeline is not None:
+                    tts_pipeline.cancel()
                 return
 
-            # Conversation history storage removed (gateway removed for MVP)
-            # Language preference is stored via in-memory ConversationStorage
-            logger.debug(f"Conversation history not saved (gateway removed for MVP)")
+            # Record the turn for analytics (kept only by the embedded store)
+            ConversationStorage.record_message(
+                user_id, chat_id, "user", transcript, created_at=transcript_at
+            )
+            ConversationStorage.record_message(
+                user_id, chat_id, "assistant", llm_response
+            )
 
             logger.info(f"LLM response: {llm_response}")
         except Exception as e:
             logger.error(f"LLM error: {e}", exc_info=True)
+            if tts_pipeline is not None:
+                tts_pipeline.cancel()
             await status_msg.edit_text(
                 f"?? **Transcription:**\n\n{transcript}\n\n"
                 f"? LLM processing failed: {str(e)}\n\n"
@@ -2364,9 +2467,13 @@ async def handle_voice_message_from_queue(
                             )
                             raise
 
-            tts_audio_bytes = await retry_with_exponential_backoff(
-                call_tts, max_retries=3, initial_delay=1.0
-            )
+            if tts_pipeline is not None:
+                # Segments were synthesized while the LLM was streaming
+                tts_audio_bytes = await tts_pipeline.finish()
+            else:
+                tts_audio_bytes = await retry_with_exponential_backoff(
+                    call_tts, max_retries=3, initial_delay=1.0
+                )
 
             # Calculate TTS audio duration and record cost
             tts_audio_duration = 0.0
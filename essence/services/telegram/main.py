@@ -54,6 +54,7 @@ from essence.services.shared_metrics import (
     VOICE_MESSAGES_PROCESSED_TOTAL,
     VOICE_PROCESSING_DURATION_SECONDS,
 )
+from essence.services.telegram.conversation_storage import close_conversation_store
 from essence.services.telegram.dependencies.config import (
     get_metrics_storage,
     get_service_config,
@@ -648,6 +649,13 @@ class TelegramBotService:
         logger.info("Waiting for in-flight requests to complete...")
         await asyncio.sleep(2)
 
+        # Flush buffered conversation writes once in-flight requests are done
+        try:
+            close_conversation_store()
+            logger.info("Conversation store closed")
+        except Exception as e:
+            logger.error(f"Error closing conversation store: {e}", exc_info=True)
+
         self._shutdown_complete = True
         logger.info("Graceful shutdown complete")
 
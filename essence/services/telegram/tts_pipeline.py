@@ -0,0 +1,230 @@
+"""
+Sentence-pipelined TTS for streaming LLM responses.
+
+Cuts the streaming LLM output into sentence/clause segments and synthesizes
+each segment while the LLM is still generating, so voice-reply latency is
+roughly first-sentence generation plus one TTS call instead of full
+generation plus TTS of the whole response. Segment audio is stitched back
+together in order once the stream ends.
+"""
+import asyncio
+import io
+import logging
+import re
+import wave
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a line break. Requiring trailing whitespace keeps "3.14" and
+# the end of a still-streaming chunk from being cut early.
+_SENTENCE_BOUNDARY = re.compile(r"[.!?…。！？]+[\"')\]]*\s+|\n+")
+# Clause boundary used to split sentences that exceed max_chars
+_CLAUSE_BOUNDARY = re.compile(r"[,;:—]\s+")
+
+
+class SentenceSegmenter:
+    """
+    Incrementally split streamed text into sentence/clause segments.
+
+    Segments shorter than min_chars are merged with the following sentence so
+    TTS is not called for fragments like "Sure." on their own; sentences longer
+    than max_chars are cut at the last clause boundary (or word) before the limit.
+    """
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 200):
+        """
+        Initialize segmenter.
+
+        Args:
+            min_chars: Minimum segment length before a sentence boundary is honored
+            max_chars: Maximum segment length before forcing a clause/word split
+        """
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text and return any segments that are now complete.
+
+        Args:
+            text: Next chunk of LLM output
+
+        Returns:
+            List of complete segments (may be empty)
+        """
+        self._buffer += text
+        segments = []
+        while True:
+            segment = self._next_segment()
+            if segment is None:
+                break
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> List[str]:
+        """
+        Return whatever text remains buffered as a final segment.
+
+        Returns:
+            List with the remaining segment, or empty if nothing is buffered
+        """
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+    def _next_segment(self) -> Optional[str]:
+        for match in _SENTENCE_BOUNDARY.finditer(self._buffer):
+            if match.end() > self.max_chars:
+                break
+            if len(self._buffer[: match.start()].strip()) >= self.min_chars:
+                return self._take(match.end())
+
+        if len(self._buffer) <= self.max_chars:
+            return None
+
+        window = self._buffer[: self.max_chars]
+        clauses = list(_CLAUSE_BOUNDARY.finditer(window))
+        if clauses and clauses[-1].end() > self.min_chars:
+            return self._take(clauses[-1].end())
+        split_at = window.rfind(" ")
+        if split_at <= self.min_chars:
+            split_at = self.max_chars
+        return self._take(split_at)
+
+    def _take(self, end: int) -> str:
+        segment = self._buffer[:end].strip()
+        self._buffer = self._buffer[end:]
+        return segment
+
+
+def stitch_audio(chunks: List[bytes]) -> bytes:
+    """
+    Concatenate synthesized audio segments in order.
+
+    WAV segments are merged into a single WAV (parameters taken from the first
+    segment); raw PCM segments are concatenated as-is.
+
+    Args:
+        chunks: Audio bytes for each segment, in playback order
+
+    Returns:
+        Combined audio bytes (empty if all segments are empty)
+    """
+    chunks = [chunk for chunk in chunks if chunk]
+    if not chunks:
+        return b""
+    if len(chunks) == 1:
+        return chunks[0]
+    if not all(chunk[:4] == b"RIFF" for chunk in chunks):
+        return b"".join(chunks)
+
+    output = io.BytesIO()
+    with wave.open(io.BytesIO(chunks[0]), "rb") as first:
+        params = first.getparams()
+    with wave.open(output, "wb") as combined:
+        combined.setparams(params)
+        for chunk in chunks:
+            with wave.open(io.BytesIO(chunk), "rb") as segment:
+                combined.writeframes(segment.readframes(segment.getnframes()))
+    return output.getvalue()
+
+
+class PipelinedTTS:
+    """
+    Synthesize LLM output sentence by sentence while the LLM is still streaming.
+
+    Wrap the LLM stream with tee(); every complete segment is handed to the
+    synthesize callable in a background task (at most max_concurrency at once).
+    finish() flushes the last partial segment, waits for all segments and
+    returns the stitched audio.
+    """
+
+    def __init__(
+        self,
+        synthesize: Callable[[str], Awaitable[bytes]],
+        max_concurrency: int = 2,
+        segmenter: Optional[SentenceSegmenter] = None,
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            synthesize: Async callable returning audio bytes for one text segment
+            max_concurrency: Maximum number of in-flight TTS calls
+            segmenter: Segmenter to use (default: SentenceSegmenter())
+        """
+        self._synthesize = synthesize
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._segmenter = segmenter or SentenceSegmenter()
+        self._tasks: List[asyncio.Task] = []
+        self.segments: List[str] = []
+
+    @property
+    def segment_count(self) -> int:
+        """Number of segments submitted for synthesis so far."""
+        return len(self._tasks)
+
+    async def tee(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Pass LLM chunks through unchanged while queueing completed segments for TTS.
+
+        Args:
+            stream: Async iterator of LLM text chunks
+
+        Yields:
+            The same chunks, in order
+        """
+        async for chunk in stream:
+            if chunk:
+                self.feed(chunk)
+            yield chunk
+
+    def feed(self, text: str) -> None:
+        """
+        Add LLM output and start synthesis for any completed segments.
+
+        Args:
+            text: Next chunk of LLM output
+        """
+        for segment in self._segmenter.feed(text):
+            self._submit(segment)
+
+    def _submit(self, segment: str) -> None:
+        index = len(self._tasks)
+        self.segments.append(segment)
+        self._tasks.append(asyncio.create_task(self._run_segment(index, segment)))
+
+    async def _run_segment(self, index: int, segment: str) -> bytes:
+        async with self._semaphore:
+            logger.debug(f"Synthesizing segment {index} ({len(segment)} chars)")
+            return await self._synthesize(segment)
+
+    async def finish(self) -> bytes:
+        """
+        Flush remaining text, wait for every segment and stitch the audio.
+
+        Returns:
+            Combined audio bytes for all segments, in order
+
+        Raises:
+            Exception: The first segment failure; remaining segments are cancelled
+        """
+        for segment in self._segmenter.flush():
+            self._submit(segment)
+        try:
+            chunks = await asyncio.gather(*self._tasks)
+        except BaseException:
+            self.cancel()
+            raise
+        logger.info(f"Pipelined TTS synthesized {len(chunks)} segments")
+        return stitch_audio(list(chunks))
+
+    def cancel(self) -> None:
+        """Cancel any in-flight segment synthesis."""
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
@@ -1,4 +1,11 @@
 # LLM strategies
+from .batch_scheduler import BatchedGeneration, ContinuousBatchScheduler
+from .kv_cache import PrefixKVCache
 from .qwen3_strategy import Qwen3LlmStrategy
 
-__all__ = ["Qwen3LlmStrategy"]
+__all__ = [
+    "Qwen3LlmStrategy",
+    "ContinuousBatchScheduler",
+    "BatchedGeneration",
+    "PrefixKVCache",
+]
@@ -0,0 +1,625 @@
+"""
+Continuous batching scheduler for HuggingFace causal LMs.
+
+Concurrent requests are queued and decoded together: every decode step runs one
+forward pass over all active sequences, and new requests join the running batch
+between steps (iteration-level scheduling) instead of waiting for the whole
+batch to finish. Each caller gets its own stream of text deltas.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .kv_cache import cache_to_legacy, legacy_to_cache
+
+logger = logging.getLogger(__name__)
+
+# Sentinel placed on a sequence's output queue once it has finished
+_END = object()
+# How often a consumer waiting for output checks its cancel event
+_CANCEL_POLL_SECONDS = 0.1
+
+
+class SchedulerQueueFull(RuntimeError):
+    """Raised when the scheduler cannot accept more pending requests."""
+
+    pass
+
+
+@dataclass
+class _Sequence:
+    """Per-request decoding state owned by the scheduler thread."""
+
+    prompt_ids: List[int]
+    max_new_tokens: int
+    temperature: float
+    top_p: float
+    top_k: Optional[int]
+    repetition_penalty: Optional[float]
+    stop: List[str]
+    output: "queue.Queue[Any]" = field(default_factory=queue.Queue)
+    generated: List[int] = field(default_factory=list)
+    emitted_text: str = ""
+    finish_reason: Optional[str] = None
+    cancelled: bool = False
+    cancel_event: Optional[threading.Event] = None
+    submitted_at: float = field(default_factory=time.time)
+    first_token_at: Optional[float] = None
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.cancelled or (
+            self.cancel_event is not None and self.cancel_event.is_set()
+        )
+
+
+class BatchedGeneration:
+    """Handle for a request submitted to a ContinuousBatchScheduler.
+
+    Iterating yields text deltas as the scheduler produces them. Closing the
+    iterator early or setting the request's cancel event cancels the request;
+    its batch slot is freed on the next step.
+    """
+
+    def __init__(self, sequence: _Sequence) -> None:
+        self._sequence = sequence
+
+    @property
+    def input_tokens(self) -> int:
+        return len(self._sequence.prompt_ids)
+
+    @property
+    def output_tokens(self) -> int:
+        return len(self._sequence.generated)
+
+    @property
+    def finish_reason(self) -> Optional[str]:
+        """ "stop", "length", "cancelled" or "error" once the request has finished."""
+        return self._sequence.finish_reason
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self._sequence.first_token_at is None:
+            return None
+        return self._sequence.first_token_at - self._sequence.submitted_at
+
+    def cancel(self) -> None:
+        self._sequence.cancelled = True
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            while True:
+                try:
+                    item = self._sequence.output.get(timeout=_CANCEL_POLL_SECONDS)
+                except queue.Empty:
+                    # Don't wait for the scheduler to reach a cancelled request
+                    if self._sequence.is_cancelled:
+                        return
+                    continue
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise RuntimeError(f"Generation failed: {item}") from item
+                yield item
+        finally:
+            self.cancel()
+
+    def text(self) -> str:
+        """Block until the request finishes and return the full generated text."""
+        return "".join(self)
+
+
+class ContinuousBatchScheduler:
+    """Iteration-level request scheduler around a single causal LM.
+
+    Sequences are left-padded so that every row's newest token sits in the last
+    position; attention masks hide the padding and position ids are derived from
+    the mask, so rows with different prompt lengths share one KV cache tensor.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        tokenizer: Any,
+        device: str = "cpu",
+        max_batch_size: int = 8,
+        max_queue_size: int = 256,
+        batch_wait_seconds: float = 0.005,
+    ) -> None:
+        """Initialize scheduler.
+
+        Args:
+            model: Loaded HuggingFace causal LM (in eval mode)
+            tokenizer: Matching tokenizer
+            device: Device the model runs on
+            max_batch_size: Maximum number of sequences decoded together
+            max_queue_size: Maximum number of requests waiting for a batch slot
+            batch_wait_seconds: How long an idle scheduler waits after the first
+                request arrives to collect more requests into the same prefill
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.batch_wait_seconds = batch_wait_seconds
+
+        self._pending: "queue.Queue[_Sequence]" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        # Batch state, only touched by the scheduler thread
+        self._active: List[_Sequence] = []
+        self._past: Optional[Tuple[Tuple[Any, Any], ...]] = None
+        self._attention_mask = None  # (batch, cache_len)
+        self._next_tokens = None  # (batch, 1) sampled but not yet in the cache
+
+        self._submitted = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._failed = 0
+        self._generated_tokens = 0
+        self._decode_steps = 0
+        self._batched_rows = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the scheduler thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="llm-batch-scheduler", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            "Continuous batch scheduler started (max_batch_size=%d)",
+            self.max_batch_size,
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the scheduler thread and fail any outstanding requests."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        error = RuntimeError("Scheduler stopped")
+        self._fail_all(error)
+        while True:
+            try:
+                sequence = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            sequence.finish_reason = "error"
+            sequence.output.put(error)
+
+    def submit(
+        self,
+        prompt: str,
+        params: Optional[Dict[str, Any]] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> BatchedGeneration:
+        """Queue a prompt for generation.
+
+        Args:
+            prompt: Prompt text
+            params: Generation params (max_tokens, temperature, top_p, top_k,
+                repetition_penalty, stop)
+            cancel: Event that cancels the request when set (may be set from
+                any thread)
+
+        Returns:
+            BatchedGeneration handle that yields text deltas
+
+        Raises:
+            SchedulerQueueFull: If too many requests are already waiting
+        """
+        params = params or {}
+        stop = params.get("stop") or []
+        if isinstance(stop, str):
+            stop = [stop]
+        top_k = params.get("top_k")
+        sequence = _Sequence(
+            prompt_ids=list(self.tokenizer(prompt)["input_ids"]),
+            max_new_tokens=int(params.get("max_tokens") or 2048),
+            temperature=float(params.get("temperature", 0.7) or 0.0),
+            top_p=float(params.get("top_p", 0.9) or 1.0),
+            top_k=int(top_k) if top_k else None,
+            repetition_penalty=params.get("repetition_penalty") or None,
+            stop=[s for s in stop if s],
+            cancel_event=cancel,
+        )
+        try:
+            self._pending.put_nowait(sequence)
+        except queue.Full:
+            raise SchedulerQueueFull(
+                f"LLM scheduler queue is full ({self._pending.maxsize} pending requests)"
+            )
+        self._submitted += 1
+        return BatchedGeneration(sequence)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        return {
+            "active": len(self._active),
+            "pending": self._pending.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "cancelled": self._cancelled,
+            "failed": self._failed,
+            "generated_tokens": self._generated_tokens,
+            "decode_steps": self._decode_steps,
+            "avg_batch_size": (
+                self._batched_rows / self._decode_steps if self._decode_steps else 0.0
+            ),
+        }
+
+    # ------------------------------------------------------------------
+    # Scheduler loop
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        import torch
+
+        with torch.no_grad():
+            while not self._stop_event.is_set():
+                try:
+                    admitted = self._collect_new_sequences()
+                    if admitted:
+                        self._prefill(admitted)
+                    self._drop_cancelled()
+                    if self._active:
+                        self._decode_step()
+                except Exception as e:
+                    logger.error("Batch scheduler step failed: %s", e, exc_info=True)
+                    self._fail_all(e)
+
+    def _collect_new_sequences(self) -> List[_Sequence]:
+        """Take pending requests that fit into the running batch."""
+        capacity = self.max_batch_size - len(self._active)
+        if capacity <= 0:
+            return []
+
+        admitted: List[_Sequence] = []
+        if not self._active:
+            # Idle: block for the first request, then briefly gather a batch
+            try:
+                admitted.append(self._pending.get(timeout=0.1))
+            except queue.Empty:
+                return []
+            deadline = time.monotonic() + self.batch_wait_seconds
+            while len(admitted) < capacity:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    admitted.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+        while len(admitted) < capacity:
+            try:
+                admitted.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+
+        return [s for s in admitted if not self._finish_if_cancelled(s)]
+
+    def _prefill(self, sequences: List[_Sequence]) -> None:
+        """Encode new prompts and merge their KV cache into the running batch."""
+        import torch
+
+        pad_id = self._pad_token_id()
+        prompt_len = max(len(s.prompt_ids) for s in sequences)
+        input_ids = torch.full(
+            (len(sequences), prompt_len), pad_id, dtype=torch.long, device=self.device
+        )
+        attention_mask = torch.zeros(
+            (len(sequences), prompt_len), dtype=torch.long, device=self.device
+        )
+        for row, sequence in enumerate(sequences):
+            ids = sequence.prompt_ids
+            input_ids[row, prompt_len - len(ids) :] = torch.tensor(
+                ids, dtype=torch.long, device=self.device
+            )
+            attention_mask[row, prompt_len - len(ids) :] = 1
+
+        try:
+            outputs = self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                position_ids=self._position_ids(attention_mask),
+                use_cache=True,
+            )
+        except Exception as e:
+            for sequence in sequences:
+                self._finish(sequence, "error", error=e)
+            raise
+
+        next_tokens = self._sample(outputs.logits[:, -1, :], sequences)
+        self._merge(
+            sequences,
+            cache_to_legacy(outputs.past_key_values),
+            attention_mask,
+            next_tokens,
+        )
+        self._process_tokens(sequences, next_tokens)
+
+    def _decode_step(self) -> None:
+        """Run one forward pass over every active sequence."""
+        import torch
+
+        mask = torch.cat(
+            [
+                self._attention_mask,
+                torch.ones(
+                    (self._attention_mask.shape[0], 1),
+                    dtype=self._attention_mask.dtype,
+                    device=self.device,
+                ),
+            ],
+            dim=1,
+        )
+        outputs = self.model(
+            input_ids=self._next_tokens,
+            attention_mask=mask,
+            position_ids=self._position_ids(mask)[:, -1:],
+            past_key_values=legacy_to_cache(self._past),
+            use_cache=True,
+        )
+        self._past = cache_to_legacy(outputs.past_key_values)
+        self._attention_mask = mask
+        self._decode_steps += 1
+        self._batched_rows += len(self._active)
+
+        next_tokens = self._sample(outputs.logits[:, -1, :], self._active)
+        self._next_tokens = next_tokens.unsqueeze(-1)
+        self._process_tokens(list(self._active), next_tokens)
+
+    # ------------------------------------------------------------------
+    # Batch bookkeeping
+    # ------------------------------------------------------------------
+
+    def _merge(
+        self,
+        sequences: List[_Sequence],
+        past: Tuple[Tuple[Any, Any], ...],
+        attention_mask: Any,
+        next_tokens: Any,
+    ) -> None:
+        """Append freshly prefilled rows to the active batch, left-padding caches."""
+        import torch
+
+        if not self._active:
+            self._active = list(sequences)
+            self._past = past
+            self._attention_mask = attention_mask
+            self._next_tokens = next_tokens.unsqueeze(-1)
+            return
+
+        active_len = self._attention_mask.shape[1]
+        new_len = attention_mask.shape[1]
+        target_len = max(active_len, new_len)
+
+        def _left_pad(tensor: Any, length: int, dim: int) -> Any:
+            missing = length - tensor.shape[dim]
+            if missing <= 0:
+                return tensor
+            shape = list(tensor.shape)
+            shape[dim] = missing
+            return torch.cat(
+                [torch.zeros(shape, dtype=tensor.dtype, device=tensor.device), tensor],
+                dim=dim,
+            )
+
+        self._past = tuple(
+            (
+                torch.cat(
+                    [_left_pad(old_k, target_len, 2), _left_pad(new_k, target_len, 2)],
+                    dim=0,
+                ),
+                torch.cat(
+                    [_left_pad(old_v, target_len, 2), _left_pad(new_v, target_len, 2)],
+                    dim=0,
+                ),
+            )
+            for (old_k, old_v), (new_k, new_v) in zip(self._past, past)
+        )
+        self._attention_mask = torch.cat(
+            [
+                _left_pad(self._attention_mask, target_len, 1),
+                _left_pad(attention_mask, target_len, 1),
+            ],
+            dim=0,
+        )
+        self._next_tokens = torch.cat(
+            [self._next_tokens, next_tokens.unsqueeze(-1)], dim=0
+        )
+        self._active.extend(sequences)
+
+    def _drop_cancelled(self) -> None:
+        for sequence in self._active:
+            self._finish_if_cancelled(sequence)
+        self._compact()
+
+    def _compact(self) -> None:
+        """Remove finished rows from the batch and trim all-padding columns."""
+        import torch
+
+        keep = [i for i, s in enumerate(self._active) if s.finish_reason is None]
+        if len(keep) == len(self._active):
+            return
+        if not keep:
+            self._active = []
+            self._past = None
+            self._attention_mask = None
+            self._next_tokens = None
+            return
+
+        index = torch.tensor(keep, dtype=torch.long, device=self.device)
+        mask = self._attention_mask.index_select(0, index)
+        # Columns that are padding for every remaining row can be dropped
+        start = int(mask.any(dim=0).nonzero()[0].item())
+        self._attention_mask = mask[:, start:]
+        self._past = tuple(
+            (
+                k.index_select(0, index)[:, :, start:],
+                v.index_select(0, index)[:, :, start:],
+            )
+            for k, v in self._past
+        )
+        self._next_tokens = self._next_tokens.index_select(0, index)
+        self._active = [self._active[i] for i in keep]
+
+    def _process_tokens(self, sequences: Sequence[_Sequence], next_tokens: Any) -> None:
+        """Record sampled tokens, stream text deltas and finish completed rows."""
+        eos_id = self.tokenizer.eos_token_id
+        for sequence, token in zip(sequences, next_tokens.tolist()):
+            if sequence.finish_reason is not None:
+                continue
+            if sequence.first_token_at is None:
+                sequence.first_token_at = time.time()
+            if eos_id is not None and token == eos_id:
+                self._emit(sequence, final=True)
+                self._finish(sequence, "stop")
+                continue
+            sequence.generated.append(token)
+            self._generated_tokens += 1
+            if self._emit(sequence, final=False):
+                self._finish(sequence, "stop")
+            elif len(sequence.generated) >= sequence.max_new_tokens:
+                self._emit(sequence, final=True)
+                self._finish(sequence, "length")
+        self._compact()
+
+    def _emit(self, sequence: _Sequence, final: bool) -> bool:
+        """Push newly decoded text to the caller.
+
+        Returns:
+            True if a stop string was reached
+        """
+        text = self.tokenizer.decode(sequence.generated, skip_special_tokens=True)
+        stopped = False
+        for stop in sequence.stop:
+            index = text.find(stop, max(0, len(sequence.emitted_text) - len(stop)))
+            if index != -1:
+                text = text[:index]
+                stopped = True
+
+        visible = text
+        if not final and not stopped:
+            # Hold back incomplete multi-byte characters and partial stop strings
+            if visible.endswith("\ufffd"):
+                visible = visible.rstrip("\ufffd")
+            for stop in sequence.stop:
+                for size in range(min(len(stop) - 1, len(visible)), 0, -1):
+                    if visible.endswith(stop[:size]):
+                        visible = visible[:-size]
+                        break
+
+        if len(visible) > len(sequence.emitted_text) and visible.startswith(
+            sequence.emitted_text
+        ):
+            sequence.output.put(visible[len(sequence.emitted_text) :])
+            sequence.emitted_text = visible
+        return stopped
+
+    def _finish(
+        self,
+        sequence: _Sequence,
+        reason: str,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        if sequence.finish_reason is not None:
+            return
+        sequence.finish_reason = reason
+        if reason == "cancelled":
+            self._cancelled += 1
+        elif reason == "error":
+            self._failed += 1
+            sequence.output.put(error or RuntimeError("Generation failed"))
+        else:
+            self._completed += 1
+        sequence.output.put(_END)
+
+    def _finish_if_cancelled(self, sequence: _Sequence) -> bool:
+        if sequence.is_cancelled and sequence.finish_reason is None:
+            self._finish(sequence, "cancelled")
+        return sequence.finish_reason is not None
+
+    def _fail_all(self, error: BaseException) -> None:
+        for sequence in self._active:
+            self._finish(sequence, "error", error=error)
+        self._active = []
+        self._past = None
+        self._attention_mask = None
+        self._next_tokens = None
+
+    # ------------------------------------------------------------------
+    # Tensor helpers
+    # ------------------------------------------------------------------
+
+    def _pad_token_id(self) -> int:
+        pad_id = getattr(self.tokenizer, "pad_token_id", None)
+        if pad_id is None:
+            pad_id = self.tokenizer.eos_token_id
+        return int(pad_id or 0)
+
+    @staticmethod
+    def _position_ids(attention_mask: Any) -> Any:
+        positions = attention_mask.long().cumsum(-1) - 1
+        return positions.clamp(min=0)
+
+    def _sample(self, logits: Any, sequences: Sequence[_Sequence]) -> Any:
+        """Pick the next token for each row using that row's sampling params."""
+        import torch
+
+        logits = logits.float()
+        tokens = torch.empty(logits.shape[0], dtype=torch.long, device=logits.device)
+        for row, sequence in enumerate(sequences):
+            row_logits = logits[row]
+            if sequence.repetition_penalty and sequence.repetition_penalty != 1.0:
+                seen = torch.tensor(
+                    sequence.prompt_ids + sequence.generated,
+                    dtype=torch.long,
+                    device=logits.device,
+                )
+                scores = row_logits.index_select(0, seen)
+                scores = torch.where(
+                    scores < 0,
+                    scores * sequence.repetition_penalty,
+                    scores / sequence.repetition_penalty,
+                )
+                row_logits = row_logits.scatter(0, seen, scores)
+
+            if sequence.temperature <= 0.0:
+                tokens[row] = torch.argmax(row_logits)
+                continue
+
+            row_logits = row_logits / sequence.temperature
+            if sequence.top_k and sequence.top_k < row_logits.shape[-1]:
+                threshold = torch.topk(row_logits, sequence.top_k).values[-1]
+                row_logits = row_logits.masked_fill(
+                    row_logits < threshold, float("-inf")
+                )
+            if 0.0 < sequence.top_p < 1.0:
+                sorted_logits, sorted_index = torch.sort(row_logits, descending=True)
+                cumulative = torch.softmax(sorted_logits, dim=-1).cumsum(-1)
+                remove = cumulative > sequence.top_p
+                # Always keep the most likely token
+                remove[1:] = remove[:-1].clone()
+                remove[0] = False
+                row_logits = row_logits.scatter(
+                    0, sorted_index, sorted_logits.masked_fill(remove, float("-inf"))
+                )
+            probs = torch.softmax(row_logits, dim=-1)
+            tokens[row] = torch.multinomial(probs, 1)[0]
+        return tokens
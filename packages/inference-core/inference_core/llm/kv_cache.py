@@ -0,0 +1,256 @@
+"""
+KV cache utilities for HuggingFace causal LMs.
+
+Includes conversion between cache objects and legacy per-layer tuples, and a
+cross-request prefix cache that keeps attention key/value tensors for token
+prefixes shared between requests (system prompts, earlier chat turns) so only
+the new suffix needs to be prefilled.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LegacyCache = Tuple[Tuple[Any, Any], ...]
+
+
+def cache_to_legacy(past: Any) -> LegacyCache:
+    """Return past_key_values as a tuple of per-layer (key, value) tensors."""
+    if isinstance(past, tuple):
+        return past
+    to_legacy = getattr(past, "to_legacy_cache", None)
+    if to_legacy is not None:
+        return to_legacy()
+    layers = getattr(past, "layers", None)
+    if layers is not None:
+        return tuple((layer.keys, layer.values) for layer in layers)
+    raise TypeError(f"Unsupported past_key_values type: {type(past).__name__}")
+
+
+def legacy_to_cache(legacy: LegacyCache) -> Any:
+    """Wrap legacy per-layer tensors in the cache object the model expects."""
+    try:
+        from transformers import DynamicCache
+    except ImportError:
+        return legacy
+    from_legacy = getattr(DynamicCache, "from_legacy_cache", None)
+    if from_legacy is not None:
+        return from_legacy(legacy)
+    cache = DynamicCache()
+    for layer_idx, (key, value) in enumerate(legacy):
+        cache.update(key, value, layer_idx)
+    return cache
+
+
+@dataclass
+class _PrefixEntry:
+    """KV tensors for one cached token prefix."""
+
+    past: LegacyCache
+    num_tokens: int
+    size_bytes: int
+    block_hashes: List[bytes]
+
+
+class PrefixKVCache:
+    """LRU cache of KV tensors keyed by hashes of token-id prefixes.
+
+    Prompts are split into fixed-size token blocks and each block boundary gets a
+    chained hash (hash of the previous boundary plus the block's tokens), so a
+    lookup finds the longest cached block-aligned prefix in O(prompt blocks).
+    One stored entry serves every shorter prefix of itself; eviction is LRU,
+    bounded by the total size of the stored tensors.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 1024 * 1024 * 1024,
+        block_size: int = 16,
+        enable_cache: bool = True,
+    ):
+        """Initialize prefix cache.
+
+        Args:
+            max_bytes: Maximum total size of cached KV tensors
+            block_size: Token granularity of prefix matching
+            enable_cache: Whether caching is enabled
+        """
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.enable_cache = enable_cache
+        self._entries: OrderedDict[bytes, _PrefixEntry] = OrderedDict()
+        # Block-boundary hash -> (entry key, prefix length in tokens)
+        self._index: Dict[bytes, Tuple[bytes, int]] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._hit_tokens = 0
+        self._lookup_tokens = 0
+        self._evictions = 0
+
+    def _block_hashes(self, token_ids: Sequence[int]) -> List[bytes]:
+        """Chained hashes for each complete block of ``token_ids``."""
+        hashes = []
+        previous = b""
+        for end in range(self.block_size, len(token_ids) + 1, self.block_size):
+            block = array("q", token_ids[end - self.block_size : end]).tobytes()
+            previous = hashlib.blake2b(previous + block, digest_size=16).digest()
+            hashes.append(previous)
+        return hashes
+
+    @staticmethod
+    def _size_bytes(past: LegacyCache) -> int:
+        return sum(
+            key.numel() * key.element_size() + value.numel() * value.element_size()
+            for key, value in past
+        )
+
+    def lookup(
+        self, token_ids: Sequence[int], max_tokens: Optional[int] = None
+    ) -> Tuple[int, Optional[LegacyCache]]:
+        """Find the longest cached prefix of ``token_ids``.
+
+        Args:
+            token_ids: Prompt token ids
+            max_tokens: Upper bound on the reused prefix length (callers need at
+                least one uncached token to run the model on)
+
+        Returns:
+            (number of reused tokens, per-layer KV tensors sliced to that length),
+            or (0, None) on a miss
+        """
+        if not self.enable_cache:
+            return 0, None
+
+        limit = (
+            len(token_ids) if max_tokens is None else min(max_tokens, len(token_ids))
+        )
+        hashes = self._block_hashes(token_ids[:limit])
+
+        with self._lock:
+            self._lookup_tokens += len(token_ids)
+            for block_hash in reversed(hashes):
+                location = self._index.get(block_hash)
+                if location is None:
+                    continue
+                entry_key, length = location
+                entry = self._entries.get(entry_key)
+                if entry is None:
+                    continue
+                self._entries.move_to_end(entry_key)
+                self._hits += 1
+                self._hit_tokens += length
+                if length == entry.num_tokens:
+                    return length, entry.past
+                return length, tuple(
+                    (key[:, :, :length], value[:, :, :length])
+                    for key, value in entry.past
+                )
+            self._misses += 1
+            return 0, None
+
+    def insert(self, token_ids: Sequence[int], past: Any) -> None:
+        """Store KV tensors covering ``token_ids``.
+
+        Only the block-aligned part of the prefix is kept. ``past`` may be a
+        cache object or legacy tuple whose sequence length is at least
+        ``len(token_ids)``.
+        """
+        if not self.enable_cache:
+            return
+
+        hashes = self._block_hashes(token_ids)
+        if not hashes:
+            return
+        num_tokens = len(hashes) * self.block_size
+        entry_key = hashes[-1]
+
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                return
+
+        legacy = cache_to_legacy(past)
+        # Detach from the live generation cache so later appends do not leak in
+        trimmed = tuple(
+            (
+                key[:, :, :num_tokens].detach().clone(),
+                value[:, :, :num_tokens].detach().clone(),
+            )
+            for key, value in legacy
+        )
+        size_bytes = self._size_bytes(trimmed)
+        if size_bytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if entry_key in self._entries:
+                return
+            self._entries[entry_key] = _PrefixEntry(
+                past=trimmed,
+                num_tokens=num_tokens,
+                size_bytes=size_bytes,
+                block_hashes=hashes,
+            )
+            self._total_bytes += size_bytes
+            for position, block_hash in enumerate(hashes, start=1):
+                self._index[block_hash] = (entry_key, position * self.block_size)
+            while self._total_bytes > self.max_bytes and self._entries:
+                self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        entry_key, entry = self._entries.popitem(last=False)
+        self._total_bytes -= entry.size_bytes
+        self._evictions += 1
+        for block_hash in entry.block_hashes:
+            location = self._index.get(block_hash)
+            if location is not None and location[0] == entry_key:
+                del self._index[block_hash]
+
+    def clear(self) -> None:
+        """Clear all cache entries."""
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self._total_bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._hit_tokens = 0
+            self._lookup_tokens = 0
+            self._evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        total_lookups = self._hits + self._misses
+        return {
+            "enabled": self.enable_cache,
+            "entries": len(self._entries),
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "block_size": self.block_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate_percent": (
+                self._hits / total_lookups * 100 if total_lookups > 0 else 0.0
+            ),
+            "reused_tokens": self._hit_tokens,
+            "token_reuse_percent": (
+                self._hit_tokens / self._lookup_tokens * 100
+                if self._lookup_tokens > 0
+                else 0.0
+            ),
+            "evictions": self._evictions,
+        }
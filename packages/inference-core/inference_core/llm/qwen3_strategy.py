@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import logging
 import os
+import queue
 import re
+import threading
 import time
 from contextlib import contextmanager
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from ..config import config
 from ..strategies import InferenceRequest, InferenceResponse, LlmStrategy
 from ..utils.inference_cache import get_llm_cache
+from .batch_scheduler import ContinuousBatchScheduler
+from .kv_cache import PrefixKVCache, legacy_to_cache
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +56,8 @@ class Qwen3LlmStrategy(LlmStrategy):
         use_quantization: Optional[bool] = None,
         quantization_bits: Optional[int] = None,  # 4 or 8 bits
         use_kv_cache: Optional[bool] = None,
+        enable_batching: Optional[bool] = None,
+        max_batch_size: Optional[int] = None,
     ) -> None:
         """Initialize Qwen3 LLM strategy.
 
@@ -66,6 +72,10 @@ class Qwen3LlmStrategy(LlmStrategy):
             use_quantization: Whether to use quantization (defaults to True for CUDA)
             quantization_bits: Number of bits for quantization (4 or 8, defaults to 8 for better compatibility)
             use_kv_cache: Whether to use KV cache for faster inference (defaults to True)
+            enable_batching: Route requests through a continuous batching scheduler
+                (defaults to LLM_BATCHING_ENABLED, false)
+            max_batch_size: Maximum sequences decoded together when batching
+                (defaults to LLM_MAX_BATCH_SIZE, 8)
         """
         self.model_name = model_name or config.model.name
         self.device = device or config.model.device
@@ -105,9 +115,33 @@ class Qwen3LlmStrategy(LlmStrategy):
         if config.model.transformers_cache_dir:
             os.environ["TRANSFORMERS_CACHE"] = config.model.transformers_cache_dir
 
+        # Continuous batching (can be enabled via environment variable)
+        if enable_batching is None:
+            self.enable_batching = (
+                os.getenv("LLM_BATCHING_ENABLED", "false").lower() == "true"
+            )
+        else:
+            self.enable_batching = enable_batching
+        self.max_batch_size = max_batch_size or int(
+            os.getenv("LLM_MAX_BATCH_SIZE", "8")
+        )
+
         self._model = None
         self._tokenizer = None
-        self._past_key_values = None  # For KV cache
+        self._scheduler: Optional[ContinuousBatchScheduler] = None
+
+        # Cross-request prefix KV cache (system prompts, earlier chat turns)
+        prefix_cache_enabled = (
+            self.use_kv_cache
+            and os.getenv("LLM_PREFIX_CACHE_ENABLED", "true").lower() == "true"
+        )
+        self._prefix_cache = PrefixKVCache(
+            max_bytes=int(
+                float(os.getenv("LLM_PREFIX_CACHE_MAX_MB", "1024")) * 1024**2
+            ),
+            block_size=int(os.getenv("LLM_PREFIX_CACHE_BLOCK_SIZE", "16")),
+            enable_cache=prefix_cache_enabled,
+        )
 
         # Initialize inference cache (can be disabled via environment variable)
         cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
@@ -497,6 +531,15 @@ class Qwen3LlmStrategy(LlmStrategy):
                 except Exception as e:
                     logger.debug(f"Could not get GPU memory stats: {e}")
 
+            if self.enable_batching:
+                self._scheduler = ContinuousBatchScheduler(
+                    self._model,
+                    self._tokenizer,
+                    device=self.device,
+                    max_batch_size=self.max_batch_size,
+                )
+                self._scheduler.start()
+
             logger.info("Qwen3 model loaded and initialized successfully")
 
         except ImportError as e:
@@ -512,6 +555,96 @@ class Qwen3LlmStrategy(LlmStrategy):
             logger.error("Failed to load Qwen3 model: %s", e, exc_info=True)
             raise
 
+    @staticmethod
+    def _parse_request(
+        request: InferenceRequest | Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Extract (prompt, params) from an InferenceRequest or plain dict."""
+        if isinstance(request, dict):
+            return request.get("prompt", ""), request.get("params", {})
+        payload = request.payload
+        if isinstance(payload, dict):
+            return payload.get("prompt", ""), payload.get("params", {})
+        return str(payload), {}
+
+    def _build_generation_kwargs(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate request params into ``model.generate`` keyword arguments."""
+        temperature = params.get("temperature", 0.7)
+        top_k = params.get("top_k", None)
+        repetition_penalty = params.get("repetition_penalty", None)
+
+        generation_kwargs = {
+            "max_new_tokens": params.get("max_tokens", 2048),
+            "temperature": temperature,
+            "top_p": params.get("top_p", 0.9),
+            "do_sample": temperature > 0.0,
+            "pad_token_id": self._tokenizer.eos_token_id,
+        }
+
+        # Add optional parameters if provided
+        if top_k is not None and top_k > 0:
+            generation_kwargs["top_k"] = int(top_k)
+
+        if repetition_penalty is not None and repetition_penalty > 0:
+            generation_kwargs["repetition_penalty"] = repetition_penalty
+
+        # Enable KV cache for faster inference (reuses computed key-value pairs)
+        if self.use_kv_cache:
+            generation_kwargs["use_cache"] = True
+
+        return generation_kwargs
+
+    def _attach_prefix_cache(
+        self, input_ids: Any, generation_kwargs: Dict[str, Any]
+    ) -> int:
+        """Seed generation with cached KV tensors for the longest known prompt prefix.
+
+        Returns:
+            Number of prompt tokens whose prefill is skipped
+        """
+        if not self._prefix_cache.enable_cache:
+            return 0
+        # Needed to get the final past_key_values back from generate()
+        generation_kwargs["return_dict_in_generate"] = True
+        token_ids = input_ids[0].tolist()
+        # generate() must run the model on at least one prompt token
+        reused_tokens, past = self._prefix_cache.lookup(
+            token_ids, max_tokens=len(token_ids) - 1
+        )
+        if past is not None:
+            generation_kwargs["past_key_values"] = legacy_to_cache(past)
+        return reused_tokens
+
+    def _store_prefix_cache(self, outputs: Any) -> Any:
+        """Remember the KV cache of a finished generation for later requests.
+
+        Returns:
+            The generated token sequences (batch, seq_len)
+        """
+        sequences = getattr(outputs, "sequences", None)
+        if sequences is None:
+            return outputs
+        past = getattr(outputs, "past_key_values", None)
+        if past is not None:
+            # The cache covers every token except the last one generated
+            self._prefix_cache.insert(sequences[0][:-1].tolist(), past)
+        return sequences
+
+    @staticmethod
+    def _get_timeout_seconds(
+        request: InferenceRequest | Dict[str, Any], params: Dict[str, Any]
+    ) -> float:
+        """Resolve the inference timeout from params, request metadata or config."""
+        timeout_seconds = params.get(
+            "timeout",
+            config.model.get("inference_timeout", 300)
+            if hasattr(config.model, "get")
+            else 300,
+        )
+        if isinstance(request, InferenceRequest) and request.metadata:
+            timeout_seconds = request.metadata.get("timeout_seconds", timeout_seconds)
+        return timeout_seconds
+
     def infer(self, request: InferenceRequest | Dict[str, Any]) -> InferenceResponse:
         """Generate text using the Qwen3 model."""
         if self._model is None or self._tokenizer is None:
@@ -520,18 +653,7 @@ class Qwen3LlmStrategy(LlmStrategy):
         try:
             import torch
 
-            # Parse request
-            if isinstance(request, dict):
-                prompt = request.get("prompt", "")
-                params = request.get("params", {})
-            else:
-                payload = request.payload
-                if isinstance(payload, dict):
-                    prompt = payload.get("prompt", "")
-                    params = payload.get("params", {})
-                else:
-                    prompt = str(payload)
-                    params = {}
+            prompt, params = self._parse_request(request)
 
             # Extract generation parameters
             temperature = params.get("temperature", 0.7)
@@ -565,49 +687,23 @@ class Qwen3LlmStrategy(LlmStrategy):
                         },
                     )
 
+            if self._scheduler is not None:
+                return self._infer_batched(prompt, params, cache_key)
+
             # Tokenize input
             inputs = self._tokenizer(prompt, return_tensors="pt").to(self.device)
 
             # Prepare generation kwargs
-            generation_kwargs = {
-                "max_new_tokens": max_tokens,
-                "temperature": temperature,
-                "top_p": top_p,
-                "do_sample": temperature > 0.0,
-                "pad_token_id": self._tokenizer.eos_token_id,
-            }
-
-            # Add optional parameters if provided
-            if top_k is not None and top_k > 0:
-                generation_kwargs["top_k"] = int(top_k)
-
-            if repetition_penalty is not None and repetition_penalty > 0:
-                generation_kwargs["repetition_penalty"] = repetition_penalty
-
-            # Enable KV cache for faster inference (reuses computed key-value pairs)
-            if self.use_kv_cache:
-                generation_kwargs["use_cache"] = True
-                # If we have past_key_values from previous generation, use them
-                if self._past_key_values is not None:
-                    # Note: past_key_values usage requires careful handling of input_ids
-                    # For now, we'll use use_cache=True which enables KV cache within a single generation
-                    # Full past_key_values reuse would require tracking conversation state
-                    pass
+            generation_kwargs = self._build_generation_kwargs(params)
+            reused_tokens = self._attach_prefix_cache(
+                inputs.input_ids, generation_kwargs
+            )
 
             # Measure inference performance
             inference_start_time = time.time()
 
             # Get timeout from config or request metadata (default: 300 seconds = 5 minutes)
-            timeout_seconds = params.get(
-                "timeout",
-                config.model.get("inference_timeout", 300)
-                if hasattr(config.model, "get")
-                else 300,
-            )
-            if isinstance(request, InferenceRequest) and request.metadata:
-                timeout_seconds = request.metadata.get(
-                    "timeout_seconds", timeout_seconds
-                )
+            timeout_seconds = self._get_timeout_seconds(request, params)
 
             # Generate with timeout and OOM handling
             try:
@@ -623,9 +719,8 @@ class Qwen3LlmStrategy(LlmStrategy):
                             inputs.input_ids, **generation_kwargs
                         )
 
-                    # Store past_key_values for potential reuse in future calls
-                    # Note: This requires the model to return past_key_values in outputs
-                    # For now, we enable use_cache which improves performance within a single generation
+                    # Store past_key_values for reuse by requests sharing this prefix
+                    outputs = self._store_prefix_cache(outputs)
             except TimeoutError as e:
                 logger.error(f"Inference timeout after {timeout_seconds}s: {e}")
                 # Clear CUDA cache if available
@@ -680,10 +775,11 @@ class Qwen3LlmStrategy(LlmStrategy):
 
             # Log performance metrics
             logger.info(
-                "Qwen3 inference performance: %.2f tokens/s (%.2fs total, %d input tokens, %d output tokens, KV cache: %s)",
+                "Qwen3 inference performance: %.2f tokens/s (%.2fs total, %d input tokens (%d from prefix cache), %d output tokens, KV cache: %s)",
                 tokens_per_second,
                 total_duration,
                 input_tokens,
+                reused_tokens,
                 output_tokens,
                 "enabled"
                 if self.use_kv_cache and generation_kwargs.get("use_cache")
@@ -713,6 +809,7 @@ class Qwen3LlmStrategy(LlmStrategy):
                     "tokens_per_second": tokens_per_second,
                     "kv_cache_enabled": self.use_kv_cache
                     and generation_kwargs.get("use_cache", False),
+                    "prefix_cache_tokens": reused_tokens,
                 },
             )
 
@@ -730,3 +827,159 @@ class Qwen3LlmStrategy(LlmStrategy):
             except Exception:
                 pass
             raise RuntimeError(f"Generation failed: {e}") from e
+
+    def _infer_batched(
+        self,
+        prompt: str,
+        params: Dict[str, Any],
+        cache_key: Optional[Dict[str, Any]],
+    ) -> InferenceResponse:
+        """Run a request through the continuous batching scheduler."""
+        start_time = time.time()
+        generation = self._scheduler.submit(prompt, params)
+        generated_text = generation.text().strip()
+        total_duration = time.time() - start_time
+        output_tokens = generation.output_tokens
+        tokens_per_second = (
+            output_tokens / total_duration if total_duration > 0 else 0.0
+        )
+
+        if cache_key is not None:
+            self._cache.put(
+                cache_key,
+                {
+                    "text": generated_text,
+                    "tokens": output_tokens,
+                    "input_tokens": generation.input_tokens,
+                },
+                model_name=self.model_name,
+            )
+
+        return InferenceResponse(
+            payload={"text": generated_text, "tokens": output_tokens},
+            metadata={
+                "input_tokens": generation.input_tokens,
+                "output_tokens": output_tokens,
+                "cached": False,
+                "batched": True,
+                "finish_reason": generation.finish_reason,
+                "time_to_first_token_seconds": generation.time_to_first_token,
+                "total_duration_seconds": total_duration,
+                "tokens_per_second": tokens_per_second,
+                "kv_cache_enabled": True,
+            },
+        )
+
+    def infer_stream(
+        self,
+        request: InferenceRequest | Dict[str, Any],
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[str]:
+        """Generate text with Qwen3, yielding decoded text deltas as they are produced.
+
+        ``model.generate`` runs on a background thread and feeds a
+        ``TextIteratorStreamer``; this generator forwards each delta to the caller.
+        Setting ``cancel`` or closing the generator early (e.g. the gRPC client
+        disconnected) stops generation at the next decoding step.
+        """
+        if self._model is None or self._tokenizer is None:
+            raise RuntimeError("Model not loaded. Call warmup() first.")
+
+        try:
+            import torch
+            from transformers import (
+                StoppingCriteria,
+                StoppingCriteriaList,
+                TextIteratorStreamer,
+            )
+        except ImportError as e:
+            raise RuntimeError(
+                "transformers and torch are required for Qwen3 model. "
+                "Install with: pip install transformers torch"
+            ) from e
+
+        prompt, params = self._parse_request(request)
+        if self._scheduler is not None:
+            yield from self._scheduler.submit(prompt, params, cancel=cancel)
+            return
+
+        generation_kwargs = self._build_generation_kwargs(params)
+        timeout_seconds = self._get_timeout_seconds(request, params)
+
+        inputs = self._tokenizer(prompt, return_tensors="pt").to(self.device)
+        self._attach_prefix_cache(inputs.input_ids, generation_kwargs)
+        streamer = TextIteratorStreamer(
+            self._tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+            timeout=timeout_seconds if 0 < timeout_seconds < 3600 else None,
+        )
+        cancelled = cancel if cancel is not None else threading.Event()
+
+        class _CancelCriteria(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs) -> bool:
+                return cancelled.is_set()
+
+        generation_kwargs["streamer"] = streamer
+        generation_kwargs["stopping_criteria"] = StoppingCriteriaList(
+            [_CancelCriteria()]
+        )
+        errors: list[BaseException] = []
+
+        def _generate() -> None:
+            try:
+                with torch.no_grad():
+                    outputs = self._model.generate(
+                        inputs.input_ids, **generation_kwargs
+                    )
+                self._store_prefix_cache(outputs)
+            except BaseException as e:  # surfaced to the consumer below
+                errors.append(e)
+                streamer.end()
+
+        inference_start_time = time.time()
+        first_token_time: Optional[float] = None
+        delta_count = 0
+        worker = threading.Thread(target=_generate, name="qwen3-stream", daemon=True)
+        worker.start()
+
+        try:
+            for delta in streamer:
+                if not delta:
+                    continue
+                if first_token_time is None:
+                    first_token_time = time.time() - inference_start_time
+                delta_count += 1
+                yield delta
+        except queue.Empty as e:
+            # The streamer timed out waiting for the next token
+            raise RuntimeError(
+                f"Inference timed out after {timeout_seconds} seconds. Try reducing max_tokens or increasing timeout."
+            ) from e
+        finally:
+            cancelled.set()
+            worker.join(timeout=5.0)
+
+        if errors:
+            error = errors[0]
+            error_msg = str(error).lower()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            if "out of memory" in error_msg or "oom" in error_msg:
+                raise RuntimeError(
+                    f"Out of memory error during inference. "
+                    f"Try reducing max_tokens (current: {generation_kwargs['max_new_tokens']}), "
+                    f"input length, or enable quantization."
+                ) from error
+            raise RuntimeError(f"Generation failed: {error}") from error
+
+        logger.info(
+            "Qwen3 streaming inference: first token after %.2fs, %d deltas in %.2fs",
+            first_token_time or 0.0,
+            delta_count,
+            time.time() - inference_start_time,
+        )
+
+    def get_prefix_cache_stats(self) -> Dict[str, Any]:
+        """Get prefix KV cache statistics (hits, misses, reused tokens, size)."""
+        return self._prefix_cache.get_stats()
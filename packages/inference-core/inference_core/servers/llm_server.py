@@ -112,34 +112,37 @@ class _LlmServicer(llm_pb2_grpc.LLMInferenceServicer):
     def GenerateStream(
         self, request: llm_pb2.GenerationRequest, context
     ) -> Iterator[llm_pb2.GenerationChunk]:
-        """Streaming text generation."""
+        """Streaming text generation.
+
+        Forwards text deltas from ``strategy.infer_stream`` as they are produced,
+        followed by an empty final chunk.
+        """
         try:
             params = _extract_generation_params(request.params)
-            result = self._strategy.infer(
+            deltas = self._strategy.infer_stream(
                 InferenceRequest(
                     payload={"prompt": request.prompt, "params": params}, metadata={}
                 )
             )
 
-            # Extract response
-            if isinstance(result.payload, dict):
-                text = result.payload.get("text", "")
-            else:
-                text = str(result.payload)
-
-            # Stream text in chunks (simplified - split by words)
-            tokens = text.split()
-            for i, token in enumerate(tokens):
-                is_final = i == len(tokens) - 1
-                chunk = llm_pb2.GenerationChunk(
-                    token=token + (" " if not is_final else ""),
-                    is_final=is_final,
-                    index=i,
-                    finish_reason=llm_pb2.FinishReason.STOP
-                    if is_final
-                    else llm_pb2.FinishReason.STOP,
+            index = 0
+            for delta in deltas:
+                if not delta:
+                    continue
+                yield llm_pb2.GenerationChunk(
+                    token=delta,
+                    is_final=False,
+                    index=index,
+                    finish_reason=llm_pb2.FinishReason.STOP,
                 )
-                yield chunk
+                index += 1
+
+            yield llm_pb2.GenerationChunk(
+                token="",
+                is_final=True,
+                index=index,
+                finish_reason=llm_pb2.FinishReason.STOP,
+            )
 
         except Exception as e:
             logger.error(f"Generation stream error: {e}", exc_info=True)
@@ -200,7 +203,11 @@ class _LlmServicer(llm_pb2_grpc.LLMInferenceServicer):
     def ChatStream(
         self, request: llm_pb2.ChatRequest, context
     ) -> Iterator[llm_pb2.ChatChunk]:
-        """Streaming chat with conversation history."""
+        """Streaming chat with conversation history.
+
+        Forwards text deltas from ``strategy.infer_stream`` as they are produced,
+        followed by an empty final chunk.
+        """
         try:
             # Format messages into prompt
             formatted_prompt = _format_chat_messages(request.messages)
@@ -208,32 +215,33 @@ class _LlmServicer(llm_pb2_grpc.LLMInferenceServicer):
             # Extract parameters
             params = _extract_generation_params(request.params)
 
-            # Generate response
-            result = self._strategy.infer(
+            deltas = self._strategy.infer_stream(
                 InferenceRequest(
                     payload={"prompt": formatted_prompt, "params": params}, metadata={}
                 )
             )
 
-            # Extract response text
-            if isinstance(result.payload, dict):
-                text = result.payload.get("text", "").strip()
-            else:
-                text = str(result.payload).strip()
-
-            # Stream text in chunks (simplified - split by words)
-            tokens = text.split()
-            for i, token in enumerate(tokens):
-                is_final = i == len(tokens) - 1
-                chunk = llm_pb2.ChatChunk(
-                    content_delta=token + (" " if not is_final else ""),
+            started = False
+            for delta in deltas:
+                # Match Chat(), which strips leading whitespace from the response
+                if not started:
+                    delta = delta.lstrip()
+                if not delta:
+                    continue
+                started = True
+                yield llm_pb2.ChatChunk(
+                    content_delta=delta,
                     role="assistant",
-                    is_final=is_final,
-                    finish_reason=llm_pb2.FinishReason.STOP
-                    if is_final
-                    else llm_pb2.FinishReason.STOP,
+                    is_final=False,
+                    finish_reason=llm_pb2.FinishReason.STOP,
                 )
-                yield chunk
+
+            yield llm_pb2.ChatChunk(
+                content_delta="",
+                role="assistant",
+                is_final=True,
+                finish_reason=llm_pb2.FinishReason.STOP,
+            )
 
         except Exception as e:
             logger.error(f"Chat stream error: {e}", exc_info=True)
@@ -257,7 +265,10 @@ class LlmGrpcApp:
         self.strategy.warmup()
 
     def run(self) -> None:
-        server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+        # Each in-flight RPC holds a worker, so this also caps how many requests
+        # the batching scheduler can decode together
+        max_workers = int(os.getenv("LLM_GRPC_MAX_WORKERS", "8"))
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
         llm_pb2_grpc.add_LLMInferenceServicer_to_server(
             _LlmServicer(self.strategy), server
         )
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import logging
 import os
-from typing import Optional
+import re
+import time
+from typing import AsyncIterator, List, Optional, Tuple
 
 import grpc
 from grpc import aio
@@ -35,10 +38,50 @@ except (ImportError, Exception) as e:
     tracer = None
 
 
+# Sentence/clause end followed by whitespace; text is synthesized segment by
+# segment so audio for the first sentence can be sent while later text arrives
+_SEGMENT_BOUNDARY = re.compile(r"[.!?;:\n]+[\"')\]]*\s+")
+_MIN_SEGMENT_CHARS = 16
+
+
+def _split_segments(buffer: str) -> Tuple[List[str], str]:
+    """Split complete segments off the front of ``buffer``.
+
+    Returns:
+        (complete segments, remaining text)
+    """
+    segments = []
+    start = 0
+    for match in _SEGMENT_BOUNDARY.finditer(buffer):
+        if len(buffer[start : match.start()].strip()) < _MIN_SEGMENT_CHARS:
+            continue
+        segments.append(buffer[start : match.end()].strip())
+        start = match.end()
+    return segments, buffer[start:]
+
+
 class _TtsServicer(tts_pb2_grpc.TextToSpeechServicer):
-    def __init__(self, strategy: TtsStrategy) -> None:
+    def __init__(
+        self,
+        strategy: TtsStrategy,
+        chunk_ms: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
         self._strategy = strategy
         self._sample_rate = 16000
+        self._chunk_ms = chunk_ms or int(os.getenv("TTS_STREAM_CHUNK_MS", "200"))
+        # Synthesis is blocking (espeak subprocess, model inference); run it on a
+        # bounded pool so the grpc.aio event loop keeps serving other requests
+        self._max_workers = max_workers or int(
+            os.getenv("TTS_MAX_WORKERS", str(min(8, os.cpu_count() or 1)))
+        )
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="tts-synth"
+        )
+
+    async def _infer(self, request: InferenceRequest):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._strategy.infer, request)
 
     async def Synthesize(
         self, request: tts_pb2.SynthesisRequest, context: aio.ServicerContext
@@ -53,7 +96,7 @@ class _TtsServicer(tts_pb2_grpc.TextToSpeechServicer):
                 span.set_attribute("tts.language", request.language)
 
         try:
-            result = self._strategy.infer(
+            result = await self._infer(
                 InferenceRequest(
                     payload=request.text,
                     metadata={
@@ -95,6 +138,117 @@ class _TtsServicer(tts_pb2_grpc.TextToSpeechServicer):
             if span:
                 span.end()
 
+    async def SynthesizeStream(
+        self,
+        request_iterator: AsyncIterator[tts_pb2.SynthesisRequest],
+        context: aio.ServicerContext,
+    ) -> AsyncIterator[tts_pb2.AudioChunk]:
+        """Synthesize incrementally arriving text into a stream of PCM chunks.
+
+        Text from the request stream is cut into sentence/clause segments; each
+        segment is synthesized on the worker pool as soon as it is complete
+        (while more text may still be arriving) and its audio is emitted as pcm16 chunks of
+        TTS_STREAM_CHUNK_MS. voice_id/language come from the first request that
+        sets them. A final empty chunk with is_final=True ends the stream.
+        """
+        span = None
+        if tracer is not None:
+            span = tracer.start_span("tts.synthesize_stream")
+
+        segments: asyncio.Queue = asyncio.Queue()
+        options = {"voice_id": "", "language": ""}
+
+        async def read_requests() -> None:
+            buffer = ""
+            try:
+                async for request in request_iterator:
+                    options["voice_id"] = options["voice_id"] or request.voice_id
+                    options["language"] = options["language"] or request.language
+                    buffer += request.text
+                    complete, buffer = _split_segments(buffer)
+                    for segment in complete:
+                        await segments.put(segment)
+                if buffer.strip():
+                    await segments.put(buffer.strip())
+            finally:
+                await segments.put(None)
+
+        reader = asyncio.create_task(read_requests())
+        sample_rate = self._sample_rate
+        samples_sent = 0
+        segment_count = 0
+        total_bytes = 0
+        start_time = time.time()
+        try:
+            while True:
+                segment = await segments.get()
+                if segment is None:
+                    break
+                result = await self._infer(
+                    InferenceRequest(
+                        payload=segment,
+                        metadata={
+                            "voice_id": options["voice_id"],
+                            "language": options["language"],
+                        },
+                    )
+                )
+                audio_bytes = (
+                    result.payload
+                    if isinstance(result.payload, bytes)
+                    else bytes(result.payload)
+                )
+                sample_rate = result.metadata.get("sample_rate", self._sample_rate)
+                segment_count += 1
+                total_bytes += len(audio_bytes)
+                if span and segment_count == 1:
+                    span.set_attribute(
+                        "tts.time_to_first_audio_ms",
+                        int((time.time() - start_time) * 1000),
+                    )
+
+                # pcm16 mono: keep chunk boundaries on whole samples
+                chunk_bytes = max(2, sample_rate * self._chunk_ms // 1000 * 2)
+                for offset in range(0, len(audio_bytes), chunk_bytes):
+                    chunk = audio_bytes[offset : offset + chunk_bytes]
+                    yield tts_pb2.AudioChunk(
+                        audio_data=chunk,
+                        sample_rate=sample_rate,
+                        channels=1,
+                        encoding="pcm16",
+                        is_final=False,
+                        timestamp_us=samples_sent * 1_000_000 // sample_rate,
+                    )
+                    samples_sent += len(chunk) // 2
+
+            # Surface errors from the request stream
+            await reader
+
+            if span:
+                span.set_attribute("tts.segment_count", segment_count)
+                span.set_attribute("tts.audio_size_bytes", total_bytes)
+                span.set_status(trace.Status(trace.StatusCode.OK))
+
+            yield tts_pb2.AudioChunk(
+                audio_data=b"",
+                sample_rate=sample_rate,
+                channels=1,
+                encoding="pcm16",
+                is_final=True,
+                timestamp_us=samples_sent * 1_000_000 // sample_rate,
+            )
+        except Exception as e:
+            logger.error(f"TTS streaming synthesis error: {e}", exc_info=True)
+            if span:
+                span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+                span.record_exception(e)
+            raise
+        finally:
+            if not reader.done():
+                reader.cancel()
+            if span:
+                span.end()
+
     async def HealthCheck(
         self, request: tts_pb2.HealthRequest, context: aio.ServicerContext
     ) -> tts_pb2.HealthResponse:
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 
 
 @dataclass
@@ -49,3 +50,24 @@ class LlmStrategy(InferenceStrategy, ABC):
     Input payload: dict {prompt: str, params: dict}
     Output payload: dict {text: str, tokens: Optional[int]}
     """
+
+    def infer_stream(
+        self, request: InferenceRequest, cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        """Generate text incrementally, yielding text deltas as they are produced.
+
+        The default implementation runs ``infer`` to completion and yields the
+        whole text as a single delta. Strategies backed by a real decoder should
+        override this so callers see the first token as soon as it is generated.
+
+        Setting ``cancel`` stops generation and ends the iterator. Unlike
+        closing the generator, it is safe while another thread is blocked in
+        ``next()`` waiting for the next delta.
+        """
+        result = self.infer(request)
+        if isinstance(result.payload, dict):
+            text = result.payload.get("text", "")
+        else:
+            text = str(result.payload)
+        if text and not (cancel is not None and cancel.is_set()):
+            yield text
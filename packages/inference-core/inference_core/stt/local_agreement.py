@@ -0,0 +1,147 @@
+"""
+Local-agreement policy for streaming Whisper transcription.
+
+The audio that has not been committed yet is re-decoded as new audio arrives.
+Words on which two consecutive hypotheses agree (their longest common prefix)
+are committed and never re-decoded; the committed text is passed back to
+Whisper as ``initial_prompt`` so the next window keeps its context. Callers
+drop audio up to the end of the last committed word, so each decode only
+covers the unstable tail and its cost stays bounded on long messages.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Tolerance for Whisper word timestamps when dropping already committed words
+_TIMESTAMP_SLACK_SECONDS = 0.1
+# Longest word n-gram checked when removing re-decoded committed words
+_MAX_OVERLAP_WORDS = 5
+
+_NORMALIZE = re.compile(r"[^\w']+")
+
+
+@dataclass
+class Word:
+    """Word with absolute timestamps (seconds from the start of the stream)."""
+
+    text: str
+    start: float
+    end: float
+    probability: float = 1.0
+
+    @property
+    def key(self) -> str:
+        """Normalized form used to compare hypotheses."""
+        return _NORMALIZE.sub("", self.text).lower()
+
+
+def join_words(words: List[Word]) -> str:
+    """Join Whisper words (which carry their own leading spaces) into text."""
+    return "".join(word.text for word in words).strip()
+
+
+class LocalAgreement:
+    """Commits the stable prefix of consecutive streaming hypotheses."""
+
+    def __init__(self, prompt_chars: int = 200):
+        """Initialize policy.
+
+        Args:
+            prompt_chars: Maximum length of committed text used as the prompt
+                (Whisper only keeps the last ~224 prompt tokens)
+        """
+        self.prompt_chars = prompt_chars
+        self.committed: List[Word] = []
+        self.tentative: List[Word] = []
+
+    @property
+    def committed_end(self) -> float:
+        """End of the last committed word in seconds (0 before any commit)."""
+        return self.committed[-1].end if self.committed else 0.0
+
+    @property
+    def committed_text(self) -> str:
+        """Text of the committed words."""
+        return join_words(self.committed)
+
+    @property
+    def text(self) -> str:
+        """Committed text followed by the current tentative words."""
+        return join_words(self.committed + self.tentative)
+
+    @property
+    def prompt(self) -> Optional[str]:
+        """Tail of the committed text to pass as ``initial_prompt``."""
+        text = self.committed_text
+        if not text:
+            return None
+        if len(text) > self.prompt_chars:
+            text = text[-self.prompt_chars :]
+            # Do not start the prompt in the middle of a word
+            text = text.split(" ", 1)[-1]
+        return text
+
+    def update(self, words: List[Word]) -> List[Word]:
+        """Add a new hypothesis for the uncommitted audio.
+
+        Args:
+            words: Words decoded from the current window (absolute timestamps)
+
+        Returns:
+            Words committed by this update, in order
+        """
+        hypothesis = self._new_words(words)
+        agreed = 0
+        for previous, current in zip(self.tentative, hypothesis):
+            if previous.key != current.key:
+                break
+            agreed += 1
+        newly_committed = hypothesis[:agreed]
+        self.committed.extend(newly_committed)
+        self.tentative = hypothesis[agreed:]
+        return newly_committed
+
+    def commit_tentative(self) -> List[Word]:
+        """Commit the current tentative words (e.g. when the window is too long).
+
+        Returns:
+            Words committed by this call
+        """
+        newly_committed = self.tentative
+        self.committed.extend(newly_committed)
+        self.tentative = []
+        return newly_committed
+
+    def finish(self, words: Optional[List[Word]] = None) -> List[Word]:
+        """Commit the final hypothesis at the end of the stream.
+
+        Args:
+            words: Final decode of the uncommitted audio; if None the last
+                tentative words are committed as they are
+
+        Returns:
+            Words committed by this call
+        """
+        if words is not None:
+            self.tentative = self._new_words(words)
+        return self.commit_tentative()
+
+    def _new_words(self, words: List[Word]) -> List[Word]:
+        """Drop words of a hypothesis that repeat already committed words."""
+        cutoff = self.committed_end - _TIMESTAMP_SLACK_SECONDS
+        words = [word for word in words if word.start >= cutoff]
+        if not self.committed or not words:
+            return words
+        if words[0].start - self.committed_end > 1.0:
+            # Far from the commit point: a repeat is real speech, not overlap
+            return words
+
+        # Window boundaries are not word aligned, so the first words of the
+        # hypothesis can re-decode the last committed ones
+        committed_keys = [word.key for word in self.committed[-_MAX_OVERLAP_WORDS:]]
+        for n in range(min(len(committed_keys), len(words)), 0, -1):
+            if committed_keys[-n:] == [word.key for word in words[:n]]:
+                return words[n:]
+        return words
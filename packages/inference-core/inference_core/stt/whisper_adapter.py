@@ -18,6 +18,7 @@ class WhisperModelAdapter(ABC):
         language: str = "en",
         task: str = "transcribe",
         initial_prompt: str | None = None,
+        word_timestamps: bool = False,
     ) -> Dict[str, Any]:
         """Transcribe audio to text.
 
@@ -26,7 +27,9 @@ class WhisperModelAdapter(ABC):
             fp16: Whether to use fp16 precision
             language: Language code (e.g., "en")
             task: "transcribe" or "translate"
-            initial_prompt: Optional prompt to guide transcription
+            initial_prompt: Optional prompt to guide transcription (e.g. the
+                text already committed by a streaming decoder)
+            word_timestamps: Include per-word timings in result["segments"]
 
         Returns:
             Dict with 'text' key containing transcript
@@ -73,9 +76,12 @@ class WhisperModelImpl(WhisperModelAdapter):
         language: str = "en",
         task: str = "transcribe",
         initial_prompt: str | None = None,
+        word_timestamps: bool = False,
     ) -> Dict[str, Any]:
         """Transcribe audio using Whisper model."""
         kwargs = {"fp16": fp16, "language": language, "task": task}
         if initial_prompt:
             kwargs["initial_prompt"] = initial_prompt
+        if word_timestamps:
+            kwargs["word_timestamps"] = True
         return self._model.transcribe(audio, **kwargs)
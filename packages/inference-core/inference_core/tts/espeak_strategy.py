@@ -1,19 +1,55 @@
 from __future__ import annotations
 
 import logging
-import os
+import struct
 import subprocess
-import tempfile
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 import numpy as np
-import soundfile as sf
 
 from ..strategies import InferenceRequest, InferenceResponse, TtsStrategy
 
 logger = logging.getLogger(__name__)
 
 
+def _decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode PCM WAV bytes into float samples in [-1, 1].
+
+    espeak's --stdout output is written as a stream, so the RIFF/data chunk
+    sizes in its header are placeholders; the data chunk is read up to the
+    end of the buffer instead of trusting the declared length.
+
+    Returns:
+        (samples, sample_rate); samples are shaped (frames, channels) for
+        multi-channel audio
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("espeak output is not a WAV stream")
+
+    offset = 12
+    channels, sample_rate, bits = 1, 0, 16
+    while offset + 8 <= len(data):
+        chunk_id = data[offset : offset + 4]
+        (chunk_size,) = struct.unpack("<I", data[offset + 4 : offset + 8])
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            _, channels, sample_rate, _, _, bits = struct.unpack(
+                "<HHIIHH", data[body : body + 16]
+            )
+        elif chunk_id == b"data":
+            if bits != 16:
+                raise ValueError(f"Unsupported WAV sample width: {bits} bits")
+            payload = data[body : body + chunk_size]
+            payload = payload[: len(payload) - len(payload) % (2 * channels)]
+            samples = np.frombuffer(payload, dtype="<i2").astype(np.float32) / 32768.0
+            if channels > 1:
+                samples = samples.reshape(-1, channels)
+            return samples, sample_rate
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV stream has no data chunk")
+
+
 class EspeakTtsStrategy(TtsStrategy):
     def __init__(self, sample_rate: int = 16000) -> None:
         self.sample_rate = sample_rate
@@ -65,13 +101,9 @@ class EspeakTtsStrategy(TtsStrategy):
             gap = "10"
 
         try:
-            # Create temp file path (don't create file, espeak will create it)
-            fd, temp_path = tempfile.mkstemp(suffix=".wav")
-            os.close(fd)  # Close file descriptor, espeak will create the file
-
             # espeak syntax: espeak [options] text
             # -s: speed in words per minute (slower = clearer for STT)
-            # -w: output WAV file
+            # --stdout: write WAV to stdout (no temp file / disk round trip)
             # -v: voice (en+f3 = English female voice 3, clearer)
             # -a: amplitude (150-180, higher = clearer but may distort)
             # -g: gap between words (10-15ms, helps STT separation)
@@ -90,30 +122,20 @@ class EspeakTtsStrategy(TtsStrategy):
                 "50",
                 "-v",
                 "en+f3",
-                "-w",
-                temp_path,
+                "--stdout",
                 text,
             ]
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL
-            )
+            result = subprocess.run(cmd, capture_output=True, stdin=subprocess.DEVNULL)
             if result.returncode != 0:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                raise Exception(f"espeak failed: {result.stderr}")
-
-            # Wait a moment for file to be written
-            import time
-
-            time.sleep(0.1)
+                stderr = result.stderr
+                if isinstance(stderr, bytes):
+                    stderr = stderr.decode(errors="replace")
+                raise Exception(f"espeak failed: {stderr}")
 
-            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                raise Exception("espeak did not create output file or file is empty")
+            if not result.stdout:
+                raise Exception("espeak produced no output")
 
-            audio_data, sr = sf.read(temp_path)
-            os.unlink(temp_path)
+            audio_data, sr = _decode_wav(result.stdout)
 
             # Check if audio data is empty
             if len(audio_data) == 0:
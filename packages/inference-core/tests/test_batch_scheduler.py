@@ -0,0 +1,196 @@
+"""Tests for the continuous batching scheduler using a tiny randomly initialized model."""
+import threading
+import time
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from inference_core.llm.batch_scheduler import (  # noqa: E402
+    ContinuousBatchScheduler,
+    SchedulerQueueFull,
+)
+
+VOCAB_SIZE = 100
+EOS_ID = 0
+PAD_ID = 1
+
+
+class CharTokenizer:
+    """Minimal reversible tokenizer so tests do not need to download a vocabulary."""
+
+    eos_token_id = EOS_ID
+    pad_token_id = PAD_ID
+
+    def __call__(self, text, return_tensors=None):
+        return {"input_ids": [3 + (ord(c) % 90) for c in text]}
+
+    def decode(self, ids, skip_special_tokens=True):
+        return "".join(chr(32 + (i % 90)) for i in ids if i not in (EOS_ID, PAD_ID))
+
+
+@pytest.fixture(scope="module", params=["gpt2", "qwen2"])
+def tiny_model(request):
+    torch.manual_seed(0)
+    if request.param == "gpt2":
+        config = transformers.GPT2Config(
+            vocab_size=VOCAB_SIZE, n_layer=2, n_embd=32, n_head=2, n_positions=256
+        )
+        model = transformers.GPT2LMHeadModel(config)
+    else:
+        config = transformers.Qwen2Config(
+            vocab_size=VOCAB_SIZE,
+            hidden_size=32,
+            intermediate_size=64,
+            num_hidden_layers=2,
+            num_attention_heads=4,
+            num_key_value_heads=2,
+            max_position_embeddings=256,
+        )
+        model = transformers.Qwen2ForCausalLM(config)
+    model.eval()
+    return model
+
+
+@pytest.fixture
+def tokenizer():
+    tok = CharTokenizer()
+    # Disable EOS so greedy outputs are compared over the full max_tokens
+    tok.eos_token_id = None
+    return tok
+
+
+def _reference_greedy(model, tokenizer, prompt, max_tokens):
+    ids = torch.tensor([tokenizer(prompt)["input_ids"]])
+    with torch.no_grad():
+        out = model.generate(
+            ids,
+            attention_mask=torch.ones_like(ids),
+            max_new_tokens=max_tokens,
+            do_sample=False,
+            eos_token_id=None,
+            pad_token_id=PAD_ID,
+        )
+    return tokenizer.decode(out[0, ids.shape[1] :].tolist())
+
+
+def test_batched_greedy_matches_sequential_generate(tiny_model, tokenizer):
+    """Concurrent requests with different prompt lengths decode exactly like generate()."""
+    prompts = ["hello", "a much longer prompt here", "xy", "another one", "zz", "q"]
+    expected = {p: _reference_greedy(tiny_model, tokenizer, p, 12) for p in prompts}
+
+    scheduler = ContinuousBatchScheduler(
+        tiny_model, tokenizer, max_batch_size=4, batch_wait_seconds=0.01
+    )
+    scheduler.start()
+    results = {}
+
+    def run(prompt):
+        results[prompt] = scheduler.submit(
+            prompt, {"max_tokens": 12, "temperature": 0}
+        ).text()
+
+    threads = []
+    for i, prompt in enumerate(prompts):
+        thread = threading.Thread(target=run, args=(prompt,))
+        thread.start()
+        threads.append(thread)
+        if i == 2:
+            # Later requests join the batch while earlier ones are decoding
+            time.sleep(0.05)
+    for thread in threads:
+        thread.join(timeout=30)
+    scheduler.stop()
+
+    assert results == expected
+    stats = scheduler.get_stats()
+    assert stats["completed"] == len(prompts)
+    assert stats["avg_batch_size"] > 1.0
+
+
+def test_per_request_max_tokens(tiny_model, tokenizer):
+    """Each request stops at its own max_tokens."""
+    scheduler = ContinuousBatchScheduler(tiny_model, tokenizer, max_batch_size=4)
+    scheduler.start()
+    short = scheduler.submit("abc", {"max_tokens": 3, "temperature": 0})
+    long = scheduler.submit("abc", {"max_tokens": 9, "temperature": 0})
+    short_text, long_text = short.text(), long.text()
+    scheduler.stop()
+
+    assert short.output_tokens == 3
+    assert long.output_tokens == 9
+    assert short.finish_reason == "length"
+    assert long_text.startswith(short_text)
+
+
+def test_stop_string_truncates_output(tiny_model, tokenizer):
+    """Generation stops at a stop string, which is not included in the output."""
+    full = _reference_greedy(tiny_model, tokenizer, "hello", 12)
+    stop = full[4:6]
+
+    scheduler = ContinuousBatchScheduler(tiny_model, tokenizer)
+    scheduler.start()
+    generation = scheduler.submit(
+        "hello", {"max_tokens": 12, "temperature": 0, "stop": [stop]}
+    )
+    text = generation.text()
+    scheduler.stop()
+
+    assert text == full[: full.find(stop)]
+    assert generation.finish_reason == "stop"
+
+
+def test_eos_finishes_sequence(tiny_model):
+    """A sampled EOS token finishes the request with reason 'stop'."""
+    tok = CharTokenizer()
+    ids = torch.tensor([tok("hi")["input_ids"]])
+    with torch.no_grad():
+        # Make the greedy first token the EOS token
+        tok.eos_token_id = int(tiny_model(ids).logits[0, -1].argmax())
+
+    scheduler = ContinuousBatchScheduler(tiny_model, tok)
+    scheduler.start()
+    generation = scheduler.submit("hi", {"max_tokens": 10, "temperature": 0})
+    text = generation.text()
+    scheduler.stop()
+
+    assert text == ""
+    assert generation.finish_reason == "stop"
+    assert generation.output_tokens == 0
+
+
+def test_cancelled_request_frees_slot(tiny_model, tokenizer):
+    """Closing a stream early cancels the request."""
+    scheduler = ContinuousBatchScheduler(tiny_model, tokenizer, max_batch_size=1)
+    scheduler.start()
+    stream = iter(scheduler.submit("hello", {"max_tokens": 200, "temperature": 0.8}))
+    next(stream)
+    stream.close()
+
+    follow_up = scheduler.submit("next", {"max_tokens": 2, "temperature": 0})
+    follow_up.text()
+    scheduler.stop()
+
+    stats = scheduler.get_stats()
+    assert stats["cancelled"] == 1
+    assert follow_up.output_tokens == 2
+
+
+def test_cancel_event_ends_waiting_stream(tiny_model, tokenizer):
+    """Setting the cancel event from another thread unblocks the consumer."""
+    # Not started, so the request never leaves the pending queue
+    scheduler = ContinuousBatchScheduler(tiny_model, tokenizer)
+    cancel = threading.Event()
+    generation = scheduler.submit("hello", {"max_tokens": 5}, cancel=cancel)
+    threading.Timer(0.2, cancel.set).start()
+
+    assert generation.text() == ""
+
+
+def test_queue_full_raises(tiny_model, tokenizer):
+    """submit() rejects requests once the pending queue is full."""
+    scheduler = ContinuousBatchScheduler(tiny_model, tokenizer, max_queue_size=1)
+    scheduler.submit("a")
+    with pytest.raises(SchedulerQueueFull):
+        scheduler.submit("b")
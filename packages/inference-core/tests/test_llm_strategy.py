@@ -58,6 +58,16 @@ def test_passthrough_llm_strategy_infer_with_dict():
     assert result.payload.get("text") == "[passthrough] test"
 
 
+def test_passthrough_llm_strategy_infer_stream_yields_full_text():
+    """Test the default LlmStrategy.infer_stream() yields infer() text as one delta."""
+    strategy = PassthroughLlmStrategy()
+    request = InferenceRequest(payload={"prompt": "hello", "params": {}}, metadata={})
+
+    deltas = list(strategy.infer_stream(request))
+
+    assert deltas == ["[passthrough] hello"]
+
+
 def test_passthrough_llm_strategy_infer_handles_empty_prompt():
     """Test PassthroughLlmStrategy handles empty prompt."""
     strategy = PassthroughLlmStrategy()
@@ -216,6 +226,51 @@ def test_qwen3_strategy_infer_without_warmup():
         )
 
 
+def test_qwen3_strategy_infer_stream_without_warmup():
+    """Test Qwen3LlmStrategy.infer_stream() raises error if model not warmed up."""
+    from inference_core.llm.qwen3_strategy import Qwen3LlmStrategy
+
+    strategy = Qwen3LlmStrategy()
+
+    with pytest.raises(RuntimeError, match="Model not loaded"):
+        next(
+            strategy.infer_stream(
+                InferenceRequest(payload={"prompt": "test", "params": {}}, metadata={})
+            )
+        )
+
+
+def test_qwen3_strategy_routes_through_batch_scheduler():
+    """Test Qwen3LlmStrategy uses the batching scheduler when one is running."""
+    from inference_core.llm.qwen3_strategy import Qwen3LlmStrategy
+
+    strategy = Qwen3LlmStrategy(enable_batching=True)
+    strategy._model = Mock()
+    strategy._tokenizer = Mock()
+    strategy._cache.enable_cache = False
+
+    generation = MagicMock()
+    generation.text.return_value = " batched text"
+    generation.__iter__.side_effect = lambda: iter(["batched", " text"])
+    generation.input_tokens = 4
+    generation.output_tokens = 2
+    generation.finish_reason = "stop"
+    strategy._scheduler = Mock()
+    strategy._scheduler.submit.return_value = generation
+
+    request = InferenceRequest(
+        payload={"prompt": "hi", "params": {"max_tokens": 5}}, metadata={}
+    )
+    result = strategy.infer(request)
+    deltas = list(strategy.infer_stream(request))
+
+    assert result.payload == {"text": "batched text", "tokens": 2}
+    assert result.metadata["batched"] is True
+    assert deltas == ["batched", " text"]
+    strategy._scheduler.submit.assert_called_with("hi", {"max_tokens": 5})
+    strategy._model.generate.assert_not_called()
+
+
 @patch("inference_core.llm.qwen3_strategy.torch")
 def test_qwen3_strategy_infer_success(mock_torch):
     """Test Qwen3LlmStrategy.infer() generates text correctly."""
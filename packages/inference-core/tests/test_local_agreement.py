@@ -0,0 +1,86 @@
+"""Tests for the local-agreement streaming transcription policy."""
+from inference_core.stt.local_agreement import LocalAgreement, Word, join_words
+
+# Reference transcript: one word every 0.5s
+SPEECH = "the quick brown fox jumps over the lazy dog and runs far away".split()
+TIMELINE = [Word(f" {text}", i * 0.5, i * 0.5 + 0.4) for i, text in enumerate(SPEECH)]
+
+
+def _decode(start: float, end: float, garble_last: bool = True):
+    """Fake decode of audio [start, end): the last word is still unstable."""
+    words = [
+        Word(w.text, w.start, w.end)
+        for w in TIMELINE
+        if w.start >= start - 0.3 and w.end <= end
+    ]
+    if garble_last and words:
+        words[-1] = Word(" uh", words[-1].start, words[-1].end)
+    return words
+
+
+def test_commits_longest_common_prefix():
+    agreement = LocalAgreement()
+    assert agreement.update([Word(" hello", 0.0, 0.4), Word(" word", 0.5, 0.9)]) == []
+    committed = agreement.update(
+        [Word(" hello", 0.0, 0.4), Word(" world", 0.5, 0.9), Word(" again", 1, 1.4)]
+    )
+    assert join_words(committed) == "hello"
+    assert agreement.committed_text == "hello"
+    assert agreement.text == "hello world again"
+
+
+def test_comparison_ignores_case_and_punctuation():
+    agreement = LocalAgreement()
+    agreement.update([Word(" Hello,", 0.0, 0.4), Word(" there", 0.5, 0.9)])
+    committed = agreement.update([Word(" hello", 0.0, 0.4), Word(" there.", 0.5, 0.9)])
+    assert len(committed) == 2
+
+
+def test_drops_redecoded_committed_words():
+    agreement = LocalAgreement()
+    agreement.update([Word(" one", 0.0, 0.4), Word(" two", 0.5, 0.9)])
+    agreement.update([Word(" one", 0.0, 0.4), Word(" two", 0.5, 0.9)])
+    assert agreement.committed_text == "one two"
+
+    # Window restarted before the commit point: timestamps drift slightly and
+    # the last committed word is decoded again
+    agreement.update([Word(" two", 0.85, 1.0), Word(" three", 1.0, 1.4)])
+    assert agreement.tentative[0].text == " three"
+
+
+def test_streaming_decode_matches_reference_transcript():
+    agreement = LocalAgreement()
+    window_start = 0.0
+    decodes = []
+    audio_end = 1.0
+    while audio_end <= TIMELINE[-1].end + 1.0:
+        decodes.append(audio_end - window_start)
+        agreement.update(_decode(window_start, audio_end))
+        # Trim at the last committed word, as the STT service does
+        window_start = max(window_start, agreement.committed_end)
+        audio_end += 1.0
+    agreement.finish(_decode(window_start, audio_end, garble_last=False))
+
+    assert agreement.committed_text == " ".join(SPEECH)
+    # Each decode only covers the uncommitted tail
+    assert max(decodes) <= 3.0
+
+
+def test_prompt_is_tail_of_committed_text():
+    agreement = LocalAgreement(prompt_chars=20)
+    assert agreement.prompt is None
+    words = [Word(f" {w}", i, i + 0.5) for i, w in enumerate(SPEECH)]
+    agreement.update(words)
+    agreement.update(words)
+
+    prompt = agreement.prompt
+    assert len(prompt) <= 20
+    assert agreement.committed_text.endswith(prompt)
+    assert prompt.split()[0] in SPEECH
+
+
+def test_finish_without_new_decode_commits_tentative():
+    agreement = LocalAgreement()
+    agreement.update([Word(" maybe", 0.0, 0.4)])
+    assert agreement.finish() == [Word(" maybe", 0.0, 0.4)]
+    assert agreement.tentative == []
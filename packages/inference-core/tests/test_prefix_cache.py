@@ -0,0 +1,207 @@
+"""Tests for the cross-request prefix KV cache."""
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from inference_core.llm.kv_cache import PrefixKVCache  # noqa: E402
+
+LAYERS = 2
+HEADS = 2
+HEAD_DIM = 4
+
+
+def _fake_past(num_tokens, fill=0.0):
+    """Legacy-format KV tensors whose values encode the token position."""
+    positions = torch.arange(num_tokens, dtype=torch.float32) + fill
+    key = positions.view(1, 1, num_tokens, 1).expand(1, HEADS, num_tokens, HEAD_DIM)
+    return tuple((key.clone(), key.clone()) for _ in range(LAYERS))
+
+
+def _entry_bytes(num_tokens):
+    return LAYERS * 2 * HEADS * num_tokens * HEAD_DIM * 4
+
+
+def test_lookup_miss_on_empty_cache():
+    """Test lookup returns no prefix when nothing is cached."""
+    cache = PrefixKVCache(block_size=4)
+
+    reused, past = cache.lookup(list(range(10)))
+
+    assert reused == 0
+    assert past is None
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_lookup_returns_longest_block_aligned_prefix():
+    """Test a stored sequence serves shorter shared prefixes, sliced to length."""
+    cache = PrefixKVCache(block_size=4)
+    cache.insert(list(range(10)), _fake_past(10))
+
+    # Shares the first 6 tokens -> one full block (4 tokens) is reusable
+    reused, past = cache.lookup([0, 1, 2, 3, 4, 5, 99, 98, 97])
+
+    assert reused == 4
+    assert past[0][0].shape[2] == 4
+    assert past[0][0][0, 0, :, 0].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_insert_keeps_only_block_aligned_tokens():
+    """Test only complete blocks are stored."""
+    cache = PrefixKVCache(block_size=4)
+    cache.insert(list(range(10)), _fake_past(10))
+
+    reused, past = cache.lookup(list(range(20)))
+
+    assert reused == 8
+    assert past[1][1].shape[2] == 8
+    assert cache.get_stats()["size_bytes"] == _entry_bytes(8)
+
+
+def test_lookup_respects_max_tokens():
+    """Test callers can keep at least one prompt token uncached."""
+    cache = PrefixKVCache(block_size=4)
+    cache.insert(list(range(8)), _fake_past(8))
+
+    reused, _ = cache.lookup(list(range(8)), max_tokens=7)
+
+    assert reused == 4
+
+
+def test_different_prefix_does_not_match():
+    """Test chained hashes do not match when an earlier block differs."""
+    cache = PrefixKVCache(block_size=4)
+    cache.insert(list(range(8)), _fake_past(8))
+
+    reused, past = cache.lookup([9, 1, 2, 3, 4, 5, 6, 7, 8])
+
+    assert reused == 0
+    assert past is None
+
+
+def test_stored_tensors_are_copied():
+    """Test mutating the source cache after insert does not affect the entry."""
+    cache = PrefixKVCache(block_size=4)
+    source = _fake_past(4)
+    cache.insert(list(range(4)), source)
+    source[0][0].fill_(-1.0)
+
+    _, past = cache.lookup(list(range(5)))
+
+    assert past[0][0][0, 0, :, 0].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_lru_eviction_bounded_by_bytes():
+    """Test the least recently used entry is evicted once max_bytes is exceeded."""
+    cache = PrefixKVCache(max_bytes=_entry_bytes(8), block_size=4)
+    first = [1, 2, 3, 4]
+    second = [5, 6, 7, 8]
+    third = [9, 10, 11, 12]
+    cache.insert(first, _fake_past(4))
+    cache.insert(second, _fake_past(4))
+    # Touch the first entry so the second becomes least recently used
+    cache.lookup(first + [0])
+    cache.insert(third, _fake_past(4))
+
+    assert cache.lookup(first + [0])[0] == 4
+    assert cache.lookup(second + [0])[0] == 0
+    assert cache.lookup(third + [0])[0] == 4
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["size_bytes"] <= stats["max_bytes"]
+
+
+def test_entry_larger_than_budget_is_not_stored():
+    """Test an entry that can never fit is skipped instead of flushing the cache."""
+    cache = PrefixKVCache(max_bytes=_entry_bytes(4), block_size=4)
+    cache.insert([1, 2, 3, 4], _fake_past(4))
+    cache.insert(list(range(16)), _fake_past(16))
+
+    assert cache.get_stats()["entries"] == 1
+    assert cache.lookup([1, 2, 3, 4, 5])[0] == 4
+
+
+def test_stats_track_hits_and_reused_tokens():
+    """Test hit/miss counters and reused token accounting."""
+    cache = PrefixKVCache(block_size=4)
+    cache.insert(list(range(8)), _fake_past(8))
+    cache.lookup(list(range(10)))
+    cache.lookup([42] * 10)
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate_percent"] == 50.0
+    assert stats["reused_tokens"] == 8
+    assert stats["token_reuse_percent"] == 40.0
+
+
+def test_disabled_cache_is_noop():
+    """Test a disabled cache stores and returns nothing."""
+    cache = PrefixKVCache(block_size=4, enable_cache=False)
+    cache.insert(list(range(8)), _fake_past(8))
+
+    assert cache.lookup(list(range(8))) == (0, None)
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_qwen3_strategy_reuses_prefix_across_turns():
+    """Test multi-turn prompts reuse the earlier turn's KV and decode identically."""
+    transformers = pytest.importorskip("transformers")
+    from inference_core.llm.qwen3_strategy import Qwen3LlmStrategy
+
+    class _Encoding(dict):
+        def to(self, device):
+            return self
+
+        @property
+        def input_ids(self):
+            return self["input_ids"]
+
+    class _Tokenizer:
+        eos_token_id = None
+        pad_token_id = 1
+
+        def __call__(self, text, return_tensors=None):
+            return _Encoding(input_ids=torch.tensor([[3 + ord(c) % 90 for c in text]]))
+
+        def decode(self, ids, skip_special_tokens=True):
+            return "".join(chr(32 + int(i) % 90) for i in ids)
+
+    torch.manual_seed(0)
+    model = transformers.Qwen2ForCausalLM(
+        transformers.Qwen2Config(
+            vocab_size=100,
+            hidden_size=32,
+            intermediate_size=64,
+            num_hidden_layers=2,
+            num_attention_heads=4,
+            num_key_value_heads=2,
+            max_position_embeddings=512,
+        )
+    ).eval()
+
+    def make_strategy(prefix_cache_enabled):
+        strategy = Qwen3LlmStrategy(
+            model_name="tiny-test", device="cpu", use_quantization=False
+        )
+        strategy._model = model
+        strategy._tokenizer = _Tokenizer()
+        strategy._cache.enable_cache = False
+        strategy._prefix_cache.enable_cache = prefix_cache_enabled
+        return strategy
+
+    cached, uncached = make_strategy(True), make_strategy(False)
+    system = "System: You are a helpful assistant.\n\n"
+    turns = [
+        system + "Human: hi\n\nAssistant:",
+        system + "Human: hi\n\nAssistant: hello\n\nHuman: how are you?\n\nAssistant:",
+    ]
+    params = {"temperature": 0, "max_tokens": 8}
+
+    for turn in turns:
+        with_cache = cached.infer({"prompt": turn, "params": params})
+        without_cache = uncached.infer({"prompt": turn, "params": params})
+        assert with_cache.payload["text"] == without_cache.payload["text"]
+
+    assert with_cache.metadata["prefix_cache_tokens"] > 0
+    assert cached.get_prefix_cache_stats()["hits"] == 1
@@ -49,6 +49,9 @@ def mock_llm_strategy():
             payload={"text": "generated text", "tokens": 10}, metadata={}
         )
     )
+    strategy.infer_stream = Mock(
+        side_effect=lambda request: iter(["generated", " text"])
+    )
     return strategy
 
 
@@ -124,6 +127,96 @@ class TestTtsServicer:
         assert isinstance(call_args, InferenceRequest)
         assert call_args.payload == "hello world"
 
+    def test_synthesize_runs_concurrently_off_event_loop(self, mock_tts_strategy):
+        """Test blocking synthesis runs on the worker pool, not the event loop."""
+        import asyncio
+        import time
+
+        from june_grpc_api.generated import tts_pb2
+
+        def slow_infer(request):
+            time.sleep(0.2)
+            return InferenceResponse(payload=b"\x00\x00", metadata={})
+
+        mock_tts_strategy.infer.side_effect = slow_infer
+        servicer = _TtsServicer(mock_tts_strategy, max_workers=4)
+
+        async def run():
+            start = time.time()
+            responses = await asyncio.gather(
+                *[
+                    servicer.Synthesize(tts_pb2.SynthesisRequest(text="hi"), None)
+                    for _ in range(4)
+                ]
+            )
+            return responses, time.time() - start
+
+        responses, elapsed = asyncio.run(run())
+
+        assert len(responses) == 4
+        assert elapsed < 0.6
+
+    def test_synthesize_stream_chunks_segments_in_order(self, mock_tts_strategy):
+        """Test SynthesizeStream synthesizes per sentence and emits PCM chunks."""
+        import asyncio
+
+        from june_grpc_api.generated import tts_pb2
+
+        mock_tts_strategy.infer.side_effect = lambda request: InferenceResponse(
+            payload=request.payload[:3].encode() * 2,
+            metadata={"sample_rate": 10},
+        )
+        # 10 Hz * 200 ms -> 2 samples (4 bytes) per chunk
+        servicer = _TtsServicer(mock_tts_strategy, chunk_ms=200)
+        synthesized_before_last_text = []
+
+        async def requests():
+            yield tts_pb2.SynthesisRequest(
+                text="Hello there, this is ", voice_id="v1", language="fr"
+            )
+            yield tts_pb2.SynthesisRequest(text="the first sentence. And ")
+            await asyncio.sleep(0.05)
+            synthesized_before_last_text.append(mock_tts_strategy.infer.call_count)
+            yield tts_pb2.SynthesisRequest(text="the rest")
+
+        async def collect():
+            return [
+                chunk async for chunk in servicer.SynthesizeStream(requests(), None)
+            ]
+
+        chunks = asyncio.run(collect())
+
+        assert synthesized_before_last_text == [1]
+        segments = [c[0][0].payload for c in mock_tts_strategy.infer.call_args_list]
+        assert segments == ["Hello there, this is the first sentence.", "And the rest"]
+        metadata = mock_tts_strategy.infer.call_args_list[0][0][0].metadata
+        assert metadata == {"voice_id": "v1", "language": "fr"}
+
+        assert [c.audio_data for c in chunks[:-1]] == [b"HelH", b"el", b"AndA", b"nd"]
+        assert all(c.encoding == "pcm16" and not c.is_final for c in chunks[:-1])
+        assert [c.timestamp_us for c in chunks] == [0, 200000, 300000, 500000, 600000]
+        assert chunks[-1].is_final and chunks[-1].audio_data == b""
+
+    def test_synthesize_stream_propagates_errors(self, mock_tts_strategy):
+        """Test SynthesizeStream raises when synthesis fails."""
+        import asyncio
+
+        from june_grpc_api.generated import tts_pb2
+
+        mock_tts_strategy.infer.side_effect = RuntimeError("espeak failed")
+        servicer = _TtsServicer(mock_tts_strategy)
+
+        async def requests():
+            yield tts_pb2.SynthesisRequest(text="hello")
+
+        async def collect():
+            return [
+                chunk async for chunk in servicer.SynthesizeStream(requests(), None)
+            ]
+
+        with pytest.raises(RuntimeError, match="espeak failed"):
+            asyncio.run(collect())
+
 
 class TestLlmServicer:
     """Tests for _LlmServicer."""
@@ -165,7 +258,49 @@ class TestLlmServicer:
             chunk.token for chunk in chunks[:-1]
         )  # All but last should have tokens
         assert chunks[-1].is_final
-        mock_llm_strategy.infer.assert_called_once()
+        assert "".join(chunk.token for chunk in chunks) == "generated text"
+        assert [chunk.index for chunk in chunks] == [0, 1, 2]
+        mock_llm_strategy.infer_stream.assert_called_once()
+        mock_llm_strategy.infer.assert_not_called()
+
+    def test_generate_stream_forwards_deltas_before_completion(self, mock_llm_strategy):
+        """Test GenerateStream yields each delta before the strategy finishes."""
+        from june_grpc_api.generated import llm_pb2
+
+        produced = []
+
+        def slow_stream(request):
+            for delta in ["a", "b", "c"]:
+                produced.append(delta)
+                yield delta
+
+        mock_llm_strategy.infer_stream = Mock(side_effect=slow_stream)
+        servicer = _LlmServicer(mock_llm_strategy)
+
+        stream = servicer.GenerateStream(llm_pb2.GenerationRequest(prompt="x"), None)
+        first = next(stream)
+
+        assert first.token == "a"
+        assert produced == ["a"]
+
+    def test_generate_stream_error(self, mock_llm_strategy):
+        """Test GenerateStream ends with an ERROR chunk when the strategy fails."""
+        from june_grpc_api.generated import llm_pb2
+
+        def failing_stream(request):
+            yield "partial"
+            raise RuntimeError("boom")
+
+        mock_llm_strategy.infer_stream = Mock(side_effect=failing_stream)
+        servicer = _LlmServicer(mock_llm_strategy)
+
+        chunks = list(
+            servicer.GenerateStream(llm_pb2.GenerationRequest(prompt="x"), None)
+        )
+
+        assert chunks[0].token == "partial"
+        assert chunks[-1].is_final
+        assert chunks[-1].finish_reason == llm_pb2.FinishReason.ERROR
 
     def test_chat_success(self, mock_llm_strategy):
         """Test _LlmServicer.Chat returns correct response."""
@@ -211,7 +346,10 @@ class TestLlmServicer:
         )  # All but last should have content
         assert chunks[-1].is_final
         assert chunks[-1].role == "assistant"
-        mock_llm_strategy.infer.assert_called_once()
+        assert "".join(chunk.content_delta for chunk in chunks) == "generated text"
+        mock_llm_strategy.infer_stream.assert_called_once()
+        call_args = mock_llm_strategy.infer_stream.call_args[0][0]
+        assert "Human: hello" in call_args.payload["prompt"]
 
     def test_chat_formatting(self, mock_llm_strategy):
         """Test Chat endpoint formats messages correctly."""
@@ -1,6 +1,5 @@
 """Tests for TTS strategies with mocked dependencies."""
-import os
-import tempfile
+import struct
 from unittest.mock import MagicMock, Mock, patch
 
 import numpy as np
@@ -51,56 +50,53 @@ def test_espeak_strategy_warmup_fails_on_subprocess_error():
             strategy.warmup()
 
 
-def test_espeak_strategy_infer_with_string(tts_strategy):
-    """Test EspeakTtsStrategy.infer accepts string directly."""
-    with patch("inference_core.tts.espeak_strategy.tempfile") as mock_tempfile, patch(
-        "inference_core.tts.espeak_strategy.subprocess"
-    ) as mock_subprocess, patch(
-        "inference_core.tts.espeak_strategy.sf"
-    ) as mock_sf, patch(
-        "inference_core.tts.espeak_strategy.os"
-    ) as mock_os:
-        # Setup mocks
-        mock_file = Mock()
-        mock_file.name = "/tmp/test.wav"
-        mock_tempfile.NamedTemporaryFile.return_value.__enter__.return_value = mock_file
+def _espeak_stdout(num_samples, sample_rate=22050):
+    """WAV bytes as espeak --stdout writes them (placeholder chunk sizes)."""
+    samples = (np.sin(np.arange(num_samples) / 5.0) * 16000).astype("<i2")
+    header = (
+        b"RIFF"
+        + struct.pack("<I", 0x7FFFFFFF)
+        + b"WAVEfmt "
+        + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data"
+        + struct.pack("<I", 0x7FFFFFFF - 36)
+    )
+    return header + samples.tobytes()
 
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_subprocess.run.return_value = mock_result
 
-        # Mock audio data
-        audio_data = np.random.randn(16000).astype(np.float32)
-        mock_sf.read.return_value = (audio_data, 16000)
+def _espeak_result(stdout=b"", returncode=0, stderr=b""):
+    result = Mock()
+    result.returncode = returncode
+    result.stdout = stdout
+    result.stderr = stderr
+    return result
+
+
+def test_espeak_strategy_infer_with_string(tts_strategy):
+    """Test EspeakTtsStrategy.infer accepts string directly."""
+    with patch("inference_core.tts.espeak_strategy.subprocess") as mock_subprocess:
+        mock_subprocess.run.return_value = _espeak_result(
+            _espeak_stdout(16000, sample_rate=16000)
+        )
 
         result = tts_strategy.infer("hello world")
 
         assert isinstance(result, InferenceResponse)
         assert isinstance(result.payload, bytes)
-        assert len(result.payload) > 0
+        assert len(result.payload) == 16000 * 2
         assert result.metadata.get("sample_rate") == 16000
-        assert result.metadata.get("duration_ms") > 0
+        assert result.metadata.get("duration_ms") == 1000
+        cmd = mock_subprocess.run.call_args[0][0]
+        assert "--stdout" in cmd
+        assert "-w" not in cmd
 
 
 def test_espeak_strategy_infer_with_request(tts_strategy):
     """Test EspeakTtsStrategy.infer accepts InferenceRequest."""
-    with patch("inference_core.tts.espeak_strategy.tempfile") as mock_tempfile, patch(
-        "inference_core.tts.espeak_strategy.subprocess"
-    ) as mock_subprocess, patch(
-        "inference_core.tts.espeak_strategy.sf"
-    ) as mock_sf, patch(
-        "inference_core.tts.espeak_strategy.os"
-    ):
-        mock_file = Mock()
-        mock_file.name = "/tmp/test.wav"
-        mock_tempfile.NamedTemporaryFile.return_value.__enter__.return_value = mock_file
-
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_subprocess.run.return_value = mock_result
-
-        audio_data = np.random.randn(16000).astype(np.float32)
-        mock_sf.read.return_value = (audio_data, 16000)
+    with patch("inference_core.tts.espeak_strategy.subprocess") as mock_subprocess:
+        mock_subprocess.run.return_value = _espeak_result(
+            _espeak_stdout(16000, sample_rate=16000)
+        )
 
         request = InferenceRequest(
             payload="hello world", metadata={"voice_id": "default", "language": "en"}
@@ -109,6 +105,7 @@ def test_espeak_strategy_infer_with_request(tts_strategy):
 
         assert isinstance(result, InferenceResponse)
         assert isinstance(result.payload, bytes)
+        assert len(result.payload) > 0
 
 
 def test_espeak_strategy_infer_empty_text(tts_strategy):
@@ -122,44 +119,23 @@ def test_espeak_strategy_infer_empty_text(tts_strategy):
 
 def test_espeak_strategy_infer_resamples_audio(tts_strategy):
     """Test EspeakTtsStrategy handles sample rate mismatch."""
-    with patch("inference_core.tts.espeak_strategy.tempfile") as mock_tempfile, patch(
-        "inference_core.tts.espeak_strategy.subprocess"
-    ) as mock_subprocess, patch(
-        "inference_core.tts.espeak_strategy.sf"
-    ) as mock_sf, patch(
-        "inference_core.tts.espeak_strategy.os"
-    ):
-        mock_file = Mock()
-        mock_file.name = "/tmp/test.wav"
-        mock_tempfile.NamedTemporaryFile.return_value.__enter__.return_value = mock_file
-
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_subprocess.run.return_value = mock_result
-
-        # Audio with different sample rate (22050)
-        audio_data = np.random.randn(22050).astype(np.float32)
-        mock_sf.read.return_value = (audio_data, 22050)
+    with patch("inference_core.tts.espeak_strategy.subprocess") as mock_subprocess:
+        # espeak's native rate is 22050 Hz
+        mock_subprocess.run.return_value = _espeak_result(_espeak_stdout(22050))
 
         result = tts_strategy.infer("test")
 
         assert isinstance(result, InferenceResponse)
-        # Should have resampled
+        # One second of audio resampled to 16 kHz int16
+        assert len(result.payload) == 16000 * 2
 
 
 def test_espeak_strategy_infer_handles_espeak_failure(tts_strategy):
     """Test EspeakTtsStrategy handles espeak command failure gracefully."""
-    with patch("inference_core.tts.espeak_strategy.tempfile") as mock_tempfile, patch(
-        "inference_core.tts.espeak_strategy.subprocess"
-    ) as mock_subprocess, patch("inference_core.tts.espeak_strategy.os"):
-        mock_file = Mock()
-        mock_file.name = "/tmp/test.wav"
-        mock_tempfile.NamedTemporaryFile.return_value.__enter__.return_value = mock_file
-
-        mock_result = Mock()
-        mock_result.returncode = 1
-        mock_result.stderr = "espeak error"
-        mock_subprocess.run.return_value = mock_result
+    with patch("inference_core.tts.espeak_strategy.subprocess") as mock_subprocess:
+        mock_subprocess.run.return_value = _espeak_result(
+            returncode=1, stderr=b"espeak error"
+        )
 
         result = tts_strategy.infer("test")
 
@@ -2,15 +2,25 @@
 gRPC Authentication Interceptor for June services.
 
 Provides authentication and authorization for gRPC services using JWT tokens
-or service-to-service API keys.
+or service-to-service API keys. Verified tokens are cached (keyed by token
+hash) so repeat callers skip signature verification.
 """
+import hashlib
 import logging
 import os
-from typing import Any, Callable, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
 
 import grpc
 from jose import JWTError, jwt
 
+try:
+    from prometheus_client import Counter
+except ImportError:  # Metrics are optional (this module is copied into images)
+    Counter = None
+
 logger = logging.getLogger(__name__)
 
 # JWT Configuration
@@ -18,6 +28,24 @@ JWT_SECRET = os.getenv("JWT_SECRET", "")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 SERVICE_API_KEY = os.getenv("SERVICE_API_KEY", "")
 
+# Verified-token cache configuration
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+JWT_CACHE_MAX_TTL = float(os.getenv("JWT_CACHE_MAX_TTL", "3600"))
+JWT_CACHE_NEGATIVE_TTL = float(os.getenv("JWT_CACHE_NEGATIVE_TTL", "30"))
+
+if Counter is not None:
+    TOKEN_CACHE_REQUESTS = Counter(
+        "grpc_auth_token_cache_requests_total",
+        "JWT verification cache lookups by result (hit, negative_hit, miss)",
+        ["result"],
+    )
+    TOKEN_VERIFICATION_FAILURES = Counter(
+        "grpc_auth_token_verification_failures_total",
+        "JWT tokens that failed signature verification or decoding",
+    )
+else:
+    TOKEN_CACHE_REQUESTS = TOKEN_VERIFICATION_FAILURES = None
+
 
 class AuthenticationError(Exception):
     """Authentication error exception."""
@@ -48,6 +76,117 @@ def verify_jwt_token(token: str) -> dict:
         raise AuthenticationError(f"Invalid token: {str(e)}")
 
 
+class TokenCache:
+    """
+    Bounded cache of JWT verification results, keyed by SHA-256 of the token.
+
+    Valid tokens are cached with their decoded claims until their exp claim
+    (or max_ttl for tokens without one). Invalid tokens are cached for
+    negative_ttl so repeated bad tokens and API keys don't re-run
+    verification. Least recently used entries are dropped beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = JWT_CACHE_MAX_ENTRIES,
+        max_ttl: float = JWT_CACHE_MAX_TTL,
+        negative_ttl: float = JWT_CACHE_NEGATIVE_TTL,
+        verify: Optional[Callable[[str], dict]] = None,
+    ):
+        """
+        Initialize token cache.
+
+        Args:
+            max_entries: Maximum cached tokens (0 disables caching)
+            max_ttl: Seconds to cache valid tokens that have no exp claim
+            negative_ttl: Seconds to cache invalid tokens
+            verify: Verification function (default: verify_jwt_token)
+        """
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self._verify = verify or verify_jwt_token
+        # token hash -> (expires_at, payload or None, error message or None),
+        # least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _record(result: str) -> None:
+        if TOKEN_CACHE_REQUESTS is not None:
+            TOKEN_CACHE_REQUESTS.labels(result=result).inc()
+
+    def verify(self, token: str) -> dict:
+        """
+        Verify a JWT token, using the cached result when there is one.
+
+        Args:
+            token: JWT token string
+
+        Returns:
+            Decoded token payload (shared with the cache; don't modify it)
+
+        Raises:
+            AuthenticationError: If token is invalid
+        """
+        if self.max_entries <= 0:
+            return self._verify(token)
+
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    entry = None
+
+        if entry is not None:
+            _, payload, error = entry
+            if payload is not None:
+                self._record("hit")
+                return payload
+            self._record("negative_hit")
+            raise AuthenticationError(error)
+
+        self._record("miss")
+        try:
+            payload = self._verify(token)
+        except AuthenticationError as e:
+            if TOKEN_VERIFICATION_FAILURES is not None:
+                TOKEN_VERIFICATION_FAILURES.inc()
+            self._store(key, (now + self.negative_ttl, None, str(e)))
+            raise
+
+        expires_at = now + self.max_ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        self._store(key, (expires_at, payload, None))
+        return payload
+
+    def _store(self, key: str, entry: Tuple[float, Optional[dict], Optional[str]]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results (e.g. after rotating JWT_SECRET)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by interceptors that aren't given their own cache
+_token_cache = TokenCache()
+
+
 def verify_service_api_key(api_key: str) -> bool:
     """
     Verify a service-to-service API key.
@@ -94,16 +233,23 @@ class AuthInterceptor(grpc.aio.ServerInterceptor):
     Validates JWT tokens or service API keys from request metadata.
     """
 
-    def __init__(self, require_auth: bool = True, allowed_services: list = None):
+    def __init__(
+        self,
+        require_auth: bool = True,
+        allowed_services: list = None,
+        token_cache: Optional[TokenCache] = None,
+    ):
         """
         Initialize authentication interceptor.
 
         Args:
             require_auth: Whether authentication is required (default: True)
             allowed_services: List of service names allowed for service-to-service auth
+            token_cache: Verified-token cache (default: shared module cache)
         """
         self.require_auth = require_auth
         self.allowed_services = allowed_services or []
+        self.token_cache = token_cache if token_cache is not None else _token_cache
 
     async def intercept_service(
         self, continuation: Callable, handler_call_details: grpc.HandlerCallDetails
@@ -156,7 +302,7 @@ class AuthInterceptor(grpc.aio.ServerInterceptor):
         try:
             # Try JWT token first
             try:
-                payload = verify_jwt_token(token)
+                payload = self.token_cache.verify(token)
 
                 # Check token type
                 token_type = payload.get("type", "access")
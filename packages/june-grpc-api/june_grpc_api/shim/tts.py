@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
 
 import grpc
 
@@ -38,3 +38,65 @@ class TextToSpeechClient:
         )
         response = await self._stub.Synthesize(request, timeout=timeout)
         return response.audio_data
+
+    async def synthesize_stream(
+        self,
+        text_chunks: Union[str, Iterable[str], AsyncIterable[str]],
+        voice_id: str = "default",
+        language: str = "en",
+        config: Optional[SynthesisConfig] = None,
+        timeout: Optional[float] = 60.0,
+    ) -> AsyncIterator[tts_pb2.AudioChunk]:
+        """Stream text to SynthesizeStream and yield audio chunks as they arrive.
+
+        Text may be sent incrementally (e.g. LLM output deltas); the server
+        synthesizes each completed sentence while more text is still arriving,
+        so playback can start before the whole response is synthesized.
+
+        Args:
+            text_chunks: Text, or a sync/async iterable of text pieces
+            voice_id: Voice to use
+            language: ISO 639-1 language code
+            config: Optional synthesis configuration
+            timeout: Deadline for the whole stream in seconds
+
+        Yields:
+            AudioChunk messages (pcm16 audio_data, sample_rate, timestamp_us);
+            the final chunk has is_final=True and no audio
+        """
+        cfg = (config or SynthesisConfig()).to_proto()
+
+        async def request_iterator():
+            first = True
+
+            def make_request(text: str) -> tts_pb2.SynthesisRequest:
+                nonlocal first
+                if first:
+                    first = False
+                    return tts_pb2.SynthesisRequest(
+                        text=text,
+                        config=cfg,
+                        voice_id=voice_id,
+                        language=language,
+                        stream=True,
+                    )
+                return tts_pb2.SynthesisRequest(text=text, stream=True)
+
+            if isinstance(text_chunks, str):
+                yield make_request(text_chunks)
+            elif hasattr(text_chunks, "__aiter__"):
+                async for text in text_chunks:
+                    if text:
+                        yield make_request(text)
+            else:
+                for text in text_chunks:
+                    if text:
+                        yield make_request(text)
+            if first:
+                # Always send voice/language even for empty input
+                yield make_request("")
+
+        async for chunk in self._stub.SynthesizeStream(
+            request_iterator(), timeout=timeout
+        ):
+            yield chunk
@@ -0,0 +1,105 @@
+"""Tests for the verified-token cache in grpc_auth."""
+
+import os
+import sys
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+pytest.importorskip("jose")
+from jose import jwt  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import grpc_auth  # noqa: E402
+from grpc_auth import AuthenticationError, AuthInterceptor, TokenCache  # noqa: E402
+
+SECRET = "test-secret"
+
+
+@pytest.fixture(autouse=True)
+def jwt_secret():
+    with patch.object(grpc_auth, "JWT_SECRET", SECRET):
+        yield
+
+
+def _token(**claims):
+    return jwt.encode({"sub": "user-1", **claims}, SECRET, algorithm="HS256")
+
+
+def _counting_verify():
+    return MagicMock(side_effect=grpc_auth.verify_jwt_token)
+
+
+def test_valid_token_verified_once():
+    verify = _counting_verify()
+    cache = TokenCache(verify=verify)
+    token = _token(exp=int(time.time()) + 60)
+
+    for _ in range(5):
+        assert cache.verify(token)["sub"] == "user-1"
+    assert verify.call_count == 1
+
+
+def test_entry_expires_with_token():
+    verify = _counting_verify()
+    cache = TokenCache(verify=verify)
+    exp = int(time.time()) + 60
+    token = _token(exp=exp)
+    cache.verify(token)
+
+    # Past exp the cached claims are dropped and the token is verified again
+    with patch.object(grpc_auth.time, "time", return_value=exp + 1):
+        cache.verify(token)
+    assert verify.call_count == 2
+
+
+def test_invalid_token_negative_cached():
+    verify = _counting_verify()
+    cache = TokenCache(verify=verify, negative_ttl=30)
+    for _ in range(3):
+        with pytest.raises(AuthenticationError):
+            cache.verify("not-a-jwt")
+    assert verify.call_count == 1
+
+    with patch.object(grpc_auth.time, "time", return_value=time.time() + 31):
+        with pytest.raises(AuthenticationError):
+            cache.verify("not-a-jwt")
+    assert verify.call_count == 2
+
+
+def test_bounded_lru():
+    cache = TokenCache(max_entries=2)
+    tokens = [_token(n=i) for i in range(3)]
+    for token in tokens:
+        cache.verify(token)
+    assert len(cache) == 2
+
+
+def test_disabled_cache_always_verifies():
+    verify = _counting_verify()
+    cache = TokenCache(max_entries=0, verify=verify)
+    token = _token()
+    cache.verify(token)
+    cache.verify(token)
+    assert verify.call_count == 2
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_interceptor_uses_cache():
+    verify = _counting_verify()
+    interceptor = AuthInterceptor(token_cache=TokenCache(verify=verify))
+    continuation = AsyncMock(return_value="handler")
+    details = MagicMock()
+    details.method = "/june.llm.LLMInference/GenerateStream"
+    details.invocation_metadata = (("authorization", f"Bearer {_token()}"),)
+    details.timeout = None
+    details.credentials = None
+    details.wait_for_ready = None
+
+    with patch.object(grpc_auth.grpc, "HandlerCallDetails", MagicMock()):
+        for _ in range(3):
+            handler = await interceptor.intercept_service(continuation, details)
+            assert handler == "handler"
+    assert verify.call_count == 1
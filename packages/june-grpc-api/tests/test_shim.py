@@ -331,3 +331,63 @@ async def test_stt_retry_success_after_multiple_failures():
         assert result.confidence == 0.9
         assert mock_recognize.call_count == 3
         assert mock_sleep.call_count == 2  # Sleep before each retry
+
+
+# TTS Streaming Client Tests
+
+
+@pytest.mark.asyncio
+async def test_tts_synthesize_stream_sends_incremental_text():
+    """Test synthesize_stream forwards text pieces and yields audio chunks."""
+    from june_grpc_api.generated import tts_pb2
+
+    channel = grpc.insecure_channel("localhost:9")
+    client = tts.TextToSpeechClient(channel)
+    sent = []
+
+    async def fake_stream(request_iterator, timeout=None):
+        async for request in request_iterator:
+            sent.append(request)
+            yield tts_pb2.AudioChunk(
+                audio_data=request.text.encode(), sample_rate=16000
+            )
+        yield tts_pb2.AudioChunk(is_final=True)
+
+    async def text_pieces():
+        yield "Hello "
+        yield ""
+        yield "world."
+
+    with patch.object(client._stub, "SynthesizeStream", side_effect=fake_stream):
+        chunks = [
+            chunk
+            async for chunk in client.synthesize_stream(text_pieces(), language="de")
+        ]
+
+    assert [r.text for r in sent] == ["Hello ", "world."]
+    assert sent[0].language == "de"
+    assert sent[0].voice_id == "default"
+    assert all(r.stream for r in sent)
+    assert [c.audio_data for c in chunks] == [b"Hello ", b"world.", b""]
+    assert chunks[-1].is_final
+
+
+@pytest.mark.asyncio
+async def test_tts_synthesize_stream_accepts_plain_text():
+    """Test synthesize_stream sends a single request for a plain string."""
+    from june_grpc_api.generated import tts_pb2
+
+    channel = grpc.insecure_channel("localhost:9")
+    client = tts.TextToSpeechClient(channel)
+    sent = []
+
+    async def fake_stream(request_iterator, timeout=None):
+        async for request in request_iterator:
+            sent.append(request.text)
+        yield tts_pb2.AudioChunk(is_final=True)
+
+    with patch.object(client._stub, "SynthesizeStream", side_effect=fake_stream):
+        chunks = [chunk async for chunk in client.synthesize_stream("Hi there.")]
+
+    assert sent == ["Hi there."]
+    assert len(chunks) == 1
@@ -3,12 +3,19 @@ June Rate Limit Module - Redis-based rate limiting with Prometheus metrics.
 
 This module provides:
 - Redis-based rate limiting with sliding window algorithm
+- O(1) in-memory engines (sliding window counter, GCRA/token bucket)
 - Per-user, per-IP, and per-endpoint rate limiting
 - Configurable rate limits with different thresholds
 - Rate limit headers in responses
 - Prometheus metrics for monitoring
 """
 
+from .engine import (
+    GCRAEngine,
+    LimiterEngine,
+    SlidingWindowCounterEngine,
+    create_engine,
+)
 from .grpc_interceptor import RateLimitInterceptor
 from .middleware import RateLimitMiddleware
 from .rate_limiter import RateLimitConfig, RateLimiter, RateLimitResult
@@ -19,6 +26,10 @@ __all__ = [
     "RateLimitResult",
     "RateLimitMiddleware",
     "RateLimitInterceptor",
+    "LimiterEngine",
+    "SlidingWindowCounterEngine",
+    "GCRAEngine",
+    "create_engine",
 ]
 
 __version__ = "0.1.0"
@@ -0,0 +1,443 @@
+"""
+In-process rate limit engines with O(1) time and memory per key.
+
+Engines keep a fixed-size state per key instead of a list of request
+timestamps, and guard it with sharded locks so unrelated keys don't contend:
+
+- SlidingWindowCounterEngine: counts for the current and previous fixed
+  window; the previous count is weighted by how much of it still overlaps
+  the sliding window.
+- GCRAEngine: generic cell rate algorithm (equivalent to a token bucket of
+  size ``limit`` refilled at ``limit / window``); stores one timestamp.
+
+Several limits on one request (e.g. per minute and per day) are checked
+together with ``hit_all()``: the request is counted in all of them or, if
+any limit denies it, in none.
+
+Memory is bounded: a key is dropped once its window has fully elapsed (its
+state is then indistinguishable from a fresh one), and each shard holds at
+most ``max_keys / shards`` keys, spilling the least recently used ones.
+"""
+import math
+import sys
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import ExitStack
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+# Rough per-entry overhead of the shard dicts (OrderedDict links, hash slots)
+_ENTRY_OVERHEAD_BYTES = 200
+# Size of a float or small int in a state list
+_VALUE_BYTES = 32
+
+
+class Decision(NamedTuple):
+    """Outcome of consuming one request from a limit."""
+
+    allowed: bool
+    remaining: int
+    reset_time: float  # Unix time at which the limit is fully replenished
+    retry_after: float  # Seconds until a request would be allowed (0 if allowed)
+
+
+class _Shard:
+    """A lock and the key states it guards."""
+
+    __slots__ = ("lock", "states", "expires", "nbytes", "next_sweep")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Least recently used first
+        self.states: "OrderedDict[str, list]" = OrderedDict()
+        # key -> time after which the state can be dropped
+        self.expires: Dict[str, float] = {}
+        self.nbytes = 0
+        self.next_sweep = 0.0
+
+
+class LimiterEngine(ABC):
+    """Base class for rate limit engines; state is sharded by key."""
+
+    name = ""
+
+    def __init__(
+        self,
+        shards: int = 64,
+        max_keys: Optional[int] = 100000,
+        sweep_interval: float = 60.0,
+        on_evict: Optional[Callable[[str, int], None]] = None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            shards: Number of lock shards
+            max_keys: Keys kept before least recently used ones are dropped
+                (None for no limit)
+            sweep_interval: Seconds between full scans of a shard for expired
+                keys (expired keys at the LRU end are dropped on every hit)
+            on_evict: Called with (reason, count) when keys are dropped;
+                reason is "expired" or "capacity"
+        """
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._max_keys_per_shard = (
+            math.ceil(max_keys / len(self._shards)) if max_keys else None
+        )
+        self.sweep_interval = sweep_interval
+        self.on_evict = on_evict
+
+    def _shard_index(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % len(self._shards)
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[self._shard_index(key)]
+
+    def hit(
+        self, key: str, limit: int, window: float, now: Optional[float] = None
+    ) -> Decision:
+        """
+        Consume one request for key if the limit allows it.
+
+        Args:
+            key: Rate limit key (identifier and limit type)
+            limit: Requests allowed per window
+            window: Window length in seconds
+            now: Current Unix time (default: time.time())
+
+        Returns:
+            Decision; denied requests are not counted
+        """
+        now = time.time() if now is None else now
+        shard = self._shard(key)
+        with shard.lock:
+            state = self._state(shard, key, window, now)
+            decision = self._check(state, limit, window, now)
+            if decision.allowed:
+                self._consume(state, limit, window, now)
+            shard.expires[key] = self._expires_at(state, window)
+            evicted = self._evict(shard, now)
+        self._report(evicted)
+        return decision
+
+    def hit_all(
+        self,
+        limits: Sequence[Tuple[str, int, float]],
+        now: Optional[float] = None,
+    ) -> List[Decision]:
+        """
+        Consume one request from several limits if all of them allow it.
+
+        All limits are checked first, with the locks of their shards held,
+        and then the request is counted in every one of them; if any limit
+        denies it, it is counted in none.
+
+        Args:
+            limits: (key, limit, window) for each limit
+            now: Current Unix time (default: time.time())
+
+        Returns:
+            One Decision per limit, in order
+        """
+        now = time.time() if now is None else now
+        indexes = [self._shard_index(key) for key, _, _ in limits]
+        evicted: Dict[str, int] = {}
+        with ExitStack() as stack:
+            # Always lock shards in index order so concurrent calls can't deadlock
+            for index in sorted(set(indexes)):
+                stack.enter_context(self._shards[index].lock)
+            states = [
+                self._state(self._shards[index], key, window, now)
+                for index, (key, _, window) in zip(indexes, limits)
+            ]
+            decisions = [
+                self._check(state, limit, window, now)
+                for state, (_, limit, window) in zip(states, limits)
+            ]
+            commit = all(decision.allowed for decision in decisions)
+            for index, state, (key, limit, window) in zip(indexes, states, limits):
+                if commit:
+                    self._consume(state, limit, window, now)
+                self._shards[index].expires[key] = self._expires_at(state, window)
+            for index in sorted(set(indexes)):
+                for reason, count in self._evict(self._shards[index], now).items():
+                    evicted[reason] = evicted.get(reason, 0) + count
+        self._report(evicted)
+        return decisions
+
+    def usage(
+        self, key: str, limit: int, window: float, now: Optional[float] = None
+    ) -> float:
+        """Estimated number of requests counted against key's current window."""
+        now = time.time() if now is None else now
+        shard = self._shard(key)
+        with shard.lock:
+            state = shard.states.get(key)
+            return self._usage(state, limit, window, now) if state else 0.0
+
+    def reset(self, key: str) -> None:
+        """Forget all state for key."""
+        shard = self._shard(key)
+        with shard.lock:
+            self._remove(shard, key)
+
+    def clear(self) -> None:
+        """Forget all state."""
+        for shard in self._shards:
+            with shard.lock:
+                shard.states.clear()
+                shard.expires.clear()
+                shard.nbytes = 0
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop every expired key now; returns the number dropped."""
+        now = time.time() if now is None else now
+        dropped = 0
+        for shard in self._shards:
+            with shard.lock:
+                dropped += self._sweep(shard, now)
+        self._report({"expired": dropped})
+        return dropped
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate memory held by key states."""
+        return sum(shard.nbytes for shard in self._shards)
+
+    def __len__(self) -> int:
+        return sum(len(shard.states) for shard in self._shards)
+
+    def _state(self, shard: _Shard, key: str, window: float, now: float) -> list:
+        """Get or create the state of key (called with the shard lock held)."""
+        state = shard.states.get(key)
+        if state is None:
+            state = self._new_state(window, now)
+            shard.states[key] = state
+            shard.nbytes += self._entry_size(key, state)
+        else:
+            shard.states.move_to_end(key)
+        return state
+
+    def _remove(self, shard: _Shard, key: str) -> None:
+        state = shard.states.pop(key, None)
+        if state is not None:
+            shard.expires.pop(key, None)
+            shard.nbytes -= self._entry_size(key, state)
+
+    def _sweep(self, shard: _Shard, now: float) -> int:
+        expired = [key for key, expires in shard.expires.items() if expires <= now]
+        for key in expired:
+            self._remove(shard, key)
+        shard.next_sweep = now + self.sweep_interval
+        return len(expired)
+
+    def _evict(self, shard: _Shard, now: float) -> Dict[str, int]:
+        """Drop expired and over-capacity keys (called with the shard lock held)."""
+        expired = 0
+        # Idle keys collect at the LRU end, so most expire from there
+        while shard.states:
+            key = next(iter(shard.states))
+            if shard.expires.get(key, now) > now:
+                break
+            self._remove(shard, key)
+            expired += 1
+        if now >= shard.next_sweep:
+            expired += self._sweep(shard, now)
+
+        spilled = 0
+        if self._max_keys_per_shard:
+            while len(shard.states) > self._max_keys_per_shard:
+                self._remove(shard, next(iter(shard.states)))
+                spilled += 1
+        return {"expired": expired, "capacity": spilled}
+
+    def _report(self, evicted: Dict[str, int]) -> None:
+        if self.on_evict is None:
+            return
+        for reason, count in evicted.items():
+            if count:
+                self.on_evict(reason, count)
+
+    @staticmethod
+    def _entry_size(key: str, state: list) -> int:
+        return (
+            sys.getsizeof(key)
+            + sys.getsizeof(state)
+            + len(state) * _VALUE_BYTES
+            + _ENTRY_OVERHEAD_BYTES
+        )
+
+    @abstractmethod
+    def _new_state(self, window: float, now: float) -> list:
+        """State for a key with no requests."""
+
+    @abstractmethod
+    def _check(self, state: list, limit: int, window: float, now: float) -> Decision:
+        """Decide on one more request without counting it (shard lock held)."""
+
+    @abstractmethod
+    def _consume(self, state: list, limit: int, window: float, now: float) -> None:
+        """Count one allowed request (called with the shard lock held)."""
+
+    @abstractmethod
+    def _usage(self, state: list, limit: int, window: float, now: float) -> float:
+        """Estimated usage for a state (called with the shard lock held)."""
+
+    @abstractmethod
+    def _expires_at(self, state: list, window: float) -> float:
+        """Time after which the state is equivalent to a fresh one."""
+
+
+class SlidingWindowCounterEngine(LimiterEngine):
+    """
+    Sliding window approximated from two fixed-window counters.
+
+    State per key: [current window start, current count, previous count].
+    The estimate assumes requests in the previous window were evenly spread.
+    """
+
+    name = "sliding_window"
+
+    @staticmethod
+    def _roll(state: list, window: float, now: float) -> float:
+        """Advance state to the window containing now; returns the window start."""
+        start = now - now % window
+        if state[0] != start:
+            # Previous count survives only if the old window is the adjacent one
+            state[2] = state[1] if state[0] == start - window else 0
+            state[1] = 0
+            state[0] = start
+        return start
+
+    def _usage(self, state: list, limit: int, window: float, now: float) -> float:
+        start = self._roll(state, window, now)
+        weight = 1.0 - (now - start) / window
+        return state[2] * weight + state[1]
+
+    def _new_state(self, window: float, now: float) -> list:
+        return [now - now % window, 0, 0]
+
+    def _expires_at(self, state: list, window: float) -> float:
+        # Both counts are dropped once the window after the current one ends
+        return state[0] + 2 * window
+
+    def _consume(self, state: list, limit: int, window: float, now: float) -> None:
+        self._roll(state, window, now)
+        state[1] += 1
+
+    def _check(self, state: list, limit: int, window: float, now: float) -> Decision:
+        used = self._usage(state, limit, window, now)
+        start = state[0]
+
+        if used < limit:
+            return Decision(
+                allowed=True,
+                remaining=max(0, int(limit - used - 1)),
+                reset_time=start + window,
+                retry_after=0.0,
+            )
+
+        current, previous = state[1], state[2]
+        if current < limit and previous:
+            # Wait for the previous window's weight to drop enough
+            elapsed = window * (1.0 - (limit - current) / previous)
+            retry_after = start + elapsed - now
+        else:
+            # Wait for the next window, where this window's count is weighted
+            elapsed = window * (1.0 - limit / current) if current else 0.0
+            retry_after = start + window + elapsed - now
+        retry_after = max(0.0, retry_after)
+        return Decision(
+            allowed=False,
+            remaining=0,
+            reset_time=now + retry_after,
+            retry_after=retry_after,
+        )
+
+
+class GCRAEngine(LimiterEngine):
+    """
+    Generic cell rate algorithm (token bucket).
+
+    State per key: [theoretical arrival time]. Allows bursts of up to limit
+    requests, then one request every window / limit seconds.
+    """
+
+    name = "gcra"
+
+    # Tolerance for float drift when bursts exactly fill the bucket
+    _EPSILON = 1e-9
+
+    def _usage(self, state: list, limit: int, window: float, now: float) -> float:
+        interval = window / limit
+        return max(0.0, state[0] - now) / interval
+
+    def _new_state(self, window: float, now: float) -> list:
+        return [now]
+
+    def _expires_at(self, state: list, window: float) -> float:
+        # Once the theoretical arrival time has passed the bucket is full
+        return state[0]
+
+    def _consume(self, state: list, limit: int, window: float, now: float) -> None:
+        state[0] = max(state[0], now) + window / limit
+
+    def _check(self, state: list, limit: int, window: float, now: float) -> Decision:
+        interval = window / limit
+        tat = max(state[0], now)
+        new_tat = tat + interval
+        allow_at = new_tat - window
+
+        if allow_at > now + self._EPSILON:
+            retry_after = allow_at - now
+            return Decision(
+                allowed=False,
+                remaining=0,
+                reset_time=tat,
+                retry_after=retry_after,
+            )
+
+        remaining = int((window - (new_tat - now)) / interval + self._EPSILON)
+        return Decision(
+            allowed=True,
+            remaining=max(0, remaining),
+            reset_time=new_tat,
+            retry_after=0.0,
+        )
+
+
+ENGINES: Dict[str, Type[LimiterEngine]] = {
+    SlidingWindowCounterEngine.name: SlidingWindowCounterEngine,
+    GCRAEngine.name: GCRAEngine,
+    "token_bucket": GCRAEngine,
+}
+
+
+def create_engine(
+    algorithm: str = "sliding_window",
+    shards: int = 64,
+    max_keys: Optional[int] = 100000,
+    **kwargs,
+) -> LimiterEngine:
+    """
+    Create a rate limit engine by name.
+
+    Args:
+        algorithm: One of ENGINES ("sliding_window", "gcra", "token_bucket")
+        shards: Number of lock shards
+        max_keys: Keys kept before least recently used ones are dropped
+        **kwargs: Other LimiterEngine options (sweep_interval, on_evict)
+
+    Returns:
+        LimiterEngine instance
+    """
+    try:
+        engine_class = ENGINES[algorithm]
+    except KeyError:
+        raise ValueError(
+            f"Unknown rate limit algorithm: {algorithm}. "
+            f"Supported: {', '.join(sorted(ENGINES))}"
+        )
+    return engine_class(shards=shards, max_keys=max_keys, **kwargs)
@@ -1,17 +1,20 @@
 """
 Redis-based rate limiter with sliding window algorithm.
 """
-import asyncio
 import logging
+import math
 import os
 import time
+import uuid
 from datetime import timedelta
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import redis.asyncio as aioredis
 from prometheus_client import Counter, Gauge, Histogram
 from redis.exceptions import ConnectionError, RedisError
 
+from .engine import LimiterEngine, create_engine
+
 logger = logging.getLogger(__name__)
 
 # Prometheus metrics
@@ -31,6 +34,68 @@ ACTIVE_RATE_LIMITS = Gauge(
     "Number of active rate limits",
     ["identifier_type", "limit_type"],
 )
+RATE_LIMIT_TRACKED_KEYS = Gauge(
+    "rate_limit_tracked_keys",
+    "Keys held by the in-memory rate limit engine",
+    ["algorithm"],
+)
+RATE_LIMIT_STATE_BYTES = Gauge(
+    "rate_limit_state_bytes",
+    "Approximate memory held by the in-memory rate limit engine",
+    ["algorithm"],
+)
+RATE_LIMIT_EVICTIONS = Counter(
+    "rate_limit_evictions_total",
+    "Keys dropped by the in-memory rate limit engine",
+    ["algorithm", "reason"],
+)
+
+# Sliding window log over one sorted set per window, checked and updated in a
+# single atomic call. KEYS: one per window. ARGV: now (seconds), a unique
+# member for this request, then limit and window seconds for each key.
+# Returns {allowed, remaining_1, retry_after_ms_1, remaining_2, ...}; the
+# request is added to every window only if all of them allow it.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local allowed = 1
+local counts = {}
+local retry_ms = {}
+
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + 2 * i])
+    local window = tonumber(ARGV[2 + 2 * i])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local count = redis.call('ZCARD', key)
+    counts[i] = count
+    retry_ms[i] = 0
+    if count >= limit then
+        allowed = 0
+        -- Allowed again once all but limit - 1 of the current entries expire
+        local entry = redis.call('ZRANGE', key, count - limit, count - limit, 'WITHSCORES')
+        local wait = window
+        if entry[2] then
+            wait = tonumber(entry[2]) + window - now
+        end
+        retry_ms[i] = math.max(1, math.ceil(wait * 1000))
+    end
+end
+
+local reply = {allowed}
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + 2 * i])
+    local window = tonumber(ARGV[2 + 2 * i])
+    local remaining = limit - counts[i]
+    if allowed == 1 then
+        redis.call('ZADD', key, now, member)
+        redis.call('PEXPIRE', key, math.ceil(window * 1000) + 1000)
+        remaining = remaining - 1
+    end
+    reply[#reply + 1] = math.max(0, remaining)
+    reply[#reply + 1] = retry_ms[i]
+end
+return reply
+"""
 
 
 class RateLimitResult:
@@ -74,6 +139,10 @@ class RateLimitConfig:
         endpoint_limits: Optional[Dict[str, Dict[str, int]]] = None,
         use_redis: bool = True,
         fallback_to_memory: bool = True,
+        algorithm: Optional[str] = None,
+        memory_shards: int = 64,
+        memory_max_keys: Optional[int] = None,
+        engine: Optional[LimiterEngine] = None,
     ):
         """
         Initialize rate limit configuration.
@@ -86,6 +155,12 @@ class RateLimitConfig:
             endpoint_limits: Per-endpoint limits (e.g., {'/api/v1/llm/generate': {'per_minute': 10}})
             use_redis: Whether to use Redis (True) or in-memory (False)
             fallback_to_memory: Fallback to in-memory if Redis unavailable
+            algorithm: In-memory algorithm, "sliding_window" or "gcra"/"token_bucket"
+                (default: RATE_LIMIT_ALGORITHM or "sliding_window")
+            memory_shards: Number of lock shards for in-memory state
+            memory_max_keys: In-memory keys kept before least recently used ones
+                are dropped (default: RATE_LIMIT_MAX_KEYS or 100000)
+            engine: Custom in-memory engine (overrides algorithm)
         """
         self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://redis:6379/0")
         self.default_per_minute = default_per_minute
@@ -95,9 +170,17 @@ class RateLimitConfig:
         self.use_redis = use_redis
         self.fallback_to_memory = fallback_to_memory
 
-        # In-memory fallback storage
-        self._memory_storage: Dict[str, list] = {}
-        self._memory_lock = asyncio.Lock()
+        self.algorithm = algorithm or os.getenv(
+            "RATE_LIMIT_ALGORITHM", "sliding_window"
+        )
+
+        if memory_max_keys is None:
+            memory_max_keys = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+        # In-memory fallback storage (O(1) state per key, idle keys expire)
+        self.engine = engine or create_engine(
+            self.algorithm, shards=memory_shards, max_keys=memory_max_keys
+        )
 
 
 class RateLimiter:
@@ -109,6 +192,22 @@ class RateLimiter:
         self._connection_pool: Optional[aioredis.ConnectionPool] = None
         self._is_connected = False
         self._use_redis = self.config.use_redis
+        self._sliding_window_script = None
+        self._register_engine_metrics()
+
+    def _register_engine_metrics(self):
+        """Report in-memory engine size and evictions to Prometheus."""
+        engine = self.config.engine
+        algorithm = engine.name or type(engine).__name__
+        RATE_LIMIT_TRACKED_KEYS.labels(algorithm=algorithm).set_function(
+            lambda: len(engine)
+        )
+        RATE_LIMIT_STATE_BYTES.labels(algorithm=algorithm).set_function(
+            lambda: engine.memory_bytes
+        )
+        engine.on_evict = lambda reason, count: RATE_LIMIT_EVICTIONS.labels(
+            algorithm=algorithm, reason=reason
+        ).inc(count)
 
     async def connect(self) -> bool:
         """Connect to Redis."""
@@ -125,6 +224,7 @@ class RateLimiter:
                 retry_on_timeout=True,
             )
             self.redis = aioredis.Redis(connection_pool=self._connection_pool)
+            self._sliding_window_script = None
 
             # Test connection
             await self.redis.ping()
@@ -152,8 +252,13 @@ class RateLimiter:
         logger.info("Disconnected from Redis")
 
     def _make_key(self, identifier_type: str, identifier: str, limit_type: str) -> str:
-        """Create a Redis key for rate limiting."""
-        return f"june:rate_limit:{identifier_type}:{identifier}:{limit_type}"
+        """
+        Create a Redis key for rate limiting.
+
+        The identifier is a hash tag, so all windows of one identifier share a
+        cluster slot and can be updated by one script call.
+        """
+        return f"june:rate_limit:{{{identifier_type}:{identifier}}}:{limit_type}"
 
     async def check_rate_limit(
         self,
@@ -195,19 +300,15 @@ class RateLimiter:
             per_hour = per_hour or self.config.default_per_hour
             per_day = per_day or self.config.default_per_day
 
-        # Check all limits (most restrictive wins)
-        results = []
-        for limit_type, limit_value, window_seconds in [
+        windows = [
             ("per_minute", per_minute, 60),
             ("per_hour", per_hour, 3600),
             ("per_day", per_day, 86400),
-        ]:
-            result = await self._check_limit(
-                identifier, identifier_type, limit_type, limit_value, window_seconds
-            )
-            results.append(result)
+        ]
+        results = await self._check_limits(identifier, identifier_type, windows)
 
-            # Record metrics
+        # Record metrics
+        for (limit_type, _, _), result in zip(windows, results):
             RATE_LIMIT_CHECKS.labels(
                 identifier_type=identifier_type,
                 result="allowed" if result.allowed else "denied",
@@ -230,161 +331,134 @@ class RateLimiter:
         # All allowed - return the one with least remaining
         return min(results, key=lambda r: r.remaining)
 
-    async def _check_limit(
+    async def _check_limits(
         self,
         identifier: str,
         identifier_type: str,
-        limit_type: str,
-        limit: int,
-        window_seconds: int,
-    ) -> RateLimitResult:
-        """Check a single rate limit."""
+        windows: List[Tuple[str, int, int]],
+    ) -> List[RateLimitResult]:
+        """Check (limit_type, limit, window_seconds) limits, one result each."""
         if self._use_redis and self._is_connected:
-            return await self._check_limit_redis(
-                identifier, identifier_type, limit_type, limit, window_seconds
-            )
-        else:
-            return await self._check_limit_memory(
-                identifier, identifier_type, limit_type, limit, window_seconds
-            )
+            return await self._check_limits_redis(identifier, identifier_type, windows)
+        return await self._check_limits_memory(identifier, identifier_type, windows)
 
-    async def _check_limit_redis(
+    async def _check_limits_redis(
         self,
         identifier: str,
         identifier_type: str,
-        limit_type: str,
-        limit: int,
-        window_seconds: int,
-    ) -> RateLimitResult:
-        """Check rate limit using Redis sliding window."""
+        windows: List[Tuple[str, int, int]],
+    ) -> List[RateLimitResult]:
+        """
+        Check all limits with one atomic script call.
+
+        The request is recorded in every window only if all of them allow it,
+        so rejected requests don't count against the limit.
+        """
         try:
-            key = self._make_key(identifier_type, identifier, limit_type)
+            if self._sliding_window_script is None:
+                self._sliding_window_script = self.redis.register_script(
+                    SLIDING_WINDOW_SCRIPT
+                )
             now = time.time()
-            window_start = now - window_seconds
-
-            # Use Redis sorted set for sliding window
-            pipe = self.redis.pipeline()
-
-            # Remove old entries outside the window
-            pipe.zremrangebyscore(key, 0, window_start)
-
-            # Count current requests in window
-            pipe.zcard(key)
-
-            # Add current request
-            pipe.zadd(key, {str(now): now})
-
-            # Set expiration
-            pipe.expire(key, window_seconds + 1)
-
-            # Execute pipeline
-            results = await pipe.execute()
-            current_count = results[1]  # Count before adding current request
-
-            # Check if limit exceeded
-            allowed = current_count < limit
-            remaining = max(0, limit - current_count - 1) if allowed else 0
-            reset_time = now + window_seconds
-
-            if not allowed:
-                # Calculate retry after (time until oldest request expires)
-                oldest = await self.redis.zrange(key, 0, 0, withscores=True)
-                if oldest:
-                    oldest_time = oldest[0][1]
-                    retry_after = int(max(0, oldest_time + window_seconds - now))
+            keys = [
+                self._make_key(identifier_type, identifier, limit_type)
+                for limit_type, _, _ in windows
+            ]
+            args: List[Any] = [now, f"{now:.6f}:{uuid.uuid4().hex}"]
+            for _, limit, window_seconds in windows:
+                args.extend([limit, window_seconds])
+
+            # Uses EVALSHA, loading the script on first use (NOSCRIPT)
+            reply = await self._sliding_window_script(keys=keys, args=args)
+
+            results = []
+            for i, (_, limit, window_seconds) in enumerate(windows):
+                remaining = int(reply[1 + 2 * i])
+                # 0 unless this window denied the request
+                retry_after = int(reply[2 + 2 * i]) / 1000
+                if retry_after:
+                    results.append(
+                        RateLimitResult(
+                            allowed=False,
+                            limit=limit,
+                            remaining=remaining,
+                            reset_time=now + retry_after,
+                            retry_after=max(1, math.ceil(retry_after)),
+                            error_message=f"Rate limit exceeded: {limit} requests per {window_seconds}s",
+                        )
+                    )
                 else:
-                    retry_after = window_seconds
-            else:
-                retry_after = None
-
-            return RateLimitResult(
-                allowed=allowed,
-                limit=limit,
-                remaining=remaining,
-                reset_time=reset_time,
-                retry_after=retry_after,
-                error_message=None
-                if allowed
-                else f"Rate limit exceeded: {limit} requests per {window_seconds}s",
-            )
+                    results.append(
+                        RateLimitResult(
+                            allowed=True,
+                            limit=limit,
+                            remaining=remaining,
+                            reset_time=now + window_seconds,
+                        )
+                    )
+            return results
 
         except (RedisError, ConnectionError) as e:
             logger.warning(f"Redis error in rate limit check: {e}")
             # Fallback to memory if configured
             if self.config.fallback_to_memory:
                 self._use_redis = False
-                return await self._check_limit_memory(
-                    identifier, identifier_type, limit_type, limit, window_seconds
-                )
+                return await self._check_limits(identifier, identifier_type, windows)
             # If no fallback, allow the request (fail open)
-            return RateLimitResult(
-                allowed=True,
-                limit=limit,
-                remaining=limit - 1,
-                reset_time=time.time() + window_seconds,
-                error_message=None,
-            )
+            return [
+                RateLimitResult(
+                    allowed=True,
+                    limit=limit,
+                    remaining=limit - 1,
+                    reset_time=time.time() + window_seconds,
+                    error_message=None,
+                )
+                for _, limit, window_seconds in windows
+            ]
 
-    async def _check_limit_memory(
+    async def _check_limits_memory(
         self,
         identifier: str,
         identifier_type: str,
-        limit_type: str,
-        limit: int,
-        window_seconds: int,
-    ) -> RateLimitResult:
-        """Check rate limit using in-memory storage."""
-        async with self._memory_lock:
-            key = f"{identifier_type}:{identifier}:{limit_type}"
-            now = time.time()
-            window_start = now - window_seconds
-
-            # Get or create request list
-            if key not in self.config._memory_storage:
-                self.config._memory_storage[key] = []
-
-            requests = self.config._memory_storage[key]
-
-            # Remove old requests outside the window
-            requests = [ts for ts in requests if ts > window_start]
-            self.config._memory_storage[key] = requests
-
-            # Check limit
-            current_count = len(requests)
-            allowed = current_count < limit
-            remaining = max(0, limit - current_count - 1) if allowed else 0
-            reset_time = now + window_seconds
-
-            if not allowed:
-                # Calculate retry after
-                oldest = min(requests) if requests else now
-                retry_after = int(max(0, oldest + window_seconds - now))
-            else:
-                retry_after = None
-                # Add current request
-                requests.append(now)
-                self.config._memory_storage[key] = requests
+        windows: List[Tuple[str, int, int]],
+    ) -> List[RateLimitResult]:
+        """
+        Check all limits using the in-memory engine.
 
-            return RateLimitResult(
-                allowed=allowed,
+        Like the Redis script, the request is counted in every window only if
+        all of them allow it.
+        """
+        decisions = self.config.engine.hit_all(
+            [
+                (f"{identifier_type}:{identifier}:{limit_type}", limit, window_seconds)
+                for limit_type, limit, window_seconds in windows
+            ]
+        )
+        return [
+            RateLimitResult(
+                allowed=decision.allowed,
                 limit=limit,
-                remaining=remaining,
-                reset_time=reset_time,
-                retry_after=retry_after,
+                remaining=decision.remaining,
+                reset_time=decision.reset_time,
+                retry_after=None
+                if decision.allowed
+                else max(1, int(math.ceil(decision.retry_after))),
                 error_message=None
-                if allowed
+                if decision.allowed
                 else f"Rate limit exceeded: {limit} requests per {window_seconds}s",
             )
+            for decision, (_, limit, window_seconds) in zip(decisions, windows)
+        ]
 
     async def get_stats(
         self, identifier: str, identifier_type: str = "user"
     ) -> Dict[str, int]:
         """Get rate limit statistics for an identifier."""
         stats = {}
-        for limit_type, window_seconds in [
-            ("per_minute", 60),
-            ("per_hour", 3600),
-            ("per_day", 86400),
+        for limit_type, limit, window_seconds in [
+            ("per_minute", self.config.default_per_minute, 60),
+            ("per_hour", self.config.default_per_hour, 3600),
+            ("per_day", self.config.default_per_day, 86400),
         ]:
             key = self._make_key(identifier_type, identifier, limit_type)
             if self._use_redis and self._is_connected:
@@ -396,17 +470,10 @@ class RateLimiter:
                 except (RedisError, ConnectionError):
                     stats[limit_type] = 0
             else:
-                async with self._memory_lock:
-                    memory_key = f"{identifier_type}:{identifier}:{limit_type}"
-                    if memory_key in self.config._memory_storage:
-                        now = time.time()
-                        window_start = now - window_seconds
-                        requests = self.config._memory_storage[memory_key]
-                        stats[limit_type] = len(
-                            [ts for ts in requests if ts > window_start]
-                        )
-                    else:
-                        stats[limit_type] = 0
+                memory_key = f"{identifier_type}:{identifier}:{limit_type}"
+                stats[limit_type] = round(
+                    self.config.engine.usage(memory_key, limit, window_seconds)
+                )
 
         return stats
 
@@ -420,7 +487,4 @@ class RateLimiter:
                 except (RedisError, ConnectionError):
                     pass
             else:
-                async with self._memory_lock:
-                    memory_key = f"{identifier_type}:{identifier}:{limit_type}"
-                    if memory_key in self.config._memory_storage:
-                        del self.config._memory_storage[memory_key]
+                self.config.engine.reset(f"{identifier_type}:{identifier}:{limit_type}")
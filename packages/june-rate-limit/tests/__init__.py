@@ -0,0 +1 @@
+"""Tests for june-rate-limit package."""
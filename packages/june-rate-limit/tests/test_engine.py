@@ -0,0 +1,157 @@
+"""Tests for the in-memory rate limit engines."""
+
+import pytest
+from june_rate_limit import (
+    GCRAEngine,
+    RateLimitConfig,
+    RateLimiter,
+    SlidingWindowCounterEngine,
+    create_engine,
+)
+
+
+class TestSlidingWindowCounterEngine:
+    """Test SlidingWindowCounterEngine."""
+
+    def test_limit_within_window(self):
+        engine = SlidingWindowCounterEngine(shards=4)
+        decisions = [engine.hit("k", 5, 60, now=1000.0) for _ in range(6)]
+        assert [d.allowed for d in decisions] == [True] * 5 + [False]
+        assert [d.remaining for d in decisions[:5]] == [4, 3, 2, 1, 0]
+        assert decisions[5].retry_after == pytest.approx(20.0)  # Next window at 1020
+
+    def test_previous_window_is_weighted(self):
+        engine = SlidingWindowCounterEngine()
+        for _ in range(10):
+            engine.hit("k", 10, 60, now=1020.0)  # Window [1020, 1080)
+        # Halfway through the next window half of the old count remains
+        assert engine.usage("k", 10, 60, now=1110.0) == pytest.approx(5.0)
+        decisions = [engine.hit("k", 10, 60, now=1110.0) for _ in range(6)]
+        assert [d.allowed for d in decisions] == [True] * 5 + [False]
+        # Old windows are forgotten entirely
+        assert engine.usage("k", 10, 60, now=1300.0) == 0
+
+    def test_constant_state_per_key(self):
+        engine = SlidingWindowCounterEngine()
+        for i in range(1000):
+            engine.hit("k", 10000, 86400, now=1000.0 + i)
+        assert len(engine) == 1
+        assert len(engine._shard("k").states["k"]) == 3
+
+
+class TestGCRAEngine:
+    """Test GCRAEngine."""
+
+    def test_burst_then_steady_rate(self):
+        engine = GCRAEngine()
+        decisions = [engine.hit("k", 5, 60, now=1000.0) for _ in range(6)]
+        assert [d.allowed for d in decisions] == [True] * 5 + [False]
+        assert decisions[4].remaining == 0
+        assert decisions[5].retry_after == pytest.approx(12.0)
+        # One request is replenished every window / limit seconds
+        assert engine.hit("k", 5, 60, now=1012.0).allowed
+        assert not engine.hit("k", 5, 60, now=1012.0).allowed
+        assert engine.usage("k", 5, 60, now=1072.0) == 0
+
+    def test_reset(self):
+        engine = create_engine("token_bucket")
+        assert isinstance(engine, GCRAEngine)
+        engine.hit("k", 1, 60, now=1000.0)
+        assert not engine.hit("k", 1, 60, now=1000.0).allowed
+        engine.reset("k")
+        assert engine.hit("k", 1, 60, now=1000.0).allowed
+
+    def test_unknown_algorithm(self):
+        with pytest.raises(ValueError):
+            create_engine("fixed_window")
+
+
+class TestHitAll:
+    """Test checking several limits at once."""
+
+    @pytest.mark.parametrize("algorithm", ["sliding_window", "gcra"])
+    def test_denied_request_is_not_counted(self, algorithm):
+        engine = create_engine(algorithm, shards=1)
+        limits = [("k:minute", 2, 60), ("k:day", 10, 86400)]
+        decisions = [engine.hit_all(limits, now=1000.0) for _ in range(5)]
+        allowed = [[d.allowed for d in ds] for ds in decisions]
+        assert allowed == [[True, True]] * 2 + [[False, True]] * 3
+        # Only the two allowed requests count against the daily limit
+        assert engine.usage("k:day", 10, 86400, now=1000.0) == pytest.approx(2.0)
+        assert engine.usage("k:minute", 2, 60, now=1000.0) == pytest.approx(2.0)
+
+    def test_keys_on_many_shards(self):
+        engine = SlidingWindowCounterEngine(shards=8)
+        limits = [(f"k{i}", 1, 60) for i in range(20)]
+        assert all(d.allowed for d in engine.hit_all(limits, now=1000.0))
+        assert not any(d.allowed for d in engine.hit_all(limits, now=1000.0))
+        assert len(engine) == 20
+
+
+class TestEngineEviction:
+    """Test that engine memory stays bounded."""
+
+    @pytest.mark.parametrize("algorithm", ["sliding_window", "gcra"])
+    def test_idle_keys_expire(self, algorithm):
+        evictions = []
+        engine = create_engine(
+            algorithm, shards=1, on_evict=lambda *args: evictions.append(args)
+        )
+        for i in range(100):
+            engine.hit(f"user{i}", 10, 60, now=1000.0)
+        assert len(engine) == 100
+        assert engine.memory_bytes > 0
+
+        # Long after every window has elapsed, the next hit drops idle keys
+        engine.hit("active", 10, 60, now=2000.0)
+        assert len(engine) == 1
+        assert evictions == [("expired", 100)]
+
+    def test_periodic_sweep_drops_keys_behind_live_ones(self):
+        engine = SlidingWindowCounterEngine(shards=1, sweep_interval=1000)
+        engine.hit("day", 10, 86400, now=1000.0)  # Stays at the LRU end
+        engine.hit("minute", 10, 60, now=1000.0)
+        # "minute" has expired but "day" is in front of it
+        engine.hit("other", 10, 60, now=1100.0)
+        assert len(engine) == 3
+        engine.hit("other", 10, 60, now=2000.0)
+        assert len(engine) == 2
+        assert engine.sweep(now=10**6) == 2
+        assert len(engine) == 0
+        assert engine.memory_bytes == 0
+
+    def test_capacity_spills_least_recently_used(self):
+        evictions = []
+        engine = GCRAEngine(
+            shards=1, max_keys=3, on_evict=lambda *args: evictions.append(args)
+        )
+        for key in ["a", "b", "c"]:
+            engine.hit(key, 10, 60, now=1000.0)
+        engine.hit("a", 10, 60, now=1000.0)
+        engine.hit("d", 10, 60, now=1000.0)
+        assert len(engine) == 3
+        assert engine.usage("b", 10, 60, now=1000.0) == 0
+        assert engine.usage("a", 10, 60, now=1000.0) == pytest.approx(2.0)
+        assert evictions == [("capacity", 1)]
+
+
+class TestRateLimiterMemory:
+    """Test RateLimiter with in-memory engines."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("algorithm", ["sliding_window", "gcra"])
+    async def test_check_and_stats(self, algorithm):
+        config = RateLimitConfig(
+            default_per_minute=3, use_redis=False, algorithm=algorithm
+        )
+        limiter = RateLimiter(config)
+        results = [await limiter.check_rate_limit("u1") for _ in range(4)]
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert results[-1].retry_after >= 1
+        assert results[-1].to_headers()["X-RateLimit-Limit"] == "3"
+
+        stats = await limiter.get_stats("u1")
+        assert stats["per_minute"] == 3
+        assert stats["per_hour"] == 3  # The denied request was not counted
+        await limiter.reset_limit("u1")
+        assert (await limiter.get_stats("u1"))["per_minute"] == 0
@@ -0,0 +1,76 @@
+"""Tests for the atomic Redis sliding window script."""
+
+import asyncio
+
+import pytest
+from june_rate_limit import RateLimitConfig, RateLimiter
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # Lua scripting support for fakeredis
+
+
+@pytest.fixture
+def limiter():
+    config = RateLimitConfig(
+        default_per_minute=3,
+        default_per_hour=5,
+        default_per_day=100,
+        fallback_to_memory=False,
+    )
+    limiter = RateLimiter(config)
+    limiter.redis = fakeredis.aioredis.FakeRedis()
+    limiter._is_connected = True
+    return limiter
+
+
+class TestRedisSlidingWindowScript:
+    """Test RateLimiter against Redis (fakeredis with Lua)."""
+
+    @pytest.mark.asyncio
+    async def test_single_round_trip_per_check(self, limiter):
+        calls = []
+        original = limiter.redis.evalsha
+
+        async def evalsha(*args, **kwargs):
+            calls.append(args[0])
+            return await original(*args, **kwargs)
+
+        limiter.redis.evalsha = evalsha
+        results = [await limiter.check_rate_limit("u1") for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results[:3]] == [2, 1, 0]
+        assert 1 <= results[3].retry_after <= 60
+        # The first call loads the script after NOSCRIPT, then one call each
+        assert len(calls) == 5
+        assert len(set(calls)) == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_requests_are_not_counted(self, limiter):
+        for _ in range(10):
+            await limiter.check_rate_limit("u1")
+        stats = await limiter.get_stats("u1")
+        assert stats == {"per_minute": 3, "per_hour": 3, "per_day": 3}
+
+    @pytest.mark.asyncio
+    async def test_most_restrictive_window_wins(self, limiter):
+        for _ in range(3):
+            assert (await limiter.check_rate_limit("u1", per_minute=10)).allowed
+        result = await limiter.check_rate_limit("u1", per_minute=10, per_hour=3)
+        assert not result.allowed
+        assert result.limit == 3
+        assert "3600s" in result.error_message
+
+    @pytest.mark.asyncio
+    async def test_concurrent_checks_are_atomic(self, limiter):
+        results = await asyncio.gather(
+            *[limiter.check_rate_limit("u1") for _ in range(20)]
+        )
+        assert sum(r.allowed for r in results) == 3
+
+    @pytest.mark.asyncio
+    async def test_reset_limit(self, limiter):
+        for _ in range(3):
+            await limiter.check_rate_limit("u1")
+        await limiter.reset_limit("u1")
+        assert (await limiter.check_rate_limit("u1")).allowed
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 """
-Conversation Export CLI Tool - Export conversations to JSON, TXT, or PDF formats.
+Conversation Export CLI Tool - Export conversations to JSON, TXT, PDF, JSON Lines or CSV.
+
+JSON Lines and CSV exports are streamed from the database in batches, so they
+run in constant memory and can cover all of a user's conversations.
 
 Usage:
     python export_conversation.py --user-id USER_ID --chat-id CHAT_ID --format json
+    python export_conversation.py --user-id USER_ID --format jsonl --output -
     python export_conversation.py --user-id USER_ID --chat-id CHAT_ID --format txt --output conversation.txt
     python export_conversation.py --user-id USER_ID --chat-id CHAT_ID --format pdf --start-date 2024-01-01 --end-date 2024-12-31
 """
@@ -16,10 +20,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-# Add parent directory to path to import conversation_storage
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "telegram"))
+# Add repository root to path to import essence
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
 
-from conversation_storage import ConversationStorage
+from essence.chat.storage.conversation import (
+    EXPORT_STREAM_FORMATS,
+    ConversationStorage,
+)
 
 # Setup logging
 logging.basicConfig(
@@ -40,7 +47,7 @@ def parse_date(date_str: str) -> datetime:
 def main():
     """Main entry point for conversation export CLI."""
     parser = argparse.ArgumentParser(
-        description="Export conversation to JSON, TXT, or PDF format",
+        description="Export conversation to JSON, TXT, PDF, JSON Lines or CSV format",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -52,22 +59,32 @@ Examples:
 
   # Export to PDF with date range
   python export_conversation.py --user-id 123 --chat-id 456 --format pdf --start-date 2024-01-01 --end-date 2024-12-31
+
+  # Stream all of a user's conversations as JSON Lines to stdout
+  python export_conversation.py --user-id 123 --format jsonl --output -
         """,
     )
 
     parser.add_argument("--user-id", required=True, help="Telegram user ID")
     parser.add_argument(
-        "--chat-id", required=True, help="Telegram chat ID (session_id)"
+        "--chat-id",
+        help="Telegram chat ID (session_id); optional for jsonl/csv to export all chats",
     )
     parser.add_argument(
         "--format",
-        choices=["json", "txt", "pdf"],
+        choices=["json", "txt", "pdf", *EXPORT_STREAM_FORMATS],
         default="json",
         help="Export format (default: json)",
     )
     parser.add_argument(
         "--output",
-        help="Output file path (default: conversation_{user_id}_{chat_id}.{format})",
+        help="Output file path, or - for stdout "
+        "(default: conversation_{user_id}_{chat_id}.{format})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Rows fetched per round trip for jsonl/csv exports",
     )
     parser.add_argument(
         "--start-date",
@@ -79,6 +96,9 @@ Examples:
     )
 
     args = parser.parse_args()
+    streaming = args.format in EXPORT_STREAM_FORMATS
+    if not streaming and not args.chat_id:
+        parser.error(f"--chat-id is required for {args.format} exports")
 
     # Parse dates if provided
     start_date = None
@@ -102,13 +122,39 @@ Examples:
     if args.output:
         output_file = Path(args.output)
     else:
-        output_file = Path(f"conversation_{args.user_id}_{args.chat_id}.{args.format}")
+        output_file = Path(
+            f"conversation_{args.user_id}_{args.chat_id or 'all'}.{args.format}"
+        )
 
     try:
         logger.info(
             f"Exporting conversation for user_id={args.user_id}, chat_id={args.chat_id} to {args.format} format..."
         )
 
+        if streaming:
+            chunks = ConversationStorage.stream_conversation_export(
+                user_id=args.user_id,
+                chat_id=args.chat_id,
+                format=args.format,
+                start_date=start_date,
+                end_date=end_date,
+                batch_size=args.batch_size,
+            )
+            size = 0
+            if args.output == "-":
+                for chunk in chunks:
+                    sys.stdout.buffer.write(chunk)
+                    size += len(chunk)
+                sys.stdout.buffer.flush()
+            else:
+                with open(output_file, "wb") as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+                        size += len(chunk)
+                logger.info(f"Conversation exported successfully to: {output_file}")
+            logger.info(f"Exported {size} bytes")
+            return
+
         # Export conversation
         export_data = ConversationStorage.export_conversation(
             user_id=args.user_id,
@@ -118,6 +164,12 @@ Examples:
             end_date=end_date,
         )
 
+        if args.output == "-":
+            sys.stdout.buffer.write(export_data)
+            sys.stdout.buffer.flush()
+            logger.info(f"Exported {len(export_data)} bytes")
+            return
+
         # Write to file
         with open(output_file, "wb") as f:
             f.write(export_data)
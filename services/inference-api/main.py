@@ -7,6 +7,7 @@ import logging
 import os
 import re
 import sys
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -695,7 +696,14 @@ class InferenceAPIService(llm_pb2_grpc.LLMInferenceServicer):
     async def _generate_tokens_stream(
         self, prompt: str, params: GenerationParameters, context_data: Dict[str, Any]
     ) -> AsyncGenerator[GenerationChunk, None]:
-        """Generate tokens with streaming."""
+        """Generate tokens with streaming.
+
+        Pulls deltas from the strategy's blocking ``infer_stream`` iterator on a
+        worker thread so each token is forwarded as soon as it is decoded.
+        """
+        deltas = None
+        cancel = threading.Event()
+        pending = None
         try:
             # Use strategy to generate text
             request = InferenceRequest(
@@ -712,29 +720,32 @@ class InferenceAPIService(llm_pb2_grpc.LLMInferenceServicer):
                 metadata={},
             )
 
-            response = self.llm_strategy.infer(request)
-
-            # Extract generated text from response
-            if isinstance(response.payload, dict):
-                response_text = response.payload.get("text", "")
-            else:
-                response_text = str(response.payload)
-
-            # Yield tokens (simplified - in real implementation, use proper streaming)
-            tokens = response_text.split()
-            for i, token in enumerate(tokens):
-                chunk = GenerationChunk(
-                    token=token + " ",
-                    is_final=(i == len(tokens) - 1),
-                    index=i,
-                    finish_reason=FinishReason.STOP
-                    if i == len(tokens) - 1
-                    else FinishReason.STOP,
+            loop = asyncio.get_running_loop()
+            deltas = iter(self.llm_strategy.infer_stream(request, cancel=cancel))
+            end_of_stream = object()
+
+            index = 0
+            while True:
+                pending = loop.run_in_executor(None, next, deltas, end_of_stream)
+                # Shielded so a cancelled request can still wait for next() below
+                delta = await asyncio.shield(pending)
+                pending = None
+                if delta is end_of_stream:
+                    break
+                if not delta:
+                    continue
+                yield GenerationChunk(
+                    token=delta,
+                    is_final=False,
+                    index=index,
+                    finish_reason=FinishReason.STOP,
                 )
-                yield chunk
+                index += 1
 
-                # Small delay to simulate streaming
-                await asyncio.sleep(0.01)
+            TOKEN_COUNT.labels(model=config.model.name).inc(index)
+            yield GenerationChunk(
+                token="", is_final=True, index=index, finish_reason=FinishReason.STOP
+            )
 
         except Exception as e:
             logger.error(f"Token generation error: {e}")
@@ -742,6 +753,17 @@ class InferenceAPIService(llm_pb2_grpc.LLMInferenceServicer):
                 token="", is_final=True, finish_reason=FinishReason.ERROR
             )
             yield error_chunk
+        finally:
+            # Stop generation if the client went away mid-stream. The strategy
+            # must see the cancel first: a worker thread may still be inside
+            # next(), and closing the iterator then raises "generator already
+            # executing" while generation carries on.
+            cancel.set()
+            if pending is not None:
+                await asyncio.wait([pending])
+            close = getattr(deltas, "close", None)
+            if close is not None:
+                close()
 
     async def _generate_text(
         self, prompt: str, params: GenerationParameters, context_data: Dict[str, Any]
@@ -0,0 +1,109 @@
+"""
+NumPy audio buffer for streaming recognition.
+
+Keeps streamed samples in one preallocated array instead of a Python list, so
+appending a chunk is a single memcpy and transcription/VAD can read the
+buffered audio as an ndarray view without rebuilding it sample by sample.
+"""
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Growable, contiguous ring buffer of audio samples.
+
+    Samples live in ``_data[_start:_end]``. Consuming from the front only moves
+    ``_start``; when an append does not fit at the end, live samples are
+    compacted to the front (or the array is doubled), so appends are amortized
+    O(chunk) and ``view()`` is always a zero-copy contiguous slice.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 16000 * 30,
+        dtype: np.dtype = np.float32,
+        max_samples: Optional[int] = None,
+    ):
+        """Initialize buffer.
+
+        Args:
+            capacity: Initial number of samples to preallocate
+            dtype: Sample dtype (float32 or int16)
+            max_samples: If set, keep only the most recent max_samples samples
+        """
+        self.dtype = np.dtype(dtype)
+        self.max_samples = max_samples
+        self._data = np.empty(max(1, capacity), dtype=self.dtype)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def capacity(self) -> int:
+        """Number of samples that fit without reallocating."""
+        return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the preallocated storage in bytes."""
+        return self._data.nbytes
+
+    def append(self, samples: np.ndarray) -> None:
+        """Append samples (converted to the buffer dtype if needed)."""
+        samples = np.asarray(samples, dtype=self.dtype).reshape(-1)
+        if self.max_samples is not None and len(samples) >= self.max_samples:
+            samples = samples[-self.max_samples :]
+            self._start = self._end = 0
+        count = len(samples)
+        if count == 0:
+            return
+
+        if self._end + count > len(self._data):
+            self._make_room(count)
+        self._data[self._end : self._end + count] = samples
+        self._end += count
+
+        if self.max_samples is not None and len(self) > self.max_samples:
+            self._start = self._end - self.max_samples
+
+    def _make_room(self, count: int) -> None:
+        size = len(self)
+        needed = size + count
+        if needed <= len(self._data) * 3 // 4:
+            # Enough consumed space at the front: compact in place (numpy
+            # handles the overlapping copy)
+            self._data[:size] = self._data[self._start : self._end]
+        else:
+            # Mostly full: double so compaction cost stays amortized O(1)
+            capacity = len(self._data)
+            while capacity * 3 // 4 < needed:
+                capacity *= 2
+            data = np.empty(capacity, dtype=self.dtype)
+            data[:size] = self._data[self._start : self._end]
+            self._data = data
+        self._start = 0
+        self._end = size
+
+    def view(self) -> np.ndarray:
+        """Zero-copy view of the buffered samples, oldest first.
+
+        The view is only valid until the next append/consume/clear.
+        """
+        return self._data[self._start : self._end]
+
+    def tail(self, count: int) -> np.ndarray:
+        """Zero-copy view of the most recent ``count`` samples."""
+        return self._data[max(self._start, self._end - count) : self._end]
+
+    def consume(self, count: int) -> None:
+        """Drop the ``count`` oldest samples."""
+        self._start = min(self._end, self._start + max(0, count))
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def clear(self) -> None:
+        """Drop all samples, keeping the allocated storage."""
+        self._start = self._end = 0
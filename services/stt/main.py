@@ -45,6 +45,7 @@ HealthRequest = asr_pb2.HealthRequest
 HealthResponse = asr_pb2.HealthResponse
 
 from inference_core import CircularBuffer, HealthChecker, Timer, config, setup_logging
+from inference_core.stt.local_agreement import LocalAgreement, Word
 
 # Initialize tracing early
 tracer = None
@@ -96,6 +97,15 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
     from stt_metrics import get_metrics_storage
 
+from audio_buffer import AudioRingBuffer
+from streaming_vad import StreamingVad
+from transcription_pool import (
+    TranscriptionPool,
+    TranscriptionQueueFull,
+    create_transcription_pool,
+    load_whisper_model,
+)
+
 # Setup logging
 setup_logging(config.monitoring.log_level, "stt")
 logger = logging.getLogger(__name__)
@@ -126,6 +136,21 @@ ACTIVE_CONNECTIONS = Gauge(
 ERROR_COUNT = Counter(
     "stt_errors_total", "Total errors", ["error_type"], registry=REGISTRY
 )
+TRANSCRIPTION_QUEUE_DEPTH = Gauge(
+    "stt_transcription_queue_depth",
+    "Transcriptions running or waiting for a worker",
+    registry=REGISTRY,
+)
+TRANSCRIPTIONS_REJECTED = Counter(
+    "stt_transcriptions_rejected_total",
+    "Transcriptions rejected because the worker queue was full",
+    registry=REGISTRY,
+)
+TRANSCRIPTIONS_CANCELLED = Counter(
+    "stt_transcriptions_cancelled_total",
+    "Transcriptions cancelled because the client went away",
+    registry=REGISTRY,
+)
 
 
 class STTService(asr_pb2_grpc.SpeechToTextServicer):
@@ -140,6 +165,25 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
         self.audio_buffer = CircularBuffer(1000)
         self.device = config.stt.device
         self.sample_rate = config.stt.sample_rate
+        # Silence after speech that ends a segment (endpoint)
+        self.vad_endpoint_ms = int(os.getenv("STT_VAD_ENDPOINT_MS", "600"))
+        # Upper bound on buffered audio before an interim result is forced
+        self.max_segment_seconds = float(os.getenv("STT_MAX_SEGMENT_SECONDS", "30"))
+        # "local_agreement": re-decode the uncommitted tail and commit words two
+        # consecutive hypotheses agree on; "segments": one interim per VAD segment
+        self.streaming_mode = os.getenv("STT_STREAMING_MODE", "local_agreement")
+        # Minimum new audio between re-decodes of the uncommitted tail
+        self.stream_decode_seconds = float(
+            os.getenv("STT_STREAM_DECODE_SECONDS", "1.0")
+        )
+        # Uncommitted audio kept before it is trimmed at the last committed word
+        self.stream_trim_seconds = float(os.getenv("STT_STREAM_TRIM_SECONDS", "10"))
+        # Whisper runs on a worker pool so the event loop keeps serving streams
+        self.transcription_pool: Optional[TranscriptionPool] = None
+        self.worker_mode = os.getenv("STT_WORKER_MODE", "thread")
+        self.max_workers = int(os.getenv("STT_MAX_WORKERS", "1"))
+        self.max_queue = int(os.getenv("STT_MAX_QUEUE", "8"))
+        self.queue_timeout = float(os.getenv("STT_QUEUE_TIMEOUT_SECONDS", "0"))
 
         # Add health checks
         self.health_checker.add_check("model", self._check_model_health)
@@ -159,7 +203,7 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
 
         try:
             with Timer("recognition_stream"):
-                audio_buffer = []
+                audio_buffer = AudioRingBuffer(capacity=self.sample_rate * 10)
                 session_id = str(uuid.uuid4())
                 chunk_count = 0
                 total_audio_size = 0
@@ -167,41 +211,131 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
                 if span:
                     span.set_attribute("stt.session_id", session_id)
 
+                streaming_vad = self._create_streaming_vad()
+                # Absolute sample index (from stream start) of audio_buffer[0]
+                buffer_start = 0
+                agreement = (
+                    LocalAgreement()
+                    if self.streaming_mode == "local_agreement"
+                    else None
+                )
+                decode_samples = int(self.sample_rate * self.stream_decode_seconds)
+                undecoded = 0
+
                 async for chunk in request_iterator:
                     chunk_count += 1
                     total_audio_size += len(chunk.audio_data)
 
                     # Process audio chunk
                     audio_data = await self._process_audio_chunk(chunk)
-                    audio_buffer.extend(audio_data)
-
-                    # Check for voice activity if VAD is enabled
-                    if config.stt.enable_vad and len(audio_buffer) > 0:
-                        vad_result = await self._detect_voice_activity(audio_buffer)
-                        if vad_result:
+                    audio_buffer.append(audio_data)
+
+                    # Cut points for interim results, relative to the buffer start
+                    cut_points = []
+                    if streaming_vad is not None:
+                        # Only the new frames are classified
+                        for event in streaming_vad.process(audio_data):
+                            cut = event.sample - buffer_start
+                            if event.kind == "speech_end" and cut > 0:
+                                cut_points.append(cut)
+                        if streaming_vad.in_speech:
                             VAD_DETECTIONS.labels(action="detected").inc()
                         else:
                             VAD_DETECTIONS.labels(action="silence").inc()
+                        max_samples = int(self.sample_rate * self.max_segment_seconds)
+                    else:
+                        max_samples = self.sample_rate * 5  # 5 seconds
+
+                    if agreement is not None:
+                        undecoded += len(audio_data)
+                        if (
+                            streaming_vad is not None
+                            and not streaming_vad.in_speech
+                            and not streaming_vad.segments
+                        ):
+                            # No speech yet: keep only a short lead-in
+                            lead_in = self.sample_rate // 2
+                            if len(audio_buffer) > lead_in:
+                                dropped = len(audio_buffer) - lead_in
+                                audio_buffer.consume(dropped)
+                                buffer_start += dropped
+                            continue
+                        if undecoded < decode_samples:
+                            continue
+                        undecoded = 0
+
+                        interim_result = await self._decode_uncommitted(
+                            agreement, audio_buffer, buffer_start, is_final=False
+                        )
+                        # Trim committed audio once the window gets long, so a
+                        # decode never covers more than the trim window plus
+                        # the unstable tail
+                        cut = (
+                            int(agreement.committed_end * self.sample_rate)
+                            - buffer_start
+                        )
+                        if cut > 0 and len(audio_buffer) > self.sample_rate * (
+                            self.stream_trim_seconds
+                        ):
+                            audio_buffer.consume(cut)
+                            buffer_start += cut
+                        if interim_result:
+                            if span:
+                                span.set_attribute(
+                                    "stt.interim_transcript_length",
+                                    len(interim_result.transcript),
+                                )
+                            yield interim_result
+                        continue
+
+                    if not cut_points and len(audio_buffer) > max_samples:
+                        cut_points.append(len(audio_buffer))
 
-                    # Send interim results for long audio
-                    if len(audio_buffer) > self.sample_rate * 5:  # 5 seconds
+                    consumed = 0
+                    for cut in cut_points:
+                        segment = audio_buffer.view()[consumed:cut]
+                        segment_start = buffer_start + consumed
+                        consumed = cut
                         interim_result = await self._transcribe_audio(
-                            audio_buffer, is_final=False
+                            segment, is_final=False
                         )
                         if interim_result:
+                            self._offset_result(interim_result, segment_start)
                             if span:
                                 span.set_attribute(
                                     "stt.interim_transcript_length",
                                     len(interim_result.transcript),
                                 )
                             yield interim_result
-                            audio_buffer = []  # Clear buffer after interim result
+                    if consumed:
+                        # Drop audio that has been transcribed
+                        audio_buffer.consume(consumed)
+                        buffer_start += consumed
+
+                if streaming_vad is not None:
+                    streaming_vad.flush()
+                    if span:
+                        span.set_attribute(
+                            "stt.vad_segments", len(streaming_vad.segments)
+                        )
+                        span.set_attribute(
+                            "stt.vad_speech_ratio", streaming_vad.speech_ratio
+                        )
 
                 # Final transcription
-                if audio_buffer:
-                    final_result = await self._transcribe_audio(
-                        audio_buffer, is_final=True
-                    )
+                if len(audio_buffer) > 0 or (
+                    agreement and (agreement.committed or agreement.tentative)
+                ):
+                    if agreement is not None:
+                        final_result = await self._decode_uncommitted(
+                            agreement, audio_buffer, buffer_start, is_final=True
+                        )
+                    else:
+                        final_result = await self._transcribe_audio(
+                            audio_buffer.view(), is_final=True
+                        )
+                        if final_result:
+                            self._offset_result(final_result, buffer_start)
                     if final_result:
                         if span:
                             span.set_attribute(
@@ -229,6 +363,11 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
                 if span:
                     span.set_status(trace.Status(trace.StatusCode.OK))
 
+        except TranscriptionQueueFull as e:
+            logger.warning(f"Recognition stream rejected: {e}")
+            if span:
+                span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
         except Exception as e:
             logger.error(f"Recognition stream error: {e}")
             if span:
@@ -449,7 +588,11 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
                 except Exception as metrics_error:
                     logger.warning(f"Failed to record error metrics: {metrics_error}")
 
-                context.set_code(grpc.StatusCode.INTERNAL)
+                if isinstance(e, TranscriptionQueueFull):
+                    # Backpressure: the client should retry later
+                    context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+                else:
+                    context.set_code(grpc.StatusCode.INTERNAL)
                 context.set_details(str(e))
                 return RecognitionResponse()
         finally:
@@ -467,7 +610,111 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
             healthy=is_healthy, version="0.2.0", model_name=config.stt.model_name
         )
 
-    async def _process_audio_chunk(self, chunk: AudioChunk) -> List[float]:
+    def _create_streaming_vad(self) -> Optional[StreamingVad]:
+        """Create per-stream VAD state, or None if VAD is disabled/unavailable."""
+        if not config.stt.enable_vad or self.vad is None:
+            return None
+        # WebRTC VAD keeps adaptive state, so each stream gets its own instance
+        return StreamingVad(
+            webrtcvad.Vad(2),
+            sample_rate=self.sample_rate,
+            endpoint_silence_ms=self.vad_endpoint_ms,
+        )
+
+    def _offset_result(self, result: RecognitionResult, start_sample: int) -> None:
+        """Shift segment-relative timestamps to stream time."""
+        if start_sample <= 0:
+            return
+        offset_us = int(start_sample * 1_000_000 / self.sample_rate)
+        result.start_time_us += offset_us
+        result.end_time_us += offset_us
+        for word in result.words:
+            word.start_time_us += offset_us
+            word.end_time_us += offset_us
+
+    async def _decode_uncommitted(
+        self,
+        agreement: LocalAgreement,
+        audio_buffer: AudioRingBuffer,
+        buffer_start: int,
+        is_final: bool,
+    ) -> Optional[RecognitionResult]:
+        """Re-decode the uncommitted audio and apply local agreement.
+
+        Args:
+            agreement: Local agreement state for the stream
+            audio_buffer: Audio starting at or before the last committed word
+            buffer_start: Absolute sample index of the first buffered sample
+            is_final: Commit everything that is left (end of stream)
+
+        Returns:
+            Result with the full transcript so far (committed + tentative), or
+            None if there is no text yet or an interim decode was skipped
+
+        Raises:
+            TranscriptionQueueFull: If the final decode could not be queued
+        """
+        try:
+            window = await self._transcribe_audio(
+                audio_buffer.view(),
+                is_final=is_final,
+                initial_prompt=agreement.prompt,
+                word_timestamps=True,
+            )
+        except TranscriptionQueueFull:
+            if is_final:
+                raise
+            # Workers are saturated: skip this interim decode, the same audio
+            # is decoded again (with more appended) on the next attempt
+            logger.debug("Skipping interim decode: transcription queue is full")
+            return None
+        offset = buffer_start / self.sample_rate
+        words = None
+        if window is not None:
+            words = [
+                Word(
+                    text=info.word,
+                    start=offset + info.start_time_us / 1_000_000,
+                    end=offset + info.end_time_us / 1_000_000,
+                    probability=info.confidence,
+                )
+                for info in window.words
+            ]
+
+        if is_final:
+            agreement.finish(words)
+        else:
+            if words is not None:
+                # A failed or empty decode says nothing about the tentative
+                # words, so keep them for the next hypothesis
+                agreement.update(words)
+            if len(audio_buffer) > self.sample_rate * self.max_segment_seconds:
+                # Whisper decodes at most 30s: stop waiting for agreement
+                agreement.commit_tentative()
+
+        words = agreement.committed + agreement.tentative
+        if not words:
+            return None
+        return RecognitionResult(
+            transcript=agreement.text,
+            is_final=is_final,
+            confidence=window.confidence if window else 0.9,
+            words=[
+                WordInfo(
+                    word=word.text,
+                    confidence=word.probability,
+                    start_time_us=int(word.start * 1_000_000),
+                    end_time_us=int(word.end * 1_000_000),
+                )
+                for word in words
+            ],
+            start_time_us=int(words[0].start * 1_000_000),
+            end_time_us=int(words[-1].end * 1_000_000),
+            speaker_id="",
+            detected_language=window.detected_language if window else "",
+        )
+
+    async def _process_audio_chunk(self, chunk: AudioChunk) -> np.ndarray:
         """Process incoming audio chunk."""
         try:
             # Decode audio data
@@ -488,15 +735,15 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
                     audio_data, chunk.sample_rate, self.sample_rate
                 )
 
-            return audio_data.tolist()
+            return audio_data
 
         except Exception as e:
             logger.error(f"Audio chunk processing error: {e}")
-            return []
+            return np.empty(0, dtype=np.float32)
 
     async def _process_audio_data(
         self, audio_data: bytes, sample_rate: int
-    ) -> List[float]:
+    ) -> np.ndarray:
         """Process audio data for one-shot recognition."""
         try:
             # Decode audio data
@@ -509,11 +756,11 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
                     audio_array, sample_rate, self.sample_rate
                 )
 
-            return audio_array.tolist()
+            return audio_array
 
         except Exception as e:
             logger.error(f"Audio data processing error: {e}")
-            return []
+            return np.empty(0, dtype=np.float32)
 
     async def _resample_audio(
         self, audio_data: np.ndarray, orig_sr: int, target_sr: int
@@ -535,29 +782,32 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
 
     async def _transcribe_audio(
         self,
-        audio_data: List[float],
+        audio_data: np.ndarray,
         is_final: bool = True,
         language: Optional[str] = None,
+        initial_prompt: Optional[str] = None,
+        word_timestamps: bool = False,
     ) -> Optional[RecognitionResult]:
         """
         Transcribe audio using Whisper.
 
         Args:
-            audio_data: Audio data as list of floats
+            audio_data: Float32 samples (lists are accepted and converted)
             is_final: Whether this is the final chunk
             language: Language code (ISO 639-1) or None for auto-detection
+            initial_prompt: Text preceding this audio (e.g. committed streaming
+                transcript) to condition the decoder on
+            word_timestamps: Ask Whisper for per-word timings
 
         Returns:
             RecognitionResult or None if transcription fails
         """
         try:
-            if (
-                not audio_data or len(audio_data) < self.sample_rate * 0.1
-            ):  # Less than 100ms
+            if len(audio_data) < self.sample_rate * 0.1:  # Less than 100ms
                 return None
 
-            # Convert to numpy array
-            audio_array = np.array(audio_data, dtype=np.float32)
+            # No copy when the samples are already float32
+            audio_array = np.asarray(audio_data, dtype=np.float32)
 
             # Ensure audio is in the right format for Whisper
             if len(audio_array.shape) == 1:
@@ -570,8 +820,14 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
                 if language:
                     transcribe_kwargs["language"] = language
                 # If language is None, don't pass it - Whisper will auto-detect
+                if initial_prompt:
+                    transcribe_kwargs["initial_prompt"] = initial_prompt
+                if word_timestamps:
+                    transcribe_kwargs["word_timestamps"] = True
 
-                result = self.whisper_model.transcribe(audio_array, **transcribe_kwargs)
+                result = await self._get_transcription_pool().transcribe(
+                    audio_array, **transcribe_kwargs
+                )
 
             # Extract transcription details
             transcript = result["text"].strip()
@@ -628,11 +884,33 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
                 or "",  # ISO 639-1 code of detected language
             )
 
+        except asyncio.CancelledError:
+            # Client went away; a queued transcription never reaches a worker
+            TRANSCRIPTIONS_CANCELLED.inc()
+            raise
+        except TranscriptionQueueFull:
+            TRANSCRIPTIONS_REJECTED.inc()
+            ERROR_COUNT.labels(error_type="queue_full").inc()
+            raise
         except Exception as e:
             logger.error(f"Transcription error: {e}")
             return None
 
-    async def _detect_voice_activity(self, audio_data: List[float]) -> bool:
+    def _get_transcription_pool(self) -> TranscriptionPool:
+        """Return the transcription pool, creating a single-thread pool around
+        an already loaded model if _load_models() did not create one."""
+        if self.transcription_pool is None:
+            model = self.whisper_model
+            self.transcription_pool = TranscriptionPool(
+                lambda: model,
+                model=model,
+                max_workers=1,
+                max_queue=self.max_queue,
+                queue_timeout=self.queue_timeout,
+            )
+        return self.transcription_pool
+
+    async def _detect_voice_activity(self, audio_data: np.ndarray) -> bool:
         """Detect voice activity using WebRTC VAD."""
         try:
             if (
@@ -641,7 +919,7 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
                 return False
 
             # Convert to 16-bit PCM for VAD
-            audio_array = np.array(audio_data, dtype=np.float32)
+            audio_array = np.asarray(audio_data, dtype=np.float32)
             audio_16bit = (audio_array * 32767).astype(np.int16)
 
             # Process in 20ms chunks
@@ -697,29 +975,26 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
                     actual_device = "cpu"
             
             logger.info(f"Loading Whisper model on device: {actual_device}")
-            
-            # If falling back to CPU but cached model was saved on CUDA, we need to handle device mapping
-            # Set torch device mapping to handle CUDA->CPU conversion for cached models
-            if actual_device == "cpu" and self.device.startswith("cuda"):
-                import torch
-                # Monkey-patch torch.load to handle CUDA->CPU mapping for cached models
-                original_load = torch.load
-                def load_with_cpu_mapping(*args, **kwargs):
-                    if "map_location" not in kwargs:
-                        kwargs["map_location"] = torch.device("cpu")
-                    return original_load(*args, **kwargs)
-                torch.load = load_with_cpu_mapping
-                try:
-                    self.whisper_model = whisper.load_model(
-                        model_name, device=actual_device
-                    )
-                finally:
-                    # Restore original torch.load
-                    torch.load = original_load
-            else:
-                self.whisper_model = whisper.load_model(
-                    model_name, device=actual_device
-                )
+
+            # If falling back to CPU but cached model was saved on CUDA, map the
+            # cached tensors to the CPU while loading
+            map_to_cpu = actual_device == "cpu" and self.device.startswith("cuda")
+            self.whisper_model = load_whisper_model(
+                model_name, actual_device, map_to_cpu=map_to_cpu
+            )
+            self.transcription_pool = create_transcription_pool(
+                model_name,
+                actual_device,
+                model=self.whisper_model,
+                map_to_cpu=map_to_cpu,
+                mode=self.worker_mode,
+                max_workers=self.max_workers,
+                max_queue=self.max_queue,
+                queue_timeout=self.queue_timeout,
+            )
+            TRANSCRIPTION_QUEUE_DEPTH.set_function(
+                lambda: self.transcription_pool.in_flight
+            )
 
             # Initialize VAD if enabled
             if config.stt.enable_vad:
@@ -746,8 +1021,8 @@ class STTService(asr_pb2_grpc.SpeechToTextServicer):
     async def disconnect_services(self):
         """Disconnect from external services."""
         # NATS removed - services communicate via gRPC directly
-        # No cleanup needed
-        pass
+        if self.transcription_pool is not None:
+            self.transcription_pool.shutdown()
 
 
 # Global service instance
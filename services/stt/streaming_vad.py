@@ -0,0 +1,146 @@
+"""
+Incremental voice activity detection for streaming recognition.
+
+Classifies each new 20ms frame exactly once (carrying partial frames over to
+the next chunk), keeps running speech/silence counts and an endpointing state
+machine, and reports speech segment boundaries as absolute sample offsets
+from the start of the stream.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+
+@dataclass
+class SpeechSegment:
+    """Speech segment boundaries in samples from the start of the stream."""
+
+    start_sample: int
+    end_sample: int
+
+
+@dataclass
+class VadEvent:
+    """Speech start or end detected while processing a chunk."""
+
+    kind: str  # 'speech_start' or 'speech_end'
+    sample: int
+    segment: Optional[SpeechSegment] = None
+
+
+class StreamingVad:
+    """Stateful WebRTC VAD over a stream of float32 chunks.
+
+    Speech starts after ``speech_start_ms`` of consecutive speech frames and
+    ends (an endpoint) after ``endpoint_silence_ms`` of consecutive silence.
+    Work per chunk is proportional to the chunk, not to the utterance.
+    """
+
+    def __init__(
+        self,
+        vad,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        speech_start_ms: int = 60,
+        endpoint_silence_ms: int = 600,
+    ):
+        """Initialize streaming VAD.
+
+        Args:
+            vad: Object with ``is_speech(frame_bytes, sample_rate)`` (webrtcvad.Vad)
+            sample_rate: Sample rate of the incoming audio
+            frame_ms: Frame length (10, 20 or 30 ms for WebRTC VAD)
+            speech_start_ms: Consecutive speech needed to open a segment
+            endpoint_silence_ms: Consecutive silence needed to close a segment
+        """
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.speech_start_frames = max(1, speech_start_ms // frame_ms)
+        self.endpoint_silence_frames = max(1, endpoint_silence_ms // frame_ms)
+
+        self._pending = np.empty(0, dtype=np.int16)
+        self.samples_processed = 0
+        self.speech_frames = 0
+        self.silence_frames = 0
+        self.in_speech = False
+        self.segment_start: Optional[int] = None
+        self.segments: List[SpeechSegment] = []
+        self._speech_run = 0
+        self._silence_run = 0
+        self._last_speech_end = 0
+
+    @property
+    def total_frames(self) -> int:
+        """Number of frames classified so far."""
+        return self.speech_frames + self.silence_frames
+
+    @property
+    def speech_ratio(self) -> float:
+        """Fraction of classified frames that contained speech."""
+        total = self.total_frames
+        return self.speech_frames / total if total else 0.0
+
+    def process(self, samples: np.ndarray) -> List[VadEvent]:
+        """Classify the complete frames in ``samples`` (plus any carried-over part).
+
+        Args:
+            samples: New float32 samples in [-1, 1]
+
+        Returns:
+            Speech start/end events detected in this chunk, in order
+        """
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+        if len(self._pending):
+            pcm = np.concatenate([self._pending, pcm])
+
+        events: List[VadEvent] = []
+        usable = len(pcm) - len(pcm) % self.frame_samples
+        for offset in range(0, usable, self.frame_samples):
+            frame = pcm[offset : offset + self.frame_samples]
+            is_speech = self.vad.is_speech(frame.tobytes(), self.sample_rate)
+            frame_end = self.samples_processed + self.frame_samples
+            event = self._update(is_speech, frame_end)
+            if event is not None:
+                events.append(event)
+            self.samples_processed = frame_end
+
+        self._pending = pcm[usable:].copy()
+        return events
+
+    def _update(self, is_speech: bool, frame_end: int) -> Optional[VadEvent]:
+        if is_speech:
+            self.speech_frames += 1
+            self._speech_run += 1
+            self._silence_run = 0
+            self._last_speech_end = frame_end
+            if not self.in_speech and self._speech_run >= self.speech_start_frames:
+                self.in_speech = True
+                self.segment_start = frame_end - self._speech_run * self.frame_samples
+                return VadEvent(kind="speech_start", sample=self.segment_start)
+            return None
+
+        self.silence_frames += 1
+        self._silence_run += 1
+        self._speech_run = 0
+        if self.in_speech and self._silence_run >= self.endpoint_silence_frames:
+            return self._close_segment(self._last_speech_end)
+        return None
+
+    def _close_segment(self, end_sample: int) -> VadEvent:
+        segment = SpeechSegment(start_sample=self.segment_start, end_sample=end_sample)
+        self.segments.append(segment)
+        self.in_speech = False
+        self.segment_start = None
+        return VadEvent(kind="speech_end", sample=end_sample, segment=segment)
+
+    def flush(self) -> Optional[VadEvent]:
+        """Close an open segment at the end of the stream.
+
+        Returns:
+            speech_end event if a segment was open, otherwise None
+        """
+        if not self.in_speech:
+            return None
+        return self._close_segment(self._last_speech_end)
@@ -0,0 +1,277 @@
+"""
+Worker pool for Whisper transcription.
+
+Whisper inference is CPU/GPU bound and blocking, so running it directly in a
+grpc.aio handler stalls every other stream on the event loop. The pool runs
+transcriptions on a thread or process pool, bounds the number of queued jobs
+(callers get TranscriptionQueueFull instead of an unbounded backlog) and
+cancels queued jobs whose caller went away (e.g. the gRPC client disconnected).
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Model used by the current worker process (process mode)
+_process_model = None
+
+
+class TranscriptionQueueFull(Exception):
+    """Raised when the pool cannot accept another transcription."""
+
+
+def load_whisper_model(model_name: str, device: str, map_to_cpu: bool = False):
+    """Load a Whisper model.
+
+    Args:
+        model_name: Whisper model name (e.g. "large-v3")
+        device: Device to load the model on
+        map_to_cpu: Map CUDA tensors in cached checkpoints to the CPU (used when
+            falling back to CPU on a host without CUDA)
+
+    Returns:
+        Loaded Whisper model
+    """
+    import torch
+    import whisper
+
+    if not map_to_cpu:
+        return whisper.load_model(model_name, device=device)
+
+    # Monkey-patch torch.load to handle CUDA->CPU mapping for cached models
+    original_load = torch.load
+
+    def load_with_cpu_mapping(*args, **kwargs):
+        if "map_location" not in kwargs:
+            kwargs["map_location"] = torch.device("cpu")
+        return original_load(*args, **kwargs)
+
+    torch.load = load_with_cpu_mapping
+    try:
+        return whisper.load_model(model_name, device=device)
+    finally:
+        # Restore original torch.load
+        torch.load = original_load
+
+
+def _init_process_worker(load_model: Callable[[], Any]) -> None:
+    global _process_model
+    _process_model = load_model()
+
+
+def _transcribe_in_process(audio: np.ndarray, kwargs: Dict[str, Any]) -> Dict:
+    return _process_model.transcribe(audio, **kwargs)
+
+
+class _ThreadModels:
+    """One model per worker thread.
+
+    Whisper installs forward hooks on the decoder for its KV cache during
+    transcribe(), so a model must not be used by two threads at once. The
+    model that is already loaded is handed to the first worker; further
+    workers load their own copy.
+    """
+
+    def __init__(self, load_model: Callable[[], Any], model: Any = None):
+        self._load_model = load_model
+        self._spare = [model] if model is not None else []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def get(self) -> Any:
+        model = getattr(self._local, "model", None)
+        if model is None:
+            with self._lock:
+                model = self._spare.pop() if self._spare else None
+            if model is None:
+                model = self._load_model()
+            self._local.model = model
+        return model
+
+    def transcribe(self, audio: np.ndarray, kwargs: Dict[str, Any]) -> Dict:
+        return self.get().transcribe(audio, **kwargs)
+
+
+class TranscriptionPool:
+    """Bounded thread/process pool for blocking transcription calls.
+
+    At most ``max_workers`` transcriptions run at once and at most
+    ``max_queue`` more wait for a worker. When the pool is full, ``transcribe``
+    waits up to ``queue_timeout`` seconds for a slot and then raises
+    TranscriptionQueueFull. Cancelling the awaiting task cancels the job if it
+    has not started yet; a running job finishes in the background and its
+    result is discarded.
+    """
+
+    def __init__(
+        self,
+        load_model: Callable[[], Any],
+        model: Any = None,
+        max_workers: int = 1,
+        max_queue: int = 8,
+        queue_timeout: float = 0.0,
+        use_processes: bool = False,
+    ):
+        """Initialize pool.
+
+        Args:
+            load_model: Zero-argument callable that loads a Whisper model; must
+                be picklable (e.g. functools.partial of load_whisper_model) in
+                process mode
+            model: Already loaded model to reuse for the first thread worker
+            max_workers: Number of concurrent transcriptions
+            max_queue: Number of transcriptions allowed to wait for a worker
+            queue_timeout: Seconds to wait for a slot when the pool is full
+                (0 rejects immediately)
+            use_processes: Run workers in separate processes (each loads its
+                own model) instead of threads
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.use_processes = use_processes
+
+        self._executor: Executor
+        if use_processes:
+            # spawn: CUDA cannot be re-initialized in a forked child
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+                initargs=(load_model,),
+            )
+            self._transcribe: Callable = _transcribe_in_process
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="whisper"
+            )
+            self._transcribe = _ThreadModels(load_model, model).transcribe
+
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Transcriptions running or waiting for a worker."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Transcriptions waiting for a worker."""
+        return max(0, self._in_flight - self.max_workers)
+
+    async def transcribe(self, audio: np.ndarray, **kwargs) -> Dict:
+        """Run ``model.transcribe(audio, **kwargs)`` on a worker.
+
+        Args:
+            audio: Audio samples; must not be modified until this returns
+            **kwargs: Keyword arguments for Whisper's transcribe()
+
+        Returns:
+            Whisper result dict
+
+        Raises:
+            TranscriptionQueueFull: If no slot became free within queue_timeout
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots is None:
+            # Created lazily so the semaphore binds to the serving loop
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+        slots = self._slots
+
+        if slots.locked() and self.queue_timeout <= 0:
+            self.rejected += 1
+            raise TranscriptionQueueFull(
+                f"Transcription queue full ({self._in_flight} in flight)"
+            )
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout or None)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise TranscriptionQueueFull(
+                f"No transcription slot within {self.queue_timeout}s"
+            ) from None
+
+        try:
+            future = self._executor.submit(self._transcribe, audio, kwargs)
+        except BaseException:
+            slots.release()
+            raise
+        self._in_flight += 1
+
+        def on_done(_future) -> None:
+            # The slot is freed when the worker is done (or the job was
+            # cancelled before starting), not when the caller stops waiting
+            try:
+                loop.call_soon_threadsafe(self._release, _future)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+        future.add_done_callback(on_done)
+        # wrap_future cancels the executor job if the awaiting task is cancelled
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future) -> None:
+        self._in_flight -= 1
+        if future.cancelled():
+            self.cancelled += 1
+        else:
+            self.completed += 1
+        self._slots.release()
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the workers and drop queued transcriptions."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def create_transcription_pool(
+    model_name: str,
+    device: str,
+    model: Any = None,
+    map_to_cpu: bool = False,
+    mode: str = "thread",
+    max_workers: int = 1,
+    max_queue: int = 8,
+    queue_timeout: float = 0.0,
+) -> TranscriptionPool:
+    """Create a TranscriptionPool that loads Whisper models on demand.
+
+    Args:
+        model_name: Whisper model name for workers that need their own model
+        device: Device for worker models
+        model: Already loaded model (reused by the first thread worker)
+        map_to_cpu: See load_whisper_model
+        mode: "thread" or "process"
+        max_workers: Number of concurrent transcriptions
+        max_queue: Number of transcriptions allowed to wait for a worker
+        queue_timeout: Seconds to wait for a slot when the pool is full
+
+    Returns:
+        Configured pool
+    """
+    if mode not in ("thread", "process"):
+        raise ValueError(f"Unknown transcription worker mode: {mode}")
+    load_model = functools.partial(
+        load_whisper_model, model_name, device, map_to_cpu=map_to_cpu
+    )
+    logger.info(
+        f"Transcription pool: {max_workers} {mode} worker(s), queue {max_queue}"
+    )
+    return TranscriptionPool(
+        load_model,
+        model=model,
+        max_workers=max_workers,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+        use_processes=mode == "process",
+    )
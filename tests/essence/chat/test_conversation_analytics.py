@@ -0,0 +1,105 @@
+"""
+Tests for rollup-backed conversation analytics.
+"""
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from essence.chat.storage import conversation  # noqa: E402
+from essence.chat.storage.conversation import ConversationStorage  # noqa: E402
+
+
+def _connection(*rows):
+    conn = MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.fetchone.side_effect = list(rows)
+    return conn, cursor
+
+
+class TestConversationAnalytics:
+    """get_conversation_analytics reads conversation_stats."""
+
+    def test_reads_rollup(self):
+        first = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+        conn, cursor = _connection(
+            {"id": "conv-1"},
+            {
+                "message_count": 4,
+                "user_message_count": 2,
+                "assistant_message_count": 2,
+                "response_time_sum": 6.0,
+                "response_count": 2,
+                "first_message_at": first,
+                "last_message_at": first + timedelta(minutes=30),
+            },
+        )
+        with patch.object(conversation, "get_db_connection", return_value=conn):
+            result = ConversationStorage.get_conversation_analytics("1", "2")
+
+        assert result["message_count"] == 4
+        assert result["average_response_time_seconds"] == 3.0
+        assert result["last_message_at"] == (first + timedelta(minutes=30)).isoformat()
+        queries = [call.args[0] for call in cursor.execute.call_args_list]
+        assert "conversation_stats" in queries[1]
+        assert not any("FROM messages" in q for q in queries)
+
+    def test_conversation_without_messages(self):
+        conn, _ = _connection({"id": "conv-1"}, None)
+        with patch.object(conversation, "get_db_connection", return_value=conn):
+            result = ConversationStorage.get_conversation_analytics("1", "2")
+        assert result["conversation_id"] == "conv-1"
+        assert result["message_count"] == 0
+
+
+class TestDashboardAnalytics:
+    """get_dashboard_analytics reads the hourly/daily rollups."""
+
+    def test_unbounded_range_uses_daily_rollup(self):
+        conn, cursor = _connection(
+            {"total_conversations": 3},
+            {
+                # psycopg2 returns SUM(bigint) as Decimal, SUM(double) as float
+                "total_messages": Decimal(10),
+                "user_messages": Decimal(5),
+                "assistant_messages": Decimal(5),
+                "response_time_sum": 10.0,
+                "response_count": Decimal(4),
+            },
+            {"active_users": 2},
+        )
+        with patch.object(conversation, "get_db_connection", return_value=conn):
+            result = ConversationStorage.get_dashboard_analytics()
+
+        assert result["total_messages"] == 10
+        assert result["average_response_time_seconds"] == 2.5
+        assert result["active_users"] == 2
+        queries = [call.args[0] for call in cursor.execute.call_args_list]
+        assert "message_stats_daily" in queries[1]
+        assert not any("FROM messages" in q for q in queries)
+
+    def test_date_range_uses_hourly_rollup(self):
+        conn, cursor = _connection(
+            {"total_conversations": 0},
+            {
+                "total_messages": None,
+                "user_messages": None,
+                "assistant_messages": None,
+                "response_time_sum": None,
+                "response_count": None,
+            },
+            {"active_users": 0},
+        )
+        start = datetime(2026, 1, 1)
+        end = datetime(2026, 1, 2)
+        with patch.object(conversation, "get_db_connection", return_value=conn):
+            result = ConversationStorage.get_dashboard_analytics(start, end)
+
+        assert result["total_messages"] == 0
+        assert result["average_response_time_seconds"] == 0.0
+        query, params = cursor.execute.call_args_list[1].args
+        assert "message_stats_hourly" in query
+        assert params == [start, end]
@@ -0,0 +1,105 @@
+"""
+Tests for the streaming conversation export.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from essence.chat.storage import conversation  # noqa: E402
+from essence.chat.storage.conversation import ConversationStorage  # noqa: E402
+
+
+def _row(i):
+    return {
+        "conversation_id": "conv-1",
+        "user_id": "1",
+        "session_id": "2",
+        "role": "user" if i % 2 == 0 else "assistant",
+        "content": f"message {i}",
+        "created_at": datetime(2026, 1, 1, 12, 0, i),
+        "metadata": {"n": i} if i == 0 else None,
+    }
+
+
+def _connections(rows, batch_size):
+    """A lookup connection returning conv-1, then a streaming connection."""
+    lookup = MagicMock()
+    lookup.cursor.return_value.fetchone.return_value = ("conv-1",)
+    stream = MagicMock()
+    batches = [rows[i : i + batch_size] for i in range(0, len(rows), batch_size)]
+    stream.cursor.return_value.fetchmany.side_effect = batches + [[]]
+    return lookup, stream
+
+
+class TestStreamConversationExport:
+    """stream_conversation_export yields one chunk per server-side batch."""
+
+    def test_jsonl_batches(self):
+        rows = [_row(i) for i in range(5)]
+        lookup, stream = _connections(rows, 2)
+        with patch.object(
+            conversation, "get_db_connection", side_effect=[lookup, stream]
+        ):
+            chunks = list(
+                ConversationStorage.stream_conversation_export(
+                    "1", "2", format="jsonl", batch_size=2
+                )
+            )
+
+        assert len(chunks) == 3
+        records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        assert [r["content"] for r in records] == [f"message {i}" for i in range(5)]
+        assert records[0]["metadata"] == {"n": 0}
+        assert records[1]["created_at"] == "2026-01-01T12:00:01"
+        assert stream.cursor.call_args.kwargs["name"].startswith("conversation_export_")
+        stream.close.assert_called_once()
+
+    def test_csv_has_header(self):
+        lookup, stream = _connections([_row(0)], 10)
+        with patch.object(
+            conversation, "get_db_connection", side_effect=[lookup, stream]
+        ):
+            data = b"".join(
+                ConversationStorage.stream_conversation_export("1", "2", format="csv")
+            )
+
+        rows = list(csv.DictReader(io.StringIO(data.decode("utf-8"))))
+        assert rows[0]["chat_id"] == "2"
+        assert json.loads(rows[0]["metadata"]) == {"n": 0}
+
+    def test_all_conversations_skip_lookup(self):
+        stream = MagicMock()
+        stream.cursor.return_value.fetchmany.side_effect = [[]]
+        with patch.object(conversation, "get_db_connection", return_value=stream):
+            assert list(ConversationStorage.stream_conversation_export("1")) == []
+        query, params = stream.cursor.return_value.execute.call_args.args
+        assert "m.conversation_id = %s" not in query
+        assert params == ["1"]
+
+    def test_early_close_returns_connection(self):
+        lookup, stream = _connections([_row(i) for i in range(4)], 1)
+        with patch.object(
+            conversation, "get_db_connection", side_effect=[lookup, stream]
+        ):
+            chunks = ConversationStorage.stream_conversation_export(
+                "1", "2", batch_size=1
+            )
+            next(chunks)
+            chunks.close()
+        stream.close.assert_called_once()
+
+    def test_errors_raised_before_streaming(self):
+        with pytest.raises(ValueError):
+            ConversationStorage.stream_conversation_export("1", "2", format="pdf")
+
+        lookup = MagicMock()
+        lookup.cursor.return_value.fetchone.return_value = None
+        with patch.object(conversation, "get_db_connection", return_value=lookup):
+            with pytest.raises(ValueError):
+                ConversationStorage.stream_conversation_export("1", "2")
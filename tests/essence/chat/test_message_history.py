@@ -56,8 +56,8 @@ class TestMessageHistory:
         )
 
         assert len(history._messages) == 1
-        assert history._by_user["12345"] == [0]
-        assert history._by_chat["67890"] == [0]
+        assert list(history._by_user["12345"]) == [0]
+        assert list(history._by_chat["67890"]) == [0]
 
     def test_get_messages_by_user(self):
         """Test retrieving messages by user ID."""
@@ -147,6 +147,183 @@ class TestMessageHistory:
         assert history._messages[0].message_content == "Message 2"  # Oldest remaining
         assert history._messages[-1].message_content == "Message 4"  # Newest
 
+    def test_evict_keeps_indexes_consistent(self):
+        """Test that eviction drops evicted entries from every index."""
+        history = MessageHistory(max_entries=4)
+
+        for i in range(10):
+            history.add_message(
+                "telegram" if i % 2 else "discord",
+                f"user-{i % 3}",
+                f"chat-{i % 2}",
+                f"Message {i}",
+                "text" if i % 2 else "error",
+                message_id=f"m{i}",
+            )
+
+        assert [m.message_content for m in history._messages] == [
+            "Message 6",
+            "Message 7",
+            "Message 8",
+            "Message 9",
+        ]
+        assert [m.message_content for m in history.get_messages(user_id="user-0")] == [
+            "Message 9",
+            "Message 6",
+        ]
+        assert [m.seq for m in history.get_messages(chat_id="chat-1")] == [9, 7]
+        assert history.get_by_message_id("m5") is None
+        assert history.get_by_message_id("m8").message_content == "Message 8"
+        assert set(history._by_message_id) == {"m6", "m7", "m8", "m9"}
+
+        stats = history.get_stats()
+        assert stats["total_messages"] == 4
+        assert stats["by_platform"] == {"telegram": 2, "discord": 2}
+        assert stats["by_type"]["error"] == 2
+        assert stats["unique_users"] == 3
+
+    def test_sequence_numbers(self):
+        """Test that sequence numbers are stable and never reused."""
+        history = MessageHistory(max_entries=2)
+
+        first = history.add_message("telegram", "1", "1", "Message 1", "text")
+        second = history.add_message("telegram", "1", "1", "Message 2", "text")
+        assert (first.seq, second.seq) == (0, 1)
+        assert history.get_entry(1) is second
+
+        history.add_message("telegram", "1", "1", "Message 3", "text")
+        assert history.get_entry(0) is None  # Evicted
+        assert history.get_entry(1) is second
+
+        history.clear()
+        fourth = history.add_message("telegram", "1", "1", "Message 4", "text")
+        assert fourth.seq == 3
+        assert history.last_seq == 3
+        assert history.get_entry(2) is None
+
+    def test_keyset_pagination(self):
+        """Test after_seq/before_seq cursors."""
+        history = MessageHistory(max_entries=100)
+        for i in range(10):
+            history.add_message("telegram", f"user-{i % 2}", "1", f"Message {i}")
+
+        # Polling forward (oldest first)
+        page = history.get_messages(after_seq=3, limit=3)
+        assert [m.seq for m in page] == [4, 5, 6]
+        page = history.get_messages(after_seq=page[-1].seq, limit=3)
+        assert [m.seq for m in page] == [7, 8, 9]
+        assert history.get_messages(after_seq=9) == []
+
+        # Paging back (newest first), through a user index
+        page = history.get_messages(user_id="user-0", limit=2)
+        assert [m.seq for m in page] == [8, 6]
+        page = history.get_messages(user_id="user-0", before_seq=6, limit=2)
+        assert [m.seq for m in page] == [4, 2]
+        page = history.get_messages(user_id="user-1", after_seq=4, before_seq=9)
+        assert [m.seq for m in page] == [5, 7]
+
+    def test_keyset_pagination_after_eviction(self):
+        """Test that cursors older than the ring start from the oldest entry."""
+        history = MessageHistory(max_entries=3)
+        for i in range(6):
+            history.add_message("telegram", "1", "1", f"Message {i}")
+
+        assert [m.seq for m in history.get_messages(after_seq=0)] == [3, 4, 5]
+        assert [m.seq for m in history.get_messages(chat_id="1", before_seq=4)] == [3]
+
+    def test_count_messages(self):
+        """Test maintained per-filter counts."""
+        history = MessageHistory(max_entries=5)
+        for i in range(7):
+            history.add_message(
+                "telegram" if i % 2 else "discord",
+                f"user-{i % 3}",
+                "chat",
+                f"Message {i}",
+                "error" if i == 6 else "text",
+            )
+
+        # Entries 2..6 remain
+        assert history.count_messages() == 5
+        assert history.count_messages(platform="discord") == 3
+        assert history.count_messages(user_id="user-0") == 2
+        assert history.count_messages(user_id="user-0", message_type="error") == 1
+        assert history.count_messages(platform="telegram", chat_id="chat") == 2
+        assert history.count_messages(user_id="missing") == 0
+        for user_id in ("user-0", "user-1", "user-2"):
+            for platform in ("telegram", "discord"):
+                assert history.count_messages(
+                    user_id=user_id, platform=platform
+                ) == len(history.get_messages(user_id=user_id, platform=platform))
+
+    def test_get_by_message_id_per_platform(self):
+        """Test message_id lookup scoped to a platform."""
+        history = MessageHistory()
+
+        history.add_message("telegram", "1", "1", "Telegram", message_id="7")
+        history.add_message("discord", "2", "2", "Discord", message_id="7")
+
+        assert history.get_by_message_id("7", platform="telegram").user_id == "1"
+        assert history.get_by_message_id("7").message_content == "Discord"
+        assert history.get_by_message_id("7", platform="other") is None
+
+    def test_get_by_message_id_filters_by_user(self):
+        """Test message_id lookup picks the newest entry of the given user."""
+        history = MessageHistory()
+
+        history.add_message("telegram", "1", "1", "Telegram", message_id="7")
+        history.add_message("discord", "2", "2", "Discord", message_id="7")
+
+        assert history.get_by_message_id("7", user_id="1").platform == "telegram"
+        assert history.get_by_message_id("7", user_id="2").platform == "discord"
+        assert history.get_by_message_id("7", user_id="3") is None
+        assert history.get_by_message_id("7", "discord", user_id="1") is None
+
+    def test_get_by_message_id_reused_across_chats(self):
+        """Test an ID reused in another chat doesn't hide the first message."""
+        history = MessageHistory(max_entries=3)
+
+        history.add_message("telegram", "u1", "c1", "hello", message_id="42")
+        history.add_message("telegram", "u2", "c2", "other", message_id="42")
+
+        entry = history.get_by_message_id("42", platform="telegram", user_id="u1")
+        assert entry.message_content == "hello"
+        assert history.get_by_message_id("42").message_content == "other"
+
+        # Evicting the older message leaves the newer one indexed
+        history.add_message("telegram", "u3", "c3", "a")
+        history.add_message("telegram", "u3", "c3", "b")
+        assert history.get_by_message_id("42", user_id="u1") is None
+        assert history.get_by_message_id("42", user_id="u2").chat_id == "c2"
+        history.add_message("telegram", "u3", "c3", "c")
+        assert "42" not in history._by_message_id
+
+    def test_index_compaction_after_eviction(self):
+        """Test per-user indexes stay bounded and correct under eviction."""
+        history = MessageHistory(max_entries=10)
+
+        for i in range(500):
+            history.add_message("telegram", str(i % 2), "1", f"Message {i}")
+
+        index = history._by_user["0"]
+        assert list(index) == list(range(490, 500, 2))
+        assert len(index.seqs) < 2 * 64
+        page = history.get_messages(user_id="0", after_seq=491, limit=2)
+        assert [entry.seq for entry in page] == [492, 494]
+        page = history.get_messages(user_id="0", before_seq=494)
+        assert [entry.seq for entry in page] == [492, 490]
+
+    def test_get_by_message_id_returns_latest(self):
+        """Test message_id lookup when an ID is reused."""
+        history = MessageHistory()
+
+        history.add_message("telegram", "1", "1", "Old", "text", message_id="42")
+        history.add_message("telegram", "1", "2", "New", "text", message_id="42")
+
+        assert history.get_by_message_id("42").message_content == "New"
+        assert history.get_by_message_id(42).message_content == "New"
+        assert history.get_by_message_id("missing") is None
+
     def test_clear(self):
         """Test clearing all messages."""
         history = MessageHistory()
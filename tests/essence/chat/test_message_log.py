@@ -0,0 +1,294 @@
+"""
+Tests for the append-only message log and persistent message history.
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from essence.chat import message_log
+from essence.chat.message_history import PersistentMessageHistory
+from essence.chat.message_log import LogLockedError, MessageLog
+
+
+def _fill(log, count, start_seq=0, start_time=1000.0):
+    for seq in range(start_seq, start_seq + count):
+        log.append(seq, start_time + seq, f"record {seq}".encode())
+
+
+class TestMessageLog:
+    """Tests for MessageLog."""
+
+    def test_survives_restart(self, tmp_path):
+        log = MessageLog(str(tmp_path), segment_records=4)
+        _fill(log, 10)
+        log.close()
+
+        log = MessageLog(str(tmp_path), segment_records=4)
+        assert len(log) == 10
+        assert log.segment_count == 3
+        assert log.next_seq == 10
+        assert log.get(6) == (6, 1006.0, b"record 6")
+        assert log.get(10) is None
+        log.append(10, 1010.0, b"record 10")
+        assert [seq for seq, _, _ in log.scan()] == list(range(11))
+        log.close()
+
+    def test_rejects_out_of_order_seq(self, tmp_path):
+        log = MessageLog(str(tmp_path))
+        _fill(log, 3)
+        with pytest.raises(ValueError):
+            log.append(2, 2000.0, b"again")
+        log.close()
+
+    def test_truncates_torn_tail(self, tmp_path):
+        log = MessageLog(str(tmp_path), segment_records=100)
+        _fill(log, 5)
+        log.close()
+        # Simulate a crash in the middle of writing a record
+        (segment,) = [p for p in tmp_path.iterdir() if p.suffix == ".log"]
+        with open(segment, "ab") as f:
+            f.write(b"\x10\x00\x00\x00garbage")
+
+        log = MessageLog(str(tmp_path), segment_records=100)
+        assert len(log) == 5
+        log.append(5, 1005.0, b"record 5")
+        assert [payload for _, _, payload in log.scan()][-2:] == [
+            b"record 4",
+            b"record 5",
+        ]
+        log.close()
+
+    def test_reindexes_records_missing_from_index(self, tmp_path):
+        log = MessageLog(str(tmp_path), segment_records=100)
+        _fill(log, 5)
+        log.sync()
+        # The index page with the last entries never reached the disk
+        log._segments[-1]._set_count(2)
+        log.close()
+
+        log = MessageLog(str(tmp_path), segment_records=100)
+        assert [seq for seq, _, _ in log.scan()] == [0, 1, 2, 3, 4]
+        log.close()
+
+    def test_time_range_scan(self, tmp_path):
+        log = MessageLog(str(tmp_path), segment_records=8)
+        _fill(log, 50)
+        records = list(log.scan(start_time=1010.0, end_time=1020.0))
+        assert [seq for seq, _, _ in records] == list(range(10, 20))
+
+        newest = list(log.scan(start_time=1045.0, reverse=True))
+        assert [seq for seq, _, _ in newest] == [49, 48, 47, 46, 45]
+
+        after = list(log.scan(after_seq=47))
+        assert [seq for seq, _, _ in after] == [48, 49]
+        log.close()
+
+    def test_index_times_stay_monotonic(self, tmp_path):
+        log = MessageLog(str(tmp_path))
+        log.append(0, 1000.0, b"a")
+        log.append(1, 900.0, b"clock stepped back")
+        log.append(2, 1001.0, b"b")
+        assert [seq for seq, _, _ in log.scan(start_time=1000.0)] == [0, 1, 2]
+        log.close()
+
+    def test_compact_drops_old_records_and_merges_segments(self, tmp_path):
+        log = MessageLog(str(tmp_path), segment_records=10)
+        _fill(log, 45)
+        assert log.segment_count == 5
+
+        # Whole segment 0-9 dropped, 10-14 dropped from the second one
+        removed = log.compact(before_time=1015.0)
+        assert removed == 15
+        assert log.first_seq == 15
+        assert [seq for seq, _, _ in log.scan()] == list(range(15, 45))
+
+        # Keep only even seqs: sealed segments shrink and are merged
+        log.compact(keep=lambda record: record[0] % 2 == 0 or record[0] >= 40)
+        assert log.segment_count == 3
+        assert [seq for seq, _, _ in log.scan()][:3] == [16, 18, 20]
+        assert log.get(17) is None
+        assert log.get(18) == (18, 1018.0, b"record 18")
+        log.close()
+
+        log = MessageLog(str(tmp_path), segment_records=10)
+        assert [seq for seq, _, _ in log.scan()][-6:] == [38, 40, 41, 42, 43, 44]
+        assert not (tmp_path / "compact.tmp").exists()
+        log.close()
+
+    def test_compact_only_reads_segments_it_rewrites(self, tmp_path):
+        log = MessageLog(str(tmp_path), segment_records=10)
+        _fill(log, 45)
+        read = message_log._Segment.read
+        with patch.object(
+            message_log._Segment, "read", autospec=True, side_effect=read
+        ) as reads:
+            # Only the kept half of the segment straddling the cutoff is copied
+            assert log.compact(before_time=1015.0) == 15
+            assert reads.call_count == 5
+            reads.reset_mock()
+            assert log.compact(before_time=1015.0) == 0
+            assert reads.call_count == 0
+        log.close()
+
+    def test_scan_resumes_across_compaction(self, tmp_path):
+        log = MessageLog(str(tmp_path), segment_records=10)
+        _fill(log, 35)
+        scan = log.scan()
+        assert [next(scan)[0] for _ in range(3)] == [0, 1, 2]
+        log.compact(keep=lambda record: record[0] % 2 == 0)
+        assert [seq for seq, _, _ in scan] == list(range(4, 30, 2)) + list(
+            range(30, 35)
+        )
+
+        reverse = log.scan(reverse=True)
+        assert next(reverse)[0] == 34
+        log.compact(before_time=1020.0)
+        assert [seq for seq, _, _ in reverse][-2:] == [22, 20]
+        log.close()
+
+    def test_unsynced_tail_is_synced_when_idle(self, tmp_path):
+        log = MessageLog(str(tmp_path), fsync_batch=100, fsync_interval=0.1)
+        with patch.object(message_log._Segment, "sync", autospec=True) as sync:
+            _fill(log, 3)
+            assert sync.call_count == 0
+            time.sleep(0.3)
+            assert sync.call_count == 1
+        assert log._unsynced == 0
+        log.close()
+
+    def test_directory_is_locked(self, tmp_path):
+        log = MessageLog(str(tmp_path))
+        with pytest.raises(LogLockedError):
+            MessageLog(str(tmp_path))
+        log.close()
+        MessageLog(str(tmp_path)).close()
+
+    def test_interrupted_merge_is_repaired_on_open(self, tmp_path):
+        log = MessageLog(str(tmp_path), segment_records=10)
+        _fill(log, 25)
+        second_segment = log._segments[1].log_path
+        log.close()
+
+        # The merge of the first two segments, keeping even seqs
+        merged = MessageLog(str(tmp_path / "merged"), segment_records=10)
+        _fill(merged, 21)
+        merged.compact(keep=lambda record: record[0] % 2 == 0)
+        merged.close()
+        # Crash right after the merged log replaced the first segment's log:
+        # its index is stale and the second segment was not removed yet
+        os.replace(
+            tmp_path / "merged" / "segment-00000000000000000000.log",
+            tmp_path / "segment-00000000000000000000.log",
+        )
+
+        log = MessageLog(str(tmp_path), segment_records=10)
+        seqs = [seq for seq, _, _ in log.scan()]
+        assert seqs == list(range(0, 20, 2)) + list(range(20, 25))
+        assert not second_segment.exists()
+        log.close()
+
+    def test_truncate_keeps_seqs_monotonic(self, tmp_path):
+        log = MessageLog(str(tmp_path), segment_records=4)
+        _fill(log, 10)
+        log.truncate()
+        assert len(log) == 0
+        assert log.next_seq == 10
+        log.close()
+
+        log = MessageLog(str(tmp_path), segment_records=4)
+        assert log.next_seq == 10
+        log.close()
+
+
+class TestPersistentMessageHistory:
+    """Tests for PersistentMessageHistory."""
+
+    def _add(self, history, count, **kwargs):
+        for i in range(count):
+            history.add_message(
+                platform="telegram",
+                user_id=str(i % 3),
+                chat_id=str(i % 3),
+                message_content=f"message {i}",
+                message_id=str(i),
+                rendering_metadata={"index": i},
+                **kwargs,
+            )
+
+    def test_restores_history_after_restart(self, tmp_path):
+        history = PersistentMessageHistory(str(tmp_path), max_entries=5)
+        self._add(history, 8)
+        history.close()
+
+        history = PersistentMessageHistory(str(tmp_path), max_entries=5)
+        assert len(history) == 5
+        assert history.last_seq == 7
+        messages = history.get_messages(user_id="1")
+        assert [m.message_content for m in messages] == ["message 7", "message 4"]
+        assert messages[0].rendering_metadata == {"index": 7}
+        assert isinstance(messages[0].timestamp, datetime)
+        assert history.get_by_message_id("6").seq == 6
+
+        entry = history.add_message(
+            platform="discord", user_id="9", chat_id="9", message_content="new"
+        )
+        assert entry.seq == 8
+        history.close()
+
+    def test_evicted_entries_are_read_from_disk(self, tmp_path):
+        history = PersistentMessageHistory(str(tmp_path), max_entries=3)
+        self._add(history, 10)
+        assert history.get_entry(1).message_content == "message 1"
+        assert history.get_entry(10) is None
+        assert [e.seq for e in history.scan()] == list(range(10))
+        history.close()
+
+    def test_scan_by_time_range(self, tmp_path):
+        history = PersistentMessageHistory(str(tmp_path), max_entries=2)
+        self._add(history, 4)
+        cutoff = datetime.now()
+        self._add(history, 2)
+        later = list(history.scan(start=cutoff))
+        assert [e.message_content for e in later] == ["message 0", "message 1"]
+        assert [e.seq for e in later] == [4, 5]
+        assert list(history.scan(end=cutoff - timedelta(days=1))) == []
+        history.close()
+
+    def test_clear_removes_entries_from_disk(self, tmp_path):
+        history = PersistentMessageHistory(str(tmp_path))
+        self._add(history, 3)
+        history.clear()
+        history.close()
+
+        history = PersistentMessageHistory(str(tmp_path))
+        assert len(history) == 0
+        assert list(history.scan()) == []
+        assert history.add_message("telegram", "1", "1", "after clear").seq == 3
+        history.close()
+
+    def test_retention_applied_on_open(self, tmp_path):
+        history = PersistentMessageHistory(str(tmp_path), segment_records=2)
+        self._add(history, 5)
+        history.close()
+
+        history = PersistentMessageHistory(
+            str(tmp_path), segment_records=2, retention_seconds=0
+        )
+        # Sealed segments are past retention; the active segment is kept
+        assert [e.seq for e in history.scan()] == [4]
+        assert history.get_stats()["stored_messages"] == 1
+        history.close()
+
+    def test_retention_applied_in_background_on_roll(self, tmp_path):
+        history = PersistentMessageHistory(
+            str(tmp_path), segment_records=2, retention_seconds=0
+        )
+        self._add(history, 5)
+        history.wait_for_compaction(timeout=5)
+        assert [e.seq for e in history.scan()] == [4]
+        # The in-memory ring still serves recent entries
+        assert len(history.get_messages()) == 5
+        history.close()
@@ -0,0 +1,124 @@
+"""
+Tests for the conversation storage read-through cache.
+"""
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from essence.chat.storage.cache import MISSING, TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_hit_and_miss(self):
+        cache = TTLCache("test", max_entries=10, ttl=60)
+        assert cache.get("a") is MISSING
+        cache.set("a", None)
+        assert cache.get("a") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_entries_expire(self):
+        cache = TTLCache("test", max_entries=10, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is MISSING
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache("test", max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_invalidation(self):
+        cache = TTLCache("test", max_entries=10, ttl=60)
+        for key in [("1", "x"), ("1", "y"), ("2", "x")]:
+            cache.set(key, True)
+        cache.invalidate(("1", "x"))
+        assert cache.invalidate_where(lambda key: key[0] == "1") == 1
+        assert cache.get(("2", "x")) is True
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_zero_ttl_disables_caching(self):
+        cache = TTLCache("test", ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is MISSING
+
+
+class TestConversationStorageCache:
+    """Preference lookups go to the database once per TTL."""
+
+    @pytest.fixture
+    def storage(self):
+        pytest.importorskip("psycopg2")
+        from essence.chat.storage import conversation
+
+        conversation.ConversationStorage.invalidate_cache()
+        yield conversation
+        conversation.ConversationStorage.invalidate_cache()
+
+    @staticmethod
+    def _connection(row):
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.return_value = row
+        return conn
+
+    def test_language_preference_read_through(self, storage):
+        conn = self._connection({"metadata": {"language_preference": "fr"}})
+        conversations = storage.ConversationStorage
+        with patch.object(storage, "get_db_connection", return_value=conn) as get:
+            for _ in range(3):
+                assert conversations.get_language_preference("1", "2") == "fr"
+            assert conversations.get_user_preferences("1", "2") == {}
+        assert get.call_count == 1
+
+    def test_set_writes_through(self, storage):
+        conn = self._connection(None)
+        with patch.object(storage, "get_db_connection", return_value=conn) as get:
+            assert storage.ConversationStorage.set_language_preference("1", "2", "ES")
+            assert storage.ConversationStorage.get_language_preference("1", "2") == "es"
+        assert get.call_count == 1
+
+    def test_errors_are_not_cached(self, storage):
+        with patch.object(
+            storage, "get_db_connection", side_effect=RuntimeError("down")
+        ):
+            assert storage.ConversationStorage.get_language_preference("1", "2") == "en"
+        conn = self._connection({"metadata": '{"language_preference": "de"}'})
+        with patch.object(storage, "get_db_connection", return_value=conn):
+            assert storage.ConversationStorage.get_language_preference("1", "2") == "de"
+
+    def test_explicit_invalidation(self, storage):
+        conn = self._connection({"metadata": {"language_preference": "fr"}})
+        with patch.object(storage, "get_db_connection", return_value=conn) as get:
+            storage.ConversationStorage.get_language_preference("1", "2")
+            storage.ConversationStorage.invalidate_cache("1", "2")
+            storage.ConversationStorage.get_language_preference("1", "2")
+        assert get.call_count == 2
+
+    def test_template_fallback_releases_connection(self, storage):
+        checked_out = []
+        peak = []
+
+        def connect():
+            conn = self._connection(None)
+            conn.close.side_effect = lambda: checked_out.remove(conn)
+            checked_out.append(conn)
+            peak.append(len(checked_out))
+            return conn
+
+        with patch.object(storage, "get_db_connection", side_effect=connect) as get:
+            template = storage.ConversationStorage.get_prompt_template_for_conversation(
+                "1", "2"
+            )
+        assert template is None
+        assert get.call_count == 2  # Conversation template, then user template
+        assert max(peak) == 1
+        assert not checked_out
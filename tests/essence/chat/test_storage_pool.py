@@ -0,0 +1,131 @@
+"""
+Tests for the conversation storage connection pool.
+"""
+import threading
+import time
+
+import pytest
+
+from essence.chat.storage.pool import (
+    ConnectionPool,
+    PoolClosed,
+    PoolTimeout,
+)
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query):
+        if self.conn.fail_ping:
+            raise RuntimeError("server closed the connection")
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.fail_ping = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connections():
+    return []
+
+
+@pytest.fixture
+def pool(connections):
+    def connect():
+        conn = FakeConnection()
+        connections.append(conn)
+        return conn
+
+    pool = ConnectionPool(connect, name="test", min_size=1, max_size=2, timeout=0.1)
+    yield pool
+    pool.close()
+
+
+class TestConnectionPool:
+    """Tests for ConnectionPool."""
+
+    def test_reuses_connections(self, pool, connections):
+        for _ in range(5):
+            conn = pool.getconn()
+            conn.close()
+        assert len(connections) == 1
+        assert pool.stats()["opened"] == 1
+
+    def test_close_returns_to_pool_and_rolls_back(self, pool, connections):
+        conn = pool.getconn()
+        assert pool.stats()["in_use"] == 1
+        conn.close()
+        conn.close()  # Idempotent
+        assert pool.stats()["idle"] == 1
+        assert connections[0].rollbacks == 1
+        assert connections[0].closed == 0
+        with pytest.raises(PoolClosed):
+            conn.cursor()
+
+    def test_exhausted_pool_times_out(self, pool):
+        first, second = pool.getconn(), pool.getconn()
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+        first.close()
+        second.close()
+
+    def test_waiter_gets_returned_connection(self, pool):
+        first, second = pool.getconn(), pool.getconn()
+        threading.Timer(0.02, first.close).start()
+        third = pool.getconn(timeout=1.0)
+        assert third.raw is not None
+        third.close()
+        second.close()
+
+    def test_broken_connection_is_replaced(self, pool, connections):
+        conn = pool.getconn()
+        connections[0].closed = 2
+        conn.close()
+        assert pool.stats()["closed"] == {"broken": 1}
+        pool.getconn().close()
+        assert len(connections) == 2
+
+    def test_unhealthy_idle_connection_is_dropped(self, pool, connections):
+        pool.health_check_interval = 0
+        connections[0].fail_ping = True
+        conn = pool.getconn()
+        assert conn.raw is connections[1]
+        assert pool.stats()["closed"] == {"unhealthy": 1}
+        conn.close()
+
+    def test_max_lifetime_recycles(self, pool, connections):
+        pool.max_lifetime = 0.01
+        time.sleep(0.02)
+        conn = pool.getconn()
+        assert conn.raw is connections[1]
+        assert connections[0].closed
+        conn.close()
+        assert pool.stats()["closed"] == {"max_lifetime": 1}
+
+    def test_closed_pool(self, pool, connections):
+        conn = pool.getconn()
+        pool.close()
+        with pytest.raises(PoolClosed):
+            pool.getconn()
+        conn.close()
+        assert all(c.closed for c in connections)
@@ -0,0 +1,179 @@
+"""
+Unit tests for the user messages queue store.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from essence.chat import user_messages_sync
+from essence.chat.user_messages_store import (
+    UserMessage,
+    UserMessageStore,
+    parse_user_messages_markdown,
+    render_user_message_markdown,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = UserMessageStore(str(tmp_path / "user_messages.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def messages_file(tmp_path, monkeypatch):
+    """Point user_messages_sync at a temporary USER_MESSAGES.md."""
+    path = tmp_path / "USER_MESSAGES.md"
+    monkeypatch.setenv("USER_MESSAGES_EXPORT_DELAY", "0")
+    with patch.object(user_messages_sync, "USER_MESSAGES_FILE", path):
+        yield path
+        timer = user_messages_sync._export_timer
+        if timer is not None:
+            timer.cancel()
+            user_messages_sync._export_timer = None
+    if user_messages_sync._store is not None:
+        user_messages_sync._store.close()
+        user_messages_sync._store = None
+
+
+class TestUserMessageStore:
+    """Tests for UserMessageStore."""
+
+    def test_uses_wal_mode(self, store):
+        mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_fetch_new_since_cursor(self, store):
+        first = store.append("1", "1", "telegram", "Request", "one")
+        store.append("1", "1", "telegram", "Request", "two", status="RESPONDED")
+        third = store.append("2", "2", "discord", "Request", "three")
+
+        new = store.fetch_by_status("NEW")
+        assert [m.content for m in new] == ["one", "three"]
+        assert store.fetch_by_status("NEW", after_id=first.id) == [store.get(third.id)]
+        assert store.fetch_by_status("NEW", limit=1)[0].id == first.id
+        assert store.count_by_status("NEW") == 2
+
+    def test_status_transitions(self, store):
+        message = store.append("1", "1", "telegram", "Request", "hi", message_id="42")
+        assert store.update_status("1", message_id="42", new_status="PROCESSING")
+        assert store.get(message.id).status == "PROCESSING"
+        assert not store.update_status("1", message_id="missing", new_status="ERROR")
+
+        # Claiming only succeeds from the expected status
+        assert not store.set_status(message.id, "RESPONDED", expected_status="NEW")
+        assert store.set_status(message.id, "RESPONDED", expected_status="PROCESSING")
+        assert store.fetch_by_status("RESPONDED")[0].content == "hi"
+
+    def test_update_status_by_timestamp(self, store):
+        store.append(
+            "1", "1", "telegram", "Request", "a", timestamp="2024-01-01 10:00:00"
+        )
+        second = store.append(
+            "1", "1", "telegram", "Request", "b", timestamp="2024-01-01 10:00:05"
+        )
+        assert store.update_status(
+            "1", timestamp="2024-01-01 10:00:05", new_status="RESPONDED"
+        )
+        assert store.get(second.id).status == "RESPONDED"
+        assert [m.content for m in store.fetch_by_status("NEW")] == ["a"]
+
+    def test_import_only_if_empty(self, store):
+        messages = [UserMessage("2024-01-01 10:00:00", "Request", "1", "1", "x", "hi")]
+        assert store.import_messages(messages, only_if_empty=True) == 1
+        assert store.import_messages(messages, only_if_empty=True) == 0
+        assert len(store) == 1
+
+    def test_markdown_round_trip(self, store, tmp_path):
+        store.append("1", "5", "telegram", "Request", "hello", message_id="9")
+        store.append("2", "", "discord", "Request", "multi\nline", username="bob")
+        store.update_status("1", message_id="9", new_status="RESPONDED")
+
+        path = tmp_path / "export.md"
+        assert store.export_markdown(path, header="# Log\n") == 2
+        parsed = parse_user_messages_markdown(path.read_text())
+        assert [(m.user_id, m.status) for m in parsed] == [
+            ("1", "RESPONDED"),
+            ("2", "NEW"),
+        ]
+        assert parsed[0].chat_id == "5"
+        assert parsed[0].message_id == "9"
+        assert parsed[1].username == "bob"
+        assert parsed[1].content == "multi\nline"
+        assert "## [" in render_user_message_markdown(parsed[0])
+
+
+class TestUserMessagesSync:
+    """Tests for the USER_MESSAGES.md sync functions backed by the store."""
+
+    def test_append_and_update_status(self, messages_file):
+        assert user_messages_sync.append_message_to_user_messages(
+            user_id="1",
+            chat_id="1",
+            platform="telegram",
+            message_type="Request",
+            content="hello",
+            message_id="7",
+        )
+        assert "- **Content:** hello" in messages_file.read_text()
+
+        assert user_messages_sync.update_message_status(
+            "1", message_id="7", new_status="RESPONDED"
+        )
+        store = user_messages_sync.get_user_message_store()
+        assert store.count_by_status("RESPONDED") == 1
+
+        # The export is re-rendered with the new status
+        text = messages_file.read_text()
+        assert "- **Status:** RESPONDED" in text
+        assert "- **Status:** NEW\n" not in text
+        assert text.startswith("# User Messages and Agent Communication Log")
+
+        # Appends after a re-render go to the new file
+        assert user_messages_sync.append_message_to_user_messages(
+            "1", "1", "telegram", "Request", "again", message_id="8"
+        )
+        assert "- **Content:** again" in messages_file.read_text()
+
+    def test_status_changes_are_coalesced(self, messages_file, monkeypatch):
+        monkeypatch.setenv("USER_MESSAGES_EXPORT_DELAY", "0.2")
+        for message_id in ("1", "2"):
+            user_messages_sync.append_message_to_user_messages(
+                "1", "1", "telegram", "Request", "hi", message_id=message_id
+            )
+
+        with patch.object(
+            user_messages_sync,
+            "export_user_messages_markdown",
+            wraps=user_messages_sync.export_user_messages_markdown,
+        ) as export:
+            for message_id in ("1", "2"):
+                user_messages_sync.update_message_status(
+                    "1", message_id=message_id, new_status="PROCESSING"
+                )
+            assert messages_file.read_text().count("- **Status:** NEW\n") == 2
+            user_messages_sync._export_timer.join(timeout=5)
+
+        export.assert_called_once()
+        assert messages_file.read_text().count("- **Status:** PROCESSING") == 2
+
+    def test_imports_existing_markdown(self, messages_file):
+        messages_file.write_text(
+            "# Log\n"
+            + render_user_message_markdown(
+                UserMessage(
+                    "2024-01-01 10:00:00", "Request", "3", "3", "telegram", "old"
+                )
+            )
+        )
+        store = user_messages_sync.get_user_message_store()
+        assert [m.content for m in store.fetch_by_status("NEW")] == ["old"]
+
+    def test_markdown_export_can_be_disabled(self, messages_file, monkeypatch):
+        monkeypatch.setenv("USER_MESSAGES_MARKDOWN_EXPORT", "false")
+        assert user_messages_sync.append_message_to_user_messages(
+            "1", "1", "telegram", "Request", "hi"
+        )
+        assert not messages_file.exists()
+        assert len(user_messages_sync.get_user_message_store()) == 1
@@ -9,10 +9,23 @@ import pytest
 
 from essence.commands.poll_user_responses import (
     PollUserResponsesCommand,
+    UserRequestsTailReader,
     check_for_user_responses,
 )
 
 
+def _entry(timestamp, message_type, user_id="123", chat_id="456", status="Pending"):
+    return f"""
+## [{timestamp}] {message_type}
+- **User:** (user_id: {user_id})
+- **Platform:** Telegram
+- **Type:** {message_type}
+- **Content:** {message_type} at {timestamp}
+- **Chat ID:** {chat_id}
+- **Status:** {status}
+"""
+
+
 class TestCheckForUserResponses:
     """Tests for check_for_user_responses function."""
 
@@ -67,6 +80,111 @@ class TestCheckForUserResponses:
             assert isinstance(new_responses, list)
             assert isinstance(timed_out, list)
 
+    def test_check_marks_answered_agent_message(self, tmp_path):
+        """Test that a user request after an agent message is a response."""
+        test_file = tmp_path / "USER_REQUESTS.md"
+        test_file.write_text(
+            _entry("2025-11-19 12:00:00", "Clarification")
+            + _entry("2025-11-19 12:05:00", "Request")
+        )
+        with patch(
+            "essence.commands.poll_user_responses.USER_REQUESTS_FILE", test_file
+        ), patch("essence.chat.user_requests_sync.USER_REQUESTS_FILE", test_file):
+            new_responses, timed_out = check_for_user_responses(timeout_hours=24 * 365)
+            assert [r.message_type for r in new_responses] == ["Clarification"]
+            assert timed_out == []
+            assert "- **Status:** Responded" in test_file.read_text()
+
+            # Already answered: nothing new on the next poll
+            assert check_for_user_responses(timeout_hours=24 * 365) == ([], [])
+
+
+class TestUserRequestsTailReader:
+    """Tests for the incremental USER_REQUESTS.md reader."""
+
+    def test_only_parses_appended_entries(self, tmp_path):
+        path = tmp_path / "USER_REQUESTS.md"
+        history = "".join(
+            _entry(f"2025-11-19 10:{i:02d}:00", "Request", user_id=str(i))
+            for i in range(50)
+        )
+        path.write_text("# Log\n" + history)
+        reader = UserRequestsTailReader(path)
+        reader.poll()
+        full = reader.bytes_parsed
+
+        new_entry = _entry("2025-11-19 12:00:00", "Clarification")
+        with open(path, "a") as f:
+            f.write(new_entry)
+        reader.poll()
+        assert reader.full_parses == 1
+        # Only the new entry and the previous last entry were read again
+        last_entry = _entry("2025-11-19 10:49:00", "Request", user_id="49")
+        assert reader.bytes_parsed - full <= len(last_entry) + len(new_entry)
+        assert list(reader.waiting) == [("123", "456")]
+
+    def test_detects_response_in_entry_appended_later(self, tmp_path):
+        path = tmp_path / "USER_REQUESTS.md"
+        path.write_text(_entry("2025-11-19 12:00:00", "Clarification"))
+        reader = UserRequestsTailReader(path)
+        reader.poll()
+        (entry,) = reader.waiting[("123", "456")].values()
+        assert not reader.has_response(entry)
+
+        with open(path, "a") as f:
+            # Other chats and earlier requests do not count
+            f.write(_entry("2025-11-19 12:01:00", "Request", chat_id="999"))
+            f.write(_entry("2025-11-19 11:00:00", "Request"))
+        reader.poll()
+        assert not reader.has_response(entry)
+
+        with open(path, "a") as f:
+            f.write(_entry("2025-11-19 12:05:00", "Request"))
+        reader.poll()
+        assert reader.has_response(entry)
+
+    def test_reparses_after_rotation_and_truncation(self, tmp_path):
+        path = tmp_path / "USER_REQUESTS.md"
+        path.write_text(
+            _entry("2025-11-19 12:00:00", "Clarification")
+            + _entry("2025-11-19 12:01:00", "Help Request")
+        )
+        reader = UserRequestsTailReader(path)
+        reader.poll()
+        assert len(reader.waiting[("123", "456")]) == 2
+
+        path.write_text(_entry("2025-11-19 13:00:00", "Request"))
+        reader.poll()
+        assert reader.full_parses == 2
+        assert reader.waiting == {}
+
+        rotated = tmp_path / "USER_REQUESTS.md.new"
+        rotated.write_text(_entry("2025-11-19 14:00:00", "Feedback Request"))
+        rotated.replace(path)
+        reader.poll()
+        assert reader.full_parses == 3
+        assert len(reader.waiting[("123", "456")]) == 1
+
+    def test_status_updates_keep_polls_incremental(self, tmp_path):
+        path = tmp_path / "USER_REQUESTS.md"
+        path.write_text(
+            _entry("2025-11-19 12:00:00", "Clarification")
+            + _entry("2025-11-19 12:05:00", "Request")
+        )
+        with patch("essence.chat.user_requests_sync.USER_REQUESTS_FILE", path):
+            reader = UserRequestsTailReader(path)
+            reader.poll()
+            (entry,) = reader.waiting[("123", "456")].values()
+            assert reader.set_status(entry, "Responded")
+            assert "- **Status:** Responded" in path.read_text()
+
+            with open(path, "a") as f:
+                f.write(_entry("2025-11-19 12:10:00", "Help Request"))
+            reader.poll()
+        assert reader.full_parses == 1
+        (entry,) = reader.waiting[("123", "456")].values()
+        assert entry.request.message_type == "Help Request"
+
 
 class TestPollUserResponsesCommand:
     """Tests for PollUserResponsesCommand."""
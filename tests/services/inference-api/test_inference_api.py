@@ -282,6 +282,14 @@ def mock_llm_strategy():
         )
 
     mock_strategy.infer = MagicMock(side_effect=mock_infer)
+
+    # Mock infer_stream() to stream the infer() result word by word
+    def mock_infer_stream(request, cancel=None):
+        text = mock_strategy.infer(request).payload["text"]
+        for word in text.split():
+            yield word + " "
+
+    mock_strategy.infer_stream = MagicMock(side_effect=mock_infer_stream)
     return mock_strategy
 
 
@@ -1048,6 +1056,31 @@ class TestStreamingErrorHandling:
         assert chunks[-1].finish_reason == FinishReason.ERROR
         assert chunks[-1].role == "assistant"
 
+    @pytest.mark.asyncio
+    async def test_cancelled_stream_stops_generation(self, service_instance):
+        """Cancelling mid-stream signals the strategy before closing its iterator."""
+        cancelled = []
+
+        def blocking_stream(request, cancel=None):
+            yield "first "
+            # Block like a decoder waiting for the next token
+            cancel.wait(timeout=5)
+            cancelled.append(cancel.is_set())
+
+        service_instance.llm_strategy.infer_stream.side_effect = blocking_stream
+        stream = service_instance._generate_tokens_stream(
+            "prompt", GenerationParameters(max_tokens=50), {}
+        )
+        assert (await stream.__anext__()).token == "first "
+
+        next_chunk = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.1)
+        next_chunk.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await next_chunk
+
+        assert cancelled == [True]
+
 
 class TestStreamingPerformance:
     """Test streaming performance characteristics."""
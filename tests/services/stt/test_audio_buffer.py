@@ -0,0 +1,88 @@
+"""
+Tests for the STT streaming audio buffer.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+_project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+stt_service_dir = os.path.join(_project_root, "services", "stt")
+if stt_service_dir not in sys.path:
+    sys.path.insert(0, stt_service_dir)
+
+from audio_buffer import AudioRingBuffer  # noqa: E402
+
+
+def test_append_and_view_preserve_order():
+    buffer = AudioRingBuffer(capacity=4)
+    buffer.append(np.array([0.1, 0.2], dtype=np.float32))
+    buffer.append(np.array([0.3, 0.4, 0.5], dtype=np.float32))
+
+    assert len(buffer) == 5
+    assert buffer.view().dtype == np.float32
+    np.testing.assert_allclose(buffer.view(), [0.1, 0.2, 0.3, 0.4, 0.5])
+
+
+def test_grows_when_full():
+    buffer = AudioRingBuffer(capacity=2)
+    for i in range(100):
+        buffer.append(np.full(3, i, dtype=np.float32))
+
+    assert len(buffer) == 300
+    assert buffer.capacity >= 300
+    np.testing.assert_array_equal(buffer.view()[::3], np.arange(100))
+
+
+def test_consume_then_append_compacts_without_growing():
+    buffer = AudioRingBuffer(capacity=16)
+    buffer.append(np.arange(10, dtype=np.float32))
+    buffer.consume(8)
+    buffer.append(np.arange(10, 20, dtype=np.float32))
+
+    assert buffer.capacity == 16
+    np.testing.assert_array_equal(buffer.view(), np.arange(8, 20))
+
+
+def test_view_is_zero_copy():
+    buffer = AudioRingBuffer(capacity=8)
+    buffer.append(np.arange(4, dtype=np.float32))
+
+    view = buffer.view()
+    view[0] = 42.0
+
+    assert buffer.view()[0] == 42.0
+
+
+def test_max_samples_keeps_most_recent():
+    buffer = AudioRingBuffer(capacity=4, max_samples=5)
+    buffer.append(np.arange(4, dtype=np.float32))
+    buffer.append(np.arange(4, 8, dtype=np.float32))
+
+    np.testing.assert_array_equal(buffer.view(), [3, 4, 5, 6, 7])
+
+    buffer.append(np.arange(100, 110, dtype=np.float32))
+    np.testing.assert_array_equal(buffer.view(), np.arange(105, 110))
+
+
+def test_tail_and_clear():
+    buffer = AudioRingBuffer(capacity=8)
+    buffer.append(np.arange(6, dtype=np.float32))
+
+    np.testing.assert_array_equal(buffer.tail(2), [4, 5])
+    np.testing.assert_array_equal(buffer.tail(10), np.arange(6))
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.view().size == 0
+
+
+def test_int16_dtype():
+    buffer = AudioRingBuffer(capacity=4, dtype=np.int16)
+    buffer.append(np.array([1, -2, 3], dtype=np.int16))
+
+    assert buffer.view().dtype == np.int16
+    assert buffer.nbytes == 4 * 2
@@ -0,0 +1,106 @@
+"""
+Tests for incremental streaming VAD.
+"""
+import os
+import sys
+
+import numpy as np
+
+_project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+stt_service_dir = os.path.join(_project_root, "services", "stt")
+if stt_service_dir not in sys.path:
+    sys.path.insert(0, stt_service_dir)
+
+from streaming_vad import StreamingVad  # noqa: E402
+
+SAMPLE_RATE = 16000
+FRAME = SAMPLE_RATE // 50  # 20ms
+
+
+class AmplitudeVad:
+    """Fake WebRTC VAD: a frame is speech if it is not all zeros."""
+
+    def __init__(self):
+        self.frames_seen = 0
+
+    def is_speech(self, frame_bytes, sample_rate):
+        self.frames_seen += 1
+        return any(frame_bytes)
+
+
+def _audio(*parts):
+    """Build audio from (kind, milliseconds) pairs."""
+    chunks = []
+    for kind, ms in parts:
+        samples = SAMPLE_RATE * ms // 1000
+        value = 0.5 if kind == "speech" else 0.0
+        chunks.append(np.full(samples, value, dtype=np.float32))
+    return np.concatenate(chunks)
+
+
+def test_each_frame_classified_once():
+    vad = AmplitudeVad()
+    streaming = StreamingVad(vad, sample_rate=SAMPLE_RATE)
+    audio = _audio(("speech", 1000))
+
+    # Chunk sizes that do not line up with frame boundaries
+    for start in range(0, len(audio), 1234):
+        streaming.process(audio[start : start + 1234])
+
+    assert vad.frames_seen == len(audio) // FRAME
+    assert streaming.total_frames == vad.frames_seen
+    assert streaming.samples_processed == len(audio)
+
+
+def test_reports_segment_boundaries():
+    streaming = StreamingVad(
+        AmplitudeVad(), sample_rate=SAMPLE_RATE, endpoint_silence_ms=200
+    )
+    audio = _audio(("silence", 400), ("speech", 600), ("silence", 400), ("speech", 300))
+
+    events = []
+    for start in range(0, len(audio), 800):
+        events.extend(streaming.process(audio[start : start + 800]))
+
+    kinds = [event.kind for event in events]
+    assert kinds == ["speech_start", "speech_end", "speech_start"]
+    assert events[0].sample == SAMPLE_RATE * 400 // 1000
+    assert events[1].segment.start_sample == SAMPLE_RATE * 400 // 1000
+    assert events[1].segment.end_sample == SAMPLE_RATE * 1000 // 1000
+    assert streaming.in_speech
+
+    final = streaming.flush()
+    assert final.kind == "speech_end"
+    assert final.segment.end_sample == len(audio)
+    assert len(streaming.segments) == 2
+
+
+def test_short_pauses_do_not_end_segment():
+    streaming = StreamingVad(
+        AmplitudeVad(), sample_rate=SAMPLE_RATE, endpoint_silence_ms=600
+    )
+    audio = _audio(("speech", 500), ("silence", 200), ("speech", 500))
+
+    events = streaming.process(audio)
+
+    assert [event.kind for event in events] == ["speech_start"]
+    assert streaming.in_speech
+
+
+def test_speech_ratio_counts():
+    streaming = StreamingVad(AmplitudeVad(), sample_rate=SAMPLE_RATE)
+    streaming.process(_audio(("speech", 200), ("silence", 600)))
+
+    assert streaming.speech_frames == 10
+    assert streaming.silence_frames == 30
+    assert streaming.speech_ratio == 0.25
+
+
+def test_flush_without_speech_returns_none():
+    streaming = StreamingVad(AmplitudeVad(), sample_rate=SAMPLE_RATE)
+    streaming.process(_audio(("silence", 300)))
+
+    assert streaming.flush() is None
+    assert streaming.segments == []
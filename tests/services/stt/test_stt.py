@@ -128,6 +128,7 @@ stt_service_dir = os.path.join(_project_root, "services", "stt")
 if stt_service_dir not in sys.path:
     sys.path.insert(0, stt_service_dir)
 from main import STTService, stt_service
+from transcription_pool import TranscriptionQueueFull
 
 
 @pytest.fixture
@@ -425,8 +426,9 @@ class TestAudioProcessing:
 
         processed = await service_instance._process_audio_chunk(chunk)
 
-        assert len(processed) == 4
-        assert processed == audio_data.tolist()
+        assert isinstance(processed, np.ndarray)
+        assert processed.dtype == np.float32
+        np.testing.assert_array_equal(processed, audio_data)
 
     @pytest.mark.asyncio
     async def test_process_audio_chunk_resampling(self, service_instance):
@@ -532,6 +534,69 @@ class TestTranscription:
         assert result is None
 
 
+class TestLocalAgreementDecode:
+    """Test re-decoding of the uncommitted audio in local-agreement mode."""
+
+    @staticmethod
+    def _agreement(tentative):
+        agreement = MagicMock()
+        agreement.prompt = ""
+        agreement.committed = []
+        agreement.tentative = tentative
+        return agreement
+
+    @staticmethod
+    def _buffer(samples=16000):
+        audio_buffer = MagicMock()
+        audio_buffer.__len__.return_value = samples
+        return audio_buffer
+
+    @pytest.mark.asyncio
+    async def test_interim_decode_skipped_when_queue_full(self, service_instance):
+        """A full transcription queue skips the interim decode."""
+        service_instance.sample_rate = 16000
+        service_instance._transcribe_audio = AsyncMock(
+            side_effect=TranscriptionQueueFull("full")
+        )
+        agreement = self._agreement([MagicMock()])
+
+        result = await service_instance._decode_uncommitted(
+            agreement, self._buffer(), 0, is_final=False
+        )
+
+        assert result is None
+        agreement.update.assert_not_called()
+        agreement.commit_tentative.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_final_decode_fails_when_queue_full(self, service_instance):
+        """The final decode still reports backpressure to the caller."""
+        service_instance.sample_rate = 16000
+        service_instance._transcribe_audio = AsyncMock(
+            side_effect=TranscriptionQueueFull("full")
+        )
+        agreement = self._agreement([MagicMock()])
+
+        with pytest.raises(TranscriptionQueueFull):
+            await service_instance._decode_uncommitted(
+                agreement, self._buffer(), 0, is_final=True
+            )
+        agreement.finish.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_empty_decode_keeps_tentative_words(self, service_instance):
+        """A decode without text leaves the tentative words in place."""
+        service_instance.sample_rate = 16000
+        service_instance._transcribe_audio = AsyncMock(return_value=None)
+        agreement = self._agreement([])
+
+        await service_instance._decode_uncommitted(
+            agreement, self._buffer(), 0, is_final=False
+        )
+
+        agreement.update.assert_not_called()
+
+
 class TestVoiceActivityDetection:
     """Test voice activity detection functionality."""
 
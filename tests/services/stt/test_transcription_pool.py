@@ -0,0 +1,153 @@
+"""
+Tests for the Whisper transcription worker pool.
+"""
+import asyncio
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+_project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+stt_service_dir = os.path.join(_project_root, "services", "stt")
+if stt_service_dir not in sys.path:
+    sys.path.insert(0, stt_service_dir)
+
+from transcription_pool import TranscriptionPool, TranscriptionQueueFull  # noqa: E402
+
+
+class BlockingModel:
+    """Fake Whisper model whose transcribe() blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+        self.threads = set()
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(len(audio))
+        self.threads.add(threading.get_ident())
+        self.release.wait(timeout=5)
+        return {"text": f"{len(audio)} samples", "segments": [], **kwargs}
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.005)
+
+
+class TestTranscriptionPool:
+    """Tests for TranscriptionPool."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop(self):
+        model = BlockingModel()
+        pool = TranscriptionPool(lambda: model, model=model)
+        task = asyncio.create_task(
+            pool.transcribe(np.zeros(160, dtype=np.float32), language="en")
+        )
+
+        # The loop keeps running while the worker is blocked
+        await _wait_for(lambda: model.calls)
+        assert not task.done()
+        model.release.set()
+
+        result = await task
+        assert result == {"text": "160 samples", "segments": [], "language": "en"}
+        assert threading.get_ident() not in model.threads
+        assert pool.in_flight == 0
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self):
+        model = BlockingModel()
+        pool = TranscriptionPool(lambda: model, model=model, max_workers=1, max_queue=1)
+        audio = np.zeros(160, dtype=np.float32)
+        tasks = [asyncio.create_task(pool.transcribe(audio)) for _ in range(2)]
+        await _wait_for(lambda: pool.in_flight == 2)
+        assert pool.queued == 1
+
+        with pytest.raises(TranscriptionQueueFull):
+            await pool.transcribe(audio)
+        assert pool.rejected == 1
+
+        model.release.set()
+        await asyncio.gather(*tasks)
+        assert pool.completed == 2
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_waits_for_slot_within_timeout(self):
+        model = BlockingModel()
+        pool = TranscriptionPool(
+            lambda: model, model=model, max_workers=1, max_queue=0, queue_timeout=2.0
+        )
+        audio = np.zeros(160, dtype=np.float32)
+        first = asyncio.create_task(pool.transcribe(audio))
+        await _wait_for(lambda: model.calls)
+        second = asyncio.create_task(pool.transcribe(audio))
+        await asyncio.sleep(0.05)
+        assert not second.done()
+
+        model.release.set()
+        await asyncio.gather(first, second)
+        assert len(model.calls) == 2
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_never_reaches_a_worker(self):
+        model = BlockingModel()
+        pool = TranscriptionPool(lambda: model, model=model, max_workers=1, max_queue=4)
+        running = asyncio.create_task(pool.transcribe(np.zeros(100)))
+        await _wait_for(lambda: model.calls)
+        queued = asyncio.create_task(pool.transcribe(np.zeros(200)))
+        await _wait_for(lambda: pool.in_flight == 2)
+
+        # e.g. the gRPC client disconnected while waiting for a worker
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        await _wait_for(lambda: pool.in_flight == 1)
+        assert pool.cancelled == 1
+
+        model.release.set()
+        await running
+        assert model.calls == [100]
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_each_thread_gets_its_own_model(self):
+        # Both jobs must be inside transcribe() at the same time to pass
+        barrier = threading.Barrier(2)
+
+        class BarrierModel:
+            def __init__(self):
+                self.calls = 0
+
+            def transcribe(self, audio, **kwargs):
+                self.calls += 1
+                barrier.wait(timeout=5)
+                return {"text": "", "segments": []}
+
+        loaded = []
+
+        def load_model():
+            loaded.append(BarrierModel())
+            return loaded[-1]
+
+        preloaded = BarrierModel()
+        pool = TranscriptionPool(load_model, model=preloaded, max_workers=2)
+        audio = np.zeros(160, dtype=np.float32)
+        await asyncio.gather(pool.transcribe(audio), pool.transcribe(audio))
+
+        # One worker reused the loaded model, the other loaded its own
+        assert len(loaded) == 1
+        assert preloaded.calls == 1
+        assert loaded[0].calls == 1
+        pool.shutdown()
@@ -0,0 +1,131 @@
+"""
+Tests for the embedded SQLite conversation store.
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from essence.services.telegram import conversation_storage
+from essence.services.telegram.conversation_storage import ConversationStorage
+from essence.services.telegram.embedded_storage import EmbeddedConversationStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmbeddedConversationStore(
+        str(tmp_path / "conversations.db"), batch_size=10, flush_interval=0
+    )
+    yield store
+    store.close()
+
+
+class TestEmbeddedConversationStore:
+    """Tests for EmbeddedConversationStore."""
+
+    def test_uses_wal_mode(self, store):
+        mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_metadata_persists(self, tmp_path):
+        path = str(tmp_path / "conversations.db")
+        store = EmbeddedConversationStore(path, flush_interval=0)
+        store.update_metadata("1", "2", {"language_preference": "fr"})
+        store.update_metadata("1", "2", {"user_name": "Ada"})
+        store.close()
+
+        reopened = EmbeddedConversationStore(path, flush_interval=0)
+        assert reopened.get_metadata("1", "2") == {
+            "language_preference": "fr",
+            "user_name": "Ada",
+        }
+        reopened.update_metadata("1", "2", {"user_name": None})
+        assert reopened.get_metadata("1", "2") == {"language_preference": "fr"}
+        assert reopened.get_metadata("1", "3") == {}
+        reopened.close()
+
+    def test_messages_are_batched(self, store):
+        for i in range(9):
+            store.record_message("1", "2", "user", f"m{i}")
+        count = store._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        assert count == 0
+        store.record_message("1", "2", "user", "m9")
+        count = store._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        assert count == 10
+
+    def test_conversation_analytics(self, store):
+        start = datetime.now() - timedelta(minutes=10)
+        store.record_message("1", "2", "user", "hi", start)
+        store.record_message(
+            "1", "2", "assistant", "hello", start + timedelta(seconds=2)
+        )
+        store.record_message("1", "2", "user", "how?", start + timedelta(seconds=60))
+        store.record_message("1", "2", "assistant", "so", start + timedelta(seconds=64))
+
+        result = store.get_conversation_analytics("1", "2")
+        assert result["message_count"] == 4
+        assert result["user_message_count"] == 2
+        assert result["assistant_message_count"] == 2
+        assert result["average_response_time_seconds"] == 3.0
+        assert result["engagement_score"] > 0
+        assert store.get_conversation_analytics("1", "9")["conversation_id"] is None
+
+    def test_dashboard_analytics(self, store):
+        now = datetime.now()
+        store.record_message("1", "a", "user", "hi", now - timedelta(days=3))
+        store.record_message("1", "a", "assistant", "yo", now - timedelta(days=3))
+        store.record_message("2", "b", "user", "hi", now)
+        store.record_message("2", "b", "assistant", "yo", now + timedelta(seconds=4))
+
+        result = store.get_dashboard_analytics()
+        assert result["total_conversations"] == 2
+        assert result["total_messages"] == 4
+        assert result["active_users"] == 2
+        assert result["average_response_time_seconds"] == 4.0
+
+        recent = store.get_dashboard_analytics(start_date=now - timedelta(hours=1))
+        assert recent["total_messages"] == 2
+        assert recent["active_users"] == 1
+
+    def test_prompt_templates(self, store):
+        user_template = store.create_template("default", "Hi {name}", user_id="1")
+        assert store.create_template("default", "dup", user_id="1") is None
+        store.update_metadata("1", "2", {})
+        conversation_id = store.get_conversation_analytics("1", "2")["conversation_id"]
+        store.create_template(
+            "default", "Chat {name}", user_id="1", conversation_id=conversation_id
+        )
+
+        assert store.get_template(user_template)["template_text"] == "Hi {name}"
+        assert store.get_template_for_user("1")["id"] == user_template
+        assert (
+            store.get_template_for_conversation("1", "2")["template_text"]
+            == "Chat {name}"
+        )
+        assert store.get_template_for_conversation("1", "3")["id"] == user_template
+
+        assert store.update_template(user_template, is_active=False)
+        assert store.get_template_for_user("1") is None
+        assert len(store.list_templates(user_id="1")) == 2
+        assert len(store.list_templates(is_active=True)) == 1
+        assert store.delete_template(user_template)
+        assert not store.delete_template(user_template)
+
+
+class TestConversationStorageWithStore:
+    """ConversationStorage uses the embedded store when configured."""
+
+    def test_dispatches_to_store(self, store):
+        with patch.object(conversation_storage, "_store", store):
+            assert ConversationStorage.set_language_preference("1", "2", "DE")
+            assert ConversationStorage.get_language_preference("1", "2") == "de"
+            assert ConversationStorage.set_user_preferences("1", "2", name=" Ada ")
+            assert ConversationStorage.get_user_preferences("1", "2") == {"name": "Ada"}
+            assert ConversationStorage.record_message("1", "2", "user", "hi")
+            analytics = ConversationStorage.get_conversation_analytics("1", "2")
+            assert analytics["message_count"] == 1
+
+    def test_in_memory_without_store(self, monkeypatch):
+        monkeypatch.delenv("CONVERSATION_DB_PATH", raising=False)
+        assert conversation_storage.get_conversation_store() is None
+        assert not ConversationStorage.record_message("1", "2", "user", "hi")
@@ -0,0 +1,215 @@
+"""
+Tests for load balancing across replicas in GrpcConnectionPool.
+"""
+import asyncio
+import sys
+from unittest.mock import MagicMock, patch
+
+import grpc
+import grpc.aio
+import pytest
+import pytest_asyncio
+
+# Mock inference_core before importing the dependencies package
+sys.modules.setdefault("inference_core", MagicMock())
+sys.modules.setdefault("inference_core.config", MagicMock())
+
+from essence.services.telegram.dependencies.grpc_pool import (  # noqa: E402
+    GrpcConnectionPool,
+    parse_addresses,
+)
+
+try:
+    from june_grpc_api.generated import asr_pb2, asr_pb2_grpc
+    from june_grpc_api.shim.asr import STTConnectionError, SpeechToTextClient
+except ImportError:  # protobuf runtime not installed
+    asr_pb2 = None
+
+_WHOAMI = "/test.Replica/WhoAmI"
+
+
+async def _start_replica(name: str, port: int = 0):
+    """A gRPC server whose only RPC returns its name."""
+
+    async def whoami(request, context):
+        return name.encode()
+
+    handler = grpc.method_handlers_generic_handler(
+        "test.Replica", {"WhoAmI": grpc.unary_unary_rpc_method_handler(whoami)}
+    )
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port(f"127.0.0.1:{port}")
+    await server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+async def _call(pool: GrpcConnectionPool) -> str:
+    async with pool.get_stt_channel() as channel:
+        response = await channel.unary_unary(_WHOAMI)(b"", timeout=2)
+    return response.decode()
+
+
+@pytest_asyncio.fixture
+async def replicas():
+    servers = [await _start_replica(name) for name in ("a", "b", "c")]
+    yield servers
+    for server, _ in servers:
+        await server.stop(None)
+
+
+async def _start_stt_replica(name: str, draining: bool = False):
+    """An STT server whose Recognize RPC transcribes everything as its name.
+
+    A draining replica accepts connections but answers UNAVAILABLE.
+    """
+    assert asr_pb2 is not None
+
+    class Servicer(asr_pb2_grpc.SpeechToTextServicer):
+        async def Recognize(self, request, context):
+            if draining:
+                await context.abort(grpc.StatusCode.UNAVAILABLE, "draining")
+            result = asr_pb2.RecognitionResult(transcript=name, is_final=True)
+            return asr_pb2.RecognitionResponse(results=[result])
+
+    server = grpc.aio.server()
+    asr_pb2_grpc.add_SpeechToTextServicer_to_server(Servicer(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+def _pool(addresses, **kwargs) -> GrpcConnectionPool:
+    return GrpcConnectionPool(
+        stt_address=addresses,
+        tts_address="tts:1",
+        llm_address="llm:1",
+        connect_timeout_s=0.5,
+        **kwargs,
+    )
+
+
+def test_parse_addresses():
+    assert parse_addresses("a:1, b:2,,") == ["a:1", "b:2"]
+    assert parse_addresses(["a:1"]) == ["a:1"]
+    with pytest.raises(ValueError):
+        parse_addresses(" , ")
+    with pytest.raises(ValueError):
+        _pool("a:1", load_balancing="random")
+
+
+class TestLoadBalancing:
+    """Calls are spread across replicas."""
+
+    @pytest.mark.asyncio
+    async def test_round_robin(self, replicas):
+        pool = _pool(",".join(address for _, address in replicas))
+        try:
+            names = [await _call(pool) for _ in range(6)]
+        finally:
+            await pool.shutdown()
+        assert names == ["a", "b", "c", "a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_least_outstanding(self, replicas):
+        pool = _pool(
+            [address for _, address in replicas], load_balancing="least_outstanding"
+        )
+        release = asyncio.Event()
+
+        async def hold():
+            async with pool.get_stt_channel() as channel:
+                await release.wait()
+                return (await channel.unary_unary(_WHOAMI)(b"", timeout=2)).decode()
+
+        try:
+            busy = [asyncio.ensure_future(hold()) for _ in range(2)]
+            await asyncio.sleep(0.5)
+            # Only the idle replica has no outstanding calls
+            assert await _call(pool) == "c"
+            release.set()
+            assert sorted(await asyncio.gather(*busy)) == ["a", "b"]
+        finally:
+            await pool.shutdown()
+
+
+class TestEjection:
+    """Failing replicas are ejected and probed back."""
+
+    @pytest.mark.asyncio
+    async def test_failing_replica_is_ejected_and_restored(self, replicas):
+        (server, address), (_, healthy) = replicas[0], replicas[1]
+        pool = _pool([address, healthy], eject_after_failures=2, ejection_time_s=0.2)
+        await server.stop(None)
+
+        try:
+            failures = 0
+            for _ in range(4):
+                try:
+                    await _call(pool)
+                except (grpc.aio.AioRpcError, asyncio.TimeoutError):
+                    failures += 1
+            assert failures == 2
+            assert pool.endpoint_status("stt")[0]["ejected"]
+            assert [await _call(pool) for _ in range(3)] == ["b", "b", "b"]
+
+            # Probe after the ejection period brings the replica back
+            port = int(address.rsplit(":", 1)[1])
+            restarted, _ = await _start_replica("a", port)
+            await asyncio.sleep(0.3)
+            with patch.object(pool, "_health_check", return_value=True) as check:
+                await _call(pool)
+                await asyncio.sleep(0.1)
+            check.assert_called_once_with("stt", address)
+            assert not pool.endpoint_status("stt")[0]["ejected"]
+            assert sorted({await _call(pool) for _ in range(4)}) == ["a", "b"]
+            await restarted.stop(None)
+        finally:
+            await pool.shutdown()
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(asr_pb2 is None, reason="june_grpc_api not importable")
+    async def test_client_connection_errors_eject_replica(self):
+        """Errors wrapped by the client shims still count against the replica."""
+        down, down_address = await _start_stt_replica("a", draining=True)
+        up, up_address = await _start_stt_replica("b")
+        pool = _pool([down_address, up_address], eject_after_failures=1)
+
+        async def recognize() -> str:
+            async with pool.get_stt_channel() as channel:
+                client = SpeechToTextClient(channel, max_retries=0)
+                return (await client.recognize(b"audio", timeout=2)).transcript
+
+        try:
+            with pytest.raises(STTConnectionError):
+                await recognize()
+            assert pool.endpoint_status("stt")[0]["ejected"]
+            assert [await recognize() for _ in range(3)] == ["b", "b", "b"]
+        finally:
+            await pool.shutdown()
+            await down.stop(None)
+            await up.stop(None)
+
+    @pytest.mark.asyncio
+    async def test_failed_probe_extends_ejection(self):
+        pool = _pool(["127.0.0.1:1", "127.0.0.1:2"], ejection_time_s=0.1)
+        endpoint = pool._endpoints["stt"][0]
+        pool._eject("stt", endpoint)
+        await asyncio.sleep(0.15)
+
+        with patch.object(pool, "_health_check", side_effect=RuntimeError("down")):
+            assert pool._pick_endpoint("stt").address == "127.0.0.1:2"
+            await asyncio.sleep(0.05)
+
+        assert endpoint.ejected
+        assert endpoint.ejections == 2
+        await pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_all_ejected_still_routes(self):
+        pool = _pool(["127.0.0.1:1", "127.0.0.1:2"], ejection_time_s=60)
+        for endpoint in pool._endpoints["stt"]:
+            pool._eject("stt", endpoint)
+        picked = {pool._pick_endpoint("stt").address for _ in range(2)}
+        assert picked == {"127.0.0.1:1", "127.0.0.1:2"}
+        await pool.shutdown()
@@ -296,6 +296,42 @@ class TestInMemoryRateLimiter:
         assert stats1["requests_1m"] == 5
         assert stats2["requests_1m"] == 1
 
+    @pytest.mark.asyncio
+    async def test_idle_users_are_evicted(self):
+        """Test that users are dropped once their day window has elapsed."""
+        limiter = InMemoryRateLimiter(shards=1)
+
+        with patch(
+            "essence.services.telegram.dependencies.rate_limit.time.time",
+            return_value=100000.0,
+        ):
+            for i in range(50):
+                await limiter.check_rate_limit(f"one_off_{i}")
+        assert limiter.tracked_users() == 50
+
+        # Two days later the next request drops every idle user
+        with patch(
+            "essence.services.telegram.dependencies.rate_limit.time.time",
+            return_value=100000.0 + 2 * 86400 + 1,
+        ):
+            await limiter.check_rate_limit("returning_user")
+        assert limiter.tracked_users() == 1
+        assert sum(limiter._nbytes) > 0
+
+    @pytest.mark.asyncio
+    async def test_max_users_spills_least_recently_used(self):
+        """Test that the number of tracked users is capped."""
+        limiter = InMemoryRateLimiter(max_requests_per_minute=2, shards=1, max_users=2)
+
+        await limiter.check_rate_limit("user_a")
+        await limiter.check_rate_limit("user_b")
+        await limiter.check_rate_limit("user_a")
+        await limiter.check_rate_limit("user_c")
+
+        assert limiter.tracked_users() == 2
+        assert (await limiter.get_user_stats("user_b"))["requests_1m"] == 0
+        assert (await limiter.get_user_stats("user_a"))["requests_1m"] == 2
+
 
 class TestRateLimiter:
     """Tests for RateLimiter wrapper class."""
@@ -0,0 +1,167 @@
+"""
+Tests for sentence-pipelined TTS.
+"""
+import asyncio
+import io
+import wave
+
+import pytest
+
+from essence.services.telegram.tts_pipeline import (
+    PipelinedTTS,
+    SentenceSegmenter,
+    stitch_audio,
+)
+
+
+def _wav(frames: bytes, sample_rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(frames)
+    return buffer.getvalue()
+
+
+async def _stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestSentenceSegmenter:
+    """Tests for SentenceSegmenter."""
+
+    def test_splits_on_sentence_boundaries(self):
+        segmenter = SentenceSegmenter(min_chars=5)
+        segments = segmenter.feed("Hello there. How are you today? I am fine")
+        assert segments == ["Hello there.", "How are you today?"]
+        assert segmenter.flush() == ["I am fine"]
+
+    def test_waits_for_whitespace_after_punctuation(self):
+        segmenter = SentenceSegmenter(min_chars=5)
+        assert segmenter.feed("The value is 3.") == []
+        assert segmenter.feed("14 exactly. Next") == ["The value is 3.14 exactly."]
+
+    def test_merges_short_sentences(self):
+        segmenter = SentenceSegmenter(min_chars=20)
+        segments = segmenter.feed("Sure. Here is the longer answer. ")
+        assert segments == ["Sure. Here is the longer answer."]
+
+    def test_splits_long_sentence_at_clause(self):
+        segmenter = SentenceSegmenter(min_chars=5, max_chars=40)
+        segments = segmenter.feed(
+            "This sentence keeps going, and going without any end in sight"
+        )
+        assert segments[0] == "This sentence keeps going,"
+        assert all(len(segment) <= 40 for segment in segments)
+
+    def test_incremental_feed_matches_single_feed(self):
+        text = "First sentence here. Second one follows!\nThird line ends now."
+        whole = SentenceSegmenter(min_chars=5)
+        expected = whole.feed(text) + whole.flush()
+
+        incremental = SentenceSegmenter(min_chars=5)
+        segments = []
+        for char in text:
+            segments.extend(incremental.feed(char))
+        segments.extend(incremental.flush())
+
+        assert segments == expected
+
+
+class TestStitchAudio:
+    """Tests for stitch_audio."""
+
+    def test_concatenates_wav_segments(self):
+        combined = stitch_audio([_wav(b"\x01\x00" * 10), b"", _wav(b"\x02\x00" * 5)])
+        with wave.open(io.BytesIO(combined), "rb") as wav_file:
+            assert wav_file.getnframes() == 15
+            assert wav_file.getframerate() == 16000
+            frames = wav_file.readframes(15)
+        assert frames == b"\x01\x00" * 10 + b"\x02\x00" * 5
+
+    def test_concatenates_raw_pcm(self):
+        assert stitch_audio([b"\x01\x00", b"\x02\x00"]) == b"\x01\x00\x02\x00"
+
+    def test_empty_segments(self):
+        assert stitch_audio([b"", b""]) == b""
+
+
+class TestPipelinedTTS:
+    """Tests for PipelinedTTS."""
+
+    @pytest.mark.asyncio
+    async def test_synthesizes_while_streaming_and_keeps_order(self):
+        started = []
+
+        async def synthesize(text):
+            started.append(text)
+            # Later segments finish first to check ordering
+            await asyncio.sleep(0.05 if text.startswith("First") else 0.0)
+            return _wav(text[:2].encode())
+
+        pipeline = PipelinedTTS(
+            synthesize, max_concurrency=4, segmenter=SentenceSegmenter(min_chars=5)
+        )
+        chunks = ["First sentence. ", "Second sentence. ", "Tail"]
+        passed_through = []
+        async for chunk in pipeline.tee(_stream(chunks)):
+            passed_through.append(chunk)
+            await asyncio.sleep(0)
+
+        assert passed_through == chunks
+        # Both complete sentences were submitted before the stream ended
+        assert started == ["First sentence.", "Second sentence."]
+
+        audio = await pipeline.finish()
+
+        assert pipeline.segments == ["First sentence.", "Second sentence.", "Tail"]
+        with wave.open(io.BytesIO(audio), "rb") as wav_file:
+            assert wav_file.readframes(wav_file.getnframes()) == b"FiSeTa"
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency(self):
+        active = 0
+        peak = 0
+
+        async def synthesize(text):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return b"\x00\x00"
+
+        pipeline = PipelinedTTS(
+            synthesize, max_concurrency=2, segmenter=SentenceSegmenter(min_chars=1)
+        )
+        pipeline.feed("One. Two. Three. Four. Five. ")
+        await pipeline.finish()
+
+        assert pipeline.segment_count == 5
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_remaining_segments(self):
+        cancelled = asyncio.Event()
+
+        async def synthesize(text):
+            if text.startswith("Bad"):
+                raise RuntimeError("tts down")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return b""
+
+        pipeline = PipelinedTTS(
+            synthesize, max_concurrency=2, segmenter=SentenceSegmenter(min_chars=1)
+        )
+        pipeline.feed("Slow one. Bad one. ")
+
+        with pytest.raises(RuntimeError, match="tts down"):
+            await pipeline.finish()
+        await asyncio.sleep(0)
+        assert cancelled.is_set()